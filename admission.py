@@ -0,0 +1,223 @@
+import asyncio
+import json
+import math
+import os
+import time
+from collections import OrderedDict, deque
+from typing import Any, Dict, Optional, Sequence, Tuple
+
+from metrics import ADMISSION_QUEUE_SECONDS, ADMISSION_REJECTED
+
+
+# Token bucket per client: setiap client boleh rate request/detik rata-rata dengan
+# lonjakan sampai burst request. Jumlah client yang diingat dibatasi (LRU), client yang
+# lama tidak terlihat mulai lagi dengan bucket penuh.
+class RateLimiter:
+    def __init__(self, rate: float, burst: float, max_clients: int = 10000):
+        self.rate = rate
+        self.burst = max(burst, 1.0)
+        self.max_clients = max_clients
+        self._buckets: 'OrderedDict[str, list]' = OrderedDict()
+
+    # 0 jika request boleh lewat, selain itu detik sampai token berikutnya tersedia
+    def acquire(self, client: str) -> float:
+        now = time.monotonic()
+        bucket = self._buckets.get(client)
+        if bucket is None:
+            bucket = self._buckets[client] = [self.burst, now]
+            if len(self._buckets) > self.max_clients:
+                self._buckets.popitem(last=False)
+        else:
+            self._buckets.move_to_end(client)
+            bucket[0] = min(self.burst, bucket[0] + (now - bucket[1]) * self.rate)
+            bucket[1] = now
+        if bucket[0] >= 1:
+            bucket[0] -= 1
+            return 0.0
+        return (1 - bucket[0]) / self.rate
+
+    def __len__(self):
+        return len(self._buckets)
+
+
+# Batas request bersamaan dengan antrean terbatas (FIFO). Request yang tidak langsung
+# dapat slot menunggu paling lama queue_timeout detik; jika antrean penuh atau waktu
+# tunggu habis request ditolak (tidak ikut menumpuk).
+class ConcurrencyLimiter:
+    def __init__(self, limit: int, queue_size: int, queue_timeout: float):
+        self.limit = limit
+        self.queue_size = queue_size
+        self.queue_timeout = queue_timeout
+        self.active = 0
+        self._waiters: deque = deque()
+
+    @property
+    def queued(self) -> int:
+        return len(self._waiters)
+
+    # None jika dapat slot, selain itu alasan ditolak ('queue_full' / 'queue_timeout')
+    async def acquire(self) -> Optional[str]:
+        if self.active < self.limit and not self._waiters:
+            self.active += 1
+            return None
+        if len(self._waiters) >= self.queue_size:
+            return 'queue_full'
+        future = asyncio.get_running_loop().create_future()
+        self._waiters.append(future)
+        try:
+            await asyncio.wait_for(future, self.queue_timeout)
+        except asyncio.TimeoutError:
+            return 'queue_timeout'
+        except asyncio.CancelledError:
+            # slot sudah diberikan tepat sebelum request dibatalkan (client putus)
+            if future.done() and not future.cancelled():
+                self.release()
+            raise
+        finally:
+            try:
+                self._waiters.remove(future)
+            except ValueError:
+                pass
+        return None
+
+    # slot langsung diberikan ke request terdepan di antrean, jika ada
+    def release(self):
+        while self._waiters:
+            future = self._waiters.popleft()
+            if not future.done():
+                future.set_result(None)
+                return
+        self.active -= 1
+
+
+# Satu anggaran admission (mis. 'local' dan 'upstream'): batas request bersamaan + antrean
+# untuk semua client, dan rate limit per client (rate 0 = tanpa rate limit).
+# Nilai bisa diganti lewat ADMISSION_<NAMA>_CONCURRENCY / _QUEUE / _QUEUE_TIMEOUT / _RATE / _BURST.
+class AdmissionPool:
+    def __init__(self, name: str, concurrency: int = 64, queue: int = 256, queue_timeout: float = 2.0,
+                 rate: float = 0.0, burst: float = 0.0):
+        self.name = name
+        prefix = f'ADMISSION_{name.upper()}_'
+        self.limiter = ConcurrencyLimiter(
+            int(os.environ.get(prefix + 'CONCURRENCY', concurrency)),
+            int(os.environ.get(prefix + 'QUEUE', queue)),
+            float(os.environ.get(prefix + 'QUEUE_TIMEOUT', queue_timeout)),
+        )
+        rate = float(os.environ.get(prefix + 'RATE', rate))
+        burst = float(os.environ.get(prefix + 'BURST', burst or rate * 2))
+        self.rate_limiter = RateLimiter(rate, burst) if rate > 0 else None
+        self.stats = {'diterima': 0, 'diantrekan': 0}
+        self.rejected = {'rate_limited': 0, 'queue_full': 0, 'queue_timeout': 0}
+
+    def status(self) -> Dict[str, Any]:
+        limiter = self.limiter
+        return {
+            'concurrency': limiter.limit,
+            'active': limiter.active,
+            'queued': limiter.queued,
+            'queue_size': limiter.queue_size,
+            'queue_timeout': limiter.queue_timeout,
+            'rate': self.rate_limiter.rate if self.rate_limiter else None,
+            'burst': self.rate_limiter.burst if self.rate_limiter else None,
+            'clients': len(self.rate_limiter) if self.rate_limiter else 0,
+            **self.stats,
+            'ditolak': dict(self.rejected),
+        }
+
+
+# local: endpoint yang hanya membaca / menulis data sendiri (cepat)
+# upstream: endpoint yang bisa menunggu API kelompok lain; dibatasi lebih ketat supaya
+# lonjakan request ke partner tidak menghabiskan memori / socket dan tidak membuat
+# endpoint lokal ikut lambat
+POOLS: Dict[str, AdmissionPool] = {
+    'local': AdmissionPool('local', concurrency=64, queue=256, queue_timeout=2.0),
+    'upstream': AdmissionPool('upstream', concurrency=16, queue=64, queue_timeout=2.0),
+}
+
+
+def admission_status() -> Dict[str, Any]:
+    return {name: pool.status() for name, pool in POOLS.items()}
+
+
+def _response(status: int, detail: str, retry_after: float):
+    body = json.dumps({'detail': detail}).encode()
+    headers = [(b'content-type', b'application/json'), (b'content-length', str(len(body)).encode()),
+               (b'retry-after', str(max(1, math.ceil(retry_after))).encode())]
+    return {'type': 'http.response.start', 'status': status, 'headers': headers}, \
+        {'type': 'http.response.body', 'body': body}
+
+
+# Middleware ASGI admission control, dijalankan sebelum routing supaya request yang
+# ditolak hampir tidak memakan CPU:
+# - path dipetakan ke pool lewat routes [(nama_pool, (pola, ...)), ...]; pola adalah awalan
+#   path per segmen dengan '*' untuk satu segmen bebas (mis. '/penduduk/*/profile'),
+#   path lain masuk default_pool, path di exempt tidak dibatasi (mis. /metrics)
+# - rate limit per client habis -> 429, antrean penuh / waktu tunggu habis -> 503,
+#   keduanya dengan header Retry-After
+# - client = alamat IP koneksi, atau IP pertama di X-Forwarded-For jika trust_forwarded
+#   (di belakang reverse proxy semua request terlihat dari alamat proxy)
+class AdmissionMiddleware:
+    def __init__(self, app, pools: Dict[str, AdmissionPool], routes: Sequence[Tuple[str, Sequence[str]]] = (),
+                 default_pool: str = 'local', exempt: Sequence[str] = (), trust_forwarded: bool = False):
+        self.app = app
+        self.pools = pools
+        self.routes = [(pools[name], [tuple(pattern.rstrip('/').split('/')) for pattern in patterns])
+                       for name, patterns in routes]
+        self.default_pool = pools[default_pool]
+        self.exempt = set(exempt)
+        self.trust_forwarded = trust_forwarded
+
+    def pool_for(self, path: str) -> Optional[AdmissionPool]:
+        if path in self.exempt:
+            return None
+        segments = path.rstrip('/').split('/')
+        for pool, patterns in self.routes:
+            for pattern in patterns:
+                if len(segments) >= len(pattern) and all(p == '*' or p == s for p, s in zip(pattern, segments)):
+                    return pool
+        return self.default_pool
+
+    def client_id(self, scope) -> str:
+        if self.trust_forwarded:
+            for name, value in scope['headers']:
+                if name == b'x-forwarded-for':
+                    return value.decode('latin-1').split(',')[0].strip()
+        client = scope.get('client')
+        return client[0] if client else 'unknown'
+
+    async def __call__(self, scope, receive, send):
+        if scope['type'] != 'http':
+            await self.app(scope, receive, send)
+            return
+        pool = self.pool_for(scope['path'])
+        if pool is None:
+            await self.app(scope, receive, send)
+            return
+        if pool.rate_limiter is not None:
+            wait = pool.rate_limiter.acquire(self.client_id(scope))
+            if wait:
+                await self._reject(send, pool, 'rate_limited', 429, "Terlalu banyak request, coba lagi nanti.", wait)
+                return
+        limiter = pool.limiter
+        started = time.perf_counter()
+        queued = limiter.active >= limiter.limit or limiter.queued > 0
+        reason = await limiter.acquire()
+        if queued:
+            pool.stats['diantrekan'] += 1
+            ADMISSION_QUEUE_SECONDS.observe(time.perf_counter() - started, (pool.name,))
+        if reason is not None:
+            await self._reject(send, pool, reason, 503, "Server sedang sibuk, coba lagi nanti.",
+                               limiter.queue_timeout)
+            return
+        pool.stats['diterima'] += 1
+        try:
+            await self.app(scope, receive, send)
+        finally:
+            limiter.release()
+
+    async def _reject(self, send, pool: AdmissionPool, reason: str, status: int, detail: str, retry_after: float):
+        pool.rejected[reason] += 1
+        ADMISSION_REJECTED.inc((pool.name, reason))
+        start, body = _response(status, detail, retry_after)
+        await send(start)
+        await send(body)
@@ -0,0 +1,203 @@
+import heapq
+import threading
+from collections import Counter
+from itertools import repeat
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+from store import Change
+
+
+# semua float adalah kelipatan 2**-1074, jadi nilai * 2**1074 selalu bilangan bulat
+_SCALE = 1 << 1074
+
+
+def _scaled(value) -> int:
+    if isinstance(value, float):
+        numerator, denominator = value.as_integer_ratio()
+        # denominator selalu pangkat dua
+        return numerator << (1075 - denominator.bit_length())
+    return value << 1074
+
+
+# Statistik satu kolom angka: sum / min / max. Jumlah per nilai disimpan, dan min / max
+# diambil dari heap nilai (max sebagai heap nilai negatif) dengan penghapusan malas: nilai
+# yang jumlahnya sudah 0 baru dibuang saat berada di puncak heap, jadi menghapus data
+# (termasuk nilai terkecil / terbesar) O(log n), tanpa memindai semua nilai.
+# Total disimpan sebagai bilangan bulat yang diskalakan (tepat, tanpa error pembulatan
+# float), sehingga hasilnya sama persis dengan menjumlahkan ulang seluruh tabel.
+class _FieldStats:
+    __slots__ = ('total', 'floats', 'counts', 'low', 'high')
+
+    def __init__(self):
+        self.total = 0
+        self.floats = 0
+        self.counts: Dict[Any, int] = {}
+        self.low: List[Any] = []
+        self.high: List[Any] = []
+
+    # jumlah data dengan nilai value bertambah delta (negatif jika berkurang)
+    def change(self, value, delta: int, is_float: bool):
+        self.total += _scaled(value) * delta
+        self.floats += is_float * delta
+        count = self.counts.get(value)
+        if count is not None:
+            if count + delta:
+                self.counts[value] = count + delta
+            else:
+                del self.counts[value]
+            return
+        self.counts[value] = delta
+        # nilai yang pernah dihapus bisa masih ada di heap; heap dibangun ulang jika isinya
+        # lebih dari dua kali jumlah nilai berbeda (O(1) rata-rata per perubahan)
+        if len(self.low) > 2 * len(self.counts) + 64:
+            self.low = list(self.counts)
+            self.high = [-value for value in self.counts]
+            heapq.heapify(self.low)
+            heapq.heapify(self.high)
+            return
+        heapq.heappush(self.low, value)
+        heapq.heappush(self.high, -value)
+
+    @property
+    def min(self):
+        low, counts = self.low, self.counts
+        while low and low[0] not in counts:
+            heapq.heappop(low)
+        return low[0] if low else None
+
+    @property
+    def max(self):
+        high, counts = self.high, self.counts
+        while high and -high[0] not in counts:
+            heapq.heappop(high)
+        return -high[0] if high else None
+
+    def snapshot(self) -> Dict[str, Any]:
+        # pembagian int / int di Python dibulatkan dengan benar (sama seperti math.fsum)
+        total = self.total / _SCALE if self.floats else self.total // _SCALE
+        return {'sum': total, 'min': self.min, 'max': self.max}
+
+
+class _GroupStats:
+    __slots__ = ('count', 'fields')
+
+    def __init__(self, fields: Sequence[str]):
+        self.count = 0
+        self.fields = {field: _FieldStats() for field in fields}
+
+    def snapshot(self) -> Dict[str, Any]:
+        return {'count': self.count, **{field: stats.snapshot() for field, stats in self.fields.items()}}
+
+
+# Ringkasan (count / sum / min / max) sebuah tabel, total dan per nilai kolom group_by.
+# Diperbarui O(log n) per data yang berubah lewat store.subscribe(), sehingga membaca
+# ringkasan tidak pernah memindai tabel. Jika versi tabel melompat (ditulis oleh worker
+# lain pada backend SQLite), perubahan yang terlewat dibaca dari log perubahan tabel
+# (store.changes_since); tabel hanya dihitung ulang jika log tersebut sudah tidak lengkap.
+class RunningAggregate:
+    def __init__(self, store, group_by: Sequence[str], fields: Sequence[str]):
+        self.store = store
+        self.group_by = tuple(group_by)
+        self.fields = tuple(fields)
+        # store in-memory memanggil listener di dalam lock tulisnya; lock yang sama dipakai
+        # di sini supaya membaca ringkasan tidak bisa saling tunggu (deadlock) dengan penulisan
+        self._lock = getattr(store, 'lock', None) or threading.RLock()
+        self._version: Optional[int] = None
+        with self._lock:
+            self._rebuild()
+        store.subscribe(self._on_change)
+
+    def _rebuild(self):
+        while True:
+            version = self.store.version
+            self._total = _GroupStats(self.fields)
+            self._groups: Dict[str, Dict[Any, _GroupStats]] = {field: {} for field in self.group_by}
+            for chunk in self.store.iter_chunks(10000):
+                self._apply_changes([(None, row) for row in chunk])
+            # diulang jika tabel berubah selama dihitung (SQLite, ditulis worker / thread lain)
+            if self.store.version == version:
+                self._version = version
+                return
+
+    # Perubahan satu batch dijumlahkan dulu per (group, kolom, nilai) dengan Counter, lalu
+    # diterapkan sekali per nilai berbeda: batch besar (mis. denda seluruh setoran dihitung
+    # ulang) tidak menskalakan nilai dan mengubah heap untuk setiap data.
+    def _apply_changes(self, changes: List[Change]):
+        counts, deltas = self._count([new for _, new in changes if new is not None])
+        removed_counts, removed_deltas = self._count([old for old, _ in changes if old is not None])
+        counts.subtract(removed_counts)
+        deltas.subtract(removed_deltas)
+        for group, delta in counts.items():
+            if delta:
+                for stats in self._targets(group):
+                    stats.count += delta
+        for (group, field, value, kind), delta in deltas.items():
+            if delta and value is not None:
+                for stats in self._targets(group):
+                    stats.fields[field].change(value, delta, kind is float)
+        # group yang sudah kosong dibuang
+        for group in counts:
+            for field, value in zip(self.group_by, group):
+                stats = self._groups[field].get(value)
+                if stats is not None and stats.count == 0:
+                    del self._groups[field][value]
+
+    # jumlah data per group dan per (group, kolom, nilai, jenis nilai); jenis nilai ikut
+    # dihitung supaya 0 dan 0.0 dibedakan (jenis hasil sum int / float tetap benar)
+    def _count(self, rows: List[Dict[str, Any]]) -> Tuple[Counter, Counter]:
+        if self.group_by:
+            groups = list(zip(*[[row.get(field) for row in rows] for field in self.group_by]))
+        else:
+            groups = [()] * len(rows)
+        deltas = Counter()
+        for field in self.fields:
+            values = [row.get(field) for row in rows]
+            deltas.update(zip(groups, repeat(field), values, map(type, values)))
+        return Counter(groups), deltas
+
+    def _targets(self, group: tuple) -> List[_GroupStats]:
+        targets = [self._total]
+        for field, value in zip(self.group_by, group):
+            groups = self._groups[field]
+            stats = groups.get(value)
+            if stats is None:
+                stats = groups[value] = _GroupStats(self.fields)
+            targets.append(stats)
+        return targets
+
+    def _on_change(self, changes: List[Change], version: int):
+        with self._lock:
+            if self._version is None or version <= self._version:
+                # belum dihitung, atau perubahan ini sudah terbaca dari log perubahan
+                return
+            if version != self._version + 1:
+                # ada perubahan yang tidak terlihat oleh worker ini
+                if not self._catch_up():
+                    self._version = None
+                return
+            self._apply_changes(changes)
+            self._version = version
+
+    # menerapkan perubahan setelah self._version dari log perubahan tabel; False jika
+    # store tidak punya log atau log sudah tidak lengkap
+    def _catch_up(self) -> bool:
+        changes_since = getattr(self.store, 'changes_since', None)
+        if changes_since is None or self._version is None:
+            return False
+        found = changes_since(self._version)
+        if found is None:
+            return False
+        changes, version = found
+        self._apply_changes(changes)
+        self._version = version
+        return True
+
+    def snapshot(self) -> Dict[str, Any]:
+        with self._lock:
+            if self._version != self.store.version and not self._catch_up():
+                self._rebuild()
+            return {
+                'total': self._total.snapshot(),
+                **{f'per_{field}': {str(value): stats.snapshot() for value, stats in groups.items()}
+                   for field, groups in self._groups.items()},
+            }
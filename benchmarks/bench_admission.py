@@ -0,0 +1,192 @@
+# Load test admission control (admission.py): serve.py (1 worker) dijalankan bersama server
+# stub partner, lalu banyak client membanjiri endpoint yang menunggu partner
+# (/penduduk/{nik}/profile dan /pajakwisata) sementara beberapa client membaca endpoint
+# lokal /pajak/{id_pajak}. Dibandingkan tiga keadaan:
+#   1. tanpa banjir (latency dasar endpoint lokal)
+#   2. banjir, admission control dimatikan (ADMISSION=0)
+#   3. banjir, admission control aktif (default)
+# Client banjir menunggu sesuai Retry-After (paling lama 1 detik) jika ditolak.
+# Yang diharapkan: p99 endpoint lokal pada keadaan 3 tetap dekat dengan keadaan 1.
+# Jalankan dari root repo: python benchmarks/bench_admission.py [detik] [client_banjir]
+import asyncio
+import multiprocessing
+import os
+import subprocess
+import sys
+import time
+from collections import Counter
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import httpx  # noqa: E402
+
+from loadtest import ROOT, free_port, percentile, rss_mb  # noqa: E402
+from stubs import StubServer, default_payloads  # noqa: E402
+
+LOCAL_CLIENTS = 4
+FLOOD_PATHS = ['/penduduk/{nik}/profile', '/pajakwisata']
+
+
+def start_server(env):
+    port = free_port()
+    process = subprocess.Popen([sys.executable, 'serve.py'], cwd=ROOT, env=dict(env, PORT=str(port)),
+                               stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+    base_url = f'http://127.0.0.1:{port}'
+    for _ in range(300):
+        try:
+            httpx.get(base_url + '/pajak/PJ001', timeout=1)
+            return process, base_url
+        except httpx.HTTPError:
+            time.sleep(0.05)
+    process.kill()
+    raise RuntimeError('server tidak bisa dijalankan')
+
+
+async def local_client(client, deadline, latencies, statuses):
+    while time.perf_counter() < deadline:
+        started = time.perf_counter()
+        try:
+            response = await client.get('/pajak/PJ001')
+            statuses[response.status_code] += 1
+        except httpx.HTTPError as e:
+            statuses[type(e).__name__] += 1
+        latencies.append(time.perf_counter() - started)
+        await asyncio.sleep(0.01)
+
+
+async def flood_client(client, deadline, i, statuses, latencies):
+    while time.perf_counter() < deadline:
+        path = FLOOD_PATHS[i % len(FLOOD_PATHS)].format(nik=100 + i % 20)
+        started = time.perf_counter()
+        try:
+            response = await client.get(path)
+        except httpx.HTTPError as e:
+            statuses[type(e).__name__] += 1
+            continue
+        statuses[response.status_code] += 1
+        if response.status_code == 200:
+            latencies.append(time.perf_counter() - started)
+        elif response.status_code in (429, 503):
+            await asyncio.sleep(min(1.0, float(response.headers.get('retry-after', 1))))
+
+
+async def flood_run(base_url, seconds, flood):
+    statuses, latencies = Counter(), []
+    limits = httpx.Limits(max_connections=None, max_keepalive_connections=flood)
+    async with httpx.AsyncClient(base_url=base_url, timeout=60, limits=limits) as client:
+        deadline = time.perf_counter() + seconds
+        await asyncio.gather(*(flood_client(client, deadline, i, statuses, latencies) for i in range(flood)))
+    ms = sorted(value * 1000 for value in latencies)
+    return dict(statuses), percentile(ms, 50), percentile(ms, 99)
+
+
+# client banjir berjalan di proses sendiri supaya tidak ikut memperlambat client lokal.
+# Prioritas CPU diturunkan (nice) seperti client di mesin lain: pada mesin dengan sedikit core,
+# CPU yang dipakai pembangkit beban tidak boleh mengurangi CPU server.
+def flood_process(base_url, seconds, flood, results):
+    os.nice(10)
+    results.put(asyncio.run(flood_run(base_url, seconds, flood)))
+
+
+# persentil dari histogram http_request_duration_seconds di /metrics (batas atas bucket),
+# yaitu waktu di dalam server termasuk antre admission, tanpa waktu di sisi client
+def server_quantile(metrics_text, route, q):
+    buckets = {}
+    for line in metrics_text.splitlines():
+        if line.startswith('http_request_duration_seconds_bucket') and f'route="{route}"' in line:
+            bound = line.split('le="')[1].split('"')[0]
+            buckets[float(bound)] = buckets.get(float(bound), 0) + int(float(line.rsplit(' ', 1)[1]))
+    if not buckets or not buckets[float('inf')]:
+        return None
+    total = buckets[float('inf')]
+    return next(bound for bound, count in sorted(buckets.items()) if count >= q * total) * 1000
+
+
+async def scenario(base_url, pid, seconds, flood):
+    latencies, local_statuses = [], Counter()
+    results = multiprocessing.Queue()
+    flooder = multiprocessing.Process(target=flood_process, args=(base_url, seconds + 1, flood, results))
+    if flood:
+        flooder.start()
+        await asyncio.sleep(1)  # banjir dimulai dulu
+    async with httpx.AsyncClient(base_url=base_url, timeout=60) as client:
+        deadline = time.perf_counter() + seconds
+        peak = [0.0]
+
+        async def watch_rss():
+            while time.perf_counter() < deadline:
+                peak[0] = max(peak[0], rss_mb(pid))
+                await asyncio.sleep(0.25)
+
+        await asyncio.gather(watch_rss(), *(local_client(client, deadline, latencies, local_statuses)
+                                            for _ in range(LOCAL_CLIENTS)))
+        metrics_text = (await client.get('/metrics')).text
+    flood_statuses, flood_p50, flood_p99 = {}, None, None
+    if flood:
+        flood_statuses, flood_p50, flood_p99 = results.get()
+        flooder.join()
+    ms = sorted(value * 1000 for value in latencies)
+    return {
+        'local_p50': percentile(ms, 50), 'local_p99': percentile(ms, 99), 'local_max': ms[-1],
+        'local_status': dict(local_statuses), 'upstream_ok_rps': flood_statuses.get(200, 0) / (seconds + 1),
+        'upstream_status': flood_statuses, 'upstream_p50': flood_p50, 'upstream_p99': flood_p99,
+        'rss_peak': peak[0],
+        'server_local_p99': server_quantile(metrics_text, '/pajak/{id_pajak}', 0.99),
+        'server_upstream_p99': max(filter(None, (server_quantile(metrics_text, route, 0.99)
+                                                 for route in ('/penduduk/{nik}/profile', '/pajakwisata'))),
+                                   default=None),
+    }
+
+
+# server stub juga di proses sendiri (encode data partner memakan CPU)
+def stub_process(ready, stop):
+    os.nice(10)
+    stub = StubServer(payloads=default_payloads(2000), latency=0.3).start()
+    ready.put((stub.env(), list(stub.payloads)))
+    stop.wait()
+    stub.stop()
+
+
+def report(label, result):
+    print(f"{label:34} lokal p50 {result['local_p50']:7.1f} ms  p99 {result['local_p99']:7.1f} ms  "
+          f"max {result['local_max']:7.1f} ms  {result['local_status']}")
+    if result['upstream_status']:
+        print(f"{'':34} upstream sukses {result['upstream_ok_rps']:6.1f} req/detik  p50 {result['upstream_p50'] or 0:7.1f} ms  "
+              f"p99 {result['upstream_p99'] or 0:7.1f} ms  {result['upstream_status']}")
+    server = f"p99 di server: lokal <= {result['server_local_p99']:.0f} ms"
+    if result['server_upstream_p99'] is not None:
+        server += f", upstream <= {result['server_upstream_p99']:.0f} ms"
+    print(f"{'':34} {server}, RSS puncak {result['rss_peak']:.1f} MB")
+
+
+def main():
+    seconds = float(sys.argv[1]) if len(sys.argv) > 1 else 10
+    flood = int(sys.argv[2]) if len(sys.argv) > 2 else 300
+    # latency partner 0.3 detik, data partner cukup besar supaya setiap response profil / join
+    # memakan CPU. Sync background dan cache dimatikan (ttl 0) supaya request menunggu partner
+    # seperti saat cache dingin: semua request yang menumpuk selama satu fetch lanjut bersamaan.
+    ready, stop = multiprocessing.Queue(), multiprocessing.Event()
+    stub = multiprocessing.Process(target=stub_process, args=(ready, stop))
+    stub.start()
+    stub_env, names = ready.get()
+    env = dict(os.environ, **stub_env, PARTNER_SYNC='0', STORAGE_BACKEND='memory', WEB_CONCURRENCY='1',
+               HOST='127.0.0.1')
+    for name in names:
+        env[f'UPSTREAM_{name.upper()}_TTL'] = env[f'UPSTREAM_{name.upper()}_STALE_TTL'] = '0'
+    try:
+        for label, flood_clients, extra in [('tanpa banjir', 0, {}),
+                                            ('banjir, admission mati', flood, {'ADMISSION': '0'}),
+                                            ('banjir, admission aktif', flood, {})]:
+            process, base_url = start_server(dict(env, **extra))
+            try:
+                report(label, asyncio.run(scenario(base_url, process.pid, seconds, flood_clients)))
+            finally:
+                process.terminate()
+                process.wait()
+    finally:
+        stop.set()
+        stub.join()
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,43 @@
+# Benchmark throughput endpoint batch /setoranpajak/bulk dan /penduduk/bulk (target >= 50k baris/detik)
+# Jalankan dari root repo: python benchmarks/bench_bulk.py [jumlah_baris]
+import json
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+
+def setoran_rows(n, start=1000):
+    return [{'id_setoran': start + i, 'id_pajak': f'PJ{i % 500:03d}', 'tanggal_jatuh_tempo': '30-11-2023',
+             'tanggal_setoran': '01-12-2023', 'status_setoran': 'terlambat' if i % 3 else 'tepat waktu',
+             'denda': 0.02, 'besar_pajak_setelah_denda': 1000000} for i in range(n)]
+
+
+def penduduk_rows(n, start=1000):
+    return [{'nik': start + i, 'nama': f'Penduduk {i}', 'provinsi': 'Jawa Barat', 'kota': f'Kota {i % 30}',
+             'kecamatan': f'Kecamatan {i % 400}', 'desa': f'Desa {i % 5000}'} for i in range(n)]
+
+
+def main():
+    from fastapi.testclient import TestClient
+    import main as app_module
+
+    n = int(sys.argv[1]) if len(sys.argv) > 1 else 200000
+    client = TestClient(app_module.app)
+    cases = [
+        ('/setoranpajak/bulk', 'json', json.dumps(setoran_rows(n)).encode(), 'application/json'),
+        ('/setoranpajak/bulk?mode=upsert', 'ndjson',
+         '\n'.join(json.dumps(row) for row in setoran_rows(n)).encode(), 'application/x-ndjson'),
+        ('/penduduk/bulk', 'json', json.dumps(penduduk_rows(n)).encode(), 'application/json'),
+    ]
+    for path, fmt, body, content_type in cases:
+        started = time.perf_counter()
+        response = client.post(path, content=body, headers={'content-type': content_type})
+        elapsed = time.perf_counter() - started
+        print(f'{path:32} {fmt:6} {n} baris: {elapsed:.3f}s = {n / elapsed:,.0f} baris/detik '
+              f"(status {response.status_code}, diproses {response.json()['data']['diproses']})")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,181 @@
+# Benchmark change feed (/changes/ws dan /changes/stream) dibanding polling tabel penuh.
+# serve.py (1 worker) diisi data penduduk sintetis, lalu selama beberapa detik satu writer
+# mengubah satu data penduduk setiap WRITE_INTERVAL detik sementara N client mengikuti
+# perubahan dengan salah satu cara:
+#   poll : GET /penduduk (seluruh tabel, dengan If-None-Match) setiap POLL_INTERVAL detik
+#   sse  : satu koneksi /changes/stream?tables=penduduk per client
+#   ws   : satu koneksi /changes/ws?tables=penduduk per client
+# Dilaporkan CPU server per detik, byte yang diterima semua client per detik dan waktu sampai
+# perubahan diterima client (p50 / p99; untuk poll dihitung dari data yang dibaca).
+# Jalankan dari root repo: python benchmarks/bench_changefeed.py [client] [detik] [jumlah_penduduk]
+import asyncio
+import json
+import os
+import subprocess
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import httpx  # noqa: E402
+from websockets.asyncio.client import connect  # noqa: E402
+
+import datasets  # noqa: E402
+from loadtest import ROOT, free_port, percentile, rss_mb  # noqa: E402
+
+WRITE_INTERVAL = 0.1
+POLL_INTERVAL = 1.0
+WRITE_NIK = datasets.nik(0)
+
+
+def start_server():
+    port = free_port()
+    env = dict(os.environ, PORT=str(port), HOST='127.0.0.1', WEB_CONCURRENCY='1', STORAGE_BACKEND='memory',
+               PARTNER_SYNC='0')
+    process = subprocess.Popen([sys.executable, 'serve.py'], cwd=ROOT, env=env,
+                               stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+    base_url = f'http://127.0.0.1:{port}'
+    for _ in range(300):
+        try:
+            httpx.get(base_url + '/changes/status', timeout=1)
+            return process, base_url
+        except httpx.HTTPError:
+            time.sleep(0.05)
+    process.kill()
+    raise RuntimeError('server tidak bisa dijalankan')
+
+
+def cpu_seconds(pid):
+    with open(f'/proc/{pid}/stat') as f:
+        fields = f.read().rsplit(')', 1)[1].split()
+    return (int(fields[11]) + int(fields[12])) / os.sysconf('SC_CLK_TCK')
+
+
+async def seed(base_url, rows):
+    async with httpx.AsyncClient(base_url=base_url) as client:
+        for start in range(0, rows, 50000):
+            body = '\n'.join(json.dumps(row) for row in datasets.penduduk_rows(start, min(rows, start + 50000)))
+            response = await client.post('/penduduk/bulk?mode=upsert', content=body.encode(),
+                                         headers={'content-type': 'application/x-ndjson'}, timeout=600)
+            assert response.status_code == 200, response.text[:200]
+
+
+# mengubah nama satu penduduk menjadi 'w<i>'; written[i] = waktu request dikirim
+async def writer(client, deadline, written):
+    row = datasets.penduduk_rows(0, 1)[0]
+    i = 0
+    while time.perf_counter() < deadline:
+        written[i] = time.perf_counter()
+        response = await client.put(f'/penduduk/{WRITE_NIK}', json=dict(row, nama=f'w{i}'))
+        assert response.status_code == 200, response.text[:200]
+        i += 1
+        await asyncio.sleep(WRITE_INTERVAL)
+
+
+def seen(received, nama, now):
+    if nama.startswith('w'):
+        received.setdefault(int(nama[1:]), now)
+
+
+async def poll_client(base_url, deadline, received, stats):
+    etag = None
+    async with httpx.AsyncClient(base_url=base_url, timeout=60) as client:
+        while time.perf_counter() < deadline:
+            headers = {'If-None-Match': etag} if etag else {}
+            async with client.stream('GET', '/penduduk', headers=headers) as response:
+                body = await response.aread()
+                stats['bytes'] += response.num_bytes_downloaded
+            now = time.perf_counter()
+            if response.status_code == 200:
+                etag = response.headers.get('etag')
+                for row in json.loads(body):
+                    if row['nik'] == WRITE_NIK:
+                        seen(received, row['nama'], now)
+                        break
+            await asyncio.sleep(POLL_INTERVAL)
+
+
+async def sse_client(base_url, deadline, received, stats, ready):
+    async with httpx.AsyncClient(base_url=base_url, timeout=None) as client:
+        async with client.stream('GET', '/changes/stream', params={'tables': 'penduduk'}) as response:
+            assert response.status_code == 200, response.status_code
+            ready.release()
+            async for chunk in response.aiter_raw():
+                now = time.perf_counter()
+                stats['bytes'] += len(chunk)
+                for line in chunk.split(b'\n'):
+                    if line.startswith(b'data: '):
+                        change = json.loads(line[6:])
+                        if change['data']:
+                            seen(received, change['data']['nama'], now)
+                if now >= deadline:
+                    return
+
+
+async def ws_client(base_url, deadline, received, stats, ready):
+    async with connect(base_url.replace('http', 'ws') + '/changes/ws?tables=penduduk') as websocket:
+        ready.release()
+        while True:
+            try:
+                message = await asyncio.wait_for(websocket.recv(), max(0.01, deadline - time.perf_counter()))
+            except asyncio.TimeoutError:
+                return
+            now = time.perf_counter()
+            stats['bytes'] += len(message)
+            change = json.loads(message)
+            if change['data']:
+                seen(received, change['data']['nama'], now)
+
+
+async def scenario(base_url, pid, mode, clients, seconds):
+    stats = {'bytes': 0}
+    received = [{} for _ in range(clients)]
+    written = {}
+    ready = asyncio.Semaphore(0)
+    async with httpx.AsyncClient(base_url=base_url, timeout=60) as client:
+        deadline = time.perf_counter() + seconds + 2
+        if mode == 'poll':
+            tasks = [asyncio.create_task(poll_client(base_url, deadline, received[i], stats)) for i in range(clients)]
+        else:
+            follow = sse_client if mode == 'sse' else ws_client
+            tasks = [asyncio.create_task(follow(base_url, deadline, received[i], stats, ready)) for i in range(clients)]
+            for _ in range(clients):
+                await ready.acquire()
+        await asyncio.sleep(0.5)
+        stats['bytes'] = 0
+        cpu_start, started = cpu_seconds(pid), time.perf_counter()
+        await writer(client, started + seconds, written)
+        cpu = cpu_seconds(pid) - cpu_start
+        elapsed = time.perf_counter() - started
+        rss = rss_mb(pid)
+        await asyncio.gather(*tasks)
+    delays = sorted((got[i] - written[i]) * 1000 for got in received for i in got if i in written)
+    # perubahan yang tertimpa sebelum terbaca (poll) tidak pernah diterima client
+    delivered = sum(1 for got in received for i in got if i in written) / (len(written) * clients)
+    return {'cpu_per_second': cpu / elapsed, 'bytes_per_second': stats['bytes'] / elapsed,
+            'p50': percentile(delays, 50), 'p99': percentile(delays, 99), 'delivered': delivered,
+            'writes': len(written), 'rss': rss}
+
+
+def main():
+    clients = int(sys.argv[1]) if len(sys.argv) > 1 else 50
+    seconds = float(sys.argv[2]) if len(sys.argv) > 2 else 10
+    rows = int(sys.argv[3]) if len(sys.argv) > 3 else 20000
+    print(f'{clients} client, {rows} penduduk, 1 perubahan / {WRITE_INTERVAL}s selama {seconds}s, '
+          f'poll setiap {POLL_INTERVAL}s')
+    for mode in ('poll', 'sse', 'ws'):
+        process, base_url = start_server()
+        try:
+            asyncio.run(seed(base_url, rows))
+            result = asyncio.run(scenario(base_url, process.pid, mode, clients, seconds))
+        finally:
+            process.terminate()
+            process.wait()
+        print(f"{mode:5} CPU server {result['cpu_per_second'] * 100:5.1f}%  "
+              f"diterima client {result['bytes_per_second'] / 1e6:8.2f} MB/detik  "
+              f"sampai ke client p50 {result['p50'] or 0:7.1f} ms  p99 {result['p99'] or 0:7.1f} ms  "
+              f"perubahan diterima {result['delivered'] * 100:5.1f}%  RSS {result['rss']:.1f} MB")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,67 @@
+# Benchmark kompresi response (compression.py) untuk GET /penduduk dan /setoranpajak dengan
+# 100k baris: byte yang dikirim dan waktu CPU per request untuk
+#   - tanpa kompresi (Accept-Encoding: identity)
+#   - gzip, data berubah setiap request (body dikompres ulang)
+#   - gzip, data tetap (body terkompres diambil dari cache per ETag)
+#   - gzip, NDJSON streaming (?stream=true, dikompres per chunk)
+# Jalankan dari root repo: python benchmarks/bench_compression.py [jumlah_baris] [jumlah_request]
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from bench_http_cache import setoran_rows  # noqa: E402
+from bench_serialization import penduduk_rows  # noqa: E402
+
+
+def measure(client, path, requests, encoding, before=None):
+    wire = 0
+    wall = time.perf_counter()
+    cpu = time.process_time()
+    for i in range(requests):
+        if before is not None:
+            before(i)
+        with client.stream('GET', path, headers={'Accept-Encoding': encoding}) as response:
+            # byte mentah seperti yang dikirim lewat jaringan (belum didekompres)
+            wire = sum(len(chunk) for chunk in response.iter_raw())
+    wall = time.perf_counter() - wall
+    cpu = time.process_time() - cpu
+    return requests / wall, cpu / requests * 1000, wire
+
+
+def main():
+    from fastapi.testclient import TestClient
+    import main as app_module
+    import tables
+    from compression import ENCODINGS
+
+    n = int(sys.argv[1]) if len(sys.argv) > 1 else 100000
+    requests = int(sys.argv[2]) if len(sys.argv) > 2 else 10
+    tables.data_penduduk.insert_many(penduduk_rows(n))
+    tables.data_setoran.insert_many(setoran_rows(n))
+    client = TestClient(app_module.app)
+    print(f'encoding tersedia: {", ".join(ENCODINGS)}')
+    tables = {'/penduduk': (tables.data_penduduk, penduduk_rows(1, start=1)[0]),
+              '/setoranpajak': (tables.data_setoran, setoran_rows(1, start=1)[0])}
+    for path, (store, row) in tables.items():
+        # menulis satu data supaya version tabel naik sebelum setiap request
+        def write(i, store=store, row=row):
+            store.upsert({**row, store.key: 10 ** 9 + i % 2})
+
+        raw = None
+        cases = [('tanpa kompresi', path, 'identity', None)]
+        for encoding in ENCODINGS:
+            cases += [(f'{encoding}, data berubah', path, encoding, write),
+                      (f'{encoding}, data tetap (cache)', path, encoding, None),
+                      (f'{encoding}, NDJSON streaming', path + '?stream=true', encoding, None)]
+        for label, url, encoding, before in cases:
+            client.get(url, headers={'Accept-Encoding': encoding})  # pemanasan
+            rps, cpu_ms, wire = measure(client, url, requests, encoding, before)
+            raw = raw or wire
+            print(f'{path:14} {label:28} {rps:7.1f} req/detik {cpu_ms:8.2f} ms CPU '
+                  f'{wire:>9} byte ({wire / raw:.1%})')
+
+
+if __name__ == '__main__':
+    main()
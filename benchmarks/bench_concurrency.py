@@ -0,0 +1,102 @@
+# Stress test multi-worker: menjalankan serve.py dengan 1, 2, 4 worker (backend SQLite bersama),
+# lalu banyak client menaikkan besar_pajak satu data dengan GET + PUT If-Match (retry jika 412).
+# Hasil akhir harus sama dengan jumlah update yang berhasil (tidak ada lost update).
+# Jalankan dari root repo: python benchmarks/bench_concurrency.py
+import asyncio
+import os
+import socket
+import subprocess
+import sys
+import tempfile
+import time
+
+import httpx
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+CLIENTS = 16
+UPDATES_PER_CLIENT = 20
+READ_SECONDS = 3.0
+
+
+def free_port():
+    with socket.socket() as sock:
+        sock.bind(('127.0.0.1', 0))
+        return sock.getsockname()[1]
+
+
+def start_server(workers, db_path):
+    port = free_port()
+    env = dict(os.environ, WEB_CONCURRENCY=str(workers), PORT=str(port), HOST='127.0.0.1',
+               STORAGE_BACKEND='sqlite', SQLITE_PATH=db_path)
+    process = subprocess.Popen([sys.executable, 'serve.py'], cwd=ROOT, env=env,
+                               stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+    base_url = f'http://127.0.0.1:{port}'
+    for _ in range(100):
+        try:
+            httpx.get(base_url + '/pajak/PJ001', timeout=1)
+            return process, base_url
+        except httpx.HTTPError:
+            time.sleep(0.1)
+    process.kill()
+    raise RuntimeError('server tidak bisa dijalankan')
+
+
+async def increment(client, retries):
+    while True:
+        response = await client.get('/pajak/PJ001')
+        pajak = response.json()['data']
+        pajak['besar_pajak'] += 1
+        response = await client.put('/pajak/PJ001', json=pajak, headers={'If-Match': response.headers['etag']})
+        if response.status_code == 200:
+            return
+        assert response.status_code == 412, response.text
+        retries.append(1)
+
+
+async def run_updates(base_url):
+    retries = []
+    async with httpx.AsyncClient(base_url=base_url, timeout=30) as client:
+        start = (await client.get('/pajak/PJ001')).json()['data']['besar_pajak']
+
+        async def worker():
+            for _ in range(UPDATES_PER_CLIENT):
+                await increment(client, retries)
+
+        await asyncio.gather(*(worker() for _ in range(CLIENTS)))
+        end = (await client.get('/pajak/PJ001')).json()['data']['besar_pajak']
+    return end - start, len(retries)
+
+
+async def run_reads(base_url):
+    count = 0
+    deadline = time.perf_counter() + READ_SECONDS
+    limits = httpx.Limits(max_connections=64)
+    async with httpx.AsyncClient(base_url=base_url, timeout=30, limits=limits) as client:
+        async def worker():
+            nonlocal count
+            while time.perf_counter() < deadline:
+                await client.get('/penduduk?provinsi=Jawa Barat')
+                count += 1
+
+        await asyncio.gather(*(worker() for _ in range(64)))
+    return count / READ_SECONDS
+
+
+def main():
+    for workers in (1, 2, 4):
+        with tempfile.TemporaryDirectory() as tmp:
+            process, base_url = start_server(workers, os.path.join(tmp, 'bench.db'))
+            try:
+                applied, retries = asyncio.run(run_updates(base_url))
+                rps = asyncio.run(run_reads(base_url))
+            finally:
+                process.terminate()
+                process.wait()
+        expected = CLIENTS * UPDATES_PER_CLIENT
+        status = 'OK' if applied == expected else 'LOST UPDATE'
+        print(f'{workers} worker: update {applied}/{expected} ({status}, {retries} retry 412), '
+              f'GET /penduduk {rps:,.0f} req/s')
+
+
+if __name__ == '__main__':
+    main()
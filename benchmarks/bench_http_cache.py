@@ -0,0 +1,66 @@
+# Benchmark polling GET /penduduk dan /setoranpajak dengan 100k baris (http_cache.py):
+#   - data berubah setiap request (body dibuat ulang)
+#   - data tidak berubah, tanpa If-None-Match (body diambil dari cache per version)
+#   - data tidak berubah, dengan If-None-Match (304 tanpa body)
+# Menampilkan req/detik, waktu CPU dan byte body per response.
+# Jalankan dari root repo: python benchmarks/bench_http_cache.py [jumlah_baris] [jumlah_request]
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from bench_serialization import penduduk_rows  # noqa: E402
+
+
+def setoran_rows(n, start=1000):
+    return [{'id_setoran': start + i, 'id_pajak': f'PJ{i % 500:03d}', 'tanggal_jatuh_tempo': '01-06-2023',
+             'tanggal_setoran': '15-06-2023', 'status_setoran': 'terlambat', 'denda': 0.0,
+             'besar_pajak_setelah_denda': 0} for i in range(n)]
+
+
+def measure(client, path, requests, before=None, headers=None):
+    size = 0
+    status = None
+    wall = time.perf_counter()
+    cpu = time.process_time()
+    for i in range(requests):
+        if before is not None:
+            before(i)
+        response = client.get(path, headers=headers)
+        size = len(response.content)
+        status = response.status_code
+    wall = time.perf_counter() - wall
+    cpu = time.process_time() - cpu
+    return requests / wall, cpu / requests * 1000, size, status
+
+
+def main():
+    from fastapi.testclient import TestClient
+    import main as app_module
+    import tables
+
+    n = int(sys.argv[1]) if len(sys.argv) > 1 else 100000
+    requests = int(sys.argv[2]) if len(sys.argv) > 2 else 10
+    tables.data_penduduk.insert_many(penduduk_rows(n))
+    tables.data_setoran.insert_many(setoran_rows(n))
+    client = TestClient(app_module.app)
+    tables = {'/penduduk': (tables.data_penduduk, penduduk_rows(1, start=1)[0]),
+              '/setoranpajak': (tables.data_setoran, setoran_rows(1, start=1)[0])}
+    for path, (store, row) in tables.items():
+        # menulis satu data supaya version tabel naik sebelum setiap request
+        def write(i, store=store, row=row):
+            store.upsert({**row, store.key: 10 ** 9 + i % 2})
+
+        cases = [('data berubah setiap request', write, None),
+                 ('data tetap, tanpa If-None-Match', None, None)]
+        for label, before, headers in cases:
+            rps, cpu_ms, size, status = measure(client, path, requests, before, headers)
+            print(f'{path:14} {label:34} {rps:8.1f} req/detik {cpu_ms:8.2f} ms CPU {size:>9} byte (status {status})')
+        etag = client.get(path).headers['ETag']
+        rps, cpu_ms, size, status = measure(client, path, requests * 50, headers={'If-None-Match': etag})
+        print(f"{path:14} {'data tetap, If-None-Match':34} {rps:8.1f} req/detik {cpu_ms:8.2f} ms CPU {size:>9} byte (status {status})")
+
+
+if __name__ == '__main__':
+    main()
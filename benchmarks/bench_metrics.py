@@ -0,0 +1,80 @@
+# Mengukur overhead MetricsMiddleware (metrics.py) per request:
+#   1. app ASGI kosong dengan dan tanpa middleware (overhead murni, mikrodetik per request)
+#   2. GET /pajak/PJ001 lewat seluruh stack aplikasi sebagai pembanding
+# lalu dibandingkan dengan anggaran waktu per request pada 5000 req/detik (200 us),
+# ditambah waktu render /metrics.
+# Jalankan dari root repo: python benchmarks/bench_metrics.py [jumlah_request]
+import asyncio
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from fastapi.routing import APIRoute  # noqa: E402
+
+from metrics import MetricsMiddleware, render  # noqa: E402
+
+TARGET_RPS = 5000
+
+
+async def empty_app(scope, receive, send):
+    scope['route'] = ROUTE
+    await send({'type': 'http.response.start', 'status': 200, 'headers': [(b'content-length', b'2')]})
+    await send({'type': 'http.response.body', 'body': b'{}'})
+
+
+ROUTE = APIRoute('/bench/{id}', empty_app)
+
+
+async def call(app, path='/bench/1'):
+    async def receive():
+        return {'type': 'http.request', 'body': b'', 'more_body': False}
+
+    async def send(message):
+        pass
+
+    scope = {'type': 'http', 'method': 'GET', 'path': path, 'raw_path': path.encode(), 'query_string': b'',
+             'headers': [(b'host', b'bench')], 'root_path': '', 'scheme': 'http', 'server': ('bench', 80),
+             'client': ('127.0.0.1', 1234), 'http_version': '1.1', 'asgi': {'version': '3.0'}}
+    await app(scope, receive, send)
+
+
+async def per_request(app, requests, path='/bench/1'):
+    for _ in range(1000):
+        await call(app, path)
+    best = float('inf')
+    # minimum dari beberapa putaran supaya gangguan lain di mesin tidak ikut terhitung
+    for _ in range(5):
+        started = time.perf_counter()
+        for _ in range(requests):
+            await call(app, path)
+        best = min(best, (time.perf_counter() - started) / requests)
+    return best
+
+
+async def run(requests):
+    import main as app_module
+
+    budget = 1 / TARGET_RPS
+    bare = await per_request(empty_app, requests)
+    wrapped = await per_request(MetricsMiddleware(empty_app), requests)
+    overhead = wrapped - bare
+    print(f'app kosong: {bare * 1e6:.2f} us, dengan MetricsMiddleware: {wrapped * 1e6:.2f} us '
+          f'-> overhead {overhead * 1e6:.2f} us per request '
+          f'({overhead / budget:.2%} dari {budget * 1e6:.0f} us pada {TARGET_RPS} req/detik)')
+    full = await per_request(app_module.app, requests // 10, '/pajak/PJ001')
+    print(f'GET /pajak/PJ001 lewat seluruh aplikasi: {full * 1e6:.1f} us per request, '
+          f'overhead metric {overhead / full:.2%}')
+    started = time.perf_counter()
+    text = render()
+    print(f'render /metrics: {(time.perf_counter() - started) * 1000:.2f} ms, {len(text)} byte')
+
+
+def main():
+    requests = int(sys.argv[1]) if len(sys.argv) > 1 else 20000
+    asyncio.run(run(requests))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,67 @@
+# Benchmark perhitungan ulang denda setoran (penalty.PenaltyEngine) untuk 1 juta setoran:
+# waktu hitung (kolom, NumPy jika terpasang) dan total termasuk menulis data yang berubah.
+# Hasil NumPy juga dibandingkan dengan perhitungan Python biasa (fallback tanpa NumPy).
+# Jalankan dari root repo: python benchmarks/bench_penalty.py [jumlah_setoran]
+import os
+import random
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import penalty  # noqa: E402
+from penalty import PenaltyEngine, format_date, parse_date  # noqa: E402
+from store import KeyedStore  # noqa: E402
+
+
+def pajak_rows(n=500):
+    return [{'id_pajak': f'PJ{i:03d}', 'status_kepemilikan': 'Swasta', 'jenis_pajak': 'PPN',
+             'tarif_pajak': 0.11, 'besar_pajak': 1000000 * (i + 1)} for i in range(n)]
+
+
+def setoran_rows(n, seed=3):
+    rng = random.Random(seed)
+    base = parse_date('01-01-2023')
+    rows = []
+    for i in range(n):
+        due = base + rng.randrange(365)
+        rows.append({'id_setoran': i, 'id_pajak': f'PJ{rng.randrange(500):03d}',
+                     'tanggal_jatuh_tempo': format_date(due), 'tanggal_setoran': format_date(due + rng.randrange(-30, 90)),
+                     'status_setoran': 'terlambat', 'denda': 0, 'besar_pajak_setelah_denda': 0})
+    return rows
+
+
+def main():
+    n = int(sys.argv[1]) if len(sys.argv) > 1 else 1000000
+    pajak = KeyedStore('id_pajak', pajak_rows())
+    setoran = KeyedStore('id_setoran')
+    setoran.insert_many(setoran_rows(n))
+    started = time.perf_counter()
+    engine = PenaltyEngine(setoran, pajak)
+    print(f'{n} setoran: kolom tanggal dibangun dalam {time.perf_counter() - started:.2f}s')
+    as_of = parse_date('31-12-2023')
+    for label, rate in (('pertama', 0.02), ('rate berubah', 0.03), ('tanpa perubahan', 0.03)):
+        hasil = engine.recalculate(rate, as_of)
+        print(f"{label:16} ({hasil['engine']}): hitung {hasil['durasi_hitung_ms']:8.1f} ms, "
+              f"total {hasil['durasi_total_ms']:8.1f} ms, {hasil['diubah']} data diubah")
+
+    if penalty._numpy() is not None:
+        # hasil fallback Python harus sama persis dengan NumPy
+        sample = min(n, 100000)
+        numpy_result = {row['id_setoran']: (row['denda'], row['besar_pajak_setelah_denda'], row['status_setoran'])
+                        for row in setoran.to_list()[:sample]}
+        check = KeyedStore('id_setoran', setoran_rows(sample))
+        # _numpy() diganti sementara supaya mesin memakai loop Python
+        numpy_loader, penalty._numpy = penalty._numpy, lambda: None
+        try:
+            hasil = PenaltyEngine(check, pajak).recalculate(0.03, as_of)
+        finally:
+            penalty._numpy = numpy_loader
+        python_result = {row['id_setoran']: (row['denda'], row['besar_pajak_setelah_denda'], row['status_setoran'])
+                         for row in check}
+        assert python_result == numpy_result, 'hasil Python berbeda dengan NumPy'
+        print(f"fallback Python ({sample} setoran): hitung {hasil['durasi_hitung_ms']:.1f} ms, hasil sama dengan NumPy")
+
+
+if __name__ == '__main__':
+    main()
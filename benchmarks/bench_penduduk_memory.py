@@ -0,0 +1,117 @@
+# Benchmark memori tabel penduduk: data sebagai dict per baris (KeyedStore) dibandingkan
+# penyimpanan per kolom (columnar.CompactStore) dengan kolom wilayah di-dictionary-encode,
+# dan tabel kelompok lain (rental / hotel / asuransi / bank) sebagai salinan dibandingkan
+# proyeksi (columnar.ProjectionStore). Setiap kelompok berisi 1/4 penduduk.
+# Data dibuat lewat json.loads seperti body request, sehingga string tidak saling berbagi objek.
+# Memori diukur dengan tracemalloc, setiap skenario di proses terpisah.
+# Jalankan dari root repo: python benchmarks/bench_penduduk_memory.py [jumlah_penduduk]
+import gc
+import json
+import os
+import random
+import subprocess
+import sys
+import tracemalloc
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from columnar import CompactStore, ProjectionStore  # noqa: E402
+from store import KeyedStore  # noqa: E402
+
+COLUMNS = ('nik', 'nama', 'provinsi', 'kota', 'kecamatan', 'desa')
+INDEXES = ('provinsi', 'kota', 'kecamatan', 'desa')
+PARTNERS = {
+    'rental': (('nik', 'nama', 'kota'), (), ()),
+    'hotel': (('nik', 'nama', 'kota'), (), ()),
+    'asuransi': (COLUMNS, INDEXES, ('nama',)),
+    'bank': (('nik', 'nama'), (), ()),
+}
+PROVINSI = ['Jawa Barat', 'DKI Jakarta', 'Jawa Tengah', 'Jawa Timur', 'Bali', 'Banten', 'DI Yogyakarta',
+            'Sumatera Barat', 'Sumatera Utara', 'Sulawesi Selatan', 'Kalimantan Timur', 'Papua']
+CHUNK = 20000
+
+
+# (provinsi, kota, kecamatan, desa) acak dari ~500 kota, ~7000 kecamatan, ~80000 desa
+def wilayah(rng):
+    kota = rng.randrange(500)
+    kecamatan = kota * 14 + rng.randrange(14)
+    desa = kecamatan * 12 + rng.randrange(12)
+    return PROVINSI[kota % len(PROVINSI)], f'Kota {kota}', f'Kecamatan {kecamatan}', f'Desa {desa}'
+
+
+def penduduk_chunks(n):
+    rng = random.Random(15)
+    for start in range(0, n, CHUNK):
+        rows = []
+        for nik in range(start, min(n, start + CHUNK)):
+            provinsi, kota, kecamatan, desa = wilayah(rng)
+            rows.append({'nik': 3200000000000000 + nik, 'nama': f'Penduduk {rng.randrange(10 ** 6)}',
+                         'provinsi': provinsi, 'kota': kota, 'kecamatan': kecamatan, 'desa': desa})
+        yield json.loads(json.dumps(rows))
+
+
+def project(rows, fields, part):
+    return json.loads(json.dumps([{field: row[field] for field in fields} for row in rows if row['nik'] % 4 == part]))
+
+
+def build(mode, n):
+    if mode == 'dict':
+        penduduk = KeyedStore('nik', indexes=INDEXES, prefix_indexes=('nama',))
+        partners = {name: KeyedStore('nik', indexes=indexes, prefix_indexes=prefix)
+                    for name, (_, indexes, prefix) in PARTNERS.items()}
+    else:
+        penduduk = CompactStore('nik', COLUMNS, INDEXES, indexes=INDEXES, prefix_indexes=('nama',))
+        partners = {name: ProjectionStore(penduduk, fields, indexes=indexes, prefix_indexes=prefix)
+                    for name, (fields, indexes, prefix) in PARTNERS.items()}
+    sizes = {}
+    for rows in penduduk_chunks(n):
+        penduduk.insert_many(rows)
+    del rows
+    gc.collect()
+    sizes['penduduk'] = tracemalloc.get_traced_memory()[0]
+    for part, (name, (fields, _, _)) in enumerate(PARTNERS.items()):
+        for chunk in penduduk.iter_chunks(CHUNK):
+            partners[name].insert_many(project(chunk, fields, part))
+        del chunk
+        gc.collect()
+        sizes[name] = tracemalloc.get_traced_memory()[0]
+    return penduduk, partners, sizes
+
+
+def run(mode, n):
+    tracemalloc.start()
+    base = tracemalloc.get_traced_memory()[0]
+    stores = build(mode, n)
+    previous = base
+    result = {}
+    for name, size in stores[2].items():
+        result[name] = size - previous
+        previous = size
+    result['total'] = previous - base
+    print(json.dumps(result))
+
+
+def measure(mode, n):
+    output = subprocess.run([sys.executable, __file__, '--run', mode, str(n)],
+                            check=True, capture_output=True, text=True).stdout
+    return json.loads(output)
+
+
+def main():
+    if sys.argv[1:2] == ['--run']:
+        run(sys.argv[2], int(sys.argv[3]))
+        return
+    n = int(sys.argv[1]) if len(sys.argv) > 1 else 1000000
+    before = measure('dict', n)
+    after = measure('columnar', n)
+    print(f'{n} penduduk, setiap kelompok {n // 4} data, byte per data (termasuk index):')
+    print(f"{'tabel':<10} {'dict':>10} {'columnar':>10}")
+    for name in ('penduduk', *PARTNERS):
+        rows = n if name == 'penduduk' else n // 4
+        print(f'{name:<10} {before[name] / rows:>10.0f} {after[name] / rows:>10.0f}')
+    print(f"{'total':<10} {before['total'] / n:>10.0f} {after['total'] / n:>10.0f}  (per penduduk)")
+    print(f"total memori: dict {before['total'] / 2 ** 20:.0f} MiB, columnar {after['total'] / 2 ** 20:.0f} MiB")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,125 @@
+# Menguji lapisan resilience API kelompok lain (resilience.py) terhadap server stub lokal
+# yang menyuntikkan error dan latency:
+#   1. partner error 30%: tingkat keberhasilan tanpa retry vs dengan retry + backoff
+#   2. partner mati: circuit breaker terbuka, request berikutnya ditolak cepat (fast-fail),
+#      cache tetap mengembalikan data terakhir, lalu breaker tertutup lagi setelah pulih
+#   3. latency ekor (3% request 0.5 detik): p50 / p99 tanpa vs dengan hedged request
+# Jalankan dari root repo: python benchmarks/bench_resilience.py
+import asyncio
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from fastapi import HTTPException  # noqa: E402
+
+from cache import UpstreamCache  # noqa: E402
+from stubs import StubServer  # noqa: E402
+from upstream import UPSTREAMS, Upstream, close_client, fetch_json  # noqa: E402
+
+
+def register(stub, name='bench', **options):
+    UPSTREAMS[name] = Upstream(name, stub.url('wisata'), 'Gagal mengambil data bench', timeout=2.0, **options)
+    return UPSTREAMS[name]
+
+
+async def success_rate(stub, retries, calls=300):
+    upstream = register(stub, retries=retries, failure_threshold=10 ** 6)
+    ok = 0
+    for _ in range(calls):
+        try:
+            await fetch_json('bench')
+            ok += 1
+        except HTTPException:
+            pass
+    return ok / calls, upstream.policy.stats['retry']
+
+
+async def flaky():
+    stub = StubServer(error_rate=0.3).start()
+    try:
+        for retries in (0, 2):
+            rate, retried = await success_rate(stub, retries)
+            print(f'  retries={retries}: berhasil {rate:.1%}, retry {retried}')
+    finally:
+        stub.stop()
+
+
+async def outage():
+    stub = StubServer().start()
+    upstream = register(stub, failure_threshold=5, reset_timeout=0.5)
+    cache = UpstreamCache()
+
+    async def cached():
+        return await cache.get('bench', lambda: fetch_json('bench'), ttl=0.0, stale_ttl=0.0)
+
+    try:
+        good = await cached()
+        stub.error_rate = 1.0
+        calls = 0
+        while upstream.policy.breaker.state != 'open':
+            calls += 1
+            assert await cached() == good
+        print(f'  breaker terbuka setelah {calls} request ({upstream.policy.stats["retry"]} retry)')
+        requests_before = stub.requests
+        started = time.perf_counter()
+        for _ in range(1000):
+            assert await cached() == good
+        elapsed = (time.perf_counter() - started) / 1000
+        print(f'  breaker terbuka: {elapsed * 1e6:.0f} us per request, request ke partner: '
+              f'{stub.requests - requests_before}, fallback cache: {cache.stats["bench"]["fallback"]}')
+        try:
+            await fetch_json('bench')
+        except HTTPException as e:
+            print(f'  tanpa cache: status {e.status_code}, Retry-After {e.headers["Retry-After"]}')
+        stub.error_rate = 0.0
+        await asyncio.sleep(0.6)
+        await cached()
+        print(f'  setelah pulih: state={upstream.policy.breaker.state}')
+    finally:
+        stub.stop()
+
+
+async def latencies(stub, hedge, calls=1000):
+    upstream = register(stub, hedge_percentile=hedge)
+    samples = []
+    for _ in range(calls):
+        started = time.perf_counter()
+        await fetch_json('bench')
+        samples.append(time.perf_counter() - started)
+    # request awal (sebelum sampel latency cukup untuk hedging) tidak dihitung
+    samples = sorted(samples[upstream.policy.hedge_min_samples:])
+    p50, p99 = samples[len(samples) // 2], samples[int(len(samples) * 0.99)]
+    return p50, p99, upstream.policy.stats
+
+
+async def tail():
+    stub = StubServer(latency=0.01, slow_rate=0.03, slow_latency=0.5).start()
+    try:
+        for hedge in (None, 0.9):
+            p50, p99, stats = await latencies(stub, hedge)
+            print(f'  hedge={hedge}: p50 {p50 * 1000:.1f} ms, p99 {p99 * 1000:.1f} ms, '
+                  f'hedged {stats["hedged"]}, hedge menang {stats["hedge_won"]}')
+    finally:
+        stub.stop()
+
+
+async def run():
+    try:
+        print('1. partner error 30%')
+        await flaky()
+        print('2. partner mati')
+        await outage()
+        print('3. latency ekor 3% x 0.5 detik')
+        await tail()
+    finally:
+        await close_client()
+
+
+def main():
+    asyncio.run(run())
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,88 @@
+# Benchmark index trigram nama penduduk (search.py): waktu build, memori per nama, latency
+# pencarian mirip dan autocomplete (p50 / p99) serta biaya menerapkan perubahan, dibanding
+# memindai seluruh nama dengan pencocokan substring (cara lama: unduh semua data lalu cari).
+# Tabel sama seperti tables.py (CompactStore), nama dari datasets.py ('Penduduk <i>').
+# Jalankan dari root repo: python benchmarks/bench_search.py [jumlah_penduduk,...]
+import os
+import random
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import datasets  # noqa: E402
+from columnar import CompactStore  # noqa: E402
+from loadtest import percentile  # noqa: E402
+from models import Penduduk  # noqa: E402
+from search import StoreNameIndex  # noqa: E402
+
+QUERIES = 200
+TARGET_MS = 5.0
+
+
+def typo(text, rng):
+    i = rng.randrange(len(text))
+    return text[:i] + text[i + 1:]
+
+
+def timed(function, queries):
+    latencies = []
+    for query in queries:
+        started = time.perf_counter()
+        function(query)
+        latencies.append((time.perf_counter() - started) * 1000)
+    latencies.sort()
+    return percentile(latencies, 50), percentile(latencies, 99)
+
+
+def run(n):
+    store = CompactStore('nik', tuple(Penduduk.model_fields), ('provinsi', 'kota', 'kecamatan', 'desa'),
+                         datasets.penduduk_rows(0, n))
+    index = StoreNameIndex(store, 'nama')
+    started = time.perf_counter()
+    index.search('x')
+    build = time.perf_counter() - started
+    status = index.status()
+    rng = random.Random(42)
+    names = [f'Penduduk {rng.randrange(n)}' for _ in range(QUERIES)]
+    cases = [
+        ('search persis', lambda q: index.search(q, 10), names),
+        ('search salah ketik', lambda q: index.search(q, 10), [typo(name, rng) for name in names]),
+        ('search sebagian', lambda q: index.search(q, 10), [name.split()[1] for name in names]),
+        ('autocomplete', lambda q: index.autocomplete(q, 10), [name[:-1] for name in names]),
+        ('autocomplete umum', lambda q: index.autocomplete(q, 10), ['pen', 'pendu', 'penduduk 1'] * 20),
+    ]
+    print(f'{n:>9,} nama: build {build:6.2f} s, index {status["bytes"] / 1e6:6.1f} MB '
+          f'= {status["bytes_per_name"]:.0f} byte/nama')
+    slowest = 0.0
+    for label, function, queries in cases:
+        p50, p99 = timed(function, queries)
+        slowest = max(slowest, p99)
+        print(f'  {label:20} p50 {p50:6.2f} ms  p99 {p99:6.2f} ms')
+    # cara lama: memindai semua nama
+    scan = [row['nama'] for row in store.to_list()]
+    p50, p99 = timed(lambda q: [name for name in scan if q.lower() in name.lower()][:10], names[:10])
+    print(f'  {"scan substring":20} p50 {p50:6.2f} ms  p99 {p99:6.2f} ms')
+    # perubahan dicatat saat tulis, diterapkan pada query berikutnya
+    started = time.perf_counter()
+    for i in range(1000):
+        store.replace(datasets.nik(i), dict(datasets.penduduk_rows(i, i + 1)[0], nama=f'Nama Baru {i}'))
+    write = (time.perf_counter() - started) / 1000 * 1e6
+    started = time.perf_counter()
+    found = index.search('nama baru 999', 1)
+    apply = (time.perf_counter() - started) * 1000
+    assert found and found[0][1] == 'Nama Baru 999', found
+    print(f'  1000 update nama: {write:.1f} us/tulis, diterapkan saat query berikutnya {apply:.1f} ms')
+    return slowest
+
+
+def main():
+    sizes = [int(size) for size in sys.argv[1].split(',')] if len(sys.argv) > 1 else [10000, 100000, 1000000]
+    slowest = 0.0
+    for n in sizes:
+        slowest = run(n)
+    print(f'p99 terburuk pada {sizes[-1]:,} nama: {slowest:.2f} ms (target < {TARGET_MS} ms)')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,57 @@
+# Benchmark response GET /penduduk dengan 100k baris: cara lama (validasi ulang lewat
+# response_model + encoder json bawaan) dibandingkan jalur cepat (orjson tanpa validasi
+# ulang, dengan cache encode per baris). Menampilkan req/detik dan waktu CPU per response.
+# Jalankan dari root repo: python benchmarks/bench_serialization.py [jumlah_baris] [jumlah_request]
+import os
+import sys
+import time
+from typing import List
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+
+def penduduk_rows(n, start=1000):
+    return [{'nik': start + i, 'nama': f'Penduduk {i}', 'provinsi': 'Jawa Barat', 'kota': f'Kota {i % 30}',
+             'kecamatan': f'Kecamatan {i % 400}', 'desa': f'Desa {i % 5000}'} for i in range(n)]
+
+
+def measure(client, path, requests):
+    client.get(path)  # pemanasan (cache encode terisi)
+    wall = time.perf_counter()
+    cpu = time.process_time()
+    for _ in range(requests):
+        response = client.get(path)
+    wall = time.perf_counter() - wall
+    cpu = time.process_time() - cpu
+    return requests / wall, cpu / requests * 1000, len(response.content)
+
+
+def main():
+    from fastapi import FastAPI
+    from fastapi.responses import JSONResponse
+    from fastapi.testclient import TestClient
+    import main as app_module
+    import tables
+    from models import Penduduk
+
+    n = int(sys.argv[1]) if len(sys.argv) > 1 else 100000
+    requests = int(sys.argv[2]) if len(sys.argv) > 2 else 10
+    tables.data_penduduk.insert_many(penduduk_rows(n))
+
+    # endpoint seperti sebelum perubahan: data divalidasi ulang dan di-encode dengan json bawaan
+    legacy = FastAPI(default_response_class=JSONResponse)
+
+    @legacy.get('/penduduk', response_model=List[Penduduk])
+    async def get_penduduk_legacy():
+        return tables.data_penduduk.to_list()
+
+    cases = [('sebelum (response_model + json)', TestClient(legacy)),
+             ('sesudah (orjson + cache baris)', TestClient(app_module.app))]
+    total = len(tables.data_penduduk)
+    for label, client in cases:
+        rps, cpu_ms, size = measure(client, '/penduduk', requests)
+        print(f'{label:34} {total} baris, {size / 1e6:.1f} MB: {rps:6.2f} req/detik, {cpu_ms:7.1f} ms CPU/response')
+
+
+if __name__ == '__main__':
+    main()
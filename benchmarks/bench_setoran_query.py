@@ -0,0 +1,58 @@
+# Benchmark query setoran dengan index (status_setoran / id_pajak hash, tanggal terurut)
+# dibandingkan scan seluruh tabel, untuk 10^4 sampai 10^6 setoran. Hasil keduanya harus sama.
+# Jalankan dari root repo: python benchmarks/bench_setoran_query.py
+import os
+import random
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from penalty import format_date, parse_date  # noqa: E402
+from store import KeyedStore  # noqa: E402
+
+RANGE_INDEXES = {'tanggal_jatuh_tempo': parse_date, 'tanggal_setoran': parse_date}
+
+
+def setoran_rows(n):
+    rng = random.Random(5)
+    base = parse_date('01-01-2020')
+    rows = []
+    for i in range(n):
+        due = base + rng.randrange(4 * 365)
+        rows.append({'id_setoran': i, 'id_pajak': f'PJ{rng.randrange(1000):03d}',
+                     'tanggal_jatuh_tempo': format_date(due), 'tanggal_setoran': format_date(due + rng.randrange(-10, 60)),
+                     'status_setoran': rng.choice(['terlambat', 'tepat waktu']), 'denda': 0.0,
+                     'besar_pajak_setelah_denda': 0})
+    return rows
+
+
+def scan(rows, status, low, high):
+    return [row for row in rows if row['status_setoran'] == status
+            and low <= parse_date(row['tanggal_jatuh_tempo']) <= high]
+
+
+def timed(fn, repeat=5):
+    started = time.perf_counter()
+    for _ in range(repeat):
+        result = fn()
+    return result, (time.perf_counter() - started) / repeat
+
+
+def main():
+    low, high = parse_date('01-03-2022'), parse_date('07-03-2022')
+    print(f"{'n':>9} {'hasil':>6} {'index (ms)':>11} {'scan (ms)':>10} {'id_pajak (ms)':>14}")
+    for exp in range(4, 7):
+        n = 10 ** exp
+        rows = setoran_rows(n)
+        store = KeyedStore('id_setoran', rows, indexes=('status_setoran', 'id_pajak'), range_indexes=RANGE_INDEXES)
+        ranges = {'tanggal_jatuh_tempo': (low, high)}
+        found, t_index = timed(lambda: store.query({'status_setoran': 'terlambat'}, None, ranges))
+        expected, t_scan = timed(lambda: scan(rows, 'terlambat', low, high), repeat=1)
+        assert found == expected
+        _, t_pajak = timed(lambda: store.page(0, 100, {'id_pajak': 'PJ042'}))
+        print(f'{n:>9} {len(found):>6} {t_index * 1e3:11.3f} {t_scan * 1e3:10.1f} {t_pajak * 1e3:14.3f}')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,103 @@
+# Mengukur cold start aplikasi (setiap pengukuran di proses Python baru):
+#   1. waktu import main
+#   2. waktu dari menjalankan serve.py (1 worker) sampai response pertama GET /pajak/PJ001
+#   3. RSS proses server setelah response pertama
+#   4. response pertama untuk domain lain (router yang dimuat saat pertama dipakai)
+# Median dari beberapa percobaan dibandingkan dengan batas di THRESHOLDS (bisa diganti lewat
+# environment STARTUP_MAX_IMPORT_MS / STARTUP_MAX_FIRST_RESPONSE_MS / STARTUP_MAX_RSS_MB);
+# exit code 1 jika ada yang melewati batas, sehingga bisa dipakai sebagai cek regresi.
+# Jalankan dari root repo: python benchmarks/bench_startup.py [jumlah_percobaan]
+import os
+import socket
+import statistics
+import subprocess
+import sys
+import time
+
+import httpx
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+# sync partner dimatikan supaya hasil tidak tergantung jaringan
+ENV = dict(os.environ, PARTNER_SYNC='0', STORAGE_BACKEND='memory', WEB_CONCURRENCY='1', HOST='127.0.0.1')
+THRESHOLDS = {
+    'import_ms': float(os.environ.get('STARTUP_MAX_IMPORT_MS', 600)),
+    'first_response_ms': float(os.environ.get('STARTUP_MAX_FIRST_RESPONSE_MS', 1000)),
+    'rss_mb': float(os.environ.get('STARTUP_MAX_RSS_MB', 90)),
+}
+OTHER_PATHS = ['/penduduk', '/setoranpajak', '/pendudukrental', '/openapi.json']
+
+
+def free_port():
+    with socket.socket() as sock:
+        sock.bind(('127.0.0.1', 0))
+        return sock.getsockname()[1]
+
+
+def import_ms():
+    code = 'import time; t = time.perf_counter(); import main; print((time.perf_counter() - t) * 1000)'
+    output = subprocess.run([sys.executable, '-c', code], cwd=ROOT, env=ENV, capture_output=True, text=True, check=True)
+    return float(output.stdout.strip().splitlines()[-1])
+
+
+def rss_mb(pid):
+    with open(f'/proc/{pid}/status') as status:
+        for line in status:
+            if line.startswith('VmRSS:'):
+                return int(line.split()[1]) / 1024
+    return float('nan')
+
+
+def first_response():
+    port = free_port()
+    base_url = f'http://127.0.0.1:{port}'
+    started = time.perf_counter()
+    process = subprocess.Popen([sys.executable, 'serve.py'], cwd=ROOT, env=dict(ENV, PORT=str(port)),
+                               stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+    try:
+        with httpx.Client(base_url=base_url, timeout=10) as client:
+            while True:
+                try:
+                    response = client.get('/pajak/PJ001')
+                    break
+                except httpx.TransportError:
+                    if process.poll() is not None or time.perf_counter() - started > 30:
+                        raise RuntimeError('server tidak bisa dijalankan')
+                    time.sleep(0.005)
+            elapsed = (time.perf_counter() - started) * 1000
+            assert response.status_code == 200, response.text
+            rss = rss_mb(process.pid)
+            others = {}
+            for path in OTHER_PATHS:
+                t = time.perf_counter()
+                assert client.get(path).status_code == 200, path
+                others[path] = (time.perf_counter() - t) * 1000
+            rss_all = rss_mb(process.pid)
+        return elapsed, rss, others, rss_all
+    finally:
+        process.terminate()
+        process.wait()
+
+
+def main():
+    runs = int(sys.argv[1]) if len(sys.argv) > 1 else 5
+    imports = [import_ms() for _ in range(runs)]
+    results = [first_response() for _ in range(runs)]
+    report = {
+        'import_ms': statistics.median(imports),
+        'first_response_ms': statistics.median(r[0] for r in results),
+        'rss_mb': statistics.median(r[1] for r in results),
+    }
+    print(f"import main            : {report['import_ms']:7.1f} ms (batas {THRESHOLDS['import_ms']:.0f})")
+    print(f"response pertama       : {report['first_response_ms']:7.1f} ms (batas {THRESHOLDS['first_response_ms']:.0f})")
+    print(f"RSS setelah response   : {report['rss_mb']:7.1f} MB (batas {THRESHOLDS['rss_mb']:.0f})")
+    for path in OTHER_PATHS:
+        print(f'  request pertama {path:16}: {statistics.median(r[2][path] for r in results):7.1f} ms')
+    print(f"RSS setelah semua route: {statistics.median(r[3] for r in results):7.1f} MB")
+    failed = [name for name, limit in THRESHOLDS.items() if report[name] > limit]
+    if failed:
+        print(f"REGRESI: {', '.join(failed)} melewati batas")
+        sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
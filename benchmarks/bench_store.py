@@ -0,0 +1,54 @@
+# Microbenchmark lookup KeyedStore vs scan list lama, dari 10^2 sampai 10^6 data, dan
+# biaya insert / delete satu data pada tabel dengan index prefix (nama) dan range (nik)
+# Jalankan dari root repo: python benchmarks/bench_store.py
+import os
+import random
+import sys
+import timeit
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from store import KeyedStore
+
+
+def make_rows(n):
+    return [{'nik': i, 'nama': f'Penduduk {i}', 'kota': 'Bandung'} for i in range(n)]
+
+
+def scan_lookup(rows, nik):
+    for index, row in enumerate(rows):
+        if row['nik'] == nik:
+            return index
+    return None
+
+
+def main():
+    lookups = 1000
+    print(f"{'n':>9} {'store get (us)':>15} {'list scan (us)':>15}")
+    for exp in range(2, 7):
+        n = 10 ** exp
+        rows = make_rows(n)
+        store = KeyedStore('nik', rows)
+        keys = [random.randrange(n) for _ in range(lookups)]
+        t_store = timeit.timeit(lambda: [store.get(k) for k in keys], number=5) / (5 * lookups)
+        # scan list hanya sampai 10^5 supaya benchmark tidak terlalu lama
+        if n <= 10 ** 5:
+            scan_keys = keys[:50]
+            t_scan = timeit.timeit(lambda: [scan_lookup(rows, k) for k in scan_keys], number=1) / len(scan_keys)
+            scan = f'{t_scan * 1e6:15.2f}'
+        else:
+            scan = f"{'-':>15}"
+        print(f'{n:>9} {t_store * 1e6:15.3f} {scan}')
+    print()
+    print(f"{'n':>9} {'insert (us)':>12} {'delete (us)':>12}")
+    for exp in range(3, 7):
+        n = 10 ** exp
+        store = KeyedStore('nik', make_rows(n), prefix_indexes=('nama',), range_indexes={'nik': int})
+        new_rows = [{'nik': n + i, 'nama': f'Penduduk {random.randrange(n)}', 'kota': 'Bandung'} for i in range(lookups)]
+        t_insert = timeit.timeit(lambda: [store.insert(row) for row in new_rows], number=1) / lookups
+        t_delete = timeit.timeit(lambda: [store.delete(row['nik']) for row in new_rows], number=1) / lookups
+        print(f'{n:>9} {t_insert * 1e6:12.2f} {t_delete * 1e6:12.2f}')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,127 @@
+# Memeriksa bahwa ringkasan berjalan (aggregate.RunningAggregate) selalu sama dengan
+# perhitungan ulang seluruh tabel setelah rangkaian insert / upsert / replace / delete /
+# batch acak, untuk backend memory dan SQLite, lalu membandingkan waktu baca ringkasan
+# dengan perhitungan ulang penuh.
+# Jalankan dari root repo: python benchmarks/bench_summary.py [jumlah_operasi] [jumlah_baris]
+import math
+import os
+import random
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from aggregate import RunningAggregate  # noqa: E402
+from sqlite_store import SqliteDatabase, SqliteStore  # noqa: E402
+from store import KeyedStore  # noqa: E402
+
+GROUP_BY = ('status_kepemilikan', 'jenis_pajak')
+FIELDS = ('besar_pajak', 'tarif_pajak')
+
+
+def random_pajak(rng, key):
+    return {'id_pajak': key, 'status_kepemilikan': rng.choice(['Swasta', 'Pemerintah', 'Campuran']),
+            'jenis_pajak': rng.choice(['PPN', 'PBJT', 'Hiburan']),
+            'tarif_pajak': rng.choice([0, 0.1, 0.11, 0.25, 0.35]),
+            'besar_pajak': rng.randrange(0, 10 ** 9, 1000)}
+
+
+# perhitungan ulang dari nol, sebagai pembanding
+def full_summary(rows):
+    def stats(group):
+        result = {'count': len(group)}
+        for field in FIELDS:
+            values = [row[field] for row in group]
+            total = math.fsum(values) if any(isinstance(v, float) for v in values) else sum(values)
+            result[field] = {'sum': total, 'min': min(values, default=None), 'max': max(values, default=None)}
+        return result
+
+    summary = {'total': stats(rows)}
+    for field in GROUP_BY:
+        groups = {}
+        for row in rows:
+            groups.setdefault(str(row[field]), []).append(row)
+        summary[f'per_{field}'] = {value: stats(group) for value, group in groups.items()}
+    return summary
+
+
+def random_operation(rng, store, keys, next_key):
+    op = rng.choice(['insert', 'upsert', 'replace', 'delete', 'insert_many', 'upsert_many', 'delete_many'])
+    if op == 'insert':
+        store.insert(random_pajak(rng, next_key()))
+    elif op == 'upsert':
+        store.upsert(random_pajak(rng, rng.choice(keys()) if rng.random() < 0.5 else next_key()))
+    elif op == 'replace' and keys():
+        key = rng.choice(keys())
+        store.replace(key, random_pajak(rng, key if rng.random() < 0.8 else next_key()))
+    elif op == 'delete' and keys():
+        store.delete(rng.choice(keys()))
+    elif op == 'insert_many':
+        store.insert_many([random_pajak(rng, next_key()) for _ in range(rng.randrange(1, 20))])
+    elif op == 'upsert_many':
+        existing = keys()
+        batch = [random_pajak(rng, rng.choice(existing) if existing and rng.random() < 0.5 else next_key())
+                 for _ in range(rng.randrange(1, 20))]
+        store.upsert_many(batch)
+    elif op == 'delete_many' and keys():
+        store.delete_many(rng.sample(keys(), min(len(keys()), rng.randrange(1, 10))))
+
+
+def check(label, store, operations):
+    rng = random.Random(42)
+    counter = [0]
+
+    def next_key():
+        counter[0] += 1
+        return f'K{counter[0]:07d}'
+
+    store.insert_many([random_pajak(rng, next_key()) for _ in range(200)])
+    aggregate = RunningAggregate(store, GROUP_BY, FIELDS)
+    for i in range(operations):
+        random_operation(rng, store, lambda: [row['id_pajak'] for row in store], next_key)
+        if i % 10 == 0 or i == operations - 1:
+            expected = full_summary(store.to_list())
+            actual = aggregate.snapshot()
+            assert actual == expected, f'{label}: ringkasan berbeda setelah operasi ke-{i}'
+    print(f'{label:7} {operations} operasi acak: ringkasan selalu sama dengan perhitungan ulang ({len(store)} baris)')
+
+
+def bench(n):
+    rng = random.Random(7)
+    store = KeyedStore('id_pajak', [random_pajak(rng, f'K{i:07d}') for i in range(n)])
+    aggregate = RunningAggregate(store, GROUP_BY, FIELDS)
+    started = time.perf_counter()
+    for _ in range(100):
+        aggregate.snapshot()
+    read = (time.perf_counter() - started) / 100
+    started = time.perf_counter()
+    full_summary(store.to_list())
+    full = time.perf_counter() - started
+    started = time.perf_counter()
+    for i in range(10000):
+        store.upsert(random_pajak(rng, f'K{i:07d}'))
+    write = (time.perf_counter() - started) / 10000
+    print(f'{n} baris: baca ringkasan {read * 1e6:.1f} us, hitung ulang penuh {full * 1e3:.1f} ms, '
+          f'upsert + update ringkasan {write * 1e6:.1f} us')
+
+
+def main():
+    operations = int(sys.argv[1]) if len(sys.argv) > 1 else 2000
+    n = int(sys.argv[2]) if len(sys.argv) > 2 else 100000
+    check('memory', KeyedStore('id_pajak'), operations)
+    with tempfile.TemporaryDirectory() as tmp:
+        db = SqliteDatabase(os.path.join(tmp, 'summary.db'))
+        store = SqliteStore(db, 'pajak', 'id_pajak', indexes=('status_kepemilikan',))
+        check('sqlite', store, operations // 4)
+        # perubahan dari worker lain (koneksi lain) harus terdeteksi lewat versi tabel
+        other = SqliteStore(SqliteDatabase(db.path), 'pajak', 'id_pajak', indexes=('status_kepemilikan',))
+        aggregate = RunningAggregate(store, GROUP_BY, FIELDS)
+        other.insert(random_pajak(random.Random(1), 'WORKER2'))
+        assert aggregate.snapshot() == full_summary(store.to_list())
+        print('sqlite  perubahan dari worker lain terdeteksi dan dibaca dari log perubahan')
+    bench(n)
+
+
+if __name__ == '__main__':
+    main()
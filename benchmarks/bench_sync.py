@@ -0,0 +1,79 @@
+# Menguji sync background data partner (sync.py) terhadap server stub lokal (latency 0.2 detik,
+# mendukung ETag / 304): mirror terisi setelah startup, handler /tourguide, /wisata/{id} dan
+# /pajakwisata hanya membaca mirror lokal (tidak ada request ke partner), sync berikutnya
+# dijawab 304, perubahan data partner terlihat sebagai diff, dan partner mati tidak
+# mempengaruhi handler.
+# Jalankan dari root repo: python benchmarks/bench_sync.py
+import asyncio
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from stubs import StubServer  # noqa: E402
+
+LATENCY = 0.2
+INTERVAL = 0.5
+REQUESTS = 200
+PATHS = ['/tourguide', '/wisata/PJ001', '/pajakwisata', '/penduduk/hotel']
+
+
+async def wait_ready(mirrors, timeout=10.0):
+    deadline = time.monotonic() + timeout
+    while not all(mirror.ready for mirror in mirrors.values()):
+        assert time.monotonic() < deadline, 'mirror tidak siap'
+        await asyncio.sleep(0.05)
+
+
+def syncs(mirrors):
+    return sum(mirror.stats['sync'] for mirror in mirrors.values())
+
+
+async def run(app_module, stub):
+    import httpx
+    from sync import lifespan, mirrors
+    transport = httpx.ASGITransport(app=app_module.app)
+    async with lifespan(app_module.app), httpx.AsyncClient(transport=transport, base_url='http://app') as client:
+        started = time.perf_counter()
+        await wait_ready(mirrors)
+        print(f'semua mirror siap dalam {time.perf_counter() - started:.2f}s')
+        for path in PATHS:
+            before = stub.requests - syncs(mirrors)
+            started = time.perf_counter()
+            responses = [await client.get(path) for _ in range(REQUESTS)]
+            elapsed = (time.perf_counter() - started) / REQUESTS
+            # request ke partner di luar sync background
+            direct = stub.requests - syncs(mirrors) - before
+            print(f'{path:16} {elapsed * 1000:.2f} ms per request (latency partner {LATENCY * 1000:.0f} ms), '
+                  f'status={sorted({r.status_code for r in responses})}, request langsung ke partner: {direct}')
+        await asyncio.sleep(INTERVAL * 3)
+        print(f'304 Not Modified dari stub: {stub.not_modified}')
+        stub.payloads['guide'] = stub.payloads['guide'][1:] + [{'id_guider': 'G999', 'nama_guider': 'Guide Baru'}]
+        await asyncio.sleep(INTERVAL * 3)
+        guide = mirrors['guide']
+        ids = [row['id_guider'] for row in (await client.get('/tourguide')).json()]
+        print(f"setelah data partner berubah: diff={guide.last_diff}, G999 terlihat={'G999' in ids}, "
+              f"G001 hilang={'G001' not in ids}")
+        stub.error_rate = 1.0
+        await asyncio.sleep(INTERVAL * 3)
+        response = await client.get('/wisata/PJ002')
+        status = (await client.get('/sync/status')).json()['data']['sources']['wisata']
+        print(f"partner mati: /wisata/PJ002 status={response.status_code} data={response.json()['data']}, "
+              f"sync terakhir={status['last_result']} ({status['last_error']}), lag={status['lag']}s")
+
+
+def main():
+    stub = StubServer(latency=LATENCY, etag=True).start()
+    os.environ.update(stub.env())
+    for name in stub.payloads:
+        os.environ[f'UPSTREAM_{name.upper()}_SYNC_INTERVAL'] = str(INTERVAL)
+    try:
+        import main as app_module
+        asyncio.run(run(app_module, stub))
+    finally:
+        stub.stop()
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,44 @@
+# Load test endpoint yang mengambil data partner terhadap server stub lokal.
+# Dengan client async bersama, N request bersamaan selesai dalam ~1x latency stub,
+# bukan N x latency seperti saat memakai requests.get yang memblokir event loop.
+# Jalankan dari root repo: python benchmarks/bench_upstream.py
+import asyncio
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from stubs import StubServer
+
+LATENCY = 0.2
+CONCURRENCY = 20
+PATHS = ['/tourguide', '/pelanggan', '/wisata']
+
+
+async def run(app):
+    import httpx
+    from upstream import lifespan
+    transport = httpx.ASGITransport(app=app)
+    async with lifespan(app), httpx.AsyncClient(transport=transport, base_url='http://app') as client:
+        for path in PATHS:
+            started = time.perf_counter()
+            responses = await asyncio.gather(*(client.get(path) for _ in range(CONCURRENCY)))
+            elapsed = time.perf_counter() - started
+            statuses = {r.status_code for r in responses}
+            print(f'{path:12} {CONCURRENCY} request bersamaan: {elapsed:.3f}s '
+                  f'(serial = {CONCURRENCY * LATENCY:.1f}s) status={sorted(statuses)}')
+
+
+def main():
+    stub = StubServer(latency=LATENCY).start()
+    os.environ.update(stub.env())
+    try:
+        import main as app_module
+        asyncio.run(run(app_module.app))
+    finally:
+        stub.stop()
+
+
+if __name__ == '__main__':
+    main()
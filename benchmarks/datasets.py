@@ -0,0 +1,61 @@
+# Data sintetis Pajak / Penduduk / Setoran untuk benchmark. Isi setiap baris hanya
+# ditentukan oleh nomornya (tanpa random), jadi dataset dengan ukuran yang sama selalu
+# identik di setiap commit / mesin, dan dataset besar bisa dibuat bertahap
+# (baris 0..n lalu n..m) dengan hasil yang sama seperti sekaligus.
+from datetime import date, timedelta
+
+PROVINSI = ['Jawa Barat', 'Jawa Tengah', 'Jawa Timur', 'DKI Jakarta', 'Banten', 'Bali', 'Sumatera Utara', 'Sulawesi Selatan']
+JENIS_PAJAK = ['Pajak Hotel', 'Pajak Restoran', 'Pajak Hiburan', 'Pajak Parkir', 'Pajak Reklame']
+KEPEMILIKAN = ['Swasta', 'Pemerintah', 'BUMN']
+STATUS_SETORAN = ['tepat waktu', 'terlambat', 'belum dibayar']
+NIK_START = 3200000000000000
+EPOCH = date(2023, 1, 1)
+
+KOTA_PER_PROVINSI = 10
+KECAMATAN_PER_KOTA = 20
+DESA_PER_KECAMATAN = 10
+
+
+def id_pajak(i):
+    return f'PJB{i:07d}'
+
+
+def nik(i):
+    return NIK_START + i
+
+
+def _tanggal(days):
+    return (EPOCH + timedelta(days=days)).strftime('%d-%m-%Y')
+
+
+def pajak_rows(start, stop):
+    return [{'id_pajak': id_pajak(i), 'status_kepemilikan': KEPEMILIKAN[i % len(KEPEMILIKAN)],
+             'jenis_pajak': JENIS_PAJAK[i * 7 % len(JENIS_PAJAK)], 'tarif_pajak': (5 + i % 11) / 100,
+             'besar_pajak': 100000 * (1 + i * 7919 % 500)} for i in range(start, stop)]
+
+
+def penduduk_rows(start, stop):
+    rows = []
+    for i in range(start, stop):
+        # sebaran wilayah tidak berurutan supaya filter tidak hanya mengenai satu blok baris
+        wilayah = i * 7919 % (len(PROVINSI) * KOTA_PER_PROVINSI * KECAMATAN_PER_KOTA * DESA_PER_KECAMATAN)
+        desa, wilayah = wilayah % DESA_PER_KECAMATAN, wilayah // DESA_PER_KECAMATAN
+        kecamatan, wilayah = wilayah % KECAMATAN_PER_KOTA, wilayah // KECAMATAN_PER_KOTA
+        kota, provinsi = wilayah % KOTA_PER_PROVINSI, wilayah // KOTA_PER_PROVINSI
+        rows.append({'nik': nik(i), 'nama': f'Penduduk {i}', 'provinsi': PROVINSI[provinsi],
+                     'kota': f'Kota {provinsi}-{kota}', 'kecamatan': f'Kecamatan {provinsi}-{kota}-{kecamatan}',
+                     'desa': f'Desa {provinsi}-{kota}-{kecamatan}-{desa}'})
+    return rows
+
+
+# setoran ke-i membayar pajak ke-(i % jumlah_pajak), jatuh tempo tersebar selama 2 tahun
+def setoran_rows(start, stop, jumlah_pajak):
+    rows = []
+    for i in range(start, stop):
+        jatuh_tempo = i * 37 % 730
+        status = STATUS_SETORAN[i * 13 % len(STATUS_SETORAN)]
+        selisih = 0 if status == 'tepat waktu' else 1 + i % 90
+        rows.append({'id_setoran': 10 ** 7 + i, 'id_pajak': id_pajak(i % jumlah_pajak),
+                     'tanggal_jatuh_tempo': _tanggal(jatuh_tempo), 'tanggal_setoran': _tanggal(jatuh_tempo + selisih),
+                     'status_setoran': status, 'denda': 0.0, 'besar_pajak_setelah_denda': 0})
+    return rows
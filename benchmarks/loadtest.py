@@ -0,0 +1,296 @@
+# Load test yang bisa diulang: API dijalankan in-process (httpx + ASGI, satu event loop
+# dengan client) atau lewat serve.py (uvicorn, proses terpisah) bersama server stub lokal
+# untuk semua API kelompok lain (stubs.py, latency dan error bisa diatur). Tabel diisi data
+# sintetis (datasets.py) lewat endpoint /bulk untuk setiap ukuran di --rows (dari kecil ke
+# besar, data ditambah bertahap), lalu setiap endpoint dibebani --concurrency client selama
+# --duration detik. Hasil per ukuran dan endpoint: req/detik, latency p50/p95/p99/max,
+# status response dan RSS server, disimpan sebagai JSON (--output) beserta commit git,
+# sehingga bisa dibandingkan antar commit dengan --compare hasil_lama.json.
+# Contoh (dari root repo):
+#   python benchmarks/loadtest.py --rows 1000,100000 --output hasil.json
+#   python benchmarks/loadtest.py --mode uvicorn --latency 0.05 --error-rate 0.1 --compare hasil.json
+import argparse
+import asyncio
+import json
+import os
+import platform
+import random
+import socket
+import subprocess
+import sys
+import tempfile
+import time
+from collections import Counter
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import httpx  # noqa: E402
+
+import datasets  # noqa: E402
+from stubs import StubServer, default_payloads  # noqa: E402
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+SEED_CHUNK = 50000
+# {nik} / {id_pajak} / {id_wisata} diisi acak dari data yang ada; endpoint partner
+# (/wisata, /pajakwisata, /tourguide, /penduduk/hotel, /profile) dilayani server stub
+ENDPOINTS = [
+    '/pajak/{id_pajak}',
+    '/pajak?limit=100',
+    '/pajak/summary',
+    '/penduduk/{nik}',
+    '/penduduk?limit=100',
+    '/penduduk?provinsi=Bali&limit=100',
+    '/penduduk?nama=Penduduk%2012&limit=100',
+    '/setoranpajak?status_setoran=terlambat&limit=100',
+    '/setoranpajak?jatuh_tempo_dari=01-03-2023&jatuh_tempo_sampai=31-03-2023&limit=100',
+    '/setoranpajak/summary',
+    '/pendudukrental?limit=100',
+    '/wisata/{id_wisata}',
+    '/pajakwisata',
+    '/tourguide',
+    '/penduduk/hotel',
+    '/penduduk/{nik}/profile',
+]
+
+
+def percentile(values, q):
+    if not values:
+        return None
+    index = min(len(values) - 1, max(0, round(q / 100 * len(values)) - 1))
+    return values[index]
+
+
+def rss_mb(pid):
+    # RSS proses dan seluruh anak-anaknya (worker uvicorn)
+    total = 0
+    pids = [pid]
+    while pids:
+        current = pids.pop()
+        try:
+            with open(f'/proc/{current}/status') as status:
+                total += next(int(line.split()[1]) for line in status if line.startswith('VmRSS:'))
+            with open(f'/proc/{current}/task/{current}/children') as children:
+                pids.extend(int(child) for child in children.read().split())
+        except (OSError, StopIteration):
+            continue
+    return round(total / 1024, 1)
+
+
+def git_commit():
+    try:
+        commit = subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], cwd=ROOT, capture_output=True,
+                                text=True, check=True).stdout.strip()
+        dirty = subprocess.run(['git', 'status', '--porcelain', '--untracked-files=no'], cwd=ROOT,
+                               capture_output=True, text=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+    return commit + ('-dirty' if dirty else '')
+
+
+def free_port():
+    with socket.socket() as sock:
+        sock.bind(('127.0.0.1', 0))
+        return sock.getsockname()[1]
+
+
+def fill(template, rng, rows, stub):
+    if '{' not in template:
+        return template
+    return template.format(nik=datasets.nik(rng.randrange(rows)), id_pajak=datasets.id_pajak(rng.randrange(rows)),
+                           id_wisata=rng.choice(stub.payloads['wisata'])['id_wisata'])
+
+
+async def seed(client, start, stop):
+    jumlah_pajak = max(stop // 100, 10)
+    tables = [('/pajak/bulk', lambda a, b: datasets.pajak_rows(a, b)),
+              ('/penduduk/bulk', datasets.penduduk_rows),
+              ('/setoranpajak/bulk', lambda a, b: datasets.setoran_rows(a, b, jumlah_pajak))]
+    for path, rows in tables:
+        for a in range(start, stop, SEED_CHUNK):
+            body = '\n'.join(json.dumps(row) for row in rows(a, min(stop, a + SEED_CHUNK)))
+            response = await client.post(path + '?mode=upsert', content=body.encode(),
+                                         headers={'content-type': 'application/x-ndjson'}, timeout=600)
+            assert response.status_code == 200, f'{path}: {response.status_code} {response.text[:200]}'
+
+
+async def load(client, template, args, rows, stub, rng):
+    latencies = []
+    statuses = Counter()
+    size = [0]
+    deadline = time.perf_counter() + args.duration
+
+    async def worker():
+        while time.perf_counter() < deadline and (not args.requests or len(latencies) < args.requests):
+            path = fill(template, rng, rows, stub)
+            started = time.perf_counter()
+            try:
+                response = await client.get(path)
+            except httpx.HTTPError as e:
+                statuses[type(e).__name__] += 1
+                continue
+            latencies.append(time.perf_counter() - started)
+            statuses[str(response.status_code)] += 1
+            size[0] += len(response.content)
+
+    started = time.perf_counter()
+    await asyncio.gather(*(worker() for _ in range(args.concurrency)))
+    elapsed = time.perf_counter() - started
+    latencies.sort()
+    ms = [value * 1000 for value in latencies]
+    return {
+        'requests': len(latencies),
+        'rps': round(len(latencies) / elapsed, 1),
+        'p50_ms': round(percentile(ms, 50), 3) if ms else None,
+        'p95_ms': round(percentile(ms, 95), 3) if ms else None,
+        'p99_ms': round(percentile(ms, 99), 3) if ms else None,
+        'max_ms': round(ms[-1], 3) if ms else None,
+        'avg_bytes': round(size[0] / len(latencies)) if latencies else 0,
+        'status': dict(statuses),
+    }
+
+
+async def run_sizes(client, args, stub, pid):
+    results = []
+    rng = random.Random(args.seed)
+    seeded = 0
+    for rows in args.rows:
+        started = time.perf_counter()
+        await seed(client, seeded, rows)
+        seeded = rows
+        result = {'rows': rows, 'seed_seconds': round(time.perf_counter() - started, 2),
+                  'rss_mb_after_seed': rss_mb(pid), 'endpoints': {}}
+        print(f'\n{rows} baris (seed {result["seed_seconds"]}s, RSS {result["rss_mb_after_seed"]} MB)')
+        print(f'{"endpoint":58} {"req/s":>8} {"p50":>8} {"p95":>8} {"p99":>8}  {"RSS":>7}  status')
+        for template in args.endpoints:
+            for _ in range(args.warmup):
+                await client.get(fill(template, rng, rows, stub))
+            stats = await load(client, template, args, rows, stub, rng)
+            stats['rss_mb'] = rss_mb(pid)
+            result['endpoints'][template] = stats
+            print(f'{template:58} {stats["rps"]:8.1f} {stats["p50_ms"] or 0:8.2f} {stats["p95_ms"] or 0:8.2f} '
+                  f'{stats["p99_ms"] or 0:8.2f}  {stats["rss_mb"]:7.1f}  {stats["status"]}')
+        results.append(result)
+    return results
+
+
+async def run_inprocess(args, stub):
+    import main as app_module
+
+    app = app_module.app
+    transport = httpx.ASGITransport(app=app)
+    async with app.router.lifespan_context(app), \
+            httpx.AsyncClient(transport=transport, base_url='http://app', timeout=args.timeout) as client:
+        return await run_sizes(client, args, stub, os.getpid())
+
+
+async def run_uvicorn(args, stub, env):
+    port = free_port()
+    process = subprocess.Popen([sys.executable, 'serve.py'], cwd=ROOT, env=dict(env, PORT=str(port)),
+                               stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+    limits = httpx.Limits(max_connections=args.concurrency, max_keepalive_connections=args.concurrency)
+    try:
+        async with httpx.AsyncClient(base_url=f'http://127.0.0.1:{port}', timeout=args.timeout, limits=limits) as client:
+            deadline = time.monotonic() + 30
+            while True:
+                try:
+                    await client.get('/pajak/summary')
+                    break
+                except httpx.TransportError:
+                    if process.poll() is not None or time.monotonic() > deadline:
+                        raise RuntimeError('server tidak bisa dijalankan')
+                    await asyncio.sleep(0.05)
+            return await run_sizes(client, args, stub, process.pid)
+    finally:
+        process.terminate()
+        process.wait()
+
+
+def compare(old_report, report):
+    old = {(result['rows'], template): stats for result in old_report['results']
+           for template, stats in result['endpoints'].items()}
+    print(f"\nperbandingan dengan {old_report['meta'].get('commit')} (req/s dan p99, positif = lebih cepat)")
+    settings = ('mode', 'workers', 'storage_backend', 'concurrency', 'stub_latency', 'stub_error_rate', 'cpu_count')
+    different = [name for name in settings if old_report['meta'].get(name) != report['meta'].get(name)]
+    if different:
+        print(f"PERINGATAN: pengaturan berbeda ({', '.join(different)}), hasil tidak sebanding langsung")
+    for result in report['results']:
+        for template, stats in result['endpoints'].items():
+            before = old.get((result['rows'], template))
+            if not before or not before['rps'] or not before['p99_ms'] or not stats['p99_ms']:
+                continue
+            print(f"{result['rows']:>8} {template:58} req/s {stats['rps'] / before['rps'] - 1:+7.1%} "
+                  f"p99 {before['p99_ms'] / stats['p99_ms'] - 1:+7.1%}")
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description='Load test API dengan server stub partner dan data sintetis.')
+    parser.add_argument('--mode', choices=('inprocess', 'uvicorn'), default='inprocess')
+    parser.add_argument('--rows', default='1000,10000,100000',
+                        help='ukuran dataset dipisah koma (mis. 1000,1000000)')
+    parser.add_argument('--endpoints', default=None, help='daftar endpoint dipisah koma (default: ENDPOINTS)')
+    parser.add_argument('--concurrency', type=int, default=16)
+    parser.add_argument('--duration', type=float, default=3.0, help='detik per endpoint')
+    parser.add_argument('--requests', type=int, default=0, help='batas request per endpoint (0 = hanya --duration)')
+    parser.add_argument('--warmup', type=int, default=5, help='request pemanasan per endpoint')
+    parser.add_argument('--timeout', type=float, default=30.0)
+    parser.add_argument('--workers', type=int, default=1, help='jumlah worker uvicorn (--mode uvicorn)')
+    parser.add_argument('--latency', type=float, default=0.02, help='latency server stub partner (detik)')
+    parser.add_argument('--error-rate', type=float, default=0.0, help='peluang server stub membalas 500')
+    parser.add_argument('--partner-rows', type=int, default=100, help='jumlah data per partner di server stub')
+    parser.add_argument('--seed', type=int, default=1, help='seed pemilihan key acak')
+    parser.add_argument('--output', help='file JSON hasil')
+    parser.add_argument('--compare', help='file JSON hasil sebelumnya untuk dibandingkan')
+    args = parser.parse_args()
+    args.rows = sorted(int(rows) for rows in args.rows.split(','))
+    args.endpoints = args.endpoints.split(',') if args.endpoints else ENDPOINTS
+    return args
+
+
+def main():
+    args = parse_args()
+    stub = StubServer(payloads=default_payloads(args.partner_rows), latency=args.latency,
+                      error_rate=args.error_rate, etag=True).start()
+    # sync partner langsung dimulai (tanpa jeda startup) supaya mirror cepat terisi
+    env = dict(os.environ, **stub.env(), PARTNER_SYNC_DELAY='0', HOST='127.0.0.1',
+               WEB_CONCURRENCY=str(args.workers))
+    if args.workers > 1:
+        env.update(STORAGE_BACKEND='sqlite', SQLITE_PATH=os.path.join(tempfile.mkdtemp(), 'loadtest.db'))
+    else:
+        env.setdefault('STORAGE_BACKEND', 'memory')
+    try:
+        if args.mode == 'inprocess':
+            os.environ.update(env)
+            results = asyncio.run(run_inprocess(args, stub))
+        else:
+            results = asyncio.run(run_uvicorn(args, stub, env))
+    finally:
+        stub.stop()
+    report = {
+        'meta': {
+            'commit': git_commit(),
+            'waktu': time.strftime('%Y-%m-%dT%H:%M:%S%z'),
+            'python': platform.python_version(),
+            'platform': platform.platform(),
+            'cpu_count': os.cpu_count(),
+            'mode': args.mode,
+            'workers': args.workers,
+            'storage_backend': env.get('STORAGE_BACKEND'),
+            'concurrency': args.concurrency,
+            'duration': args.duration,
+            'stub_latency': args.latency,
+            'stub_error_rate': args.error_rate,
+            'partner_rows': args.partner_rows,
+        },
+        'results': results,
+    }
+    if args.output:
+        with open(args.output, 'w') as output:
+            json.dump(report, output, indent=2)
+        print(f'\nhasil disimpan di {args.output}')
+    if args.compare:
+        with open(args.compare) as previous:
+            compare(json.load(previous), report)
+
+
+if __name__ == '__main__':
+    main()
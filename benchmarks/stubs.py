@@ -0,0 +1,125 @@
+# Server stub lokal untuk API kelompok lain (wisata, asuransi, bank, hotel, rental, tour guide)
+# dengan latency dan error yang bisa diatur. Dipakai oleh script benchmark.
+import asyncio
+import hashlib
+import json
+import random
+import threading
+
+
+def default_payloads(n=20):
+    return {
+        'wisata': [{'id_wisata': f'PJ{i:03d}', 'nama_objek': f'Objek Wisata {i}'} for i in range(1, n + 1)],
+        'asuransi': [{'nik': 100 + i, 'nama': f'Penduduk {i}', 'provinsi': 'Jawa Barat', 'kota': 'Bandung',
+                      'kecamatan': 'Dayeuhkolot', 'desa': 'Bojongsoang'} for i in range(1, n + 1)],
+        'bank': [{'nik': 100 + i, 'nama': f'Penduduk {i}'} for i in range(1, n + 1)],
+        'hotel': [{'nik': 100 + i, 'nama': f'Penduduk {i}', 'kabupaten': 'Bandung'} for i in range(1, n + 1)],
+        'rental': [{'nik': 100 + i, 'nomor_telepon': f'0812{i:06d}', 'email': f'p{i}@mail.com'} for i in range(1, n + 1)],
+        'guide': [{'id_guider': f'G{i:03d}', 'nama_guider': f'Guide {i}'} for i in range(1, n + 1)],
+    }
+
+
+class StubServer:
+    # latency: detik per request, error_rate: peluang (0..1) membalas 500,
+    # slow_rate: peluang request dijawab setelah slow_latency detik (latency ekor / tail),
+    # etag: mengirim ETag dan menjawab 304 untuk If-None-Match yang cocok.
+    # Semua atribut (termasuk payloads) boleh diubah saat server berjalan.
+    def __init__(self, payloads=None, latency=0.0, error_rate=0.0, host='127.0.0.1', port=0,
+                 slow_rate=0.0, slow_latency=1.0, etag=False):
+        self.payloads = payloads if payloads is not None else default_payloads()
+        self.latency = latency
+        self.error_rate = error_rate
+        self.slow_rate = slow_rate
+        self.slow_latency = slow_latency
+        self.etag = etag
+        self.not_modified = 0
+        self.host = host
+        self.port = port
+        self.requests = 0
+        self._loop = None
+        self._server = None
+        self._thread = None
+        self._writers = set()
+        self._tasks = set()
+
+    def url(self, name):
+        return f'http://{self.host}:{self.port}/{name}'
+
+    # environment variable UPSTREAM_<NAMA>_URL untuk diarahkan ke stub ini
+    def env(self):
+        return {f'UPSTREAM_{name.upper()}_URL': self.url(name) for name in self.payloads}
+
+    async def _handle(self, reader, writer):
+        self._writers.add(writer)
+        self._tasks.add(asyncio.current_task())
+        try:
+            while True:
+                request_line = await reader.readline()
+                if not request_line:
+                    break
+                headers = {}
+                while (line := await reader.readline()) not in (b'\r\n', b'\n', b''):
+                    name, _, value = line.decode().partition(':')
+                    headers[name.strip().lower()] = value.strip()
+                self.requests += 1
+                path = request_line.split()[1].decode().strip('/')
+                if self.slow_rate and random.random() < self.slow_rate:
+                    await asyncio.sleep(self.slow_latency)
+                elif self.latency:
+                    await asyncio.sleep(self.latency)
+                if random.random() < self.error_rate:
+                    status, body = '500 Internal Server Error', b'{"detail": "stub error"}'
+                elif path in self.payloads:
+                    status, body = '200 OK', json.dumps(self.payloads[path]).encode()
+                else:
+                    status, body = '404 Not Found', b'{"detail": "Not Found"}'
+                extra = ''
+                if self.etag and status == '200 OK':
+                    tag = '"' + hashlib.sha1(body).hexdigest()[:16] + '"'
+                    extra = f'ETag: {tag}\r\n'
+                    if headers.get('if-none-match') == tag:
+                        self.not_modified += 1
+                        status, body = '304 Not Modified', b''
+                writer.write(f'HTTP/1.1 {status}\r\nContent-Type: application/json\r\n{extra}'
+                             f'Content-Length: {len(body)}\r\n\r\n'.encode() + body)
+                await writer.drain()
+        except (ConnectionError, asyncio.IncompleteReadError):
+            pass
+        except asyncio.CancelledError:
+            pass
+        finally:
+            self._writers.discard(writer)
+            self._tasks.discard(asyncio.current_task())
+            writer.close()
+
+    def start(self):
+        started = threading.Event()
+
+        def run():
+            self._loop = asyncio.new_event_loop()
+            self._server = self._loop.run_until_complete(asyncio.start_server(self._handle, self.host, self.port))
+            self.port = self._server.sockets[0].getsockname()[1]
+            started.set()
+            self._loop.run_forever()
+
+        self._thread = threading.Thread(target=run, daemon=True)
+        self._thread.start()
+        started.wait()
+        return self
+
+    async def _shutdown(self):
+        self._server.close()
+        for writer in list(self._writers):
+            writer.close()
+        # handler yang masih menunggu (mis. latency) dihentikan
+        for task in list(self._tasks):
+            task.cancel()
+        await asyncio.sleep(0.05)
+
+    def stop(self):
+        if self._loop is not None:
+            asyncio.run_coroutine_threadsafe(self._shutdown(), self._loop).result(timeout=5)
+            self._loop.call_soon_threadsafe(self._loop.stop)
+            self._thread.join(timeout=5)
+            self._loop.close()
+            self._loop = None
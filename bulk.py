@@ -0,0 +1,144 @@
+from typing import Any, Dict, List, Type, Union
+
+from fastapi import HTTPException, Request
+from pydantic import BaseModel, TypeAdapter, ValidationError
+
+from pagination import NDJSON_MEDIA_TYPE
+from store import DuplicateKeyError, KeyedStore
+
+
+BULK_MODES = ('insert', 'upsert', 'delete')
+INSERT_RETRIES = 3  # percobaan ulang insert jika ada key yang ditambahkan request lain di tengah batch
+_adapters: Dict[Any, TypeAdapter] = {}
+_any_adapter = TypeAdapter(Any)
+
+
+def _adapter(item_type) -> TypeAdapter:
+    adapter = _adapters.get(item_type)
+    if adapter is None:
+        adapter = _adapters[item_type] = TypeAdapter(List[item_type])
+    return adapter
+
+
+# Body batch bisa berupa JSON array (bytes) atau NDJSON (satu data JSON per baris, list baris
+# yang tidak kosong). NDJSON digabung menjadi satu JSON array supaya tetap divalidasi sekali
+# jalan; baris disimpan supaya baris yang bukan JSON bisa dilaporkan sendiri-sendiri.
+BatchBody = Union[bytes, List[bytes]]
+
+
+async def read_batch_body(request: Request) -> BatchBody:
+    body = await request.body()
+    content_type = request.headers.get('content-type', '')
+    if content_type.startswith(NDJSON_MEDIA_TYPE) or content_type.startswith('application/jsonl'):
+        return [line for line in body.splitlines() if line.strip()]
+    return body
+
+
+def _joined(body: BatchBody) -> bytes:
+    return b'[' + b','.join(body) + b']' if isinstance(body, list) else body
+
+
+# Validasi seluruh batch sekaligus. Mengembalikan (data valid sebagai dict, index baris
+# valid, daftar error per baris). Jika ada yang tidak valid, baris valid dicari ulang satu-satu.
+def validate_batch(body: BatchBody, item_type) -> tuple:
+    adapter = _adapter(item_type)
+    try:
+        items = adapter.validate_json(_joined(body))
+        return adapter.dump_python(items), list(range(len(items))), []
+    except ValidationError as e:
+        errors: Dict[int, List[str]] = {}
+        for error in e.errors():
+            loc = error['loc']
+            if not loc or not isinstance(loc[0], int):
+                if isinstance(body, list):
+                    return _validate_lines(body, item_type)
+                raise HTTPException(status_code=400, detail="Body harus berupa JSON array atau NDJSON.")
+            field = '.'.join(str(part) for part in loc[1:])
+            errors.setdefault(loc[0], []).append(f"{field}: {error['msg']}" if field else error['msg'])
+    raw_items = TypeAdapter(List[Any]).validate_json(_joined(body))
+    item_adapter = TypeAdapter(item_type)
+    rows, indexes = [], []
+    for i, raw in enumerate(raw_items):
+        if i not in errors:
+            rows.append(item_adapter.dump_python(item_adapter.validate_python(raw)))
+            indexes.append(i)
+    return rows, indexes, [{'index': i, 'detail': detail} for i, detail in sorted(errors.items())]
+
+
+# NDJSON dengan baris yang bukan JSON: setiap baris di-parse dan divalidasi sendiri
+def _validate_lines(lines: List[bytes], item_type) -> tuple:
+    item_adapter = TypeAdapter(item_type)
+    rows, indexes, errors = [], [], []
+    for i, line in enumerate(lines):
+        try:
+            raw = _any_adapter.validate_json(line)
+        except ValidationError as e:
+            errors.append({'index': i, 'detail': [f"JSON tidak valid: {e.errors()[0]['msg']}"]})
+            continue
+        try:
+            rows.append(item_adapter.dump_python(item_adapter.validate_python(raw)))
+            indexes.append(i)
+        except ValidationError as e:
+            errors.append({'index': i, 'detail': [
+                f"{'.'.join(str(part) for part in error['loc'])}: {error['msg']}" if error['loc'] else error['msg']
+                for error in e.errors()]})
+    return rows, indexes, errors
+
+
+# Menjalankan insert / upsert / delete batch ke tabel. Berat untuk batch besar, jadi
+# dipanggil lewat run_in_threadpool oleh handler supaya event loop tidak tertahan.
+# atomic=True: jika ada satu baris yang gagal, tidak ada yang disimpan (400 jika ada data
+# tidak valid, 409 jika semuanya key bentrok).
+# atomic=False: baris yang valid tetap disimpan, baris yang gagal dilaporkan per index.
+def apply_batch(store: KeyedStore, model: Type[BaseModel], body: BatchBody, mode: str, atomic: bool) -> Dict[str, Any]:
+    if mode == 'delete':
+        # untuk delete, body berisi daftar key (mis. [101, 102]) atau data lengkap
+        key_type = model.model_fields[store.key].annotation
+        try:
+            keys = _adapter(key_type).validate_json(_joined(body))
+        except ValidationError:
+            rows, _, errors = validate_batch(body, model)
+            if errors and atomic:
+                raise HTTPException(status_code=400, detail={'message': "Data batch tidak valid.", 'errors': errors})
+            keys = [row[store.key] for row in rows]
+        else:
+            errors = []
+        deleted = store.delete_many(keys)
+        return {'diproses': deleted, 'ditolak': len(errors), 'errors': errors}
+
+    rows, indexes, errors = validate_batch(body, model)
+    if errors and atomic:
+        raise HTTPException(status_code=400, detail={'message': "Data batch tidak valid.", 'errors': errors})
+    if mode == 'upsert':
+        store.upsert_many(rows)
+        return {'diproses': len(rows), 'ditolak': len(errors), 'errors': errors}
+    # key dicek lalu di-insert; jika di antaranya request lain (atau worker lain) menambah key
+    # yang sama, insert_many gagal tanpa menyimpan apa pun dan pengecekan diulang
+    for attempt in range(INSERT_RETRIES + 1):
+        conflicts = store.conflicts(rows)
+        if conflicts:
+            errors = sorted(errors + [{'index': indexes[i], 'detail': [f"{store.key} sudah ada."]} for i in conflicts],
+                            key=lambda error: error['index'])
+            if atomic:
+                raise HTTPException(status_code=409, detail={'message': "Key data batch sudah ada.", 'errors': errors})
+            skip = set(conflicts)
+            rows = [row for i, row in enumerate(rows) if i not in skip]
+            indexes = [index for i, index in enumerate(indexes) if i not in skip]
+        try:
+            store.insert_many(rows)
+            break
+        except DuplicateKeyError:
+            if attempt == INSERT_RETRIES:
+                raise HTTPException(status_code=409, detail={
+                    'message': "Key data batch bentrok dengan data yang sedang ditambahkan, coba lagi.",
+                    'errors': errors})
+    return {'diproses': len(rows), 'ditolak': len(errors), 'errors': errors}
+
+
+# dokumentasi body untuk Swagger, karena body dibaca langsung dari Request
+def bulk_openapi(model: Type[BaseModel]) -> Dict[str, Any]:
+    schema = {'type': 'array', 'items': model.model_json_schema()}
+    return {'requestBody': {'required': True, 'content': {
+        'application/json': {'schema': schema},
+        NDJSON_MEDIA_TYPE: {'schema': {'type': 'string', 'description': "Satu data JSON per baris"}},
+    }}}
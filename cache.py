@@ -0,0 +1,133 @@
+import asyncio
+import time
+from collections import OrderedDict
+from typing import Any, Awaitable, Callable, Dict, Optional
+
+from upstream import UPSTREAMS, fetch_json
+
+
+class CacheEntry:
+    __slots__ = ('value', 'fetched_at', 'fresh_until', 'stale_until', 'generation')
+
+    def __init__(self, value: Any, ttl: float, stale_ttl: float, generation: int):
+        now = time.monotonic()
+        self.value = value
+        self.fetched_at = now
+        self.fresh_until = now + ttl
+        self.stale_until = now + ttl + stale_ttl
+        self.generation = generation
+
+
+# Cache in-process untuk data partner:
+# - masih fresh (umur < ttl): langsung dikembalikan (hit)
+# - sudah lewat ttl tapi masih < ttl + stale_ttl: data lama dikembalikan dan
+#   di-refresh di background (stale-while-revalidate)
+# - request bersamaan untuk key yang sama berbagi satu fetch (coalescing)
+# - jika fetch gagal, data terakhir yang berhasil diambil tetap dikembalikan (fallback)
+# - jumlah entry dibatasi, entry yang paling lama tidak dipakai dibuang (LRU)
+class UpstreamCache:
+    def __init__(self, max_entries: int = 64):
+        self.max_entries = max_entries
+        self._entries: 'OrderedDict[str, CacheEntry]' = OrderedDict()
+        self._inflight: Dict[str, asyncio.Task] = {}
+        self._generations: Dict[str, int] = {}
+        self._background = set()
+        self.stats: Dict[str, Dict[str, int]] = {}
+
+    def _count(self, key: str, counter: str):
+        counters = self.stats.setdefault(key, {'hit': 0, 'stale_hit': 0, 'miss': 0, 'coalesced': 0,
+                                               'refresh': 0, 'refresh_error': 0, 'fallback': 0,
+                                               'eviction': 0})
+        counters[counter] += 1
+
+    # nomor generasi data untuk key ini, naik setiap kali data berhasil diambil ulang
+    def generation(self, key: str) -> int:
+        return self._generations.get(key, 0)
+
+    def peek(self, key: str) -> Optional[CacheEntry]:
+        return self._entries.get(key)
+
+    async def get(self, key: str, loader: Callable[[], Awaitable[Any]], ttl: float, stale_ttl: float) -> Any:
+        entry = self._entries.get(key)
+        now = time.monotonic()
+        if entry is not None and now < entry.stale_until:
+            self._entries.move_to_end(key)
+            if now < entry.fresh_until:
+                self._count(key, 'hit')
+            else:
+                self._count(key, 'stale_hit')
+                if key not in self._inflight:
+                    self._background.add(self._start_load(key, loader, ttl, stale_ttl))
+            return entry.value
+        if key in self._inflight:
+            self._count(key, 'coalesced')
+        else:
+            self._count(key, 'miss')
+            self._start_load(key, loader, ttl, stale_ttl)
+        try:
+            # shield supaya request yang dibatalkan tidak ikut membatalkan fetch bersama
+            return await asyncio.shield(self._inflight[key])
+        except Exception:
+            # partner gagal / circuit breaker terbuka: pakai data terakhir yang berhasil
+            # diambil walau sudah lewat stale_ttl, error hanya jika belum pernah ada data
+            if entry is None:
+                raise
+            self._count(key, 'fallback')
+            return entry.value
+
+    def invalidate(self, key: Optional[str] = None):
+        if key is None:
+            self._entries.clear()
+        else:
+            self._entries.pop(key, None)
+
+    def _start_load(self, key: str, loader, ttl: float, stale_ttl: float) -> asyncio.Task:
+        task = asyncio.ensure_future(self._load(key, loader, ttl, stale_ttl))
+        task.add_done_callback(self._load_done)
+        self._inflight[key] = task
+        return task
+
+    async def _load(self, key: str, loader, ttl: float, stale_ttl: float) -> Any:
+        try:
+            value = await loader()
+            generation = self._generations.get(key, 0) + 1
+            self._generations[key] = generation
+            self._entries[key] = CacheEntry(value, ttl, stale_ttl, generation)
+            self._entries.move_to_end(key)
+            self._count(key, 'refresh')
+            while len(self._entries) > self.max_entries:
+                evicted, _ = self._entries.popitem(last=False)
+                self._count(evicted, 'eviction')
+            return value
+        except Exception:
+            self._count(key, 'refresh_error')
+            raise
+        finally:
+            self._inflight.pop(key, None)
+
+    def _load_done(self, task: asyncio.Task):
+        self._background.discard(task)
+        if not task.cancelled():
+            # error sudah dicatat di stats; untuk refresh background data lama tetap dipakai,
+            # dan fetch yang semua pemanggilnya sudah timeout tidak perlu dilaporkan lagi
+            task.exception()
+
+    def snapshot(self) -> Dict[str, Any]:
+        now = time.monotonic()
+        return {
+            key: {
+                **self.stats.get(key, {}),
+                'generation': self.generation(key),
+                'age': round(now - entry.fetched_at, 3) if (entry := self._entries.get(key)) else None,
+            }
+            for key in sorted(set(self.stats) | set(self._entries))
+        }
+
+
+upstream_cache = UpstreamCache()
+
+
+# Mengambil data partner lewat cache, ttl / stale_ttl diatur per partner di upstream.py
+async def fetch_cached(name: str) -> Any:
+    upstream = UPSTREAMS[name]
+    return await upstream_cache.get(name, lambda: fetch_json(name), upstream.ttl, upstream.stale_ttl)
@@ -0,0 +1,368 @@
+import asyncio
+import json
+import os
+import threading
+import time
+from bisect import bisect_right
+from typing import Any, Dict, Iterable, List, Optional, Sequence, Set, Tuple
+
+from metrics import CHANGEFEED_SUBSCRIBERS
+from serialization import dumps
+from storage import shared_database
+from store import Change
+
+
+# Satu perubahan data: insert / update / delete satu baris di satu tabel. Jika key data
+# berubah, op update dengan old_key berisi key lama.
+# JSON-nya dibuat sekali saat pertama kali dikirim, lalu dipakai ulang untuk semua subscriber.
+class ChangeEntry:
+    __slots__ = ('seq', 'table', 'op', 'key', 'data', 'old_key', '_encoded')
+
+    def __init__(self, seq: int, table: str, op: str, key: Any, data: Optional[Dict[str, Any]],
+                 old_key: Any = None):
+        self.seq = seq
+        self.table = table
+        self.op = op
+        self.key = key
+        self.data = data
+        self.old_key = old_key
+        self._encoded: Optional[bytes] = None
+
+    def encoded(self) -> bytes:
+        if self._encoded is None:
+            change = {'seq': self.seq, 'table': self.table, 'op': self.op, 'key': self.key, 'data': self.data}
+            if self.old_key is not None:
+                change['old_key'] = self.old_key
+            self._encoded = dumps(change)
+        return self._encoded
+
+
+# Perubahan dari satu operasi tulis (satu notifikasi store) dengan seq berurutan mulai first_seq.
+# Disimpan apa adanya (list changes dari store); ChangeEntry baru dibuat saat dibaca subscriber,
+# jadi bulk insert besar tidak membayar pembuatan objek per baris jika tidak ada yang membaca.
+class _Batch:
+    __slots__ = ('first_seq', 'table', 'key', 'changes', 'entries')
+
+    def __init__(self, first_seq: int, table: str, key: str, changes: List[Change]):
+        self.first_seq = first_seq
+        self.table = table
+        self.key = key
+        self.changes = changes
+        self.entries: List[Optional[ChangeEntry]] = [None] * len(changes)
+
+    def entry(self, i: int) -> ChangeEntry:
+        entry = self.entries[i]
+        if entry is None:
+            old, new = self.changes[i]
+            key, seq = self.key, self.first_seq + i
+            if new is None:
+                entry = ChangeEntry(seq, self.table, 'delete', old[key], None)
+            elif old is None:
+                entry = ChangeEntry(seq, self.table, 'insert', new[key], new)
+            else:
+                entry = ChangeEntry(seq, self.table, 'update', new[key], new,
+                                    old[key] if old[key] != new[key] else None)
+            self.entries[i] = entry
+        return entry
+
+
+# seq yang diminta sudah tidak ada di log (subscriber terlalu lama tertinggal / terputus):
+# data harus diambil ulang lengkap, lalu berlangganan lagi dari last_seq
+class ChangeLogReset(Exception):
+    def __init__(self, first_seq: int, last_seq: int):
+        super().__init__(first_seq, last_seq)
+        self.first_seq = first_seq
+        self.last_seq = last_seq
+
+
+# Bagian yang sama untuk ChangeLog dan SqliteChangeLog: tabel yang dicatat, daftar
+# subscriber dan cara membangunkannya. Tempat perubahan disimpan (track / first_seq /
+# last_seq / check / read) diisi subclass.
+class _ChangeFeed:
+    shared = False  # True: satu log untuk semua worker
+
+    def __init__(self, retention: int, max_subscribers: int):
+        self.retention = retention
+        self.max_subscribers = max_subscribers
+        self.tables: Dict[str, Any] = {}
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._subscriptions: Set['Subscription'] = set()
+
+    def _wake(self):
+        loop = self._loop
+        if loop is None or not self._subscriptions:
+            return
+        try:
+            running = asyncio.get_running_loop()
+        except RuntimeError:
+            running = None
+        if running is loop:
+            self._set_events()
+        else:
+            loop.call_soon_threadsafe(self._set_events)
+
+    def _set_events(self):
+        for subscription in self._subscriptions:
+            subscription.event.set()
+
+    def subscribe(self, after: Optional[int] = None, tables: Optional[Iterable[str]] = None,
+                  transport: str = 'sse') -> Optional['Subscription']:
+        if len(self._subscriptions) >= self.max_subscribers:
+            return None
+        self._loop = asyncio.get_running_loop()
+        subscription = Subscription(self, self.last_seq if after is None else after,
+                                    set(tables) if tables else None, transport)
+        self._subscriptions.add(subscription)
+        CHANGEFEED_SUBSCRIBERS.inc((transport,))
+        return subscription
+
+    def _unsubscribe(self, subscription: 'Subscription'):
+        if subscription in self._subscriptions:
+            self._subscriptions.discard(subscription)
+            CHANGEFEED_SUBSCRIBERS.inc((subscription.transport,), -1)
+
+    def status(self) -> Dict[str, Any]:
+        return {
+            'first_seq': self.first_seq,
+            'last_seq': self.last_seq,
+            'retention': self.retention,
+            'tables': list(self.tables),
+            'subscribers': len(self._subscriptions),
+            'max_subscribers': self.max_subscribers,
+            'shared': self.shared,
+        }
+
+
+# Log perubahan append-only untuk beberapa tabel dengan satu nomor urut (seq) yang naik terus.
+# Diisi lewat store.subscribe(), jadi semua jalur tulis (POST / PUT / DELETE, bulk, perubahan
+# tabel induk pada proyeksi) tercatat. Hanya retention perubahan terakhir yang disimpan.
+# Subscriber membaca log dengan cursor sendiri (tidak ada antrean per subscriber), sehingga
+# subscriber lambat tidak menambah memori; jika tertinggal lebih dari retention ia mendapat
+# ChangeLogReset. Listener store bisa dipanggil dari thread lain (handler def biasa),
+# subscriber dibangunkan lewat event loop.
+# seq pertama diambil dari waktu startup (mikrodetik), jadi seq dari proses sebelum restart
+# selalu lebih kecil dan terdeteksi sebagai reset, tidak tertukar dengan seq proses ini.
+# Log ini hanya untuk backend memory (satu worker); backend SQLite (dipakai serve.py untuk
+# beberapa worker) memakai SqliteChangeLog, log bersama yang ditulis semua worker.
+class ChangeLog(_ChangeFeed):
+    def __init__(self, retention: int = 50000, max_subscribers: int = 1000):
+        super().__init__(retention, max_subscribers)
+        self._batches: List[_Batch] = []
+        self._starts: List[int] = []  # first_seq setiap batch, untuk bisect
+        self._size = 0
+        self._first_seq = self._next_seq = time.time_ns() // 1000
+        self._lock = threading.Lock()
+
+    @property
+    def last_seq(self) -> int:
+        return self._next_seq - 1
+
+    @property
+    def first_seq(self) -> int:
+        return self._first_seq
+
+    def track(self, table: str, store):
+        self.tables[table] = store
+        key = store.key
+
+        def on_change(changes: List[Change], version: int):
+            self.append(table, key, changes)
+
+        store.subscribe(on_change)
+
+    def append(self, table: str, key: str, changes: List[Change]):
+        if not changes:
+            return
+        with self._lock:
+            batch = _Batch(self._next_seq, table, key, changes)
+            self._batches.append(batch)
+            self._starts.append(batch.first_seq)
+            self._next_seq += len(changes)
+            self._size += len(changes)
+            # dipotong sekaligus (bukan per data) supaya append tetap O(1) rata-rata
+            if self._size > self.retention + self.retention // 4:
+                self._trim()
+        self._wake()
+
+    # membuang perubahan paling lama sampai tersisa retention perubahan
+    def _trim(self):
+        excess = self._size - self.retention
+        batches = self._batches
+        drop = 0
+        while drop < len(batches) and len(batches[drop].changes) <= excess:
+            excess -= len(batches[drop].changes)
+            drop += 1
+        del batches[:drop]
+        del self._starts[:drop]
+        if excess:
+            batch = batches[0]
+            batch.changes = batch.changes[excess:]
+            batch.entries = batch.entries[excess:]
+            batch.first_seq += excess
+            self._starts[0] = batch.first_seq
+        self._size = self.retention
+        self._first_seq = batches[0].first_seq if batches else self._next_seq
+
+    # ChangeLogReset jika perubahan setelah seq after tidak lagi (atau tidak pernah) ada di log
+    def check(self, after: int):
+        if not self._first_seq - 1 <= after < self._next_seq:
+            raise ChangeLogReset(self._first_seq, self._next_seq - 1)
+
+    # perubahan setelah seq after untuk tabel tertentu (None = semua), paling banyak limit.
+    # Mengembalikan (perubahan, seq terakhir yang sudah diperiksa).
+    def read(self, after: int, tables: Optional[Set[str]] = None,
+             limit: int = 1000) -> Tuple[List[ChangeEntry], int]:
+        with self._lock:
+            self.check(after)
+            found = []
+            batches = self._batches
+            for i in range(max(0, bisect_right(self._starts, after) - 1), len(batches)):
+                batch = batches[i]
+                if tables is not None and batch.table not in tables:
+                    continue
+                offset = max(0, after + 1 - batch.first_seq)
+                stop = min(len(batch.changes), offset + limit - len(found))
+                found.extend(batch.entry(j) for j in range(offset, stop))
+                if len(found) >= limit:
+                    return found, found[-1].seq
+            return found, self._next_seq - 1
+
+
+# Change log untuk backend SQLite: dibaca dari tabel _changes (sqlite_store.SqliteDatabase)
+# yang ditulis setiap POST / PUT / DELETE / bulk di worker mana pun dalam transaksi yang sama
+# dengan datanya, jadi seq satu urutan untuk semua worker dan tetap berlaku setelah restart;
+# client boleh tersambung ulang ke worker lain. Subscriber dibangunkan langsung oleh tulisan
+# di worker ini dan oleh polling seq terakhir setiap poll_interval detik (tulisan worker lain).
+class SqliteChangeLog(_ChangeFeed):
+    CACHE_SIZE = 4096  # ChangeEntry terakhir yang dipakai bersama subscriber di worker ini
+    shared = True
+
+    def __init__(self, db, max_subscribers: int = 1000, poll_interval: float = 0.1):
+        super().__init__(db.change_retention, max_subscribers)
+        self.db = db
+        self.poll_interval = poll_interval
+        self._entries: Dict[int, ChangeEntry] = {}
+        self._poller: Optional[asyncio.Task] = None
+
+    @property
+    def last_seq(self) -> int:
+        return self.db.last_change_seq()
+
+    @property
+    def first_seq(self) -> int:
+        return self.db.change_range()[0]
+
+    def track(self, table: str, store):
+        self.tables[table] = store
+
+        def on_change(changes: List[Change], version: int):
+            self._wake()
+
+        store.subscribe(on_change)
+
+    def check(self, after: int):
+        first, last = self.db.change_range()
+        if not first - 1 <= after <= last:
+            raise ChangeLogReset(first, last)
+
+    def read(self, after: int, tables: Optional[Set[str]] = None,
+             limit: int = 1000) -> Tuple[List[ChangeEntry], int]:
+        first, last, found = self.db.read_changes(after, sorted(tables or self.tables), limit)
+        if not first - 1 <= after <= last:
+            raise ChangeLogReset(first, last)
+        entries = [self._entry(*change) for change in found]
+        if len(entries) >= limit:
+            return entries, entries[-1].seq
+        return entries, last
+
+    def _entry(self, seq: int, table: str, old: Optional[str], new: Optional[str]) -> ChangeEntry:
+        entry = self._entries.get(seq)
+        if entry is None:
+            key = self.tables[table].key
+            old_row = json.loads(old) if old is not None else None
+            new_row = json.loads(new) if new is not None else None
+            if new_row is None:
+                entry = ChangeEntry(seq, table, 'delete', old_row[key], None)
+            elif old_row is None:
+                entry = ChangeEntry(seq, table, 'insert', new_row[key], new_row)
+            else:
+                entry = ChangeEntry(seq, table, 'update', new_row[key], new_row,
+                                    old_row[key] if old_row[key] != new_row[key] else None)
+            if len(self._entries) >= self.CACHE_SIZE:
+                del self._entries[next(iter(self._entries))]
+            self._entries[seq] = entry
+        return entry
+
+    def subscribe(self, after: Optional[int] = None, tables: Optional[Iterable[str]] = None,
+                  transport: str = 'sse') -> Optional['Subscription']:
+        subscription = super().subscribe(after, tables, transport)
+        if subscription is not None and (self._poller is None or self._poller.done()):
+            self._poller = asyncio.get_running_loop().create_task(self._poll())
+        return subscription
+
+    # membangunkan subscriber jika ada tulisan baru (dari worker mana pun), selama ada subscriber
+    async def _poll(self):
+        seen = self.db.last_change_seq()
+        while self._subscriptions:
+            await asyncio.sleep(self.poll_interval)
+            last = self.db.last_change_seq()
+            if last != seen:
+                seen = last
+                self._set_events()
+
+    def status(self) -> Dict[str, Any]:
+        first, last = self.db.change_range()
+        return {**super().status(), 'first_seq': first, 'last_seq': last}
+
+
+# Satu subscriber (koneksi SSE / WebSocket): membaca log dari cursor-nya sendiri
+class Subscription:
+    def __init__(self, log: _ChangeFeed, cursor: int, tables: Optional[Set[str]], transport: str):
+        self.log = log
+        self.cursor = cursor
+        self.tables = tables
+        self.transport = transport
+        self.event = asyncio.Event()
+        self.closed = False
+
+    # batch perubahan berikutnya; [] jika tidak ada perubahan selama timeout detik
+    # (dipakai untuk heartbeat) atau subscription ditutup. ChangeLogReset jika cursor
+    # sudah keluar dari log.
+    async def next_batch(self, limit: int = 500, timeout: float = 15.0) -> List[ChangeEntry]:
+        while not self.closed:
+            self.event.clear()
+            entries, self.cursor = self.log.read(self.cursor, self.tables, limit)
+            if entries:
+                return entries
+            try:
+                await asyncio.wait_for(self.event.wait(), timeout)
+            except asyncio.TimeoutError:
+                return []
+        return []
+
+    def close(self):
+        self.closed = True
+        self.event.set()
+        self.log._unsubscribe(self)
+
+
+def parse_tables(tables: Optional[str], known: Sequence[str]) -> Optional[List[str]]:
+    if not tables:
+        return None
+    names = [name.strip() for name in tables.split(',') if name.strip()]
+    unknown = [name for name in names if name not in known]
+    if unknown:
+        raise ValueError(', '.join(unknown))
+    return names
+
+
+def _open_change_log() -> _ChangeFeed:
+    max_subscribers = int(os.environ.get('CHANGEFEED_MAX_SUBSCRIBERS', 1000))
+    database = shared_database()
+    if database is not None:
+        return SqliteChangeLog(database, max_subscribers,
+                               poll_interval=float(os.environ.get('CHANGEFEED_POLL_SECONDS', 0.1)))
+    return ChangeLog(retention=int(os.environ.get('CHANGEFEED_RETENTION', 50000)), max_subscribers=max_subscribers)
+
+
+change_log = _open_change_log()
@@ -0,0 +1,300 @@
+from array import array
+from typing import Any, Callable, Dict, Iterator, List, Mapping, Optional, Sequence, Tuple
+
+from store import Change, KeyedStore, _locked
+
+
+# penanda kolom yang tidak ada di dalam data
+_MISSING = object()
+
+
+# Dictionary encoding satu kolom kategori (provinsi / kota / ...): setiap nilai berbeda
+# disimpan sekali, data hanya menyimpan kodenya. Kode 0 berarti kolom tidak ada.
+class _Dictionary:
+    __slots__ = ('values', 'codes')
+
+    def __init__(self):
+        self.values: List[Any] = [_MISSING]
+        self.codes: Dict[Any, int] = {}
+
+    def encode(self, value: Any) -> int:
+        if value is _MISSING:
+            return 0
+        code = self.codes.get(value)
+        if code is None:
+            code = self.codes[value] = len(self.values)
+            self.values.append(value)
+        return code
+
+
+# Penyimpanan data tabel per kolom, dipakai KeyedStore sebagai pengganti dict key -> data.
+# Setiap data menempati satu slot: kolom kategori disimpan sebagai kode di array('I'),
+# kolom lain di list biasa, key hanya disimpan sebagai key dict slot. Kolom di luar
+# columns (jarang) disimpan apa adanya per slot. Slot data yang dihapus dipakai ulang.
+# Membaca data membuat dict baru dengan urutan kolom sesuai columns.
+class ColumnarRows:
+    def __init__(self, key: str, columns: Sequence[str], categorical: Sequence[str] = ()):
+        self.key = key
+        self.columns = tuple(columns)
+        self._dictionaries = {field: _Dictionary() for field in categorical if field in self.columns and field != key}
+        self._codes = {field: array('I') for field in self._dictionaries}
+        self._plain = {field: [] for field in self.columns if field != key and field not in self._dictionaries}
+        self._slots: Dict[Any, int] = {}
+        self._free: List[int] = []
+        self._size = 0
+        self._extra: Dict[int, Dict[str, Any]] = {}
+        self._known = frozenset(self.columns)
+        # nomor tulis terakhir setiap slot (naik terus), untuk cache encode per data
+        self._stamps = array('Q')
+        self._writes = 0
+        # urutan baca kolom: (kolom, list nilai / nilai dictionary, array kode atau None)
+        self._layout = [(field, None, None) if field == key
+                        else (field, self._dictionaries[field].values, self._codes[field]) if field in self._dictionaries
+                        else (field, self._plain[field], None)
+                        for field in self.columns]
+
+    def __len__(self) -> int:
+        return len(self._slots)
+
+    def __iter__(self) -> Iterator[Any]:
+        return iter(self._slots)
+
+    def __contains__(self, key_value: Any) -> bool:
+        return key_value in self._slots
+
+    def __getitem__(self, key_value: Any) -> Dict[str, Any]:
+        return self._row(key_value, self._slots[key_value])
+
+    def get(self, key_value: Any, default: Any = None) -> Any:
+        slot = self._slots.get(key_value)
+        return default if slot is None else self._row(key_value, slot)
+
+    def values(self) -> List[Dict[str, Any]]:
+        return [self._row(key_value, slot) for key_value, slot in self._slots.items()]
+
+    def __setitem__(self, key_value: Any, row: Dict[str, Any]):
+        slot = self._slots.get(key_value)
+        if slot is None:
+            slot = self._slots[key_value] = self._allocate()
+        for field, codes in self._codes.items():
+            codes[slot] = self._dictionaries[field].encode(row.get(field, _MISSING))
+        for field, values in self._plain.items():
+            values[slot] = row.get(field, _MISSING)
+        extra = {field: value for field, value in row.items() if field not in self._known}
+        if extra:
+            self._extra[slot] = extra
+        else:
+            self._extra.pop(slot, None)
+        self._writes += 1
+        self._stamps[slot] = self._writes
+
+    def __delitem__(self, key_value: Any):
+        slot = self._slots.pop(key_value)
+        for codes in self._codes.values():
+            codes[slot] = 0
+        for values in self._plain.values():
+            values[slot] = _MISSING
+        self._extra.pop(slot, None)
+        self._free.append(slot)
+
+    def pop(self, key_value: Any, default: Any = None) -> Any:
+        slot = self._slots.get(key_value)
+        if slot is None:
+            return default
+        row = self._row(key_value, slot)
+        del self[key_value]
+        return row
+
+    def _allocate(self) -> int:
+        if self._free:
+            return self._free.pop()
+        slot = self._size
+        self._size += 1
+        for codes in self._codes.values():
+            codes.append(0)
+        for values in self._plain.values():
+            values.append(_MISSING)
+        self._stamps.append(0)
+        return slot
+
+    # (key, nomor tulis) semua data, dalam urutan yang sama dengan values(). Nomor tulis
+    # berubah setiap data ditulis, jadi (key, nomor tulis) yang sama berarti isi yang sama.
+    def stamped_keys(self) -> List[Tuple[Any, int]]:
+        return list(zip(self._slots, map(self._stamps.__getitem__, self._slots.values())))
+
+    def stamp(self, key_value: Any) -> int:
+        return self._stamps[self._slots[key_value]]
+
+    def _row(self, key_value: Any, slot: int) -> Dict[str, Any]:
+        row = {}
+        for field, values, codes in self._layout:
+            if values is None:
+                row[field] = key_value
+                continue
+            value = values[codes[slot]] if codes is not None else values[slot]
+            if value is not _MISSING:
+                row[field] = value
+        extra = self._extra.get(slot)
+        if extra:
+            row.update(extra)
+        return row
+
+
+# Data tabel proyeksi (projection): bagian kolom fields dari data tabel induk dengan key
+# yang sama. Anggota yang isinya sama dengan proyeksi data induk tidak menyimpan salinan
+# (None), dibaca langsung dari tabel induk; yang berbeda / tidak ada di induk disimpan sendiri.
+class ProjectionRows:
+    def __init__(self, key: str, base_rows, fields: Sequence[str]):
+        self.key = key
+        self.fields = tuple(fields)
+        self._base = base_rows
+        self._members: Dict[Any, Optional[Dict[str, Any]]] = {}
+        # nomor tulis data yang disimpan sendiri (data yang mengikuti induk memakai nomor tulis induk)
+        self._stamps: Dict[Any, int] = {}
+        self._writes = 0
+
+    def __len__(self) -> int:
+        return len(self._members)
+
+    def __iter__(self) -> Iterator[Any]:
+        return iter(self._members)
+
+    def __contains__(self, key_value: Any) -> bool:
+        return key_value in self._members
+
+    def __getitem__(self, key_value: Any) -> Dict[str, Any]:
+        own = self._members[key_value]
+        return own if own is not None else self.project(self._base[key_value])
+
+    def get(self, key_value: Any, default: Any = None) -> Any:
+        own = self._members.get(key_value, _MISSING)
+        if own is _MISSING:
+            return default
+        return own if own is not None else self.project(self._base[key_value])
+
+    def values(self) -> List[Dict[str, Any]]:
+        return [self[key_value] for key_value in self._members]
+
+    def __setitem__(self, key_value: Any, row: Dict[str, Any]):
+        base_row = self._base.get(key_value)
+        follows = base_row is not None and self.project(base_row) == row
+        self._members[key_value] = None if follows else row
+        self._stamp(key_value, follows)
+
+    def __delitem__(self, key_value: Any):
+        del self._members[key_value]
+        self._stamps.pop(key_value, None)
+
+    def pop(self, key_value: Any, default: Any = None) -> Any:
+        if key_value not in self._members:
+            return default
+        row = self[key_value]
+        del self[key_value]
+        return row
+
+    def project(self, base_row: Dict[str, Any]) -> Dict[str, Any]:
+        return {field: base_row[field] for field in self.fields if field in base_row}
+
+    # True jika anggota ini dibaca dari tabel induk (tidak menyimpan salinan sendiri)
+    def follows(self, key_value: Any) -> bool:
+        return self._members.get(key_value, _MISSING) is None
+
+    # data induk akan hilang (dihapus / diganti key), proyeksinya disimpan sendiri
+    def detach(self, key_value: Any, row: Dict[str, Any]):
+        self._members[key_value] = row
+        self._stamp(key_value, False)
+
+    def _stamp(self, key_value: Any, follows: bool):
+        if follows:
+            self._stamps.pop(key_value, None)
+        else:
+            self._writes += 1
+            self._stamps[key_value] = self._writes
+
+    # seperti ColumnarRows.stamped_keys(): (0, nomor tulis induk) untuk data yang mengikuti
+    # induk, (1, nomor tulis sendiri) untuk yang disimpan sendiri. None jika tabel induk
+    # tidak punya nomor tulis (mis. induk KeyedStore biasa).
+    def stamped_keys(self) -> Optional[List[Tuple[Any, Tuple[int, int]]]]:
+        base_stamp = getattr(self._base, 'stamp', None)
+        if base_stamp is None:
+            return None
+        stamps = self._stamps
+        return [(key_value, (1, stamps[key_value]) if own is not None else (0, base_stamp(key_value)))
+                for key_value, own in self._members.items()]
+
+
+# Tabel yang tidak menyimpan dict data (setiap baca membuat dict baru), jadi baca satu data
+# dan iterasi juga dijalankan di bawah lock supaya tidak membaca data yang sedang ditulis.
+class _MaterializedStore(KeyedStore):
+    shares_rows = False
+
+    @_locked
+    def get(self, key_value: Any) -> Optional[Dict[str, Any]]:
+        return self._rows.get(key_value)
+
+    def __iter__(self) -> Iterator[Dict[str, Any]]:
+        return iter(self.to_list())
+
+    # (key, nomor tulis) semua data dalam urutan to_list(), dipakai cache encode
+    # (serialization.encode_table); None jika tidak tersedia
+    def stamped_keys(self) -> Optional[List[Tuple[Any, Any]]]:
+        return self._rows.stamped_keys()
+
+
+# KeyedStore dengan data disimpan per kolom (ColumnarRows): kolom categorical
+# (mis. provinsi / kota / kecamatan / desa) di-dictionary-encode.
+class CompactStore(_MaterializedStore):
+    def __init__(self, key: str, columns: Sequence[str], categorical: Sequence[str] = (),
+                 rows=(), indexes: Sequence[str] = (), prefix_indexes: Sequence[str] = (),
+                 range_indexes: Optional[Mapping[str, Callable[[Any], Any]]] = None):
+        self.columns = tuple(columns)
+        self.categorical = tuple(categorical)
+        super().__init__(key, rows, indexes, prefix_indexes, range_indexes)
+
+    def _new_rows(self) -> ColumnarRows:
+        return ColumnarRows(self.key, self.columns, self.categorical)
+
+
+# Tabel berisi sebagian data dan kolom (fields) tabel induk, mis. data penduduk yang
+# dibagikan ke kelompok rental / hotel / bank. Data yang sama dengan induknya tidak
+# disalin (ProjectionRows), perubahan data induk langsung terlihat di sini (version naik
+# dan listener dipanggil). Jika data induk dihapus, data di sini tetap ada (disalin saat itu).
+# Ditulis langsung tetap bisa: data yang berbeda dari induk disimpan sendiri, induk tidak berubah.
+# Memakai lock tabel induk supaya perubahan induk dan tabel ini tidak bisa saling tunggu.
+class ProjectionStore(_MaterializedStore):
+    def __init__(self, base: KeyedStore, fields: Sequence[str], rows=(),
+                 indexes: Sequence[str] = (), prefix_indexes: Sequence[str] = (),
+                 range_indexes: Optional[Mapping[str, Callable[[Any], Any]]] = None):
+        self.base = base
+        self.fields = tuple(fields)
+        super().__init__(base.key, rows, indexes, prefix_indexes, range_indexes)
+        self._lock = base.lock
+        base.subscribe(self._on_base_change)
+
+    def _new_rows(self) -> ProjectionRows:
+        return ProjectionRows(self.base.key, self.base._rows, self.fields)
+
+    def _on_base_change(self, changes: List[Change], version: int):
+        key = self.key
+        members = self._rows
+        # key -> [proyeksi sebelum batch, proyeksi sesudah batch]
+        pending: Dict[Any, List[Dict[str, Any]]] = {}
+        visible = []
+        for old, new in changes:
+            if old is None or not members.follows(old[key]):
+                continue
+            key_value = old[key]
+            before = members.project(old)
+            if new is None or new[key] != key_value:
+                members.detach(key_value, before)
+                continue
+            after = members.project(new)
+            if after != before:
+                pending.setdefault(key_value, [before, after])[1] = after
+                visible.append((before, after))
+        if not visible:
+            return
+        self._apply_index_batch([(key_value, before) for key_value, (before, _) in pending.items()],
+                                [(key_value, after) for key_value, (_, after) in pending.items()])
+        self.version += 1
+        self._notify(visible)
@@ -0,0 +1,227 @@
+import os
+import zlib
+from typing import Callable, Dict, Optional
+
+from starlette.concurrency import run_in_threadpool
+from starlette.datastructures import Headers, MutableHeaders
+
+from http_cache import BodyCache
+
+try:
+    import brotli
+except ImportError:  # brotli opsional, tanpa brotli hanya gzip / zstd
+    brotli = None
+
+try:
+    import zstandard
+except ImportError:  # zstandard opsional
+    zstandard = None
+
+
+# Response lebih kecil dari ini tidak dikompres (header + CPU lebih mahal dari hematnya)
+MINIMUM_SIZE = int(os.environ.get('COMPRESS_MINIMUM_SIZE', 1024))
+# body / chunk sebesar ini dikompres di threadpool supaya event loop tidak tertahan
+THREAD_MINIMUM_SIZE = 256 * 1024
+COMPRESSIBLE_TYPES = ('application/json', 'application/x-ndjson', 'text/', 'application/javascript')
+SSE_TYPE = 'text/event-stream'
+
+GZIP_LEVEL = int(os.environ.get('COMPRESS_GZIP_LEVEL', 6))
+BROTLI_QUALITY = int(os.environ.get('COMPRESS_BROTLI_QUALITY', 5))
+ZSTD_LEVEL = int(os.environ.get('COMPRESS_ZSTD_LEVEL', 3))
+
+
+# Kompresor streaming per encoding: compress(data) mengembalikan data yang langsung bisa
+# dikirim (di-flush per chunk, supaya baris NDJSON tidak tertahan di buffer), finish() sisa akhirnya
+class _GzipStream:
+    def __init__(self):
+        # wbits 31: format gzip (header tanpa nama file / waktu, hasil selalu sama)
+        self._compressor = zlib.compressobj(GZIP_LEVEL, zlib.DEFLATED, 31)
+
+    def compress(self, data: bytes) -> bytes:
+        return self._compressor.compress(data) + self._compressor.flush(zlib.Z_SYNC_FLUSH)
+
+    def finish(self) -> bytes:
+        return self._compressor.flush()
+
+
+class _BrotliStream:
+    def __init__(self):
+        self._compressor = brotli.Compressor(quality=BROTLI_QUALITY)
+
+    def compress(self, data: bytes) -> bytes:
+        return self._compressor.process(data) + self._compressor.flush()
+
+    def finish(self) -> bytes:
+        return self._compressor.finish()
+
+
+class _ZstdStream:
+    def __init__(self):
+        self._compressor = zstandard.ZstdCompressor(level=ZSTD_LEVEL).compressobj()
+
+    def compress(self, data: bytes) -> bytes:
+        return self._compressor.compress(data) + self._compressor.flush(zstandard.COMPRESSOBJ_FLUSH_BLOCK)
+
+    def finish(self) -> bytes:
+        return self._compressor.flush()
+
+
+def _gzip(body: bytes) -> bytes:
+    compressor = zlib.compressobj(GZIP_LEVEL, zlib.DEFLATED, 31)
+    return compressor.compress(body) + compressor.flush()
+
+
+# encoding yang didukung, urut dari yang paling disukai jika client menerima beberapa
+ENCODINGS: Dict[str, Callable[[], object]] = {}
+COMPRESSORS: Dict[str, Callable[[bytes], bytes]] = {}
+if brotli is not None:
+    ENCODINGS['br'] = _BrotliStream
+    COMPRESSORS['br'] = lambda body: brotli.compress(body, quality=BROTLI_QUALITY)
+if zstandard is not None:
+    ENCODINGS['zstd'] = _ZstdStream
+    COMPRESSORS['zstd'] = lambda body: zstandard.ZstdCompressor(level=ZSTD_LEVEL).compress(body)
+ENCODINGS['gzip'] = _GzipStream
+COMPRESSORS['gzip'] = _gzip
+
+
+# Memilih encoding dari header Accept-Encoding (mis. "gzip, br;q=0.9, *;q=0"):
+# q tertinggi menang, jika sama dipakai urutan ENCODINGS. None: kirim apa adanya.
+def negotiate(accept_encoding: Optional[str]) -> Optional[str]:
+    if not accept_encoding:
+        return None
+    weights = {}
+    for part in accept_encoding.split(','):
+        name, _, params = part.strip().partition(';')
+        weight = 1.0
+        params = params.strip()
+        if params.startswith('q='):
+            try:
+                weight = float(params[2:])
+            except ValueError:
+                weight = 0.0
+        weights[name.strip().lower()] = weight
+    best, best_weight = None, 0.0
+    for encoding in ENCODINGS:
+        weight = weights.get(encoding, weights.get('*', 0.0))
+        if weight > best_weight:
+            best, best_weight = encoding, weight
+    return best
+
+
+# Body terkompresi per (method, path + query, ETag, encoding). ETag response tabel berubah
+# setiap version naik (http_cache.py), jadi data yang belum berubah tidak dikompres ulang di
+# setiap request. Method dan path ikut di key karena ETag yang sama bisa dipakai body yang
+# berbeda (mis. GET dan PUT /pajak/{id} sama-sama mengirim row_etag data dengan pesan berbeda).
+compressed_cache = BodyCache(int(os.environ.get('HTTP_COMPRESSED_CACHE_BYTES', 32 * 1024 * 1024)))
+
+
+async def _run(function, data: bytes) -> bytes:
+    if len(data) >= THREAD_MINIMUM_SIZE:
+        return await run_in_threadpool(function, data)
+    return function(data)
+
+
+# Middleware ASGI kompresi response (gzip, ditambah br / zstd jika library-nya terpasang):
+# - hanya untuk tipe teks / JSON / NDJSON dengan ukuran minimal minimum_size
+# - response streaming (tanpa Content-Length, mis. ?stream=true) dikompres per chunk
+# - body dengan ETag diambil dari compressed_cache jika sudah pernah dikompres
+# ETag response yang dikompres dijadikan weak (W/"..."), seperti nginx; If-None-Match
+# dengan ETag weak tetap dicocokkan oleh http_cache.etag_matches.
+class CompressionMiddleware:
+    def __init__(self, app, minimum_size: int = MINIMUM_SIZE):
+        self.app = app
+        self.minimum_size = minimum_size
+
+    async def __call__(self, scope, receive, send):
+        if scope['type'] != 'http':
+            await self.app(scope, receive, send)
+            return
+        encoding = negotiate(Headers(scope=scope).get('accept-encoding'))
+        if encoding is None:
+            await self.app(scope, receive, send)
+            return
+        query = scope.get('query_string', b'').decode('latin-1')
+        request = f"{scope['method']} {scope['path']}?{query}"
+        await self.app(scope, receive, _CompressingSend(send, encoding, self.minimum_size, request))
+
+
+class _CompressingSend:
+    def __init__(self, send, encoding: str, minimum_size: int, request: str):
+        self.send = send
+        self.encoding = encoding
+        self.minimum_size = minimum_size
+        self.request = request  # 'METHOD path?query', bagian key compressed_cache
+        self.start = None
+        self.stream = None
+        self.passthrough = False
+
+    async def __call__(self, message):
+        if message['type'] == 'http.response.start':
+            self.start = message
+            headers = Headers(raw=message['headers'])
+            content_type = headers.get('content-type', '')
+            if message['status'] == 304 and headers.get('etag', 'W/').startswith('"'):
+                # sama dengan ETag weak yang dikirim bersama body terkompres
+                MutableHeaders(raw=message['headers'])['etag'] = 'W/' + headers['etag']
+            # event stream (change feed SSE) tidak dikompres: setiap event harus langsung terkirim
+            if ('content-encoding' in headers or message['status'] in (204, 304)
+                    or not content_type.startswith(COMPRESSIBLE_TYPES) or content_type.startswith(SSE_TYPE)):
+                self.passthrough = True
+            else:
+                MutableHeaders(raw=message['headers']).add_vary_header('Accept-Encoding')
+            return
+        if message['type'] != 'http.response.body':
+            await self.send(message)
+            return
+        if self.passthrough:
+            await self._send_start()
+            await self.send(message)
+            return
+        body = message.get('body', b'')
+        more_body = message.get('more_body', False)
+        if self.stream is None and not more_body:
+            await self._send_whole(body)
+            return
+        if self.stream is None:
+            self.stream = ENCODINGS[self.encoding]()
+            headers = self._encoded_headers()
+            del headers['content-length']
+            await self._send_start()
+        data = await _run(self.stream.compress, body) if body else b''
+        if not more_body:
+            data += self.stream.finish()
+        if data or not more_body:
+            await self.send({'type': 'http.response.body', 'body': data, 'more_body': more_body})
+
+    async def _send_start(self):
+        if self.start is not None:
+            start, self.start = self.start, None
+            await self.send(start)
+
+    # header response untuk body yang dikompres: Content-Encoding + ETag weak
+    def _encoded_headers(self) -> MutableHeaders:
+        headers = MutableHeaders(raw=self.start['headers'])
+        headers['content-encoding'] = self.encoding
+        etag = headers.get('etag')
+        if etag is not None and not etag.startswith('W/'):
+            headers['etag'] = 'W/' + etag
+        return headers
+
+    async def _send_whole(self, body: bytes):
+        if len(body) < self.minimum_size:
+            await self._send_start()
+            await self.send({'type': 'http.response.body', 'body': body})
+            return
+        etag = Headers(raw=self.start['headers']).get('etag')
+        key = f'{self.request};{etag};{self.encoding}' if etag is not None else None
+        entry = compressed_cache.get(key) if key is not None else None
+        if entry is not None:
+            compressed = entry[0]
+        else:
+            compressed = await _run(COMPRESSORS[self.encoding], body)
+            if key is not None:
+                compressed_cache.put(key, compressed, {})
+        headers = self._encoded_headers()
+        headers['content-length'] = str(len(compressed))
+        await self._send_start()
+        await self.send({'type': 'http.response.body', 'body': compressed})
@@ -0,0 +1,95 @@
+import hashlib
+import json
+import os
+import threading
+from collections import OrderedDict
+from typing import Any, Callable, Dict, Optional, Tuple
+
+from fastapi.responses import Response
+
+from serialization import TrustedJSONResponse
+
+
+# Cache-Control untuk response data tabel. Default no-cache: client / proxy boleh menyimpan
+# response tapi harus bertanya ulang (If-None-Match) setiap kali, yang dijawab 304 jika
+# datanya belum berubah. HTTP_CACHE_MAX_AGE (detik) mengizinkan dipakai tanpa bertanya.
+_max_age = int(os.environ.get('HTTP_CACHE_MAX_AGE', 0))
+CACHE_CONTROL = f'max-age={_max_age}, must-revalidate' if _max_age > 0 else 'no-cache'
+
+
+# ETag (strong) dari bagian-bagian yang menentukan isi body, mis. (cache_tag tabel,
+# version tabel, parameter query). Sama persis -> body sama persis.
+def response_etag(*parts: Any) -> str:
+    encoded = json.dumps(parts, sort_keys=True, separators=(',', ':'), default=str).encode()
+    return '"' + hashlib.sha1(encoded).hexdigest()[:24] + '"'
+
+
+# Mengecek header If-None-Match (boleh berisi beberapa ETag, '*', atau ETag weak W/"...")
+def etag_matches(if_none_match: Optional[str], etag: str) -> bool:
+    if not if_none_match:
+        return False
+    for tag in if_none_match.split(','):
+        tag = tag.strip()
+        if tag == '*' or tag == etag or tag == 'W/' + etag:
+            return True
+    return False
+
+
+# Body response yang sudah di-encode per ETag, dibatasi total ukuran (LRU).
+# Karena ETag berubah setiap version tabel naik, entry lama tidak perlu dihapus manual:
+# tidak pernah diminta lagi dan akhirnya terbuang.
+class BodyCache:
+    def __init__(self, max_bytes: int = 64 * 1024 * 1024):
+        self.max_bytes = max_bytes
+        self.size = 0
+        self._entries: 'OrderedDict[str, Tuple[bytes, Dict[str, str]]]' = OrderedDict()
+        self._lock = threading.Lock()
+        self.stats = {'hit': 0, 'miss': 0, 'not_modified': 0, 'eviction': 0}
+
+    def get(self, etag: str) -> Optional[Tuple[bytes, Dict[str, str]]]:
+        with self._lock:
+            entry = self._entries.get(etag)
+            if entry is None:
+                self.stats['miss'] += 1
+                return None
+            self._entries.move_to_end(etag)
+            self.stats['hit'] += 1
+            return entry
+
+    def put(self, etag: str, body: bytes, headers: Dict[str, str]):
+        if len(body) > self.max_bytes:
+            return
+        with self._lock:
+            old = self._entries.pop(etag, None)
+            if old is not None:
+                self.size -= len(old[0])
+            self._entries[etag] = (body, headers)
+            self.size += len(body)
+            while self.size > self.max_bytes:
+                _, (evicted, _) = self._entries.popitem(last=False)
+                self.size -= len(evicted)
+                self.stats['eviction'] += 1
+
+    def snapshot(self) -> Dict[str, Any]:
+        return {'entries': len(self._entries), 'bytes': self.size, 'max_bytes': self.max_bytes, **self.stats}
+
+
+body_cache = BodyCache(int(os.environ.get('HTTP_BODY_CACHE_BYTES', 64 * 1024 * 1024)))
+
+
+# Response dengan ETag + Cache-Control. If-None-Match yang cocok dijawab 304 tanpa
+# membaca / meng-encode data sama sekali; jika tidak, body diambil dari body_cache atau
+# dibuat dengan build() -> (body, header tambahan) lalu disimpan.
+def cached_response(if_none_match: Optional[str], etag: str,
+                    build: Callable[[], Tuple[bytes, Optional[Dict[str, str]]]]) -> Response:
+    headers = {'ETag': etag, 'Cache-Control': CACHE_CONTROL}
+    if etag_matches(if_none_match, etag):
+        body_cache.stats['not_modified'] += 1
+        return Response(status_code=304, headers=headers)
+    entry = body_cache.get(etag)
+    if entry is None:
+        body, extra = build()
+        entry = (body, extra or {})
+        body_cache.put(etag, *entry)
+    body, extra = entry
+    return TrustedJSONResponse(body, headers={**extra, **headers})
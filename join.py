@@ -0,0 +1,69 @@
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+from store import KeyedStore
+
+
+# Join tabel lokal (KeyedStore) dengan data partner (list of dict) berdasarkan key.
+# - index hash data partner dibangun sekali per generasi cache (setiap refresh
+#   cache menghasilkan objek list baru)
+# - hasil join disimpan (memo) sampai versi tabel lokal atau data partner berubah
+# - mode 'inner' hanya mengembalikan baris yang punya pasangan, 'left' mengembalikan
+#   semua baris lokal (kolom partner bernilai None jika tidak ada pasangan)
+class HashJoin:
+    MODES = ('inner', 'left')
+
+    def __init__(self, left: KeyedStore, left_key: str, right_key: str,
+                 combine: Callable[[Dict[str, Any], Optional[Dict[str, Any]]], Any]):
+        self.left = left
+        self.left_key = left_key
+        self.right_key = right_key
+        self.combine = combine
+        self._right_rows: Optional[List[Dict[str, Any]]] = None
+        self._right_index: Dict[Any, Dict[str, Any]] = {}
+        self._memo: Dict[str, Tuple[int, List[Any]]] = {}
+        self._row_memo: Dict[Any, Tuple[int, Any]] = {}
+
+    def _index(self, right_rows: List[Dict[str, Any]]) -> Dict[Any, Dict[str, Any]]:
+        if right_rows is not self._right_rows:
+            # key ganda: baris pertama yang dipakai (sama seperti Mirror.index)
+            index: Dict[Any, Dict[str, Any]] = {}
+            for row in right_rows:
+                index.setdefault(row.get(self.right_key), row)
+            self._right_index = index
+            self._right_rows = right_rows
+            self._memo.clear()
+            self._row_memo.clear()
+        return self._right_index
+
+    # seluruh hasil join, O(n + m) saat dibangun ulang dan O(1) saat memo masih berlaku
+    def rows(self, right_rows: List[Dict[str, Any]], mode: str = 'left') -> List[Any]:
+        index = self._index(right_rows)
+        # versi dibaca sebelum salinan tabel diambil: jika ada tulis di antaranya, memo
+        # tercatat dengan versi lama dan dibangun ulang pada request berikutnya
+        version = self.left.version
+        memo = self._memo.get(mode)
+        if memo is not None and memo[0] == version:
+            return memo[1]
+        result = []
+        for left_row in self.left.to_list():
+            right_row = index.get(left_row.get(self.left_key))
+            if right_row is not None or mode == 'left':
+                result.append(self.combine(left_row, right_row))
+        self._memo[mode] = (version, result)
+        return result
+
+    # hasil join untuk satu key tabel lokal, O(1)
+    def get(self, key_value: Any, right_rows: List[Dict[str, Any]], mode: str = 'inner') -> Optional[Any]:
+        index = self._index(right_rows)
+        left_row = self.left.get(key_value)
+        if left_row is None:
+            return None
+        right_row = index.get(left_row.get(self.left_key))
+        if right_row is None and mode == 'inner':
+            return None
+        memo = self._row_memo.get(key_value)
+        if memo is not None and memo[0] == self.left.version:
+            return memo[1]
+        combined = self.combine(left_row, right_row)
+        self._row_memo[key_value] = (self.left.version, combined)
+        return combined
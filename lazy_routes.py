@@ -0,0 +1,58 @@
+import importlib
+from typing import Dict, List, Sequence, Tuple
+
+
+# Router per domain (modul routes_*.py dengan atribut router) yang baru diimpor dan
+# didaftarkan ke app saat pertama kali ada request ke salah satu prefix path-nya.
+# Startup tidak membayar import model, pembuatan route dan engine (mis. PenaltyEngine +
+# numpy) domain yang belum dipakai. Urutan route di app selalu mengikuti urutan modules,
+# tidak tergantung urutan modul dimuat.
+class LazyRouters:
+    def __init__(self, app, modules: Sequence[Tuple[str, Sequence[str]]]):
+        self.app = app
+        self.modules = list(modules)
+        self._routes: Dict[str, List] = {}
+
+    @property
+    def pending(self) -> bool:
+        return len(self._routes) < len(self.modules)
+
+    def load(self, name: str):
+        if name in self._routes:
+            return
+        router = importlib.import_module(name).router
+        routes = self.app.router.routes
+        before = len(routes)
+        self.app.include_router(router)
+        self._routes[name] = routes[before:]
+        loaded = {id(route) for added in self._routes.values() for route in added}
+        # route milik app sendiri (docs, status, ...) tetap di depan, lalu router sesuai urutan modules
+        routes[:] = ([route for route in routes if id(route) not in loaded]
+                     + [route for module, _ in self.modules for route in self._routes.get(module, ())])
+
+    def load_path(self, path: str):
+        for name, prefixes in self.modules:
+            if name not in self._routes and any(path == prefix or path.startswith(prefix + '/')
+                                                for prefix in prefixes):
+                self.load(name)
+
+    def load_all(self):
+        for name, _ in self.modules:
+            self.load(name)
+
+
+# Middleware ASGI yang memuat router sesuai path request sebelum routing FastAPI.
+# Setelah semua router dimuat hanya tersisa satu pengecekan per request.
+class LazyRoutesMiddleware:
+    def __init__(self, app, routers: LazyRouters):
+        self.app = app
+        self.routers = routers
+
+    async def __call__(self, scope, receive, send):
+        if self.routers.pending and scope['type'] in ('http', 'websocket'):
+            path = scope['path']
+            root_path = scope.get('root_path', '')
+            if root_path and path.startswith(root_path):
+                path = path[len(root_path):]
+            self.routers.load_path(path)
+        await self.app(scope, receive, send)
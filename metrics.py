@@ -0,0 +1,230 @@
+import asyncio
+import os
+import time
+from bisect import bisect_left
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Dict, List, Optional, Sequence, Tuple
+
+from starlette.responses import Response
+
+# Metric sederhana dalam format teks Prometheus (tanpa library tambahan).
+# Semua nilai diubah dari event loop saja (middleware, fetch partner, monitor lag),
+# jadi tidak perlu lock. Dengan beberapa worker (serve.py) setiap proses punya
+# metric sendiri.
+
+LATENCY_BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+SIZE_BUCKETS = (256, 1024, 4096, 16384, 65536, 262144, 1048576, 4194304, 16777216, 67108864)
+LAG_BUCKETS = (0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5)
+
+
+def _escape(value: str) -> str:
+    return value.replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+
+
+def _format_labels(names: Sequence[str], values: Sequence[str], extra: str = '') -> str:
+    parts = [f'{name}="{_escape(str(value))}"' for name, value in zip(names, values)]
+    if extra:
+        parts.append(extra)
+    return '{' + ','.join(parts) + '}' if parts else ''
+
+
+def _format_value(value: float) -> str:
+    return repr(float(value)) if isinstance(value, float) else str(value)
+
+
+class Counter:
+    type = 'counter'
+
+    def __init__(self, name: str, help: str, labels: Sequence[str] = ()):
+        self.name = name
+        self.help = help
+        self.labels = tuple(labels)
+        self.values: Dict[Tuple[str, ...], float] = {}
+
+    def inc(self, labels: Tuple[str, ...] = (), amount: float = 1):
+        self.values[labels] = self.values.get(labels, 0) + amount
+
+    def render(self) -> List[str]:
+        lines = [f'# HELP {self.name} {self.help}', f'# TYPE {self.name} {self.type}']
+        for labels, value in sorted(self.values.items()):
+            lines.append(f'{self.name}{_format_labels(self.labels, labels)} {_format_value(value)}')
+        return lines
+
+
+class Gauge(Counter):
+    type = 'gauge'
+
+    def set(self, value: float, labels: Tuple[str, ...] = ()):
+        self.values[labels] = value
+
+
+# Histogram: jumlah observasi per bucket disimpan tidak kumulatif (observe cukup
+# menambah satu slot), baru dijumlahkan kumulatif saat render
+class Histogram:
+    type = 'histogram'
+
+    def __init__(self, name: str, help: str, labels: Sequence[str] = (), buckets: Sequence[float] = LATENCY_BUCKETS):
+        self.name = name
+        self.help = help
+        self.labels = tuple(labels)
+        self.buckets = tuple(buckets)
+        # labels -> [jumlah per bucket (+Inf di slot terakhir), total nilai, jumlah observasi]
+        self.values: Dict[Tuple[str, ...], list] = {}
+
+    def observe(self, value: float, labels: Tuple[str, ...] = ()):
+        entry = self.values.get(labels)
+        if entry is None:
+            entry = self.values[labels] = [[0] * (len(self.buckets) + 1), 0.0, 0]
+        entry[0][bisect_left(self.buckets, value)] += 1
+        entry[1] += value
+        entry[2] += 1
+
+    def render(self) -> List[str]:
+        lines = [f'# HELP {self.name} {self.help}', f'# TYPE {self.name} {self.type}']
+        for labels, (counts, total, count) in sorted(self.values.items()):
+            cumulative = 0
+            for bound, bucket_count in zip(self.buckets + (float('inf'),), counts):
+                cumulative += bucket_count
+                le = 'le="+Inf"' if bound == float('inf') else f'le="{float(bound)!r}"'
+                lines.append(f'{self.name}_bucket{_format_labels(self.labels, labels, le)} {cumulative}')
+            label_text = _format_labels(self.labels, labels)
+            lines.append(f'{self.name}_sum{label_text} {_format_value(total)}')
+            lines.append(f'{self.name}_count{label_text} {count}')
+        return lines
+
+
+REQUESTS = Counter('http_requests_total', 'Jumlah request HTTP', ('method', 'route', 'status'))
+REQUEST_SECONDS = Histogram('http_request_duration_seconds', 'Waktu proses request HTTP', ('method', 'route'))
+RESPONSE_BYTES = Histogram('http_response_size_bytes', 'Ukuran body response (setelah kompresi)',
+                           ('method', 'route'), SIZE_BUCKETS)
+IN_FLIGHT = Gauge('http_requests_in_flight', 'Jumlah request yang sedang diproses')
+IN_FLIGHT.set(0)
+# hanya untuk request yang menunggu data partner: waktu menunggu partner dan sisanya (proses lokal)
+UPSTREAM_WAIT_SECONDS = Histogram('http_request_upstream_wait_seconds',
+                                  'Waktu request menunggu data API kelompok lain', ('method', 'route'))
+LOCAL_SECONDS = Histogram('http_request_local_seconds',
+                          'Waktu proses lokal request yang menunggu API kelompok lain', ('method', 'route'))
+PARTNER_FETCH_SECONDS = Histogram('partner_fetch_seconds',
+                                  'Waktu handler menunggu data partner (cache / request langsung)', ('partner',))
+UPSTREAM_SECONDS = Histogram('upstream_request_duration_seconds',
+                             'Waktu satu percobaan request ke API kelompok lain', ('upstream', 'status'))
+ADMISSION_REJECTED = Counter('admission_rejected_total', 'Request yang ditolak admission control (429 / 503)',
+                             ('pool', 'reason'))
+ADMISSION_QUEUE_SECONDS = Histogram('admission_queue_seconds', 'Waktu request menunggu di antrean admission', ('pool',))
+CHANGEFEED_SUBSCRIBERS = Gauge('changefeed_subscribers', 'Jumlah subscriber change feed yang terhubung', ('transport',))
+LOOP_LAG_SECONDS = Histogram('event_loop_lag_seconds', 'Keterlambatan event loop (blocking)', (), LAG_BUCKETS)
+LOOP_LAG_LAST = Gauge('event_loop_lag_last_seconds', 'Keterlambatan event loop pada pengukuran terakhir')
+
+REGISTRY = [REQUESTS, REQUEST_SECONDS, RESPONSE_BYTES, IN_FLIGHT, UPSTREAM_WAIT_SECONDS, LOCAL_SECONDS,
+            PARTNER_FETCH_SECONDS, UPSTREAM_SECONDS, ADMISSION_REJECTED, ADMISSION_QUEUE_SECONDS,
+            CHANGEFEED_SUBSCRIBERS, LOOP_LAG_SECONDS, LOOP_LAG_LAST]
+
+CONTENT_TYPE = 'text/plain; version=0.0.4; charset=utf-8'
+
+
+def render() -> str:
+    lines = []
+    for metric in REGISTRY:
+        lines.extend(metric.render())
+    return '\n'.join(lines) + '\n'
+
+
+def metrics_response() -> Response:
+    return Response(render(), media_type=CONTENT_TYPE)
+
+
+# total waktu menunggu partner selama request yang sedang berjalan (diisi MetricsMiddleware)
+_upstream_wait: ContextVar[Optional[List[float]]] = ContextVar('upstream_wait', default=None)
+
+
+# Mengukur waktu menunggu data partner di handler, dicatat per partner dan
+# ditambahkan ke waktu tunggu request yang sedang berjalan
+@contextmanager
+def partner_wait(name: str):
+    started = time.perf_counter()
+    try:
+        yield
+    finally:
+        elapsed = time.perf_counter() - started
+        PARTNER_FETCH_SECONDS.observe(elapsed, (name,))
+        wait = _upstream_wait.get()
+        if wait is not None:
+            wait[0] += elapsed
+
+
+# Middleware ASGI: jumlah request per route + status, latency, ukuran response dan
+# request yang sedang berjalan. Route dicatat sebagai template path (mis. /penduduk/{nik}),
+# path yang tidak dikenal sebagai "unmatched" supaya jumlah label tetap terbatas.
+class MetricsMiddleware:
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope['type'] != 'http':
+            await self.app(scope, receive, send)
+            return
+        state = [500, 0]  # status, byte body
+        wait = [0.0]
+        # setiap request berjalan di task (context) sendiri, jadi tidak perlu di-reset
+        _upstream_wait.set(wait)
+
+        async def send_wrapper(message):
+            if message['type'] == 'http.response.body':
+                state[1] += len(message.get('body', b''))
+            elif message['type'] == 'http.response.start':
+                state[0] = message['status']
+            await send(message)
+
+        in_flight = IN_FLIGHT.values
+        in_flight[()] += 1
+        started = time.perf_counter()
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            elapsed = time.perf_counter() - started
+            in_flight[()] -= 1
+            route = scope.get('route')
+            if route is not None:
+                path = route.path
+            else:
+                # route Starlette biasa (mis. docs / openapi.json) tidak punya parameter path
+                path = scope['path'] if 'endpoint' in scope else 'unmatched'
+            labels = (scope['method'], path)
+            REQUESTS.inc((scope['method'], path, state[0]))
+            REQUEST_SECONDS.observe(elapsed, labels)
+            RESPONSE_BYTES.observe(state[1], labels)
+            if wait[0]:
+                UPSTREAM_WAIT_SECONDS.observe(wait[0], labels)
+                LOCAL_SECONDS.observe(max(0.0, elapsed - wait[0]), labels)
+
+
+# Mengukur keterlambatan event loop: tidur interval detik lalu mencatat selisih waktu
+# bangun dengan yang seharusnya. Kode blocking di handler async (I/O sinkron, CPU berat)
+# terlihat sebagai lag besar.
+class LoopLagMonitor:
+    def __init__(self, interval: float = 0.5):
+        self.interval = interval
+        self._task: Optional[asyncio.Task] = None
+
+    def start(self):
+        if self._task is None:
+            self._task = asyncio.ensure_future(self._run())
+
+    async def stop(self):
+        task, self._task = self._task, None
+        if task is not None:
+            task.cancel()
+            await asyncio.gather(task, return_exceptions=True)
+
+    async def _run(self):
+        loop = asyncio.get_running_loop()
+        while True:
+            started = loop.time()
+            await asyncio.sleep(self.interval)
+            lag = max(0.0, loop.time() - started - self.interval)
+            LOOP_LAG_SECONDS.observe(lag)
+            LOOP_LAG_LAST.set(lag)
+
+
+loop_monitor = LoopLagMonitor(float(os.environ.get('METRICS_LOOP_LAG_INTERVAL', 0.5)))
@@ -0,0 +1,62 @@
+from typing import Any, Optional
+
+from pydantic import BaseModel
+
+
+# Schema model yang dipakai bersama beberapa router dan untuk kolom tabel di tables.py.
+# Model yang hanya dipakai satu domain ada di modul routes_*.py masing-masing.
+
+# Schema model untuk respons umum
+class ApiResponse(BaseModel):
+    status: bool
+    message: str
+    data: Optional[Any] = None
+
+# schema model untuk data pajak objek wisata
+class Pajak(BaseModel):
+    id_pajak: str
+    status_kepemilikan: str
+    jenis_pajak: str
+    tarif_pajak: float
+    besar_pajak: int
+
+# untuk penduduk
+class Penduduk (BaseModel):
+    nik: int
+    nama: str
+    provinsi: str
+    kota: str
+    kecamatan: str
+    desa: str
+
+class Pendudukrental (BaseModel):
+    nik: int
+    nama: str
+    kota: str
+
+class Pendudukhotel (BaseModel):
+    nik: int
+    nama: str
+    kota: str
+
+class Pendudukasuransi (BaseModel):
+    nik: int
+    nama: str
+    provinsi: str
+    kota: str
+    kecamatan: str
+    desa : str
+
+class Pendudukbank (BaseModel):
+    nik: int
+    nama: str
+
+# chema model untuk data SETORAN PAJAK OBJEK WISATA UNTUK BANK
+class Setoran(BaseModel):
+    id_setoran:int
+    id_pajak: str
+    tanggal_jatuh_tempo: str
+    tanggal_setoran: str
+    status_setoran: str
+    denda: float
+    besar_pajak_setelah_denda: int
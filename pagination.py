@@ -0,0 +1,98 @@
+import base64
+from typing import Any, Dict, Iterator, Optional, Tuple
+
+from fastapi import Header, HTTPException, Query
+from fastapi.responses import StreamingResponse
+
+from http_cache import cached_response, response_etag
+from serialization import api_body, encode_rows, encode_table, encoded_rows
+from store import KeyedStore
+
+
+NDJSON_MEDIA_TYPE = 'application/x-ndjson'
+MAX_LIMIT = 10000
+STREAM_CHUNK_SIZE = 1000
+
+
+# Parameter query untuk semua endpoint list: ?limit=&cursor=&stream=,
+# ditambah header If-None-Match untuk conditional GET (304 jika data belum berubah)
+class Pagination:
+    def __init__(
+        self,
+        limit: Optional[int] = Query(None, ge=1, le=MAX_LIMIT, description="Jumlah data per halaman"),
+        cursor: Optional[str] = Query(None, description="Nilai header X-Next-Cursor dari halaman sebelumnya"),
+        stream: bool = Query(False, description="Kirim data sebagai NDJSON (satu baris JSON per data) secara streaming"),
+        if_none_match: Optional[str] = Header(None, description="ETag response sebelumnya"),
+    ):
+        self.limit = limit
+        self.cursor = cursor
+        self.stream = stream
+        self.if_none_match = if_none_match
+
+    @property
+    def after(self) -> int:
+        return decode_cursor(self.cursor) if self.cursor else 0
+
+
+def encode_cursor(seq: int) -> str:
+    return base64.urlsafe_b64encode(str(seq).encode()).decode().rstrip('=')
+
+
+def decode_cursor(cursor: str) -> int:
+    try:
+        return int(base64.urlsafe_b64decode(cursor + '=' * (-len(cursor) % 4)).decode())
+    except ValueError:
+        raise HTTPException(status_code=400, detail="Cursor tidak valid.")
+
+
+# Mengambil data tabel sesuai parameter pagination. Tanpa limit/cursor seluruh
+# data dikembalikan seperti sebelumnya; dengan stream=true data dikirim per baris.
+# filters / prefix / ranges diteruskan ke store.query() / store.page() untuk data yang difilter.
+# Data tabel sudah divalidasi saat insert, jadi langsung di-encode tanpa melewati
+# response_model lagi. message diisi untuk endpoint yang membungkus data dengan ApiResponse.
+# ETag dihitung dari version tabel + parameter (http_cache.py): If-None-Match yang cocok
+# dijawab 304 tanpa query, dan body yang sama dipakai ulang selama version tidak berubah.
+def list_rows(store: KeyedStore, page: Pagination, filters: Optional[Dict[str, Any]] = None,
+              prefix: Optional[Tuple[str, str]] = None, message: Optional[str] = None,
+              ranges: Optional[Dict[str, Tuple[Any, Any]]] = None):
+    filters = {field: value for field, value in (filters or {}).items() if value is not None}
+    if prefix is not None and not prefix[1]:
+        prefix = None
+    ranges = {field: bounds for field, bounds in (ranges or {}).items() if bounds != (None, None)}
+    if page.stream:
+        return ndjson_response(store, page.after, filters, prefix, ranges)
+    # version dibaca sebelum data: jika ada tulisan di tengah, body lebih baru dari ETag-nya
+    # (request berikutnya tetap mendapat ETag baru), tidak pernah sebaliknya
+    etag = response_etag(store.cache_tag, store.version, filters, prefix, ranges,
+                         page.limit, page.after if page.cursor else None, message)
+
+    def build():
+        if page.limit is None and page.cursor is None:
+            headers = None
+            if not (filters or prefix or ranges):
+                body = encode_table(store)
+                return (api_body(message, body) if message is not None else body), headers
+            data = store.query(filters, prefix, ranges)
+        else:
+            data, next_seq = store.page(page.after, page.limit, filters, prefix, ranges)
+            headers = {'X-Next-Cursor': encode_cursor(next_seq)} if next_seq is not None else None
+        body = encode_rows(store, data)
+        return (api_body(message, body) if message is not None else body), headers
+
+    return cached_response(page.if_none_match, etag, build)
+
+
+def ndjson_response(store: KeyedStore, after: int = 0, filters: Optional[Dict[str, Any]] = None,
+                    prefix: Optional[Tuple[str, str]] = None,
+                    ranges: Optional[Dict[str, Tuple[Any, Any]]] = None) -> StreamingResponse:
+    return StreamingResponse(_iter_ndjson(store, after, filters, prefix, ranges), media_type=NDJSON_MEDIA_TYPE)
+
+
+def _iter_ndjson(store: KeyedStore, after: int, filters: Optional[Dict[str, Any]],
+                 prefix: Optional[Tuple[str, str]], ranges: Optional[Dict[str, Tuple[Any, Any]]]) -> Iterator[bytes]:
+    if filters or prefix or ranges:
+        chunks = [store.page(after, None, filters, prefix, ranges)[0]]
+    else:
+        chunks = store.iter_chunks(STREAM_CHUNK_SIZE, after)
+    for chunk in chunks:
+        yield b''.join(row + b'\n' for row in encoded_rows(store, chunk))
@@ -0,0 +1,237 @@
+import functools
+import threading
+import time
+from array import array
+from datetime import date, datetime
+from typing import Any, Dict, List, Optional
+
+from store import Change, paused_gc
+
+DATE_FORMAT = '%d-%m-%Y'
+DEFAULT_RATE = 0.02  # denda per 30 hari keterlambatan
+# status_setoran yang ditentukan dari keterlambatan (kode 0 / 1); status lain (mis. 'belum dibayar',
+# kode -1) tidak diubah
+STATUS = ('tepat waktu', 'terlambat')
+
+
+# numpy opsional (tanpa numpy dihitung dengan loop Python biasa) dan baru diimpor saat
+# denda pertama kali dihitung, supaya tidak menambah waktu startup
+@functools.lru_cache(maxsize=None)
+def _numpy():
+    try:
+        import numpy
+    except ImportError:
+        return None
+    return numpy
+
+
+# tanggal 'DD-MM-YYYY' -> nomor ordinal (hari sejak 1-1-0001), 0 jika tidak valid.
+# Tanggal yang sama banyak dipakai berulang, jadi hasil parse di-cache.
+@functools.lru_cache(maxsize=65536)
+def parse_date(text: str) -> int:
+    try:
+        return datetime.strptime(text, DATE_FORMAT).date().toordinal()
+    except (TypeError, ValueError):
+        return 0
+
+
+def format_date(ordinal: int) -> str:
+    return date.fromordinal(ordinal).strftime(DATE_FORMAT)
+
+
+# Menghitung denda setoran secara kolom (columnar). Tanggal jatuh tempo dan tanggal
+# setoran setiap data disimpan sebagai array ordinal, id_pajak sebagai kode angka,
+# dan diperbarui lewat store.subscribe() setiap kali data setoran berubah.
+# recalculate() menghitung ulang seluruh tabel sekali jalan (NumPy jika terpasang):
+#   hari_terlambat            = max(0, min(tanggal_setoran, as_of) - tanggal_jatuh_tempo)
+#   denda                     = rate * hari_terlambat / 30
+#   besar_pajak_setelah_denda = besar_pajak * (1 + denda), dibulatkan
+#   status_setoran            = 'terlambat' jika hari_terlambat > 0, selain itu 'tepat waktu'
+# Hanya data yang nilainya berubah yang ditulis kembali ke tabel.
+class PenaltyEngine:
+    def __init__(self, setoran_store, pajak_store, rate: float = DEFAULT_RATE):
+        self.setoran = setoran_store
+        self.pajak = pajak_store
+        self.rate = rate
+        self.as_of: Optional[int] = None
+        self._lock = getattr(setoran_store, 'lock', None) or threading.RLock()
+        self._writing = False
+        with self._lock:
+            self._rebuild()
+        setoran_store.subscribe(self._on_change)
+
+    def _rebuild(self):
+        with paused_gc():
+            self._rebuild_columns()
+
+    def _rebuild_columns(self):
+        while True:
+            version = self.setoran.version
+            self._slots: Dict[Any, int] = {}
+            self._keys: List[Any] = []
+            self._due = array('q')
+            self._paid = array('q')
+            self._codes = array('q')
+            self._denda = array('d')
+            self._setelah = array('q')
+            self._status = array('b')
+            self._pajak_ids: List[Any] = []
+            self._pajak_codes: Dict[Any, int] = {}
+            for chunk in self.setoran.iter_chunks(10000):
+                for row in chunk:
+                    self._put(row)
+            if self.setoran.version == version:
+                self._version = version
+                return
+
+    def _code(self, id_pajak) -> int:
+        code = self._pajak_codes.get(id_pajak)
+        if code is None:
+            code = self._pajak_codes[id_pajak] = len(self._pajak_ids)
+            self._pajak_ids.append(id_pajak)
+        return code
+
+    def _put(self, row: Dict[str, Any]):
+        key_value = row[self.setoran.key]
+        due = parse_date(row.get('tanggal_jatuh_tempo'))
+        paid = parse_date(row.get('tanggal_setoran'))
+        code = self._pajak_codes.get(row.get('id_pajak'))
+        if code is None:
+            code = self._code(row.get('id_pajak'))
+        denda = float(row.get('denda') or 0)
+        setelah = int(row.get('besar_pajak_setelah_denda') or 0)
+        status = STATUS.index(row.get('status_setoran')) if row.get('status_setoran') in STATUS else -1
+        slot = self._slots.get(key_value)
+        if slot is None:
+            self._slots[key_value] = len(self._keys)
+            self._keys.append(key_value)
+            self._due.append(due)
+            self._paid.append(paid)
+            self._codes.append(code)
+            self._denda.append(denda)
+            self._setelah.append(setelah)
+            self._status.append(status)
+        else:
+            self._due[slot] = due
+            self._paid[slot] = paid
+            self._codes[slot] = code
+            self._denda[slot] = denda
+            self._setelah[slot] = setelah
+            self._status[slot] = status
+
+    # slot yang dihapus diisi dengan slot terakhir supaya array tetap rapat
+    def _drop(self, key_value):
+        slot = self._slots.pop(key_value, None)
+        if slot is None:
+            return
+        last = len(self._keys) - 1
+        if slot != last:
+            moved = self._keys[last]
+            self._keys[slot] = moved
+            self._slots[moved] = slot
+            for column in self._columns():
+                column[slot] = column[last]
+        self._keys.pop()
+        for column in self._columns():
+            column.pop()
+
+    def _columns(self):
+        return (self._due, self._paid, self._codes, self._denda, self._setelah, self._status)
+
+    def _on_change(self, changes: List[Change], version: int):
+        with self._lock:
+            if self._version is None or version != self._version + 1:
+                self._version = None
+                return
+            self._version = version
+            if self._writing:
+                # hasil recalculate() sendiri, kolom sudah diperbarui di sana
+                return
+            key = self.setoran.key
+            for old, new in changes:
+                if old is not None and (new is None or new[key] != old[key]):
+                    self._drop(old[key])
+                if new is not None:
+                    self._put(new)
+
+    def _besar_pajak(self) -> List[int]:
+        besar = []
+        for id_pajak in self._pajak_ids:
+            pajak = self.pajak.get(id_pajak)
+            besar.append(int(pajak['besar_pajak']) if pajak is not None else 0)
+        return besar
+
+    def _compute(self, rate: float, as_of: int):
+        besar_by_code = self._besar_pajak()
+        np = _numpy()
+        if np is not None:
+            due = np.frombuffer(self._due, dtype=np.int64)
+            paid = np.frombuffer(self._paid, dtype=np.int64)
+            codes = np.frombuffer(self._codes, dtype=np.int64)
+            valid = (due > 0) & (paid > 0)
+            overdue = np.maximum(np.minimum(paid, as_of) - due, 0)
+            denda = rate * overdue / 30
+            besar = np.array(besar_by_code, dtype=np.int64)[codes] if besar_by_code else np.zeros(len(codes), np.int64)
+            setelah = np.rint(besar * (1 + denda)).astype(np.int64)
+            status = np.frombuffer(self._status, dtype=np.int8)
+            late = (overdue > 0).astype(np.int8)
+            moved = valid & (status >= 0) & (status != late)
+            changed = moved | (valid & ((denda != np.frombuffer(self._denda, dtype=np.float64))
+                                        | (setelah != np.frombuffer(self._setelah, dtype=np.int64))))
+            slots = np.flatnonzero(changed)
+            # status baru hanya untuk data yang statusnya berubah, -1 untuk yang tetap
+            status_list = np.where(moved[slots], late[slots], -1).tolist()
+            return slots.tolist(), denda[slots].tolist(), setelah[slots].tolist(), status_list
+        slots, denda_list, setelah_list, status_list = [], [], [], []
+        for slot, (due, paid, code, status) in enumerate(zip(self._due, self._paid, self._codes, self._status)):
+            if due <= 0 or paid <= 0:
+                continue
+            overdue = max(min(paid, as_of) - due, 0)
+            denda = rate * overdue / 30
+            setelah = round(besar_by_code[code] * (1 + denda))
+            late = int(overdue > 0)
+            moved = status >= 0 and status != late
+            if moved or denda != self._denda[slot] or setelah != self._setelah[slot]:
+                slots.append(slot)
+                denda_list.append(denda)
+                setelah_list.append(setelah)
+                status_list.append(late if moved else -1)
+        return slots, denda_list, setelah_list, status_list
+
+    # Menghitung ulang denda seluruh setoran. as_of (ordinal) default hari ini.
+    # Data dengan tanggal tidak valid dilewati (denda tidak diubah).
+    def recalculate(self, rate: Optional[float] = None, as_of: Optional[int] = None) -> Dict[str, Any]:
+        started = time.perf_counter()
+        with self._lock:
+            if self._version != self.setoran.version:
+                self._rebuild()
+            self.rate = self.rate if rate is None else rate
+            self.as_of = date.today().toordinal() if as_of is None else as_of
+            slots, denda, setelah, status = self._compute(self.rate, self.as_of)
+            computed = time.perf_counter()
+            self._writing = True
+            try:
+                with paused_gc():
+                    keys = self._keys
+                    updates = {keys[slot]: {'denda': d, 'besar_pajak_setelah_denda': s}
+                               for slot, d, s in zip(slots, denda, setelah)}
+                    for slot, code in zip(slots, status):
+                        if code >= 0:
+                            updates[keys[slot]]['status_setoran'] = STATUS[code]
+                    changed = self.setoran.update_many(updates) if updates else 0
+            finally:
+                self._writing = False
+            for slot, d, s, code in zip(slots, denda, setelah, status):
+                self._denda[slot] = d
+                self._setelah[slot] = s
+                if code >= 0:
+                    self._status[slot] = code
+            return {
+                'rate': self.rate,
+                'as_of': format_date(self.as_of),
+                'engine': 'numpy' if _numpy() is not None else 'python',
+                'jumlah_setoran': len(self._keys),
+                'diubah': changed,
+                'durasi_hitung_ms': round((computed - started) * 1000, 3),
+                'durasi_total_ms': round((time.perf_counter() - started) * 1000, 3),
+            }
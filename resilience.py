@@ -0,0 +1,208 @@
+import asyncio
+import random
+import time
+from collections import deque
+from typing import Any, Awaitable, Callable, Dict, Optional
+
+
+# Error dari satu percobaan request ke partner. status_code mengikuti HTTP:
+# 502 / 504 untuk error jaringan / timeout, selain itu status dari partner.
+class UpstreamError(Exception):
+    def __init__(self, status_code: int):
+        super().__init__(status_code)
+        self.status_code = status_code
+
+    # partner (atau jaringannya) bermasalah: dicoba ulang dan dihitung oleh circuit breaker.
+    # Status 4xx lain (mis. 404) berarti partner hidup, tidak dicoba ulang.
+    @property
+    def retryable(self) -> bool:
+        return self.status_code >= 500 or self.status_code == 429
+
+
+# Error ketika circuit breaker sedang terbuka, request tidak dikirim sama sekali
+class CircuitOpenError(Exception):
+    def __init__(self, retry_after: float):
+        super().__init__(retry_after)
+        self.retry_after = retry_after
+
+
+# Circuit breaker satu partner:
+# - closed: request dikirim biasa, failure_threshold kegagalan berturut-turut -> open
+# - open: request langsung ditolak selama reset_timeout detik
+# - half_open: satu request percobaan dikirim, berhasil -> closed, gagal -> open lagi
+class CircuitBreaker:
+    def __init__(self, failure_threshold: int = 5, reset_timeout: float = 30.0):
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.state = 'closed'
+        self.failures = 0
+        self.opened = 0
+        self._opened_at = 0.0
+        self._probing = False
+
+    def allow(self) -> bool:
+        if self.state == 'closed':
+            return True
+        if self.state == 'open':
+            if time.monotonic() < self._opened_at + self.reset_timeout:
+                return False
+            self.state = 'half_open'
+            self._probing = False
+        # half_open: hanya satu request percobaan dalam satu waktu
+        if self._probing:
+            return False
+        self._probing = True
+        return True
+
+    def retry_after(self) -> float:
+        if self.state != 'open':
+            return 0.0
+        return max(0.0, self._opened_at + self.reset_timeout - time.monotonic())
+
+    def record_success(self):
+        self.state = 'closed'
+        self.failures = 0
+        self._probing = False
+
+    def record_failure(self):
+        self.failures += 1
+        self._probing = False
+        if self.state == 'half_open' or self.failures >= self.failure_threshold:
+            if self.state != 'open':
+                self.opened += 1
+            self.state = 'open'
+            self._opened_at = time.monotonic()
+
+    # request percobaan dibatalkan sebelum selesai, percobaan berikutnya boleh dikirim
+    def release(self):
+        self._probing = False
+
+
+# Latency request yang berhasil (detik), hanya sejumlah size terakhir yang disimpan
+class LatencyWindow:
+    def __init__(self, size: int = 200):
+        self._samples = deque(maxlen=size)
+
+    def __len__(self) -> int:
+        return len(self._samples)
+
+    def add(self, seconds: float):
+        self._samples.append(seconds)
+
+    def percentile(self, p: float) -> Optional[float]:
+        if not self._samples:
+            return None
+        ordered = sorted(self._samples)
+        return ordered[min(len(ordered) - 1, int(p * len(ordered)))]
+
+
+# Kebijakan pemanggilan satu partner: circuit breaker, retry terbatas dengan exponential
+# backoff + jitter (full jitter: jeda acak 0 .. backoff * 2^percobaan), dan hedged request
+# (opsional): jika percobaan belum selesai setelah latency persentil hedge_percentile,
+# request kedua dikirim dan hasil yang lebih dulu berhasil yang dipakai.
+# Semua percobaan (termasuk jeda retry) dibatasi total budget detik, sehingga retry tidak
+# membuat request lebih lama dari timeout partner.
+class ResiliencePolicy:
+    def __init__(self, budget: float, retries: int = 2, backoff: float = 0.2, max_backoff: float = 2.0,
+                 failure_threshold: int = 5, reset_timeout: float = 30.0,
+                 hedge_percentile: Optional[float] = None, hedge_min_samples: int = 20):
+        self.budget = budget
+        self.retries = retries
+        self.backoff = backoff
+        self.max_backoff = max_backoff
+        self.hedge_percentile = hedge_percentile
+        self.hedge_min_samples = hedge_min_samples
+        self.breaker = CircuitBreaker(failure_threshold, reset_timeout)
+        self.latency = LatencyWindow()
+        self.stats: Dict[str, int] = {'call': 0, 'success': 0, 'failure': 0, 'retry': 0,
+                                      'rejected': 0, 'hedged': 0, 'hedge_won': 0}
+
+    # jeda sebelum request kedua dikirim, None jika hedging tidak aktif / sampel belum cukup
+    def hedge_delay(self) -> Optional[float]:
+        if self.hedge_percentile is None or len(self.latency) < self.hedge_min_samples:
+            return None
+        return self.latency.percentile(self.hedge_percentile)
+
+    # attempt(timeout) mengirim satu request dengan batas waktu timeout detik
+    async def call(self, attempt: Callable[[float], Awaitable[Any]]) -> Any:
+        self.stats['call'] += 1
+        if not self.breaker.allow():
+            self.stats['rejected'] += 1
+            raise CircuitOpenError(self.breaker.retry_after())
+        loop = asyncio.get_running_loop()
+        deadline = loop.time() + self.budget
+        number = 0
+        while True:
+            try:
+                value = await self._attempt(attempt, deadline - loop.time())
+            except UpstreamError as e:
+                if not e.retryable:
+                    # partner hidup dan menjawab, hanya datanya yang tidak ada / ditolak
+                    self.breaker.record_success()
+                    self.stats['failure'] += 1
+                    raise
+                self.breaker.record_failure()
+                delay = random.uniform(0, min(self.max_backoff, self.backoff * 2 ** number))
+                if number >= self.retries or self.breaker.state == 'open' or loop.time() + delay >= deadline:
+                    self.stats['failure'] += 1
+                    raise
+            except BaseException:
+                self.breaker.release()
+                raise
+            else:
+                self.breaker.record_success()
+                self.stats['success'] += 1
+                return value
+            number += 1
+            self.stats['retry'] += 1
+            await asyncio.sleep(delay)
+
+    async def _attempt(self, attempt: Callable[[float], Awaitable[Any]], timeout: float) -> Any:
+        loop = asyncio.get_running_loop()
+        started = loop.time()
+        delay = self.hedge_delay()
+        if delay is None or delay >= timeout:
+            value = await attempt(timeout)
+            self.latency.add(loop.time() - started)
+            return value
+        first = asyncio.ensure_future(attempt(timeout))
+        pending = {first}
+        try:
+            done, pending = await asyncio.wait(pending, timeout=delay)
+            if not done:
+                self.stats['hedged'] += 1
+                hedge_started = loop.time()
+                second = asyncio.ensure_future(attempt(timeout - delay))
+                pending.add(second)
+            error = None
+            while pending or done:
+                for task in done:
+                    if task.exception() is None:
+                        if task is first:
+                            self.latency.add(loop.time() - started)
+                        else:
+                            self.stats['hedge_won'] += 1
+                            self.latency.add(loop.time() - hedge_started)
+                        return task.result()
+                    error = task.exception()
+                if not pending:
+                    break
+                done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+            raise error
+        finally:
+            for task in pending:
+                task.cancel()
+
+    def snapshot(self) -> Dict[str, Any]:
+        def ms(seconds):
+            return None if seconds is None else round(seconds * 1000, 3)
+        return {
+            'state': self.breaker.state,
+            'consecutive_failures': self.breaker.failures,
+            'opened': self.breaker.opened,
+            'retry_after': round(self.breaker.retry_after(), 3),
+            'latency_ms': {'p50': ms(self.latency.percentile(0.5)), 'p95': ms(self.latency.percentile(0.95)),
+                           'p99': ms(self.latency.percentile(0.99))},
+            'hedge_delay_ms': ms(self.hedge_delay()),
+            **self.stats,
+        }
@@ -0,0 +1,147 @@
+import asyncio
+from typing import Optional
+
+from fastapi import APIRouter, Header, HTTPException, Query, Response, WebSocket, WebSocketDisconnect
+from fastapi.responses import StreamingResponse
+
+from changefeed import ChangeLogReset, change_log, parse_tables
+from models import ApiResponse
+from serialization import api_body, dumps
+import tables  # noqa: F401  (mendaftarkan semua tabel ke change_log)
+
+# Router change feed (/changes): perubahan data (insert / update / delete) semua tabel
+# sejak seq tertentu, supaya kelompok lain tidak perlu membaca ulang seluruh tabel.
+# Cara pakai: ambil data lengkap + last_seq dari /changes/status, lalu berlangganan lewat
+# /changes/stream (SSE), /changes/ws (WebSocket) atau polling /changes mulai dari seq tersebut.
+# Jika seq sudah tidak ada di log (tertinggal lebih dari CHANGEFEED_RETENTION perubahan
+# atau server restart) client mendapat reset dan harus mengambil ulang data lengkap.
+router = APIRouter()
+
+SSE_MEDIA_TYPE = 'text/event-stream'
+HEARTBEAT_SECONDS = 15.0
+BATCH_SIZE = 500
+WS_CLOSE_FULL = 1013  # Try Again Later
+WS_CLOSE_RESET = 4410  # seperti HTTP 410 Gone
+
+
+def _tables(tables: Optional[str]):
+    try:
+        return parse_tables(tables, list(change_log.tables))
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=f"Tabel tidak dikenal: {e}. Pilihan: {', '.join(change_log.tables)}.")
+
+
+def _reset_detail(reset: ChangeLogReset) -> str:
+    return (f"Perubahan yang diminta sudah tidak tersedia (log berisi seq {reset.first_seq} - {reset.last_seq}). "
+            f"Ambil ulang data lengkap lalu lanjutkan dari seq {reset.last_seq}.")
+
+
+def _reset_body(reset: ChangeLogReset) -> bytes:
+    return dumps({'op': 'reset', 'first_seq': reset.first_seq, 'last_seq': reset.last_seq,
+                  'detail': _reset_detail(reset)})
+
+
+def _subscribe(since: Optional[int], tables, transport: str):
+    if since is not None:
+        try:
+            change_log.check(since)
+        except ChangeLogReset as reset:
+            raise HTTPException(status_code=410, detail=_reset_detail(reset))
+    subscription = change_log.subscribe(since, tables, transport)
+    if subscription is None:
+        raise HTTPException(status_code=503, detail="Jumlah subscriber change feed sudah maksimal, coba lagi nanti.",
+                            headers={'Retry-After': '5'})
+    return subscription
+
+
+# Endpoint untuk melihat status change feed (rentang seq di log, tabel, jumlah subscriber)
+@router.get('/changes/status', response_model=ApiResponse)
+async def get_changes_status():
+    return ApiResponse(status=True, message="Status Change Feed Berhasil Diambil", data=change_log.status())
+
+# Polling perubahan setelah seq since (tanpa since: mulai dari sekarang, hanya mengembalikan cursor).
+# Request berikutnya memakai cursor dari response ini sebagai since.
+@router.get('/changes')
+async def get_changes(
+    since: Optional[int] = Query(None, description="seq terakhir yang sudah diterima"),
+    tables: Optional[str] = Query(None, description="Nama tabel dipisah koma (default: semua tabel)"),
+    limit: int = Query(1000, ge=1, le=10000, description="Jumlah perubahan maksimal"),
+):
+    table_set = _tables(tables)
+    if since is None:
+        since = change_log.last_seq
+    try:
+        entries, cursor = change_log.read(since, set(table_set) if table_set else None, limit)
+    except ChangeLogReset as reset:
+        raise HTTPException(status_code=410, detail=_reset_detail(reset))
+    data = (b'{"changes":[' + b','.join(entry.encoded() for entry in entries) + b'],"cursor":'
+            + str(cursor).encode() + b',"last_seq":' + str(change_log.last_seq).encode() + b'}')
+    return Response(api_body("Data Perubahan Berhasil Diambil", data), media_type='application/json')
+
+# Server-Sent Events: satu event per perubahan (id = seq, event = change, data = JSON perubahan).
+# Saat tersambung ulang, EventSource mengirim header Last-Event-ID sehingga stream lanjut
+# dari perubahan terakhir yang diterima. Komentar heartbeat dikirim jika tidak ada perubahan.
+@router.get('/changes/stream')
+async def stream_changes(
+    since: Optional[int] = Query(None, description="seq terakhir yang sudah diterima (default: mulai dari sekarang)"),
+    tables: Optional[str] = Query(None, description="Nama tabel dipisah koma (default: semua tabel)"),
+    last_event_id: Optional[int] = Header(None, description="Diisi otomatis oleh EventSource saat tersambung ulang"),
+):
+    subscription = _subscribe(last_event_id if last_event_id is not None else since, _tables(tables), 'sse')
+
+    async def events():
+        try:
+            yield b'retry: 2000\n\n'
+            while True:
+                try:
+                    entries = await subscription.next_batch(BATCH_SIZE, HEARTBEAT_SECONDS)
+                except ChangeLogReset as reset:
+                    yield b'event: reset\ndata: ' + _reset_body(reset) + b'\n\n'
+                    return
+                if not entries:
+                    yield b': heartbeat\n\n'
+                    continue
+                yield b''.join(b'id: %d\nevent: change\ndata: %s\n\n' % (entry.seq, entry.encoded())
+                               for entry in entries)
+        finally:
+            subscription.close()
+
+    return StreamingResponse(events(), media_type=SSE_MEDIA_TYPE,
+                             headers={'Cache-Control': 'no-cache', 'X-Accel-Buffering': 'no'})
+
+# WebSocket: satu pesan teks (JSON perubahan) per perubahan. Pesan dari client diabaikan.
+# Reset dikirim sebagai pesan {"op": "reset", ...} lalu koneksi ditutup dengan kode 4410.
+@router.websocket('/changes/ws')
+async def websocket_changes(websocket: WebSocket, since: Optional[int] = None, tables: Optional[str] = None):
+    try:
+        subscription = _subscribe(since, _tables(tables), 'websocket')
+    except HTTPException as e:
+        await websocket.close(code=WS_CLOSE_FULL if e.status_code == 503 else 1008, reason=e.detail[:120])
+        return
+    await websocket.accept()
+
+    # menunggu client memutus koneksi, supaya subscriber yang diam langsung dilepas
+    async def wait_disconnect():
+        try:
+            while (await websocket.receive())['type'] != 'websocket.disconnect':
+                pass
+        finally:
+            subscription.close()
+
+    receiver = asyncio.create_task(wait_disconnect())
+    try:
+        while not subscription.closed:
+            try:
+                entries = await subscription.next_batch(BATCH_SIZE, HEARTBEAT_SECONDS)
+            except ChangeLogReset as reset:
+                await websocket.send_text(_reset_body(reset).decode())
+                await websocket.close(code=WS_CLOSE_RESET)
+                return
+            # send menunggu sampai data terkirim: client lambat hanya membuat cursor-nya tertinggal
+            for entry in entries:
+                await websocket.send_text(entry.encoded().decode())
+    except (WebSocketDisconnect, RuntimeError):
+        pass
+    finally:
+        subscription.close()
+        receiver.cancel()
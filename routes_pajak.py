@@ -0,0 +1,86 @@
+from typing import Optional
+
+from fastapi import APIRouter, Depends, Header, HTTPException, Query, Request, Response
+from starlette.concurrency import run_in_threadpool
+
+from aggregate import RunningAggregate
+from bulk import apply_batch, bulk_openapi, read_batch_body
+from models import ApiResponse, Pajak
+from pagination import Pagination, list_rows
+from store import DuplicateKeyError, PreconditionFailed, row_etag
+from tables import data_pajak
+
+# Router data pajak objek wisata (/pajak)
+router = APIRouter()
+
+# # Endpoint untuk menambahkan data pajak objek wisata
+# @router.post("/pajak", response_model=ApiResponse)
+# async def add_pajak(pajak: Pajak):
+#     data_pajak.append(pajak.dict())
+#     return ApiResponse(status=True, message="Data Pajak Objek Wisata Berhasil Ditambahkan", data=pajak)
+
+# Menambah data pajak 
+@router.post("/pajak", response_model=ApiResponse)
+async def add_pajak(pajak: Pajak):
+    try:
+        data_pajak.insert(pajak.dict())
+    except DuplicateKeyError:
+        raise HTTPException(status_code=400, detail="ID Pajak sudah ada.")
+    return ApiResponse(status=True, message="Data Pajak Berhasil Ditambahkan", data=pajak)
+
+# Menambah / mengubah / menghapus banyak data pajak sekaligus (JSON array atau NDJSON)
+@router.post("/pajak/bulk", response_model=ApiResponse, openapi_extra=bulk_openapi(Pajak))
+async def bulk_pajak(request: Request, mode: str = Query('insert', pattern='^(insert|upsert|delete)$'), atomic: bool = True):
+    hasil = await run_in_threadpool(apply_batch, data_pajak, Pajak, await read_batch_body(request), mode, atomic)
+    return ApiResponse(status=True, message="Data Pajak Batch Berhasil Diproses", data=hasil)
+
+# Endpoint untuk mendapatkan data pajak objek wisata
+@router.get("/pajak", response_model=ApiResponse)
+async def get_pajak(page: Pagination = Depends()):
+    return list_rows(data_pajak, page, message="Data Pajak Berhasil Diambil")
+
+# ringkasan pajak (jumlah data, total / min / max besar_pajak dan tarif_pajak),
+# diperbarui setiap kali data pajak berubah sehingga tidak perlu menghitung ulang seluruh tabel
+ringkasan_pajak = RunningAggregate(data_pajak, group_by=('status_kepemilikan', 'jenis_pajak'),
+                                   fields=('besar_pajak', 'tarif_pajak'))
+
+# Endpoint untuk mendapatkan ringkasan data pajak (didaftarkan sebelum /pajak/{id_pajak})
+@router.get("/pajak/summary", response_model=ApiResponse)
+def get_pajak_summary():
+    return ApiResponse(status=True, message="Ringkasan Data Pajak Berhasil Diambil", data=ringkasan_pajak.snapshot())
+
+# Endpoint untuk mengambil detail data pajak sesuai dengan input id_pajak
+@router.get("/pajak/{id_pajak}", response_model=ApiResponse)
+def get_pajak_by_id(id_pajak: str, response: Response):
+    pajak = data_pajak.get(id_pajak)
+    if pajak is not None:
+        response.headers['ETag'] = row_etag(pajak)
+        return ApiResponse(status=True, message="Data Pajak Berhasil Diambil", data=pajak)
+    raise HTTPException(status_code=404, detail="Data Pajak Tidak Ditemukan")
+
+# Endpoint untuk memperbarui data pajak objek wisata dengan memasukkan id_pajak saja
+@router.put("/pajak/{id_pajak}", response_model=ApiResponse)
+def update_pajak_by_id(id_pajak: str, update_pajak: Pajak, response: Response, if_match: Optional[str] = Header(None)):
+    try:
+        updated = data_pajak.replace(id_pajak, update_pajak.dict(), if_match=if_match)
+    except DuplicateKeyError:
+        raise HTTPException(status_code=400, detail="ID Pajak sudah ada.")
+    except PreconditionFailed:
+        raise HTTPException(status_code=412, detail="Data sudah diubah oleh request lain (If-Match tidak cocok).")
+    if updated is not None:
+        response.headers['ETag'] = row_etag(updated)
+        return ApiResponse(status=True, message="Data Pajak Berhasil Diperbarui", data=update_pajak)
+    else:
+        raise HTTPException(status_code=404, detail="Data Pajak Tidak Ditemukan")
+
+# Endpoint untuk menghapus data pajak objek wisaya by id_pajak
+@router.delete("/pajak/{id_pajak}", response_model=ApiResponse)
+def delete_pajak_by_id(id_pajak: str, if_match: Optional[str] = Header(None)):
+    try:
+        deleted = data_pajak.delete(id_pajak, if_match=if_match)
+    except PreconditionFailed:
+        raise HTTPException(status_code=412, detail="Data sudah diubah oleh request lain (If-Match tidak cocok).")
+    if deleted is not None:
+        return ApiResponse(status=True, message="Data Pajak Berhasil Dihapus")
+    else:
+        raise HTTPException(status_code=404, detail="Data Pajak Tidak Berhasil Dihapus")
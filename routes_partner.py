@@ -0,0 +1,245 @@
+from typing import List, Optional
+
+from fastapi import APIRouter, Depends, Header, HTTPException, Query, Response
+from pydantic import BaseModel
+
+from models import Pendudukasuransi, Pendudukbank, Pendudukhotel, Pendudukrental
+from pagination import Pagination, list_rows
+from store import DuplicateKeyError, PreconditionFailed, row_etag
+from sync import partner_rows
+from tables import data_Pendudukasuransi, data_Pendudukbank, data_Pendudukhotel, data_Pendudukrental
+
+# Router data penduduk untuk kelompok lain (/pendudukrental, /pendudukhotel, /pendudukasuransi,
+# /pendudukbank) dan data dari API kelompok lain (/penduduk/asuransi, /pelanggan, /tourguide, ...)
+router = APIRouter()
+
+# ================================================================================== (RENTAL MOBIL)
+
+@router.post("/pendudukrental")
+def tambah_pendudukrental(pendudukrental: Pendudukrental):
+    try:
+        data_Pendudukrental.insert(pendudukrental.dict())
+    except DuplicateKeyError:
+        raise HTTPException(status_code=400, detail="NIK sudah ada.")
+    return {"message": "Data Penduduk berhasil ditambahkan."}
+
+@router.get('/pendudukrental', response_model=List[Pendudukrental])
+async def get_pendudukrental(page: Pagination = Depends()):
+    return list_rows(data_Pendudukrental, page)
+
+@router.get("/pendudukrental/{nik}", response_model=Pendudukrental)
+def get_pendudukrental_by_nik(nik: int, response: Response):
+    pendudukrental = data_Pendudukrental.get(nik)
+    if pendudukrental is not None:
+        response.headers['ETag'] = row_etag(pendudukrental)
+        return Pendudukrental(**pendudukrental)
+    raise HTTPException(status_code=404, detail="Data Penduduk tidak ditemukan.")
+
+@router.put("/pendudukrental/{nik}")
+def update_pendudukrental_by_nik(nik: int, pendudukrental: Pendudukrental, response: Response, if_match: Optional[str] = Header(None)):
+    try:
+        updated = data_Pendudukrental.replace(nik, pendudukrental.dict(), if_match=if_match)
+    except DuplicateKeyError:
+        raise HTTPException(status_code=400, detail="NIK sudah ada.")
+    except PreconditionFailed:
+        raise HTTPException(status_code=412, detail="Data sudah diubah oleh request lain (If-Match tidak cocok).")
+    if updated is not None:
+        response.headers['ETag'] = row_etag(updated)
+        return {"message": "Data Penduduk berhasil diperbarui."}
+    else:
+        raise HTTPException(status_code=404, detail="Data Penduduk tidak ditemukan.")
+
+@router.delete("/pendudukrental/{nik}")
+def delete_pendudukrental(nik: int, if_match: Optional[str] = Header(None)):
+    try:
+        deleted = data_Pendudukrental.delete(nik, if_match=if_match)
+    except PreconditionFailed:
+        raise HTTPException(status_code=412, detail="Data sudah diubah oleh request lain (If-Match tidak cocok).")
+    if deleted is not None:
+        return {"message": "Data Penduduk berhasil dihapus."}
+    else:
+        raise HTTPException(status_code=404, detail="Data Penduduk tidak ditemukan.")
+
+# ================================================================================== (HOTEL)
+
+@router.post("/pendudukhotel")
+def tambah_pendudukhotel(pendudukhotel: Pendudukhotel):
+    try:
+        data_Pendudukhotel.insert(pendudukhotel.dict())
+    except DuplicateKeyError:
+        raise HTTPException(status_code=400, detail="NIK sudah ada.")
+    return {"message": "Data Penduduk berhasil ditambahkan."}
+
+
+@router.get('/pendudukhotel', response_model=List[Pendudukhotel])
+async def get_pendudukhotel(page: Pagination = Depends()):
+    return list_rows(data_Pendudukhotel, page)
+
+@router.get("/pendudukhotel/{nik}", response_model=Pendudukhotel)
+def get_pendudukhotel_by_nik(nik: int, response: Response):
+    pendudukhotel = data_Pendudukhotel.get(nik)
+    if pendudukhotel is not None:
+        response.headers['ETag'] = row_etag(pendudukhotel)
+        return Pendudukhotel(**pendudukhotel)
+    raise HTTPException(status_code=404, detail="Data Penduduk tidak ditemukan.")
+
+@router.put("/pendudukhotel/{nik}")
+def update_pendudukhotel_by_nik(nik: int, pendudukhotel: Pendudukhotel, response: Response, if_match: Optional[str] = Header(None)):
+    try:
+        updated = data_Pendudukhotel.replace(nik, pendudukhotel.dict(), if_match=if_match)
+    except DuplicateKeyError:
+        raise HTTPException(status_code=400, detail="NIK sudah ada.")
+    except PreconditionFailed:
+        raise HTTPException(status_code=412, detail="Data sudah diubah oleh request lain (If-Match tidak cocok).")
+    if updated is not None:
+        response.headers['ETag'] = row_etag(updated)
+        return {"message": "Data Penduduk berhasil diperbarui."}
+    else:
+        raise HTTPException(status_code=404, detail="Data Penduduk tidak ditemukan.")
+
+@router.delete("/pendudukhotel/{nik}")
+def delete_pendudukhotel(nik: int, if_match: Optional[str] = Header(None)):
+    try:
+        deleted = data_Pendudukhotel.delete(nik, if_match=if_match)
+    except PreconditionFailed:
+        raise HTTPException(status_code=412, detail="Data sudah diubah oleh request lain (If-Match tidak cocok).")
+    if deleted is not None:
+        return {"message": "Data Penduduk berhasil dihapus."}
+    else:
+        raise HTTPException(status_code=404, detail="Data Penduduk tidak ditemukan.")
+
+#====================================================================================== (Selesai)
+
+# ================================================================================== (ASURANSI)
+
+@router.post('/pendudukasuransi', response_model=Pendudukasuransi)
+async def post_pendudukasuransi(pendudukasuransi: Pendudukasuransi):
+    try:
+        data_Pendudukasuransi.insert(pendudukasuransi.dict())
+    except DuplicateKeyError:
+        raise HTTPException(status_code=400, detail="NIK sudah ada.")
+    return pendudukasuransi
+
+# untuk menampilkan data kita sendiri kelompok asuransi, bisa difilter seperti /penduduk
+@router.get('/pendudukasuransi', response_model=List[Pendudukasuransi])
+async def get_pendudukasuransi(
+    page: Pagination = Depends(),
+    provinsi: Optional[str] = None,
+    kota: Optional[str] = None,
+    kecamatan: Optional[str] = None,
+    desa: Optional[str] = None,
+    nama: Optional[str] = Query(None, description="Awalan nama (tidak membedakan huruf besar/kecil)"),
+):
+    filters = {'provinsi': provinsi, 'kota': kota, 'kecamatan': kecamatan, 'desa': desa}
+    return list_rows(data_Pendudukasuransi, page, filters, prefix=('nama', nama))
+
+@router.get("/pendudukasuransi/{nik}", response_model=Pendudukasuransi)
+def get_pendudukasuransi_by_nik(nik: int, response: Response):
+    pendudukasuransi = data_Pendudukasuransi.get(nik)
+    if pendudukasuransi is not None:
+        response.headers['ETag'] = row_etag(pendudukasuransi)
+        return Pendudukasuransi(**pendudukasuransi)
+    raise HTTPException(status_code=404, detail="Data Penduduk tidak ditemukan.")
+
+# =========================================== (BATAS PENDUDUK ASURANSI)
+
+# ================================================================================== (BANK)
+
+@router.post('/pendudukbank', response_model=Pendudukbank)
+async def post_pendudukbank(pendudukbank: Pendudukbank):
+    try:
+        data_Pendudukbank.insert(pendudukbank.dict())
+    except DuplicateKeyError:
+        raise HTTPException(status_code=400, detail="NIK sudah ada.")
+    return pendudukbank
+
+# untuk menampilkan data kita sendiri kelompok hotel
+@router.get('/pendudukbank', response_model=List[Pendudukbank])
+async def get_pendudukbank(page: Pagination = Depends()):
+    return list_rows(data_Pendudukbank, page)
+
+@router.get("/pendudukbank/{nik}", response_model=Pendudukbank)
+def get_pendudukbank_by_nik(nik: int, response: Response):
+    pendudukbank = data_Pendudukbank.get(nik)
+    if pendudukbank is not None:
+        response.headers['ETag'] = row_etag(pendudukbank)
+        return Pendudukbank(**pendudukbank)
+    raise HTTPException(status_code=404, detail="Data Penduduk tidak ditemukan.")
+
+# =========================================== (BATAS PENDUDUK BANK)
+
+# untuk get data dari kelompok asuransi menggunakan url web hosting
+async def get_asuransi_from_web():
+    return await partner_rows('asuransi')  #endpoint kelompok asuransi
+
+# untuk get data dari kelompok bank menggunakan url web hosting (bank)
+async def get_bank_from_web():
+    return await partner_rows('bank')  #endpoint kelompok bank
+
+# untuk get data dari kelompok hotel menggunakan url web hosting (hotel)
+async def get_hotel_from_web():
+    return await partner_rows('hotel')  #endpoint kelompok hotel
+
+# untuk get data dari kelompok bank menggunakan url web hosting (rental mobil)
+async def get_rental_from_web():
+    return await partner_rows('rental')  #endpoint kelompok rental mobil
+
+# untuk get data dari kelompok tour guide menggunakan url web hosting (Tour Guide)
+async def get_guide_from_web():
+    return await partner_rows('guide')  #endpoint kelompok tour guide
+
+class Asuransi(BaseModel):
+    nik: int
+    nama: str
+    provinsi: str
+    kota: str
+    kecamatan: str
+    desa : str
+
+class Bank(BaseModel):
+    nik: int
+    nama: str
+
+class Hotel(BaseModel):
+    nik: int
+    nama: str
+    kabupaten: str
+
+class Rental(BaseModel):
+    nomor_telepon:str
+    email:str
+
+class Guide(BaseModel):
+    id_guider: str
+    nama_guider: str
+    
+# untuk mendapatkan hasil dari kelompok lain (asuransi)
+@router.get('/penduduk/asuransi', response_model=List[Asuransi])
+async def get_asuransi():
+    data_asuransi = await get_asuransi_from_web()
+    return data_asuransi
+
+# untuk mendapatkan hasil dari kelompok lain (bank)
+@router.get('/penduduk/bank', response_model=List[Bank])
+async def get_bank():
+    data_bank = await get_bank_from_web()
+    return data_bank
+
+# untuk mendapatkan hasil dari kelompok lain (hotel)
+@router.get('/penduduk/hotel', response_model=List[Hotel])
+async def get_hotel():
+    data_hotel = await get_hotel_from_web()
+    return data_hotel
+
+# untuk mendapatkan hasil dari kelompok lain (rental mobil)
+@router.get('/pelanggan', response_model=List[Rental])
+async def get_pelanggan():
+    data_pelanggan = await get_rental_from_web()
+    return data_pelanggan
+
+# untuk mendapatkan hasil dari kelompok lain (Tour Guide)
+# untuk mendapatkan hasil dari kelompok lain (Tour Guide)
+@router.get('/tourguide', response_model=List[Guide])
+async def get_tourguide():
+    data_tourguide = await get_guide_from_web()
+    return data_tourguide
@@ -0,0 +1,163 @@
+import asyncio
+from typing import Any, Dict, List, Optional
+
+from fastapi import APIRouter, Depends, Header, HTTPException, Query, Request, Response
+from pydantic import BaseModel, ValidationError
+from starlette.concurrency import run_in_threadpool
+
+from bulk import apply_batch, bulk_openapi, read_batch_body
+from models import ApiResponse, Penduduk
+from pagination import Pagination, list_rows
+from routes_partner import Asuransi, Bank, Hotel, get_asuransi_from_web, get_bank_from_web, get_hotel_from_web
+from search import StoreNameIndex, register
+from store import DuplicateKeyError, PreconditionFailed, row_etag
+from tables import data_penduduk
+
+# Router data penduduk (/penduduk) dan profil penduduk dari semua kelompok
+router = APIRouter()
+
+    # untuk post data kita ke kelompok lain
+@router.post('/penduduk', response_model=Penduduk)
+async def post_penduduk(penduduk: Penduduk):
+    try:
+        data_penduduk.insert(penduduk.dict())
+    except DuplicateKeyError:
+        raise HTTPException(status_code=400, detail="NIK sudah ada.")
+    return penduduk
+
+# Menambah / mengubah / menghapus banyak data penduduk sekaligus (JSON array atau NDJSON)
+@router.post('/penduduk/bulk', response_model=ApiResponse, openapi_extra=bulk_openapi(Penduduk))
+async def bulk_penduduk(request: Request, mode: str = Query('insert', pattern='^(insert|upsert|delete)$'), atomic: bool = True):
+    hasil = await run_in_threadpool(apply_batch, data_penduduk, Penduduk, await read_batch_body(request), mode, atomic)
+    return ApiResponse(status=True, message="Data Penduduk Batch Berhasil Diproses", data=hasil)
+
+# untuk menampilkan data kita sendiri, bisa difilter berdasarkan wilayah dan awalan nama
+@router.get('/penduduk', response_model=List[Penduduk])
+async def get_penduduk(
+    page: Pagination = Depends(),
+    provinsi: Optional[str] = None,
+    kota: Optional[str] = None,
+    kecamatan: Optional[str] = None,
+    desa: Optional[str] = None,
+    nama: Optional[str] = Query(None, description="Awalan nama (tidak membedakan huruf besar/kecil)"),
+):
+    filters = {'provinsi': provinsi, 'kota': kota, 'kecamatan': kecamatan, 'desa': desa}
+    return list_rows(data_penduduk, page, filters, prefix=('nama', nama))
+
+# index trigram nama penduduk untuk pencarian mirip dan autocomplete (search.py)
+nama_penduduk = register('penduduk', StoreNameIndex(data_penduduk, 'nama'))
+
+# Mencari penduduk dengan nama yang mirip (salah ketik / ejaan berbeda), terurut dari yang paling mirip.
+# def biasa (threadpool): query pertama membangun index seluruh tabel
+@router.get('/penduduk/search', response_model=ApiResponse)
+def search_penduduk(
+    q: str = Query(..., min_length=1, description="Nama yang dicari"),
+    limit: int = Query(10, ge=1, le=100),
+    threshold: float = Query(0.3, ge=0, le=1, description="Skor kemiripan minimal (0 - 1)"),
+):
+    hasil = []
+    for nik, _, skor in nama_penduduk.search(q, limit, threshold):
+        penduduk = data_penduduk.get(nik)
+        if penduduk is not None:
+            hasil.append({**penduduk, 'skor': round(skor, 4)})
+    return ApiResponse(status=True, message="Data Penduduk Berhasil Dicari", data=hasil)
+
+# Saran nama penduduk untuk kotak pencarian: nama yang memuat semua kata q, kata terakhir boleh belum lengkap
+@router.get('/penduduk/autocomplete', response_model=ApiResponse)
+def autocomplete_penduduk(q: str = Query(..., min_length=1), limit: int = Query(10, ge=1, le=100)):
+    hasil = [{'nik': nik, 'nama': nama} for nik, nama in nama_penduduk.autocomplete(q, limit)]
+    return ApiResponse(status=True, message="Saran Nama Penduduk Berhasil Diambil", data=hasil)
+
+# untuk get data sendiri (berdasarkan NIK)
+# {nik:int} supaya /penduduk/asuransi, /penduduk/bank dan /penduduk/hotel tidak tertangkap route ini
+@router.get("/penduduk/{nik:int}", response_model=Optional[Penduduk])
+def get_penduduk_by_id(nik: int, response: Response):
+    penduduk = data_penduduk.get(nik)
+    if penduduk is not None:
+        response.headers['ETag'] = row_etag(penduduk)
+        return Penduduk(**penduduk)
+    return None
+
+# untuk update data sendiri 
+@router.put("/penduduk/{nik}")
+def update_penduduk_by_id(nik: int, update_penduduk: Penduduk, response: Response, if_match: Optional[str] = Header(None)):
+    try:
+        updated = data_penduduk.replace(nik, update_penduduk.dict(), if_match=if_match)
+    except DuplicateKeyError:
+        raise HTTPException(status_code=400, detail="NIK sudah ada.")
+    except PreconditionFailed:
+        raise HTTPException(status_code=412, detail="Data sudah diubah oleh request lain (If-Match tidak cocok).")
+    if updated is not None:
+        response.headers['ETag'] = row_etag(updated)
+        return {"message": "Data Penduduk berhasil diperbarui."}
+    else:
+        raise HTTPException(status_code=404, detail="Data Penduduk Tidak Ditemukan.")
+    
+# untuk menghapus data
+@router.delete("/penduduk/{nik}")
+def delete_penduduk_by_id(nik: int, if_match: Optional[str] = Header(None)):
+    try:
+        deleted = data_penduduk.delete(nik, if_match=if_match)
+    except PreconditionFailed:
+        raise HTTPException(status_code=412, detail="Data sudah diubah oleh request lain (If-Match tidak cocok).")
+    if deleted is not None:
+        return {"message": "Data (nama datanya) Berhasil Dihapus."}
+    else:
+        raise HTTPException(status_code=404, detail="Data Penduduk Tidak Berhasil Dihapus.")
+    
+
+# ================================================================================== (PROFIL PENDUDUK)
+
+class ProfileSource(BaseModel):
+    status: str  # 'ok', 'timeout' atau 'error'
+    data: List[Any] = []
+    detail: Optional[str] = None
+
+class ProfileResponse(BaseModel):
+    nik: int
+    penduduk: Optional[Penduduk] = None
+    sources: Dict[str, ProfileSource]
+
+# sumber data kelompok lain untuk profil: (fungsi fetch, schema model), hanya kelompok yang
+# datanya memuat nik. Data rental (nomor_telepon, email) dan tour guide (id_guider, nama_guider)
+# tidak punya kolom yang bisa dihubungkan ke penduduk, jadi tidak ikut di profil.
+PROFILE_SOURCES = {
+    'asuransi': (get_asuransi_from_web, Asuransi),
+    'bank': (get_bank_from_web, Bank),
+    'hotel': (get_hotel_from_web, Hotel),
+}
+
+# mengambil data satu kelompok dengan batas waktu, hasilnya hanya data milik nik tersebut.
+# Data kelompok lain yang tidak sesuai schema dilewati per baris (jumlahnya di detail).
+async def get_profile_source(nik: int, fetch, model, timeout: float) -> ProfileSource:
+    try:
+        rows = await asyncio.wait_for(fetch(), timeout)
+        data, invalid = [], 0
+        for row in rows:
+            if row.get('nik') != nik:
+                continue
+            try:
+                data.append(model(**row))
+            except (ValidationError, TypeError):
+                invalid += 1
+        return ProfileSource(status='ok', data=data,
+                             detail=f"{invalid} data tidak sesuai format dilewati" if invalid else None)
+    except asyncio.TimeoutError:
+        return ProfileSource(status='timeout', detail=f"Tidak ada respons dalam {timeout} detik")
+    except HTTPException as e:
+        return ProfileSource(status='error', detail=e.detail)
+    except Exception as e:
+        return ProfileSource(status='error', detail=str(e))
+
+# untuk mendapatkan data satu penduduk dari semua kelompok sekaligus (diambil bersamaan)
+@router.get('/penduduk/{nik:int}/profile', response_model=ProfileResponse)
+async def get_penduduk_profile(nik: int, timeout: float = Query(5.0, gt=0, le=60, description="Batas waktu per kelompok (detik)")):
+    results = await asyncio.gather(*(
+        get_profile_source(nik, fetch, model, timeout) for fetch, model in PROFILE_SOURCES.values()
+    ))
+    penduduk = data_penduduk.get(nik)
+    return ProfileResponse(
+        nik=nik,
+        penduduk=Penduduk(**penduduk) if penduduk is not None else None,
+        sources=dict(zip(PROFILE_SOURCES, results)),
+    )
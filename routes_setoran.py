@@ -0,0 +1,122 @@
+from typing import List, Optional, Union
+
+from fastapi import APIRouter, Depends, HTTPException, Query, Request
+from pydantic import BaseModel
+from starlette.concurrency import run_in_threadpool
+
+from aggregate import RunningAggregate
+from bulk import apply_batch, bulk_openapi, read_batch_body
+from models import ApiResponse, Setoran
+from pagination import Pagination, list_rows
+from penalty import PenaltyEngine, parse_date
+from store import DuplicateKeyError
+from tables import data_pajak, data_setoran
+
+# Router data setoran pajak (/setoranpajak)
+router = APIRouter()
+
+# Endpoint untuk menambahkan data pajak objek wisata
+@router.post("/setoranpajak")
+async def add_setoran(setoranpajak: Setoran):
+    try:
+        data_setoran.insert(setoranpajak.dict())
+    except DuplicateKeyError:
+        raise HTTPException(status_code=400, detail="ID Setoran sudah ada.")
+    return {"message": "Data Setoran Pajak Objek Wisata Berhasil Ditambahkan."}
+
+# Menambah / mengubah / menghapus banyak data setoran sekaligus (JSON array atau NDJSON)
+@router.post("/setoranpajak/bulk", response_model=ApiResponse, openapi_extra=bulk_openapi(Setoran))
+async def bulk_setoran(request: Request, mode: str = Query('insert', pattern='^(insert|upsert|delete)$'), atomic: bool = True):
+    hasil = await run_in_threadpool(apply_batch, data_setoran, Setoran, await read_batch_body(request), mode, atomic)
+    return ApiResponse(status=True, message="Data Setoran Batch Berhasil Diproses", data=hasil)
+
+# menghitung denda setoran dari tanggal_jatuh_tempo dan tanggal_setoran (lihat penalty.py)
+penalty_engine = PenaltyEngine(data_setoran, data_pajak)
+
+# Endpoint untuk menghitung ulang denda dan besar_pajak_setelah_denda seluruh setoran sekaligus
+@router.post("/setoranpajak/recalculate", response_model=ApiResponse)
+def recalculate_setoran(
+    rate: Optional[float] = Query(None, ge=0, description="Denda per 30 hari keterlambatan (default: rate terakhir, awalnya 0.02)"),
+    as_of: Optional[str] = Query(None, description="Tanggal perhitungan DD-MM-YYYY (default: hari ini)"),
+):
+    as_of_ordinal = None
+    if as_of is not None:
+        as_of_ordinal = parse_date(as_of)
+        if not as_of_ordinal:
+            raise HTTPException(status_code=400, detail="Format as_of harus DD-MM-YYYY.")
+    hasil = penalty_engine.recalculate(rate, as_of_ordinal)
+    return ApiResponse(status=True, message="Denda Setoran Berhasil Dihitung Ulang", data=hasil)
+
+# tanggal DD-MM-YYYY dari query parameter -> ordinal (None jika tidak diisi)
+def tanggal_query(value: Optional[str], nama: str) -> Optional[int]:
+    if value is None:
+        return None
+    ordinal = parse_date(value)
+    if not ordinal:
+        raise HTTPException(status_code=400, detail=f"Format {nama} harus DD-MM-YYYY.")
+    return ordinal
+
+#Endpoint untuk mendapatkan data pajak objek wisata
+# bisa difilter berdasarkan status / id_pajak dan rentang tanggal (batas inklusif, format DD-MM-YYYY),
+# mis. setoran terlambat dengan jatuh tempo antara X dan Y:
+#   /setoranpajak?status_setoran=terlambat&jatuh_tempo_dari=X&jatuh_tempo_sampai=Y
+@router.get("/setoranpajak", response_model=List[Setoran])
+async def get_setoran(
+    page: Pagination = Depends(),
+    status_setoran: Optional[str] = None,
+    id_pajak: Optional[str] = None,
+    jatuh_tempo_dari: Optional[str] = Query(None, description="tanggal_jatuh_tempo >= (DD-MM-YYYY)"),
+    jatuh_tempo_sampai: Optional[str] = Query(None, description="tanggal_jatuh_tempo <= (DD-MM-YYYY)"),
+    setoran_dari: Optional[str] = Query(None, description="tanggal_setoran >= (DD-MM-YYYY)"),
+    setoran_sampai: Optional[str] = Query(None, description="tanggal_setoran <= (DD-MM-YYYY)"),
+):
+    filters = {'status_setoran': status_setoran, 'id_pajak': id_pajak}
+    ranges = {
+        'tanggal_jatuh_tempo': (tanggal_query(jatuh_tempo_dari, 'jatuh_tempo_dari'),
+                                tanggal_query(jatuh_tempo_sampai, 'jatuh_tempo_sampai')),
+        'tanggal_setoran': (tanggal_query(setoran_dari, 'setoran_dari'), tanggal_query(setoran_sampai, 'setoran_sampai')),
+    }
+    return list_rows(data_setoran, page, filters, ranges=ranges)
+
+# ringkasan setoran per status_setoran (mis. jumlah setoran terlambat dan total besar_pajak_setelah_denda)
+ringkasan_setoran = RunningAggregate(data_setoran, group_by=('status_setoran',),
+                                     fields=('besar_pajak_setelah_denda', 'denda'))
+
+# Endpoint untuk mendapatkan ringkasan data setoran (didaftarkan sebelum /setoranpajak/{status_setoran})
+@router.get("/setoranpajak/summary", response_model=ApiResponse)
+def get_setoran_summary():
+    return ApiResponse(status=True, message="Ringkasan Data Setoran Berhasil Diambil", data=ringkasan_setoran.snapshot())
+
+# @router.get("/setoranpajak/{status_setoran}", response_model=Optional[Setoran])
+# def get_setoran_by_status(status_setoran: str):
+#     for pajaksetoran in data_setoran:
+#         if pajaksetoran['status_setoran'] == status_setoran:
+#             return Setoran(**pajaksetoran)
+#     raise HTTPException(status_code=404, detail="Setoran not found")
+class NotFoundResponse(BaseModel):
+    status_setoran: str
+    detail: str
+
+# setoran pertama dengan status tersebut, dicari lewat index status_setoran
+# (untuk semua setoran dengan status tertentu pakai /setoranpajak?status_setoran=...)
+@router.get("/setoranpajak/{status_setoran}", response_model=Union[Setoran, NotFoundResponse])
+def get_setoran_by_status(status_setoran: str):
+    found = data_setoran.first('status_setoran', status_setoran)
+    if found is not None:
+        return Setoran(**found)
+    return NotFoundResponse(status_setoran=status_setoran, detail=f"Setoran pajak dengan status '{status_setoran}' tidak ditemukan")
+
+
+
+# Function to check for penalties and calculate fine
+# (sekarang dihitung untuk seluruh tabel oleh PenaltyEngine di penalty.py, lihat /setoranpajak/recalculate)
+# def calculate_fine(setoran, current_date, fine_rate=0.02):
+#     due_date = setoran['tanggal_jatuh_tempo']
+#     if due_date < current_date:
+#         # Calculate the number of days overdue
+#         overdue_days = (current_date - due_date).days
+#         # Calculate the fine as a percentage of the 'besar_pajak'
+#         fine_amount = setoran['besar_pajak'] * fine_rate * (overdue_days / 30)  # Assuming fine is per month
+#         setoran['denda'] = fine_amount
+#     else:
+#         setoran['denda'] = 0
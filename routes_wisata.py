@@ -0,0 +1,222 @@
+from typing import Any, Dict, Optional
+
+from fastapi import APIRouter, Header, HTTPException, Query, Response
+from pydantic import BaseModel
+
+from http_cache import cached_response, response_etag
+from join import HashJoin
+from models import ApiResponse
+from search import RowsNameIndex, register
+from serialization import TrustedJSONResponse, api_body, dumps
+from store import DuplicateKeyError, PreconditionFailed, row_etag
+from sync import partner_row, partner_rows, partner_rows_tagged
+from tables import data_pajak
+
+# Router data objek wisata dari kelompok lain (/wisata) dan gabungan pajak + wisata (/pajakwisata)
+router = APIRouter()
+
+# Fungsi untuk mengambil data objek wisata dari website objek wisata
+async def get_data_wisata_from_web():
+    return await partner_rows('wisata')  # URL Endpoint API dari Objek Wisata ada di upstream.py, disinkronkan di sync.py
+
+# Schema Model untuk data Objek Wisata
+class Wisata(BaseModel):
+    id_wisata: str
+    nama_objek: str
+
+# Endpoint untuk mendapatkan data objek wisata
+@router.get('/wisata', response_model=ApiResponse)
+async def get_wisata():
+    data_wisata = await get_data_wisata_from_web()
+    return ApiResponse(status=True, message="Data Objek Wisata Berhasil Diambil", data=data_wisata)
+
+# Fungsi untuk mendapatkan indeks objek wisata berdasarkan id_wisata
+async def get_wisata_index(id_wisata: str):
+    data_wisata = await get_data_wisata_from_web()
+    for index, wisata in enumerate(data_wisata):
+        if wisata['id_wisata'] == id_wisata:
+            return index
+    return None
+
+# index trigram nama objek wisata, dibangun ulang setiap data wisata dari mirror / cache berganti
+nama_wisata = register('wisata', RowsNameIndex('nama_objek'))
+
+# Endpoint untuk mencari objek wisata dengan nama yang mirip, terurut dari yang paling mirip
+@router.get('/wisata/search', response_model=ApiResponse)
+async def search_wisata(
+    q: str = Query(..., min_length=1, description="Nama objek wisata yang dicari"),
+    limit: int = Query(10, ge=1, le=100),
+    threshold: float = Query(0.3, ge=0, le=1, description="Skor kemiripan minimal (0 - 1)"),
+):
+    data_wisata = await get_data_wisata_from_web()
+    hasil = [{**wisata, 'skor': round(skor, 4)} for wisata, skor in nama_wisata.search(data_wisata, q, limit, threshold)]
+    return ApiResponse(status=True, message="Data Objek Wisata Berhasil Dicari", data=hasil)
+
+# Endpoint saran nama objek wisata untuk kotak pencarian (kata terakhir boleh belum lengkap)
+@router.get('/wisata/autocomplete', response_model=ApiResponse)
+async def autocomplete_wisata(q: str = Query(..., min_length=1), limit: int = Query(10, ge=1, le=100)):
+    data_wisata = await get_data_wisata_from_web()
+    return ApiResponse(status=True, message="Saran Nama Objek Wisata Berhasil Diambil",
+                       data=nama_wisata.autocomplete(data_wisata, q, limit))
+
+# Endpoint untuk mendapatkan data objek wisata berdasarkan id_wisata
+@router.get('/wisata/{id_wisata}', response_model=ApiResponse)
+async def get_wisata_by_id(id_wisata: str):
+    wisata = await partner_row('wisata', id_wisata)  # dari index mirror lokal
+    if wisata is not None:
+        return ApiResponse(status=True, message="Data Objek Wisata Berhasil Diambil", data=wisata)
+    return ApiResponse(status=False, message="Data Objek Wisata Tidak Ditemukan", data=None)
+
+# # Menambah data objek wisata
+# @router.post("/wisata", response_model=ApiResponse)
+# async def add_wisata(wisata: Wisata):
+#     data_wisata = await get_data_wisata_from_web()
+#     if any(existing_wisata['id_wisata'] == wisata.id_wisata for existing_wisata in data_wisata):
+#         raise HTTPException(status_code=400, detail="ID Objek Wisata sudah ada.")
+#     data_pajak.append(wisata.dict())
+#     return ApiResponse(status=True, message="Data Objek Wisata Berhasil Ditambahkan", data=wisata)
+
+# # Endpoint untuk mengubah isi/value data dari Objek Wisata
+# @router.put("/wisata/{id_wisata}", response_model=ApiResponse)
+# async def update_wisata_by_nik(id_wisata: str, update_wisata = Wisata):
+#     data_wisata = await get_data_wisata_from_web()
+#     index = get_wisata_index(id_wisata)
+#     if index is not None:
+#         data_wisata[index] = update_wisata.dict()
+#         return ApiResponse(status=True, message="Data Pajak Berhasil Diperbarui", data=update_wisata)
+#     else:
+#         raise HTTPException(status_code=404, detail="Data Objek Wisata tidak ditemukan.")
+
+#============================ COMBINED DATA PAJAK DAN OBJEK WISATA ==============================
+
+class Pajakwisata(BaseModel):
+    id_pajak: str
+    id_wisata : Optional[str] = None
+    nama_objek : Optional[str] = None
+    status_kepemilikan: str
+    jenis_pajak: str
+    tarif_pajak: float
+    besar_pajak: int
+
+class PajakwisataResponse(BaseModel):
+    status: bool
+    message: str
+    data: Any
+
+# Menggabungkan satu data pajak dengan data objek wisata pasangannya (bisa None).
+# Divalidasi sekali saat join dibangun ulang, hasilnya disimpan sebagai dict.
+def gabung_pajak_wisata(pajak, wisata):
+    wisata = wisata or {}
+    return Pajakwisata(
+        id_pajak=pajak['id_pajak'],
+        id_wisata=wisata.get('id_wisata'),
+        nama_objek=wisata.get('nama_objek'),
+        status_kepemilikan=pajak['status_kepemilikan'],
+        jenis_pajak=pajak['jenis_pajak'],
+        tarif_pajak=pajak['tarif_pajak'],
+        besar_pajak=pajak['besar_pajak']
+    ).dict()
+
+# Join data pajak dengan data objek wisata berdasarkan id_pajak = id_wisata
+pajak_wisata_join = HashJoin(data_pajak, left_key='id_pajak', right_key='id_wisata', combine=gabung_pajak_wisata)
+# body response /pajakwisata per mode, di-encode ulang hanya jika hasil join berubah
+pajak_wisata_body: Dict[str, tuple] = {}
+
+# Endpoint untuk mendapatkan semua data pajak objek wisata
+# mode=left: semua data pajak (nama_objek kosong jika tidak ada pasangan), mode=inner: hanya yang berpasangan
+# ETag dari version tabel pajak + isi data wisata di mirror, If-None-Match yang cocok dijawab 304
+@router.get('/pajakwisata', response_model=PajakwisataResponse)
+async def get_pajak_wisata(mode: str = Query('left', pattern='^(inner|left)$'), if_none_match: Optional[str] = Header(None)):
+    data_wisata, wisata_tag = await partner_rows_tagged('wisata')
+
+    def build():
+        gabungan_data = pajak_wisata_join.rows(data_wisata, mode)
+        cached = pajak_wisata_body.get(mode)
+        if cached is None or cached[0] is not gabungan_data:
+            cached = pajak_wisata_body[mode] = (gabungan_data, api_body('Data berhasil diambil', dumps(gabungan_data)))
+        return cached[1], None
+
+    if wisata_tag is None:
+        # data wisata belum dari mirror, isinya belum punya tag yang pasti
+        return TrustedJSONResponse(build()[0])
+    return cached_response(if_none_match, response_etag(data_pajak.cache_tag, data_pajak.version, wisata_tag, mode), build)
+
+@router.get('/pajakwisata/{id_pajak}', response_model=PajakwisataResponse)
+async def get_pajak_wisata_by_id(id_pajak: str):
+    data_wisata = await get_data_wisata_from_web()
+    gabungan_data = pajak_wisata_join.get(id_pajak, data_wisata)
+    if gabungan_data is not None:
+        return PajakwisataResponse(
+            status=True,
+            message='Data berhasil diambil',
+            data=gabungan_data
+        )
+    return PajakwisataResponse(
+        status=False,
+        message='Data tidak ditemukan',
+        data=None
+    )
+
+# # Endpoint untuk mendapatkan data pajak objek wisata berdasarkan id_pajak
+# @router.get('/pajakwisata/{id_pajak}', response_model=PajakwisataResponse)
+# async def get_pajak_wisata_by_id(id_pajak: str):
+#     data_wisata = await get_data_wisata_from_web()
+#     for pajak in data_pajak:
+#         if pajak['id_pajak'] == id_pajak:
+#             for wisata in data_wisata:
+#                 if wisata['id_wisata'] == pajak['id_wisata']:  # Periksa pencocokan id_wisata dengan id_pajak
+#                     gabungan_data = Pajakwisata(
+#                         id_pajak=pajak['id_pajak'],
+#                         id_wisata=wisata['id_wisata'],
+#                         nama_objek=wisata['nama_objek'],
+#                         status_kepemilikan=pajak['status_kepemilikan'],
+#                         jenis_pajak=pajak['jenis_pajak'],
+#                         tarif_pajak=pajak['tarif_pajak'],
+#                         besar_pajak=pajak['besar_pajak']
+#                     )
+#                     return PajakwisataResponse(
+#                         status=True,
+#                         message='Data berhasil diambil',
+#                         data=gabungan_data
+#                     )
+#     return PajakwisataResponse(
+#         status=False,
+#         message='Data tidak ditemukan',
+#         data=None
+#     )
+
+# Endpoint untuk menambahkan data gabungan pajak dan objek wisata
+@router.post('/pajakwisata', response_model=PajakwisataResponse)
+async def create_pajak_wisata(pajakwisata: Pajakwisata):
+    try:
+        data_pajak.insert(pajakwisata.dict())
+    except DuplicateKeyError:
+        raise HTTPException(status_code=400, detail="ID Pajak sudah ada.")
+    return PajakwisataResponse(
+        status=True, 
+        message="Data Pajak Objek Wisata berhasil ditambahkan",
+        data=pajakwisata
+    )
+
+# Endpoint untuk update isi data gabungan pajak dan objek wisata
+@router.put('/pajakwisata/{id_pajak}', response_model=PajakwisataResponse)
+async def update_pajak_wisata(id_pajak: str, pajakwisata: Pajakwisata, response: Response, if_match: Optional[str] = Header(None)):
+    try:
+        updated = data_pajak.replace(id_pajak, pajakwisata.dict(), if_match=if_match)
+    except DuplicateKeyError:
+        raise HTTPException(status_code=400, detail="ID Pajak sudah ada.")
+    except PreconditionFailed:
+        raise HTTPException(status_code=412, detail="Data sudah diubah oleh request lain (If-Match tidak cocok).")
+    if updated is not None:
+        response.headers['ETag'] = row_etag(updated)
+        return PajakwisataResponse(status=True, message="Data berhasil diupdate", data=pajakwisata)
+    return PajakwisataResponse(status=False, message="Data tidak ditemukan", data=None)
+
+# Endpoint untuk menghapus data gabungan pajak dan objek wisata
+@router.delete('/pajakwisata/{id_pajak}', response_model=PajakwisataResponse)
+async def delete_pajak_wisata(id_pajak: str, if_match: Optional[str] = Header(None)):
+    try:
+        data_pajak.delete(id_pajak, if_match=if_match)
+    except PreconditionFailed:
+        raise HTTPException(status_code=412, detail="Data sudah diubah oleh request lain (If-Match tidak cocok).")
+    return PajakwisataResponse(status=True, message="Data berhasil dihapus", data=None)
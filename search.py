@@ -0,0 +1,398 @@
+import functools
+import math
+import re
+import sys
+import threading
+import time
+import unicodedata
+from array import array
+from bisect import bisect_left
+from collections import Counter
+from typing import Any, Dict, Iterator, List, Optional, Set, Tuple
+
+from store import Change, paused_gc
+
+# batas kerja satu query supaya latency tetap beberapa milidetik meski tabel berisi jutaan nama
+MAX_POSTINGS = 100000  # jumlah posting trigram yang dihitung per query fuzzy
+MAX_CANDIDATES = 200  # kandidat dengan trigram sama terbanyak yang dihitung skornya
+MAX_SCAN = 1000  # nama cocok yang dikumpulkan per query autocomplete
+SCAN_CHUNK = 4000  # dokumen hasil irisan posting yang diperiksa sekaligus (autocomplete)
+
+_NON_ALNUM = re.compile(r'[^0-9a-z]+')
+
+
+# numpy opsional (tanpa numpy dihitung dengan Counter) dan baru diimpor saat query pertama
+@functools.lru_cache(maxsize=None)
+def _numpy():
+    try:
+        import numpy
+    except ImportError:
+        return None
+    return numpy
+
+
+# huruf kecil tanpa aksen, selain huruf / angka menjadi spasi: 'Sé-Kar  Ayu' -> 'se kar ayu'
+@functools.lru_cache(maxsize=65536)
+def normalize(text: str) -> str:
+    text = str(text)
+    if not text.isascii():
+        text = unicodedata.normalize('NFKD', text).encode('ascii', 'ignore').decode()
+    return _NON_ALNUM.sub(' ', text.lower()).strip()
+
+
+# trigram per kata seperti pg_trgm: kata diberi dua spasi di depan dan satu di belakang,
+# jadi awal kata lebih berpengaruh dan kata pendek ('al') tetap punya trigram.
+# Semua kata diproses sebagai satu string ('  ani   budi '), lalu trigram antar kata
+# ('i  ' dan '   ') dibuang; jauh lebih cepat daripada membuat set per kata.
+def trigrams(normalized: str) -> Set[str]:
+    if not normalized:
+        return set()
+    padded = '  ' + normalized.replace(' ', '   ') + ' '
+    grams = {padded[i:i + 3] for i in range(len(padded) - 2)}
+    if ' ' in normalized:
+        grams.discard('   ')
+        for word in normalized.split(' ')[:-1]:
+            grams.discard(word[-1] + '  ')
+    return grams
+
+
+def similarity(a: Set[str], b: Set[str]) -> float:
+    if not a or not b:
+        return 0.0
+    shared = len(a & b)
+    return shared / (len(a) + len(b) - shared)
+
+
+# Inverted index trigram untuk satu kolom nama. Setiap nama mendapat nomor dokumen;
+# posting list (nomor dokumen per trigram) disimpan sebagai array int 4 byte.
+# Nama yang dihapus / diganti hanya ditandai (None) dan posting-nya dibersihkan saat
+# index dibangun ulang. Teks nama dan key tidak disalin (objek yang sama dengan tabel).
+class NameIndex:
+    def __init__(self):
+        self.keys: List[Any] = []
+        self.names: List[Optional[str]] = []
+        self.docs: Dict[Any, int] = {}  # key -> nomor dokumen yang masih berlaku
+        self.grams: Dict[str, array] = {}
+        self.dead = 0
+
+    def __len__(self) -> int:
+        return len(self.docs)
+
+    def add(self, key: Any, name: Optional[str]):
+        if key in self.docs:
+            self.remove(key)
+        if not name:
+            return
+        normalized = normalize(name)
+        doc = len(self.names)
+        self.keys.append(key)
+        self.names.append(name)
+        self.docs[key] = doc
+        grams = self.grams
+        for gram in trigrams(normalized):
+            posting = grams.get(gram)
+            if posting is None:
+                posting = grams[gram] = array('i')
+            posting.append(doc)
+
+    def remove(self, key: Any):
+        doc = self.docs.pop(key, None)
+        if doc is not None:
+            self.names[doc] = None
+            self.dead += 1
+
+    # nama paling mirip dengan text: (key, nama, skor) dengan skor = |A n B| / |A u B|
+    # trigram, terurut dari skor tertinggi, hanya yang skornya >= threshold
+    def search(self, text: str, limit: int = 10, threshold: float = 0.3) -> List[Tuple[Any, str, float]]:
+        query = trigrams(normalize(text))
+        if not query:
+            return []
+        # nama dengan skor >= threshold pasti memiliki minimal `shared` trigram query, jadi pasti
+        # memiliki salah satu dari (len(query) - shared + 1) trigram mana pun (pigeonhole).
+        # Dipakai trigram yang paling jarang (trigram yang tidak ada di index gratis), selama
+        # jumlah posting-nya masih di bawah MAX_POSTINGS. Trigram lain ikut dihitung jika masih
+        # muat supaya kandidat dengan trigram sama terbanyak tidak seri (mis. 'nama baru 99' dan
+        # 'nama baru 999' hanya dibedakan trigram angka yang lebih umum).
+        shared = max(1, math.ceil(threshold * len(query)))
+        postings = sorted((self.grams.get(gram, ()) for gram in query), key=len)
+        selected, total = [], 0
+        for i, posting in enumerate(postings):
+            if selected and total + len(posting) > MAX_POSTINGS:
+                if i >= len(query) - shared + 1:
+                    continue
+                break
+            selected.append(posting)
+            total += len(posting)
+        names = self.names
+        scored = []
+        for doc in self._top_candidates(selected, total):
+            name = names[doc]
+            if name is None:
+                continue
+            score = similarity(query, trigrams(normalize(name)))
+            if score >= threshold:
+                scored.append((-score, len(name), doc))
+        scored.sort()
+        return [(self.keys[doc], names[doc], -score) for score, _, doc in scored[:limit]]
+
+    # nomor dokumen yang paling banyak muncul di posting terpilih (paling banyak MAX_CANDIDATES)
+    def _top_candidates(self, selected: List[array], total: int) -> List[int]:
+        if not total:
+            return []
+        np = _numpy()
+        if np is None:
+            counts = Counter()
+            for posting in selected:
+                counts.update(posting)
+            return [doc for doc, _ in counts.most_common(MAX_CANDIDATES)]
+        docs, counts = np.unique(np.concatenate([np.frombuffer(posting, dtype=np.intc) for posting in selected if posting]),
+                                 return_counts=True)
+        if len(docs) > MAX_CANDIDATES:
+            docs = docs[np.argpartition(-counts, MAX_CANDIDATES)[:MAX_CANDIDATES]]
+        return docs.tolist()
+
+    # nama yang memuat semua kata text, kata terakhir boleh belum lengkap (awalan).
+    # Nama yang diawali text didahulukan, lalu nama yang lebih pendek.
+    def autocomplete(self, text: str, limit: int = 10) -> List[Tuple[Any, str]]:
+        tokens = normalize(text).split()
+        if not tokens:
+            return []
+        complete, last = tokens[:-1], tokens[-1]
+        # trigram yang pasti dimiliki nama yang cocok: semua trigram kata lengkap dan trigram
+        # awal kata terakhir (tanpa spasi penutup)
+        required = trigrams(' '.join(complete))
+        padded = '  ' + last
+        required.update(padded[i:i + 3] for i in range(len(padded) - 2))
+        postings = sorted((self.grams.get(gram, ()) for gram in required), key=len)
+        query = ' '.join(tokens)
+        names = self.names
+        found = []
+        # trigram sama belum tentu kata yang cocok ('budi andi dani' memuat semua trigram
+        # 'budi ani'), jadi setiap potongan hasil irisan langsung diperiksa dan batas MAX_SCAN
+        # dihitung dari nama yang benar-benar cocok
+        for docs in self._intersect(postings):
+            for doc in docs:
+                name = names[doc]
+                if name is None:
+                    continue
+                normalized = normalize(name)
+                words = normalized.split()
+                if all(word in words for word in complete) and any(word.startswith(last) for word in words):
+                    found.append((not normalized.startswith(query), len(name), name, doc))
+                    if len(found) >= MAX_SCAN:
+                        break
+            if len(found) >= MAX_SCAN:
+                break
+        found.sort()
+        return [(self.keys[doc], name) for _, _, name, doc in found[:limit]]
+
+    # nomor dokumen yang ada di semua posting, per potongan SCAN_CHUNK dokumen. Posting list
+    # selalu terurut (nomor dokumen baru selalu lebih besar), jadi posting terpendek cukup
+    # dicari di posting lain: searchsorted dengan NumPy, tanpa NumPy bisect dengan batas bawah
+    # yang terus maju. Untuk awalan yang sangat umum hanya MAX_POSTINGS dokumen pertama
+    # posting terpendek yang diperiksa.
+    def _intersect(self, postings: List[array]) -> Iterator[List[int]]:
+        if not postings or not postings[0]:
+            return
+        end = min(len(postings[0]), MAX_POSTINGS)
+        np = _numpy()
+        if np is None:
+            shortest, others = postings[0], postings[1:]
+            starts = [0] * len(others)
+            # irisan dihitung per dokumen, jadi potongan kecil saja supaya tidak mengiris jauh
+            # melewati nama cocok ke-MAX_SCAN
+            chunk = SCAN_CHUNK // 16
+            for begin in range(0, end, chunk):
+                docs = []
+                for doc in shortest[begin:min(begin + chunk, end)]:
+                    for i, other in enumerate(others):
+                        j = starts[i] = bisect_left(other, doc, starts[i])
+                        if j == len(other) or other[j] != doc:
+                            break
+                    else:
+                        docs.append(doc)
+                yield docs
+            return
+        others = [np.frombuffer(posting, dtype=np.intc) for posting in postings[1:]]
+        shortest = np.frombuffer(postings[0], dtype=np.intc)[:end]
+        for begin in range(0, end, SCAN_CHUNK):
+            docs = shortest[begin:begin + SCAN_CHUNK]
+            for other in others:
+                docs = docs[other[np.minimum(np.searchsorted(other, docs), len(other) - 1)] == docs]
+            yield docs.tolist()
+
+    # perkiraan memori index (tanpa teks nama dan key, yang dipakai bersama dengan tabel)
+    def memory(self) -> int:
+        size = sum(sys.getsizeof(item) for item in (self.keys, self.names, self.docs, self.grams))
+        return size + sum(sys.getsizeof(gram) + sys.getsizeof(posting) for gram, posting in self.grams.items())
+
+
+# Index nama untuk satu kolom tabel (store). Seperti RunningAggregate (aggregate.py):
+# perubahan diterima lewat store.subscribe(), dan jika versi tabel melompat (ditulis worker
+# lain pada backend SQLite) index dibangun ulang saat dipakai. Perubahan hanya dicatat
+# saat tulis dan diterapkan pada query berikutnya, jadi bulk insert tidak ikut membayar
+# index. Index pertama kali dibangun saat query pertama (bukan saat startup), tanpa memegang
+# lock tabel: tabel dibaca per potongan dan perubahan selama pembangunan dicatat lalu
+# diterapkan sesudahnya (menerapkan ulang perubahan yang sudah terbaca tidak mengubah hasil).
+class StoreNameIndex:
+    def __init__(self, store, field: str):
+        self.store = store
+        self.field = field
+        self._lock = threading.Lock()
+        self._build_lock = threading.Lock()
+        self._index = NameIndex()
+        self._version: Optional[int] = None
+        self._building = False
+        self._pending: List[List[Change]] = []
+        self._pending_rows = 0
+        self.build_seconds: Optional[float] = None
+        store.subscribe(self._on_change)
+
+    def _on_change(self, changes: List[Change], version: int):
+        with self._lock:
+            if self._version is None or version <= self._version:
+                # belum dibangun, atau perubahan sudah terbaca saat index mulai dibangun
+                return
+            # ada perubahan yang tidak terlihat oleh worker ini, atau perubahan yang belum
+            # diterapkan sudah terlalu banyak: lebih murah dibangun ulang saat query berikutnya
+            if version != self._version + 1 or \
+                    (not self._building and (self._pending_rows + len(changes)) * 2 > len(self._index)):
+                self._version = None
+                self._pending, self._pending_rows = [], 0
+                return
+            self._pending.append(changes)
+            self._pending_rows += len(changes)
+            self._version = version
+
+    def _rebuild(self):
+        with self._build_lock:
+            with self._lock:
+                if self._version is not None and self._version == self.store.version and \
+                        self._index.dead <= max(1000, len(self._index)):
+                    return  # sudah dibangun thread lain
+                self._version = self.store.version
+                self._pending, self._pending_rows = [], 0
+                self._building = True
+            started = time.perf_counter()
+            index = NameIndex()
+            key, field = self.store.key, self.field
+            try:
+                with paused_gc():
+                    for chunk in self.store.iter_chunks(10000):
+                        for row in chunk:
+                            index.add(row[key], row.get(field))
+            except BaseException:
+                with self._lock:
+                    self._building = False
+                    self._version = None
+                raise
+            with self._lock:
+                self._building = False
+                self._index = index
+            self.build_seconds = round(time.perf_counter() - started, 3)
+
+    # menjalankan query(index) pada index yang sesuai isi tabel saat ini
+    def _query(self, query):
+        while True:
+            with self._lock:
+                if not self._building and self._version is not None and self._version == self.store.version:
+                    index = self._index
+                    self._apply_pending(index)
+                    # nama yang dihapus / diganti masih ada di posting list; dibersihkan dengan dibangun ulang
+                    if index.dead <= max(1000, len(index)):
+                        return query(index)
+                    self._version = None
+            self._rebuild()
+
+    def _apply_pending(self, index: NameIndex):
+        key, field = self.store.key, self.field
+        for changes in self._pending:
+            for old, new in changes:
+                if new is None:
+                    index.remove(old[key])
+                elif old is None or old[key] != new[key] or old.get(field) != new.get(field):
+                    if old is not None:
+                        index.remove(old[key])
+                    index.add(new[key], new.get(field))
+        self._pending, self._pending_rows = [], 0
+
+    def search(self, text: str, limit: int = 10, threshold: float = 0.3) -> List[Tuple[Any, str, float]]:
+        return self._query(lambda index: index.search(text, limit, threshold))
+
+    def autocomplete(self, text: str, limit: int = 10) -> List[Tuple[Any, str]]:
+        return self._query(lambda index: index.autocomplete(text, limit))
+
+    def status(self) -> Dict[str, Any]:
+        with self._lock:
+            index = self._index
+            memory = index.memory()
+            return {
+                'built': self._version is not None and not self._building,
+                'names': len(index),
+                'dead': index.dead,
+                'pending': self._pending_rows,
+                'trigrams': len(index.grams),
+                'bytes': memory,
+                'bytes_per_name': round(memory / len(index), 1) if len(index) else None,
+                'build_seconds': self.build_seconds,
+            }
+
+
+# Index nama untuk list data partner (mis. mirror / cache wisata). Dibangun ulang jika list
+# berubah: mirror (sync.py) dan cache (cache.py) mengganti objek list saat data diperbarui
+# dan memakai objek yang sama selama data tidak berubah. Key setiap nama = posisinya di list.
+class RowsNameIndex:
+    def __init__(self, field: str):
+        self.field = field
+        self._lock = threading.Lock()
+        self._rows: Optional[List[Dict[str, Any]]] = None
+        self._index = NameIndex()
+        self.builds = 0
+        self.build_seconds: Optional[float] = None
+
+    def _current(self, rows: List[Dict[str, Any]]) -> NameIndex:
+        if rows is not self._rows:
+            started = time.perf_counter()
+            index = NameIndex()
+            for position, row in enumerate(rows):
+                index.add(position, row.get(self.field))
+            self._rows, self._index = rows, index
+            self.builds += 1
+            self.build_seconds = round(time.perf_counter() - started, 3)
+        return self._index
+
+    def search(self, rows: List[Dict[str, Any]], text: str, limit: int = 10,
+               threshold: float = 0.3) -> List[Tuple[Dict[str, Any], float]]:
+        with self._lock:
+            return [(rows[position], score) for position, _, score in self._current(rows).search(text, limit, threshold)]
+
+    def autocomplete(self, rows: List[Dict[str, Any]], text: str, limit: int = 10) -> List[Dict[str, Any]]:
+        with self._lock:
+            return [rows[position] for position, _ in self._current(rows).autocomplete(text, limit)]
+
+    def status(self) -> Dict[str, Any]:
+        with self._lock:
+            index = self._index
+            memory = index.memory()
+            return {
+                'built': self._rows is not None,
+                'names': len(index),
+                'trigrams': len(index.grams),
+                'bytes': memory,
+                'bytes_per_name': round(memory / len(index), 1) if len(index) else None,
+                'builds': self.builds,
+                'build_seconds': self.build_seconds,
+            }
+
+
+# index yang sudah dibuat (router yang sudah dimuat), untuk /search/status
+INDEXES: Dict[str, Any] = {}
+
+
+def register(name: str, index):
+    INDEXES[name] = index
+    return index
+
+
+def search_status() -> Dict[str, Any]:
+    return {name: index.status() for name, index in INDEXES.items()}
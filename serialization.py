@@ -0,0 +1,133 @@
+import json
+import threading
+import weakref
+from typing import Any, Dict, List, Optional, Tuple
+
+from fastapi.responses import JSONResponse, Response
+
+try:
+    import orjson
+except ImportError:  # orjson opsional, tanpa orjson dipakai json bawaan
+    orjson = None
+
+
+if orjson is not None:
+    from fastapi.responses import ORJSONResponse as DefaultResponse
+
+    def dumps(value: Any) -> bytes:
+        return orjson.dumps(value)
+else:
+    DefaultResponse = JSONResponse
+
+    def dumps(value: Any) -> bytes:
+        return json.dumps(value, ensure_ascii=False, separators=(',', ':')).encode()
+
+
+# Response untuk body JSON yang sudah di-encode. Dipakai untuk data tabel yang
+# sudah divalidasi saat insert, sehingga response_model tidak memvalidasi ulang.
+class TrustedJSONResponse(Response):
+    media_type = 'application/json'
+
+
+# Cache hasil encode per baris. Selama tabel mengembalikan objek dict yang sama
+# (store in-memory tidak menyalin baris, setiap perubahan menyimpan dict baru),
+# baris yang belum berubah tidak perlu di-encode ulang.
+class RowEncodeCache:
+    def __init__(self):
+        self._entries: Dict[Any, Tuple[Dict[str, Any], bytes]] = {}
+        self._lock = threading.Lock()
+
+    def encode(self, key: str, rows: List[Dict[str, Any]]) -> List[bytes]:
+        entries = self._entries
+        encoded = []
+        with self._lock:
+            for row in rows:
+                key_value = row[key]
+                entry = entries.get(key_value)
+                if entry is None or entry[0] is not row:
+                    entry = entries[key_value] = (row, dumps(row))
+                encoded.append(entry[1])
+        return encoded
+
+    # Seperti encode(), untuk tabel yang membuat dict baru setiap dibaca: entry dicocokkan
+    # dengan nomor tulis data (stamped = [(key, nomor tulis)]), bukan objek dict-nya.
+    # Mengembalikan hasil encode (None untuk data yang belum ada di cache) dan key yang
+    # belum ada; dipanggil di dalam lock tabel supaya nomor tulis sesuai isi tabel.
+    def lookup(self, stamped: List[Tuple[Any, Any]]) -> Tuple[List[Optional[bytes]], List[Any]]:
+        entries = self._entries
+        encoded, missing = [], []
+        with self._lock:
+            for key_value, stamp in stamped:
+                entry = entries.get(key_value)
+                if entry is None or entry[0] != stamp:
+                    encoded.append(None)
+                    missing.append(key_value)
+                else:
+                    encoded.append(entry[1])
+        return encoded, missing
+
+    # meng-encode data yang belum ada di cache (rows: key -> data) lalu menyimpannya
+    def fill(self, stamped: List[Tuple[Any, Any]], encoded: List[Optional[bytes]], rows: Dict[Any, Dict[str, Any]]):
+        fresh = {}
+        for i, (key_value, stamp) in enumerate(stamped):
+            if encoded[i] is None:
+                encoded[i] = dumps(rows[key_value])
+                fresh[key_value] = (stamp, encoded[i])
+        with self._lock:
+            self._entries.update(fresh)
+
+    # membuang entry milik baris yang sudah dihapus / diganti key-nya
+    def prune(self, live: int):
+        if len(self._entries) > 2 * live + 1024:
+            with self._lock:
+                self._entries.clear()
+
+
+_row_caches: 'weakref.WeakKeyDictionary[Any, RowEncodeCache]' = weakref.WeakKeyDictionary()
+
+
+# Hasil encode JSON setiap baris (bytes), memakai cache jika tabel mendukungnya
+def encoded_rows(store, rows: List[Dict[str, Any]]) -> List[bytes]:
+    # store SQLite membuat dict baru setiap query, jadi cache tidak berguna di sana
+    if not getattr(store, 'shares_rows', False):
+        return [dumps(row) for row in rows]
+    cache = _row_caches.get(store)
+    if cache is None:
+        cache = _row_caches[store] = RowEncodeCache()
+    encoded = cache.encode(store.key, rows)
+    cache.prune(len(store))
+    return encoded
+
+
+def encode_rows(store, rows: List[Dict[str, Any]]) -> bytes:
+    return b'[' + b','.join(encoded_rows(store, rows)) + b']'
+
+
+# Seluruh isi tabel sebagai JSON array, sama dengan encode_rows(store, store.to_list()).
+# Tabel yang membuat dict baru setiap dibaca (columnar.CompactStore / ProjectionStore)
+# memberi nomor tulis per data (stamped_keys): hanya data yang berubah sejak terakhir
+# di-encode yang dibuat ulang sebagai dict (di dalam lock) dan di-encode (di luar lock).
+def encode_table(store) -> bytes:
+    stamped_keys = getattr(store, 'stamped_keys', None)
+    if stamped_keys is None:
+        return encode_rows(store, store.to_list())
+    cache = _row_caches.get(store)
+    if cache is None:
+        cache = _row_caches[store] = RowEncodeCache()
+    with store.lock:
+        stamped = stamped_keys()
+        if stamped is None:
+            rows = store.to_list()
+        else:
+            encoded, missing = cache.lookup(stamped)
+            rows = {key_value: store._rows[key_value] for key_value in missing}
+    if stamped is None:
+        return encode_rows(store, rows)
+    cache.fill(stamped, encoded, rows)
+    cache.prune(len(stamped))
+    return b'[' + b','.join(encoded) + b']'
+
+
+# Membungkus data yang sudah di-encode dengan format ApiResponse
+def api_body(message: str, data: bytes, status: bool = True) -> bytes:
+    return b'{"status":' + (b'true' if status else b'false') + b',"message":' + dumps(message) + b',"data":' + data + b'}'
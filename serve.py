@@ -0,0 +1,36 @@
+import os
+import sys
+
+import uvicorn
+
+
+# Menjalankan API dengan uvicorn.
+#   WEB_CONCURRENCY : jumlah worker (default 1)
+#   PORT / HOST     : alamat server (default 0.0.0.0:8000)
+# Dengan lebih dari satu worker, setiap proses punya memori sendiri sehingga data
+# harus disimpan di backend bersama; STORAGE_BACKEND otomatis menjadi sqlite
+# (file SQLITE_PATH, default government.db). Tanpa WEB_CONCURRENCY tetap satu worker
+# dengan backend memory, jadi tidak ada file database yang dibuat diam-diam.
+def main():
+    workers = int(os.environ.get('WEB_CONCURRENCY') or 1)
+    if workers > 1:
+        backend = os.environ.setdefault('STORAGE_BACKEND', 'sqlite')
+        if backend == 'memory':
+            raise SystemExit("STORAGE_BACKEND=memory tidak bisa dipakai bersama beberapa worker.")
+    # dibaca setelah STORAGE_BACKEND ditentukan, sama seperti yang dipakai setiap worker
+    import storage
+    if storage.STORAGE_BACKEND == 'sqlite':
+        where = f"sqlite ({os.path.abspath(storage.SQLITE_PATH)})"
+    else:
+        where = storage.STORAGE_BACKEND
+    print(f"{workers} worker, backend penyimpanan: {where}", file=sys.stderr, flush=True)
+    uvicorn.run(
+        'main:app',
+        host=os.environ.get('HOST', '0.0.0.0'),
+        port=int(os.environ.get('PORT', 8000)),
+        workers=workers,
+    )
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,488 @@
+import json
+import secrets
+import sqlite3
+import threading
+from typing import Any, Callable, Dict, Iterable, Iterator, List, Mapping, Optional, Sequence, Tuple
+
+from store import Change, DuplicateKeyError, check_if_match
+
+
+def _lower(value: Any) -> str:
+    return str('' if value is None else value).lower()
+
+
+# Koneksi SQLite dipakai ulang per thread (event loop dan threadpool FastAPI
+# masing-masing punya koneksi sendiri). Mode WAL supaya banyak proses / worker
+# bisa membaca bersamaan sambil ada yang menulis.
+# Tabel _changes berisi log perubahan semua tabel (ditulis dalam transaksi yang sama
+# dengan datanya, oleh worker mana pun): seq AUTOINCREMENT naik terus dan tidak pernah
+# dipakai ulang. Hanya change_retention perubahan terakhir yang disimpan; versi tabel yang
+# perubahannya sudah (sebagian) dibuang dicatat di _meta sebagai '_trimmed:<tabel>'.
+class SqliteDatabase:
+    def __init__(self, path: str, change_retention: int = 50000):
+        self.path = path
+        self.change_retention = change_retention
+        self._local = threading.local()
+        self._trim_lock = threading.Lock()
+        self._unchecked = 0  # perubahan yang ditulis proses ini sejak log terakhir dipotong
+        with self.connection() as conn:
+            conn.execute("CREATE TABLE IF NOT EXISTS _meta (name TEXT PRIMARY KEY, version INTEGER NOT NULL)")
+            conn.execute("CREATE TABLE IF NOT EXISTS _changes (seq INTEGER PRIMARY KEY AUTOINCREMENT, "
+                         "tbl TEXT NOT NULL, version INTEGER NOT NULL, old TEXT, new TEXT)")
+            conn.execute("CREATE INDEX IF NOT EXISTS _changes_tbl ON _changes (tbl, version)")
+            # nomor acak database ini (dibuat sekali, sama untuk semua worker), dipakai di ETag
+            # supaya version tabel dari file database yang dibuat ulang tidak dianggap sama
+            conn.execute("INSERT OR IGNORE INTO _meta (name, version) VALUES ('_epoch', ?)",
+                         (secrets.randbits(62),))
+            self.epoch = conn.execute("SELECT version FROM _meta WHERE name = '_epoch'").fetchone()[0]
+
+    def connection(self) -> sqlite3.Connection:
+        conn = getattr(self._local, 'conn', None)
+        if conn is None:
+            conn = sqlite3.connect(self.path, timeout=30, cached_statements=256, check_same_thread=False)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            # lower() versi Python (lower() SQLite hanya untuk huruf ASCII), dipakai trigger proyeksi
+            conn.create_function('py_lower', 1, _lower, deterministic=True)
+            self._local.conn = conn
+        return conn
+
+    # dipanggil setelah transaksi yang menulis count perubahan selesai; log dipotong
+    # sekaligus (bukan per perubahan) setiap kelebihan seperempat retention
+    def wrote_changes(self, count: int):
+        with self._trim_lock:
+            self._unchecked += count
+            if self._unchecked <= self.change_retention // 4:
+                return
+            self._unchecked = 0
+        with self.connection() as conn:
+            conn.execute("BEGIN IMMEDIATE")
+            cutoff = self._last_seq(conn) - self.change_retention
+            conn.execute("INSERT OR REPLACE INTO _meta (name, version) "
+                         "SELECT '_trimmed:' || tbl, MAX(version) FROM _changes WHERE seq <= ? GROUP BY tbl", (cutoff,))
+            conn.execute("DELETE FROM _changes WHERE seq <= ?", (cutoff,))
+
+    @staticmethod
+    def _last_seq(conn: sqlite3.Connection) -> int:
+        found = conn.execute("SELECT seq FROM sqlite_sequence WHERE name = '_changes'").fetchone()
+        return found[0] if found else 0
+
+    # (seq pertama yang masih ada di log, seq terakhir yang pernah ditulis)
+    def change_range(self) -> Tuple[int, int]:
+        conn = self.connection()
+        with conn:
+            conn.execute("BEGIN")
+            return self._change_range(conn)
+
+    def _change_range(self, conn: sqlite3.Connection) -> Tuple[int, int]:
+        last = self._last_seq(conn)
+        first = conn.execute("SELECT MIN(seq) FROM _changes").fetchone()[0]
+        return (last + 1 if first is None else first), last
+
+    # perubahan setelah seq after untuk tabel tables, paling banyak limit, dalam satu snapshot:
+    # (seq pertama, seq terakhir, [(seq, tabel, old, new)]) dengan old / new berupa teks JSON
+    def read_changes(self, after: int, tables: Sequence[str], limit: int) -> Tuple[int, int, List[Tuple]]:
+        conn = self.connection()
+        with conn:
+            conn.execute("BEGIN")
+            first, last = self._change_range(conn)
+            if not first - 1 <= after <= last:
+                return first, last, []
+            sql = (f"SELECT seq, tbl, old, new FROM _changes WHERE seq > ? AND seq <= ? "
+                   f"AND tbl IN ({', '.join('?' * len(tables))}) ORDER BY seq LIMIT ?")
+            return first, last, conn.execute(sql, (after, last, *tables, limit)).fetchall()
+
+    def last_change_seq(self) -> int:
+        return self._last_seq(self.connection())
+
+
+# Tabel yang disimpan di SQLite dengan interface yang sama seperti store.KeyedStore,
+# sehingga handler CRUD tidak perlu diubah. Setiap tabel punya kolom:
+#   seq  : nomor urut (cursor pagination), key : primary key data (unik),
+#   data : isi data dalam JSON, f_<kolom> / p_<kolom> / r_<kolom> : salinan kolom yang
+#   diindeks (r_ berisi nilai urut dari range_indexes, mis. tanggal sebagai ordinal).
+# Semua query memakai SQL yang sama sehingga statement-nya di-cache oleh sqlite3.
+class SqliteStore:
+    shares_rows = False
+
+    def __init__(self, db: SqliteDatabase, name: str, key: str, seed_rows: Iterable[Dict[str, Any]] = (),
+                 indexes: Sequence[str] = (), prefix_indexes: Sequence[str] = (),
+                 range_indexes: Optional[Mapping[str, Callable[[Any], Any]]] = None):
+        self.db = db
+        self.name = name
+        self.key = key
+        self.cache_tag = f'{db.epoch:x}-{name}'
+        self.indexes = tuple(indexes)
+        self.prefix_indexes = tuple(prefix_indexes)
+        self.range_keys: Dict[str, Callable[[Any], Any]] = dict(range_indexes or {})
+        self._listeners: List[Callable[[List[Change], int], None]] = []
+        columns = ([f'f_{field}' for field in self.indexes] + [f'p_{field}' for field in self.prefix_indexes]
+                   + [f'r_{field}' for field in self.range_keys])
+        self._columns = columns
+        extra = ''.join(f', {column}' for column in columns)
+        marks = ', ?' * len(columns)
+        updates = ''.join(f', {column} = excluded.{column}' for column in columns)
+        self._sql_get = f"SELECT data FROM {name} WHERE key = ?"
+        self._sql_insert = f"INSERT INTO {name} (key, data{extra}) VALUES (?, ?{marks})"
+        self._sql_upsert = (f"INSERT INTO {name} (key, data{extra}) VALUES (?, ?{marks}) "
+                            f"ON CONFLICT(key) DO UPDATE SET data = excluded.data{updates}")
+        self._sql_replace = (f"UPDATE {name} SET key = ?, data = ?"
+                             + ''.join(f', {column} = ?' for column in columns) + " WHERE key = ?")
+        self._sql_delete = f"DELETE FROM {name} WHERE key = ?"
+        self._sql_after = f"SELECT seq, data FROM {name} WHERE seq > ? ORDER BY seq LIMIT ?"
+        self._sql_bump = "UPDATE _meta SET version = version + 1 WHERE name = ?"
+        self._sql_change = "INSERT INTO _changes (tbl, version, old, new) VALUES (?, ?, ?, ?)"
+        self._sql_version = "SELECT version FROM _meta WHERE name = ?"
+        with self.db.connection() as conn:
+            conn.execute(f"CREATE TABLE IF NOT EXISTS {name} (seq INTEGER PRIMARY KEY AUTOINCREMENT, "
+                         f"key UNIQUE NOT NULL, data TEXT NOT NULL{extra})")
+            self._add_missing_columns(conn)
+            for column in columns:
+                conn.execute(f"CREATE INDEX IF NOT EXISTS {name}_{column} ON {name} ({column}, seq)")
+            created = conn.execute("INSERT OR IGNORE INTO _meta (name, version) VALUES (?, 0)", (name,)).rowcount
+        # data awal hanya dimasukkan saat tabel pertama kali dibuat
+        if created:
+            self.insert_many(list(seed_rows))
+
+    def _index_values(self, row: Dict[str, Any]) -> Tuple[Any, ...]:
+        return (*(row.get(field) for field in self.indexes),
+                *(_lower(row.get(field)) for field in self.prefix_indexes),
+                *(convert(row.get(field)) for field, convert in self.range_keys.items()))
+
+    def _params(self, row: Dict[str, Any], data: Optional[str] = None) -> Tuple[Any, ...]:
+        return (row[self.key], data or json.dumps(row), *self._index_values(row))
+
+    # tabel dari versi sebelumnya bisa belum punya kolom index yang baru ditambahkan:
+    # kolomnya ditambah lalu diisi dari data yang sudah ada
+    def _add_missing_columns(self, conn: sqlite3.Connection):
+        existing = {info[1] for info in conn.execute(f"PRAGMA table_info({self.name})")}
+        missing = [column for column in self._columns if column not in existing]
+        if not missing:
+            return
+        for column in missing:
+            conn.execute(f"ALTER TABLE {self.name} ADD COLUMN {column}")
+        sql = (f"UPDATE {self.name} SET " + ', '.join(f'{column} = ?' for column in self._columns)
+               + " WHERE seq = ?")
+        rows = conn.execute(f"SELECT seq, data FROM {self.name}").fetchall()
+        conn.executemany(sql, ((*self._index_values(json.loads(data)), seq) for seq, data in rows))
+
+    @property
+    def version(self) -> int:
+        found = self.db.connection().execute(self._sql_version, (self.name,)).fetchone()
+        return found[0] if found else 0
+
+    def __len__(self) -> int:
+        return self.db.connection().execute(f"SELECT COUNT(*) FROM {self.name}").fetchone()[0]
+
+    def __iter__(self) -> Iterator[Dict[str, Any]]:
+        for chunk in self.iter_chunks():
+            yield from chunk
+
+    def __contains__(self, key_value: Any) -> bool:
+        return self.get(key_value) is not None
+
+    def get(self, key_value: Any) -> Optional[Dict[str, Any]]:
+        found = self.db.connection().execute(self._sql_get, (key_value,)).fetchone()
+        return json.loads(found[0]) if found else None
+
+    # listener(changes, version) dipanggil setelah transaksi tulis di worker ini selesai.
+    # version adalah versi tabel hasil transaksi tersebut, sehingga listener bisa
+    # mengetahui jika ada worker lain yang menulis di antaranya (versi melompat).
+    def subscribe(self, listener: Callable[[List[Change], int], None]):
+        self._listeners.append(listener)
+
+    def _bump(self, conn: sqlite3.Connection) -> int:
+        conn.execute(self._sql_bump, (self.name,))
+        return conn.execute(self._sql_version, (self.name,)).fetchone()[0]
+
+    # menaikkan versi tabel dan mencatat perubahan [(old, new)] (teks JSON / None) ke _changes
+    def _commit(self, conn: sqlite3.Connection, changes: List[Tuple[Optional[str], Optional[str]]]) -> int:
+        version = self._bump(conn)
+        name = self.name
+        conn.executemany(self._sql_change, ((name, version, old, new) for old, new in changes))
+        return version
+
+    # perubahan tabel ini setelah versi version (termasuk yang ditulis worker lain), untuk data
+    # turunan yang versinya tertinggal: ([(old, new)], versi terbaru), atau None jika sebagian
+    # perubahan sudah tidak ada di log (data turunan harus dihitung ulang)
+    def changes_since(self, version: int) -> Optional[Tuple[List[Change], int]]:
+        conn = self.db.connection()
+        with conn:
+            conn.execute("BEGIN")
+            trimmed = conn.execute(self._sql_version, ('_trimmed:' + self.name,)).fetchone()
+            if trimmed is not None and trimmed[0] > version:
+                return None
+            found = conn.execute("SELECT version, old, new FROM _changes WHERE tbl = ? AND version > ? ORDER BY seq",
+                                 (self.name, version)).fetchall()
+            current = conn.execute(self._sql_version, (self.name,)).fetchone()
+        changes = []
+        for changed, old, new in found:
+            # setiap versi punya perubahan di log, jadi versi yang hilang berarti log tidak lengkap
+            if changed != version:
+                if changed != version + 1:
+                    return None
+                version = changed
+            changes.append((old and json.loads(old), new and json.loads(new)))
+        if current is None or current[0] != version:
+            return None
+        return changes, version
+
+    def _notify(self, changes: List[Change], version: int):
+        for listener in self._listeners:
+            listener(changes, version)
+
+    # data lama (teks JSON) untuk beberapa key sekaligus
+    def _get_many(self, conn: sqlite3.Connection, keys: List[Any]) -> Dict[Any, str]:
+        found = {}
+        for start in range(0, len(keys), 500):
+            part = keys[start:start + 500]
+            sql = f"SELECT key, data FROM {self.name} WHERE key IN ({', '.join('?' * len(part))})"
+            found.update(conn.execute(sql, part))
+        return found
+
+    def insert(self, row: Dict[str, Any]) -> Dict[str, Any]:
+        data = json.dumps(row)
+        try:
+            with self.db.connection() as conn:
+                conn.execute(self._sql_insert, self._params(row, data))
+                version = self._commit(conn, [(None, data)])
+        except sqlite3.IntegrityError:
+            raise DuplicateKeyError(row[self.key])
+        self.db.wrote_changes(1)
+        self._notify([(None, row)], version)
+        return row
+
+    def upsert(self, row: Dict[str, Any]) -> Dict[str, Any]:
+        data = json.dumps(row)
+        with self.db.connection() as conn:
+            conn.execute("BEGIN IMMEDIATE")
+            found = conn.execute(self._sql_get, (row[self.key],)).fetchone()
+            conn.execute(self._sql_upsert, self._params(row, data))
+            version = self._commit(conn, [(found and found[0], data)])
+        self.db.wrote_changes(1)
+        self._notify([(found and json.loads(found[0]), row)], version)
+        return row
+
+    # if_match dicek di dalam transaksi BEGIN IMMEDIATE (lock tulis database), sehingga
+    # tidak ada worker lain yang bisa mengubah data di antara pengecekan dan penulisan
+    def replace(self, key_value: Any, row: Dict[str, Any], if_match: Optional[str] = None) -> Optional[Dict[str, Any]]:
+        try:
+            with self.db.connection() as conn:
+                conn.execute("BEGIN IMMEDIATE")
+                found = conn.execute(self._sql_get, (key_value,)).fetchone()
+                if found is None:
+                    return None
+                old = json.loads(found[0])
+                check_if_match(if_match, old)
+                data = json.dumps(row)
+                conn.execute(self._sql_replace, (*self._params(row, data), key_value))
+                version = self._commit(conn, [(found[0], data)])
+        except sqlite3.IntegrityError:
+            raise DuplicateKeyError(row[self.key])
+        self.db.wrote_changes(1)
+        self._notify([(old, row)], version)
+        return row
+
+    def delete(self, key_value: Any, if_match: Optional[str] = None) -> Optional[Dict[str, Any]]:
+        with self.db.connection() as conn:
+            conn.execute("BEGIN IMMEDIATE")
+            found = conn.execute(self._sql_get, (key_value,)).fetchone()
+            if found is None:
+                return None
+            old = json.loads(found[0])
+            check_if_match(if_match, old)
+            conn.execute(self._sql_delete, (key_value,))
+            version = self._commit(conn, [(found[0], None)])
+        self.db.wrote_changes(1)
+        self._notify([(old, None)], version)
+        return old
+
+    def conflicts(self, rows: List[Dict[str, Any]]) -> List[int]:
+        keys = [row[self.key] for row in rows]
+        existing = set()
+        conn = self.db.connection()
+        for start in range(0, len(keys), 500):
+            part = keys[start:start + 500]
+            sql = f"SELECT key FROM {self.name} WHERE key IN ({', '.join('?' * len(part))})"
+            existing.update(found[0] for found in conn.execute(sql, part))
+        seen = set()
+        bad = []
+        for i, key_value in enumerate(keys):
+            if key_value in existing or key_value in seen:
+                bad.append(i)
+            else:
+                seen.add(key_value)
+        return bad
+
+    # batch kosong tidak menaikkan versi, jadi setiap versi punya perubahan di _changes
+    def insert_many(self, rows: List[Dict[str, Any]]) -> int:
+        if not rows:
+            return 0
+        data = [json.dumps(row) for row in rows]
+        try:
+            with self.db.connection() as conn:
+                conn.executemany(self._sql_insert, (self._params(row, text) for row, text in zip(rows, data)))
+                version = self._commit(conn, [(None, text) for text in data])
+        except sqlite3.IntegrityError as e:
+            raise DuplicateKeyError(str(e))
+        self.db.wrote_changes(len(rows))
+        if self._listeners:
+            self._notify([(None, row) for row in rows], version)
+        return len(rows)
+
+    def upsert_many(self, rows: List[Dict[str, Any]]) -> int:
+        if not rows:
+            return 0
+        data = [json.dumps(row) for row in rows]
+        changes = []
+        with self.db.connection() as conn:
+            conn.execute("BEGIN IMMEDIATE")
+            current = self._get_many(conn, [row[self.key] for row in rows])
+            for row, text in zip(rows, data):
+                changes.append((current.get(row[self.key]), text))
+                current[row[self.key]] = text
+            conn.executemany(self._sql_upsert, (self._params(row, text) for row, text in zip(rows, data)))
+            version = self._commit(conn, changes)
+        self.db.wrote_changes(len(rows))
+        if self._listeners:
+            self._notify([(old and json.loads(old), row) for (old, _), row in zip(changes, rows)], version)
+        return len(rows)
+
+    def delete_many(self, keys: Iterable[Any]) -> int:
+        keys = list(keys)
+        with self.db.connection() as conn:
+            conn.execute("BEGIN IMMEDIATE")
+            old = self._get_many(conn, keys)
+            if not old:
+                return 0
+            conn.executemany(self._sql_delete, ((key_value,) for key_value in old))
+            version = self._commit(conn, [(text, None) for text in old.values()])
+        self.db.wrote_changes(len(old))
+        if self._listeners:
+            self._notify([(json.loads(text), None) for text in old.values()], version)
+        return len(old)
+
+    def update_many(self, updates: Dict[Any, Dict[str, Any]]) -> int:
+        with self.db.connection() as conn:
+            conn.execute("BEGIN IMMEDIATE")
+            current = self._get_many(conn, list(updates))
+            changes, texts = [], []
+            for key_value, text in current.items():
+                old = json.loads(text)
+                row = {**old, **updates[key_value]}
+                row[self.key] = key_value
+                changes.append((old, row))
+                texts.append((text, json.dumps(row)))
+            if not changes:
+                return 0
+            conn.executemany(self._sql_replace, ((*self._params(row, new), row[self.key])
+                                                 for (_, row), (_, new) in zip(changes, texts)))
+            version = self._commit(conn, texts)
+        self.db.wrote_changes(len(changes))
+        self._notify(changes, version)
+        return len(changes)
+
+    def _where(self, filters: Dict[str, Any], prefix: Optional[Tuple[str, str]],
+               ranges: Optional[Dict[str, Tuple[Any, Any]]] = None) -> Tuple[str, List[Any]]:
+        clauses, params = [], []
+        for field, (low, high) in (ranges or {}).items():
+            if field not in self.range_keys:
+                raise KeyError(field)
+            if low is not None:
+                clauses.append(f'r_{field} >= ?')
+                params.append(low)
+            if high is not None:
+                clauses.append(f'r_{field} <= ?')
+                params.append(high)
+        for field, value in filters.items():
+            if value is None:
+                continue
+            if field in self.indexes:
+                clauses.append(f'f_{field} = ?')
+            else:
+                clauses.append(f"json_extract(data, '$.{field}') = ?")
+            params.append(value)
+        if prefix is not None and prefix[1]:
+            field, text = prefix
+            text = text.lower()
+            if field in self.prefix_indexes:
+                # range scan pada index: awalan <= nilai < awalan + karakter terbesar
+                clauses.append(f'p_{field} >= ? AND p_{field} < ?')
+                params.extend([text, text + '\U0010ffff'])
+            else:
+                clauses.append(f"lower(json_extract(data, '$.{field}')) LIKE ? ESCAPE '\\'")
+                params.append(text.replace('\\', '\\\\').replace('%', '\\%').replace('_', '\\_') + '%')
+        return ' AND '.join(clauses) or '1', params
+
+    def query(self, filters: Dict[str, Any], prefix: Optional[Tuple[str, str]] = None,
+              ranges: Optional[Dict[str, Tuple[Any, Any]]] = None) -> List[Dict[str, Any]]:
+        return self.page(0, None, filters, prefix, ranges)[0]
+
+    def page(self, after: int = 0, limit: Optional[int] = None, filters: Optional[Dict[str, Any]] = None,
+             prefix: Optional[Tuple[str, str]] = None,
+             ranges: Optional[Dict[str, Tuple[Any, Any]]] = None) -> Tuple[List[Dict[str, Any]], Optional[int]]:
+        where, params = self._where(filters or {}, prefix, ranges)
+        sql = f"SELECT seq, data FROM {self.name} WHERE seq > ? AND {where} ORDER BY seq LIMIT ?"
+        found = self.db.connection().execute(sql, (after, *params, -1 if limit is None else limit + 1)).fetchall()
+        next_cursor = None
+        if limit is not None and len(found) > limit:
+            found = found[:limit]
+            next_cursor = found[-1][0]
+        return [json.loads(data) for _, data in found], next_cursor
+
+    # data pertama (urutan seq) dengan kolom field bernilai value; dengan index (f_<kolom>, seq)
+    # cukup membaca satu entri index
+    def first(self, field: str, value: Any) -> Optional[Dict[str, Any]]:
+        found = self.page(0, 1, {field: value})[0]
+        return found[0] if found else None
+
+    def iter_chunks(self, chunk_size: int = 1000, after: int = 0) -> Iterator[List[Dict[str, Any]]]:
+        while True:
+            found = self.db.connection().execute(self._sql_after, (after, chunk_size)).fetchall()
+            if not found:
+                return
+            after = found[-1][0]
+            yield [json.loads(data) for _, data in found]
+
+    def to_list(self) -> List[Dict[str, Any]]:
+        return [row for chunk in self.iter_chunks(10000) for row in chunk]
+
+
+# Tabel proyeksi untuk backend SQLite (padanan columnar.ProjectionStore): sebagian kolom
+# (fields) data tabel induk dengan key yang sama. Data disimpan di tabel sendiri, dan
+# trigger pada tabel induk memperbarui data yang mengikuti induknya saat data induk diubah,
+# dalam transaksi yang sama dan dari worker mana pun: versi tabel ini naik dan perubahannya
+# dicatat di _changes. Data mengikuti induknya jika isi kolom fields sama dengan data induk
+# sebelum diubah; data yang ditulis berbeda dari induk tetap seperti yang ditulis. Jika data
+# induk dihapus / diganti key, data di sini tetap ada dengan isi terakhirnya.
+class SqliteProjectionStore(SqliteStore):
+    def __init__(self, db: SqliteDatabase, name: str, base: SqliteStore, fields: Sequence[str],
+                 seed_rows: Iterable[Dict[str, Any]] = (), indexes: Sequence[str] = (),
+                 prefix_indexes: Sequence[str] = ()):
+        self.base = base
+        self.fields = tuple(fields)
+        super().__init__(db, name, base.key, seed_rows, indexes, prefix_indexes)
+        with self.db.connection() as conn:
+            conn.execute("BEGIN IMMEDIATE")
+            conn.execute(f"DROP TRIGGER IF EXISTS {name}_follow_{base.name}")
+            conn.execute(self._trigger_sql())
+
+    def _trigger_sql(self) -> str:
+        name, base = self.name, self.base.name
+
+        def field(row: str, field: str) -> str:
+            return f"json_extract({row}.data, '$.{field}')"
+
+        projected = 'json_object(' + ', '.join(f"'{f}', {field('NEW', f)}" for f in self.fields) + ')'
+        follows = "key = OLD.key AND " + ' AND '.join(f"{field(name, f)} IS {field('OLD', f)}" for f in self.fields)
+        changed = ' OR '.join(f"{field('OLD', f)} IS NOT {field('NEW', f)}" for f in self.fields)
+        columns = ([f"f_{f} = {field('NEW', f)}" for f in self.indexes]
+                   + [f"p_{f} = py_lower({field('NEW', f)})" for f in self.prefix_indexes])
+        return (f"CREATE TRIGGER {name}_follow_{base} AFTER UPDATE OF data ON {base} "
+                f"WHEN OLD.key = NEW.key AND ({changed}) BEGIN "
+                f"UPDATE _meta SET version = version + 1 WHERE name = '{name}' "
+                f"AND EXISTS (SELECT 1 FROM {name} WHERE {follows}); "
+                f"INSERT INTO _changes (tbl, version, old, new) SELECT '{name}', "
+                f"(SELECT version FROM _meta WHERE name = '{name}'), data, {projected} FROM {name} WHERE {follows}; "
+                f"UPDATE {name} SET {', '.join(['data = ' + projected] + columns)} WHERE {follows}; "
+                f"END")
@@ -0,0 +1,52 @@
+import os
+
+from columnar import CompactStore, ProjectionStore
+from store import KeyedStore
+
+
+# Backend penyimpanan tabel dipilih lewat environment variable:
+#   STORAGE_BACKEND=memory (default) : KeyedStore in-memory, hilang saat restart
+#   STORAGE_BACKEND=sqlite           : SQLite mode WAL di SQLITE_PATH, dipakai bersama semua worker
+STORAGE_BACKEND = os.environ.get('STORAGE_BACKEND', 'memory')
+SQLITE_PATH = os.environ.get('SQLITE_PATH', 'government.db')
+
+_database = None
+
+
+# database SQLite bersama semua worker (None untuk backend memory)
+def shared_database():
+    global _database
+    if STORAGE_BACKEND != 'sqlite':
+        return None
+    if _database is None:
+        from sqlite_store import SqliteDatabase
+        _database = SqliteDatabase(SQLITE_PATH, change_retention=int(os.environ.get('CHANGEFEED_RETENTION', 50000)))
+    return _database
+
+
+# Membuka tabel dengan nama tertentu. seed_rows hanya dipakai untuk isi awal tabel baru.
+# columns: kolom tetap tabel; jika diisi, backend memory menyimpan data per kolom (CompactStore)
+# dengan kolom categorical di-dictionary-encode.
+def open_store(name, key, seed_rows=(), indexes=(), prefix_indexes=(), range_indexes=None,
+               columns=None, categorical=()):
+    if STORAGE_BACKEND == 'sqlite':
+        from sqlite_store import SqliteStore
+        return SqliteStore(shared_database(), name, key, seed_rows, indexes, prefix_indexes, range_indexes)
+    if STORAGE_BACKEND != 'memory':
+        raise ValueError(f"STORAGE_BACKEND tidak dikenal: {STORAGE_BACKEND}")
+    if columns is not None:
+        return CompactStore(key, columns, categorical, seed_rows, indexes, prefix_indexes, range_indexes)
+    return KeyedStore(key, seed_rows, indexes, prefix_indexes, range_indexes)
+
+
+# Membuka tabel berisi sebagian data dan kolom (fields) tabel base dengan key yang sama;
+# perubahan data base ikut terlihat di tabel ini.
+# Backend memory: ProjectionStore, data yang sama dengan base tidak disalin.
+# Backend SQLite: SqliteProjectionStore, tabel sendiri yang diperbarui trigger pada tabel base.
+def open_projection(name, base, fields, seed_rows=(), indexes=(), prefix_indexes=()):
+    if STORAGE_BACKEND == 'sqlite':
+        from sqlite_store import SqliteProjectionStore
+        return SqliteProjectionStore(shared_database(), name, base, fields, seed_rows, indexes, prefix_indexes)
+    if STORAGE_BACKEND != 'memory':
+        raise ValueError(f"STORAGE_BACKEND tidak dikenal: {STORAGE_BACKEND}")
+    return ProjectionStore(base, fields, seed_rows, indexes, prefix_indexes)
@@ -0,0 +1,607 @@
+import contextlib
+import functools
+import gc
+import hashlib
+import json
+import secrets
+import threading
+from bisect import bisect_left, bisect_right, insort
+from itertools import islice
+from typing import Any, Callable, Dict, Iterable, Iterator, List, Mapping, Optional, Sequence, Set, Tuple
+
+
+# perubahan satu data: (data lama, data baru)
+Change = Tuple[Optional[Dict[str, Any]], Optional[Dict[str, Any]]]
+
+
+# Error ketika key (id_pajak / nik / id_setoran) sudah ada di dalam tabel
+class DuplicateKeyError(KeyError):
+    pass
+
+
+# Error ketika header If-Match tidak cocok dengan ETag data saat ini
+class PreconditionFailed(Exception):
+    pass
+
+
+# ETag (strong) sebuah data, dihitung dari isinya sehingga sama di semua worker / backend
+def row_etag(row: Dict[str, Any]) -> str:
+    encoded = json.dumps(row, sort_keys=True, separators=(',', ':'), default=str).encode()
+    return '"' + hashlib.sha1(encoded).hexdigest()[:24] + '"'
+
+
+# Mengecek header If-Match terhadap data saat ini ('*' berarti data apa saja asal ada)
+def check_if_match(if_match: Optional[str], row: Dict[str, Any]):
+    if if_match is None or if_match.strip() == '*':
+        return
+    tags = {tag.strip() for tag in if_match.split(',')}
+    if row_etag(row) not in tags:
+        raise PreconditionFailed(row_etag(row))
+
+
+# semua perubahan (dan pembacaan yang mengiterasi index) dijalankan di bawah lock tabel,
+# karena handler sync FastAPI berjalan paralel di threadpool
+_gc_lock = threading.Lock()
+_gc_pauses = 0
+
+
+# Batch besar membuat jutaan dict / tuple baru sekaligus. Selama batch berjalan garbage
+# collector siklik dimatikan supaya tidak berulang kali memindai seluruh tabel
+# (data tabel tidak membentuk referensi siklik, jadi tidak ada yang tertunda dibersihkan).
+@contextlib.contextmanager
+def paused_gc():
+    global _gc_pauses
+    with _gc_lock:
+        # jika gc sudah dimatikan oleh kode lain, biarkan seperti itu
+        paused = _gc_pauses > 0 or gc.isenabled()
+        if paused:
+            _gc_pauses += 1
+            gc.disable()
+    try:
+        yield
+    finally:
+        if paused:
+            with _gc_lock:
+                _gc_pauses -= 1
+                if _gc_pauses == 0:
+                    gc.enable()
+
+
+# Index terurut (prefix / range): daftar (nilai urut, key) yang dipecah per blok berisi
+# paling banyak 2 * LOAD entry. Menambah / menghapus satu entry hanya menggeser isi satu
+# blok (bukan seluruh daftar yang panjangnya sebanyak data tabel).
+class _SortedEntries:
+    LOAD = 1000
+
+    def __init__(self):
+        self._blocks: List[List[Tuple[Any, Any]]] = []
+        # entry terakhir (terbesar) setiap blok, untuk mencari blok dengan bisect
+        self._maxes: List[Tuple[Any, Any]] = []
+        self._len = 0
+
+    def __len__(self) -> int:
+        return self._len
+
+    def __iter__(self) -> Iterator[Tuple[Any, Any]]:
+        for block in self._blocks:
+            yield from block
+
+    def add(self, entry: Tuple[Any, Any]):
+        blocks, maxes = self._blocks, self._maxes
+        self._len += 1
+        if not blocks:
+            blocks.append([entry])
+            maxes.append(entry)
+            return
+        i = bisect_left(maxes, entry)
+        if i == len(blocks):
+            i -= 1
+            blocks[i].append(entry)
+            maxes[i] = entry
+        else:
+            insort(blocks[i], entry)
+        block = blocks[i]
+        if len(block) > 2 * self.LOAD:
+            blocks[i:i + 1] = [block[:self.LOAD], block[self.LOAD:]]
+            maxes[i:i + 1] = [block[self.LOAD - 1], block[-1]]
+
+    def discard(self, entry: Tuple[Any, Any]):
+        i = bisect_left(self._maxes, entry)
+        if i == len(self._blocks):
+            return
+        block = self._blocks[i]
+        j = bisect_left(block, entry)
+        if block[j] != entry:
+            return
+        del block[j]
+        self._len -= 1
+        if not block:
+            del self._blocks[i]
+            del self._maxes[i]
+        elif j == len(block):
+            self._maxes[i] = block[-1]
+
+    # entry mulai dari yang pertama >= start, berurutan
+    def irange(self, start: Tuple[Any, ...]) -> Iterator[Tuple[Any, Any]]:
+        i = bisect_left(self._maxes, start)
+        if i == len(self._blocks):
+            return
+        block = self._blocks[i]
+        yield from islice(block, bisect_left(block, start), None)
+        for block in islice(self._blocks, i + 1, None):
+            yield from block
+
+    # operasi batch: membuang entry gone dan menambah entry added, diurutkan ulang sekali
+    def update(self, gone: Set[Tuple[Any, Any]], added: Iterable[Tuple[Any, Any]]):
+        entries = [entry for entry in self if entry not in gone] if gone else list(self)
+        entries.extend(added)
+        entries.sort()
+        self._blocks = [entries[i:i + self.LOAD] for i in range(0, len(entries), self.LOAD)]
+        self._maxes = [block[-1] for block in self._blocks]
+        self._len = len(entries)
+
+
+def _locked(method):
+    @functools.wraps(method)
+    def wrapper(self, *args, **kwargs):
+        with self._lock:
+            return method(self, *args, **kwargs)
+    return wrapper
+
+
+# Tabel in-memory yang diindeks dengan hash (dict) berdasarkan satu kolom key.
+# get / insert / upsert / delete O(1), iterasi tetap sesuai urutan insert.
+# indexes: kolom yang diberi index hash (nilai -> kumpulan key) untuk filter,
+# prefix_indexes: kolom yang diberi index terurut untuk pencarian awalan (prefix).
+# range_indexes: kolom -> fungsi pengubah nilai menjadi nilai yang bisa diurutkan
+# (mis. tanggal 'DD-MM-YYYY' -> ordinal), diberi index terurut untuk query rentang.
+# Setiap data mendapat nomor urut (seq) yang naik terus dan tidak pernah dipakai
+# ulang, dipakai sebagai cursor pagination yang tetap valid walau ada insert/delete.
+# version naik setiap kali isi tabel berubah, dipakai untuk invalidasi data turunan.
+class KeyedStore:
+    # baris yang dikembalikan adalah dict yang disimpan (bukan salinan); setiap perubahan
+    # menyimpan dict baru, sehingga hasil encode per baris bisa di-cache (serialization.py)
+    shares_rows = True
+
+    def __init__(self, key: str, rows: Iterable[Dict[str, Any]] = (),
+                 indexes: Sequence[str] = (), prefix_indexes: Sequence[str] = (),
+                 range_indexes: Optional[Mapping[str, Callable[[Any], Any]]] = None):
+        self.key = key
+        self._rows = self._new_rows()
+        # dict dipakai sebagai ordered set supaya hasil filter tetap berurutan
+        self._indexes: Dict[str, Dict[Any, Dict[Any, None]]] = {field: {} for field in indexes}
+        self._prefix_indexes: Dict[str, _SortedEntries] = {field: _SortedEntries() for field in prefix_indexes}
+        self.range_keys: Dict[str, Callable[[Any], Any]] = dict(range_indexes or {})
+        self._range_indexes: Dict[str, _SortedEntries] = {field: _SortedEntries() for field in self.range_keys}
+        self._sorted = self._sorted_indexes()
+        # (kolom, nilai) index hash yang isinya tidak lagi urut seq (ada key lama yang masuk
+        # ulang di belakang); diurutkan ulang saat first() membutuhkannya
+        self._unordered: Set[Tuple[str, Any]] = set()
+        # False selama operasi batch: index terurut diurutkan ulang sekali di akhir batch
+        self._sorted_per_row = True
+        self._seq: Dict[Any, int] = {}
+        self._by_seq: Dict[int, Any] = {}
+        # daftar seq yang selalu terurut; seq yang sudah dihapus dibersihkan secara berkala
+        self._order: List[int] = []
+        self._next_seq = 1
+        self._removed = 0
+        self.version = 0
+        # pembeda tabel ini untuk ETag / cache body (version saja bisa sama antar tabel / restart)
+        self.cache_tag = secrets.token_hex(6)
+        self._lock = threading.RLock()
+        self._listeners: List[Callable[[List[Change], int], None]] = []
+        # data awal dimasukkan sebagai satu batch (index terurut cukup diurutkan sekali)
+        self.insert_many(list(rows))
+
+    # tempat penyimpanan data (key -> data); diganti subclass dengan penyimpanan yang lebih hemat
+    def _new_rows(self) -> Dict[Any, Dict[str, Any]]:
+        return {}
+
+    # lock tulis tabel, dipakai juga oleh data turunan yang diperbarui lewat subscribe()
+    @property
+    def lock(self) -> threading.RLock:
+        return self._lock
+
+    def __len__(self) -> int:
+        return len(self._rows)
+
+    def __iter__(self) -> Iterator[Dict[str, Any]]:
+        return iter(self._rows.values())
+
+    def __contains__(self, key_value: Any) -> bool:
+        return key_value in self._rows
+
+    def get(self, key_value: Any) -> Optional[Dict[str, Any]]:
+        return self._rows.get(key_value)
+
+    # menambah data baru, key harus unik
+    @_locked
+    def insert(self, row: Dict[str, Any]) -> Dict[str, Any]:
+        key_value = row[self.key]
+        if key_value in self._rows:
+            raise DuplicateKeyError(key_value)
+        self._rows[key_value] = row
+        self._seq_add(key_value)
+        self._index_add(key_value, row)
+        self.version += 1
+        self._notify([(None, row)])
+        return row
+
+    # menambah atau menimpa data dengan key yang sama
+    @_locked
+    def upsert(self, row: Dict[str, Any]) -> Dict[str, Any]:
+        key_value = row[self.key]
+        old = self._rows.get(key_value)
+        self._rows[key_value] = row
+        if old is not None:
+            self._index_replace(key_value, old, key_value, row)
+        else:
+            self._seq_add(key_value)
+            self._index_add(key_value, row)
+        self.version += 1
+        self._notify([(old, row)])
+        return row
+
+    # mengganti data dengan key lama, key baru boleh berbeda asal belum dipakai
+    @_locked
+    # if_match: isi header If-Match, PreconditionFailed jika data sudah diubah request lain
+    def replace(self, key_value: Any, row: Dict[str, Any], if_match: Optional[str] = None) -> Optional[Dict[str, Any]]:
+        old = self._rows.get(key_value)
+        if old is None:
+            return None
+        check_if_match(if_match, old)
+        new_key = row[self.key]
+        if new_key != key_value:
+            if new_key in self._rows:
+                raise DuplicateKeyError(new_key)
+            del self._rows[key_value]
+            self._seq_remove(key_value)
+            self._seq_add(new_key)
+        self._rows[new_key] = row
+        self._index_replace(key_value, old, new_key, row)
+        self.version += 1
+        self._notify([(old, row)])
+        return row
+
+    # menghapus data, mengembalikan data yang dihapus (None jika tidak ada)
+    @_locked
+    def delete(self, key_value: Any, if_match: Optional[str] = None) -> Optional[Dict[str, Any]]:
+        old = self._rows.get(key_value)
+        if old is not None:
+            check_if_match(if_match, old)
+            del self._rows[key_value]
+            self._seq_remove(key_value)
+            self._index_remove(key_value, old)
+            self.version += 1
+            self._notify([(old, None)])
+        return old
+
+    # mengambil satu halaman data setelah cursor (seq terakhir halaman sebelumnya).
+    # filters / prefix / ranges sama seperti query() jika ingin mem-pagination hasil filter.
+    # Mengembalikan (data, cursor halaman berikutnya atau None jika sudah habis).
+    @_locked
+    def page(self, after: int = 0, limit: Optional[int] = None, filters: Optional[Dict[str, Any]] = None,
+             prefix: Optional[Tuple[str, str]] = None,
+             ranges: Optional[Dict[str, Tuple[Any, Any]]] = None) -> Tuple[List[Dict[str, Any]], Optional[int]]:
+        if filters or prefix or ranges:
+            rows = self.query(filters or {}, prefix, ranges)
+            seqs = [s for s in (self._seq[row[self.key]] for row in rows) if s > after]
+        else:
+            seqs = self._seqs_after(after, None if limit is None else limit + 1)
+        if limit is None or len(seqs) <= limit:
+            next_cursor = None
+        else:
+            seqs = seqs[:limit]
+            next_cursor = seqs[-1]
+        return [self._rows[self._by_seq[s]] for s in seqs], next_cursor
+
+    # data pertama (urutan tabel / seq) dengan kolom field bernilai value, langsung dari index
+    # hash kolom tersebut tanpa mengumpulkan semua data yang cocok; kolom tanpa index dicari
+    # dengan memindai tabel. None jika tidak ada.
+    @_locked
+    def first(self, field: str, value: Any) -> Optional[Dict[str, Any]]:
+        index = self._indexes.get(field)
+        if index is None:
+            return next((row for row in self._rows.values() if row.get(field) == value), None)
+        keys = index.get(value)
+        if not keys:
+            return None
+        if (field, value) in self._unordered:
+            # sekali diurutkan, first() berikutnya O(1) sampai ada key lama yang masuk ulang
+            keys = index[value] = dict.fromkeys(sorted(keys, key=self._seq.__getitem__))
+            self._unordered.discard((field, value))
+        return self._rows[next(iter(keys))]
+
+    # iterasi semua data per potongan (chunk); aman walau tabel berubah di tengah iterasi
+    def iter_chunks(self, chunk_size: int = 1000, after: int = 0) -> Iterator[List[Dict[str, Any]]]:
+        while True:
+            with self._lock:
+                seqs = self._seqs_after(after, chunk_size)
+                chunk = [self._rows[self._by_seq[s]] for s in seqs]
+            if not seqs:
+                return
+            after = seqs[-1]
+            yield chunk
+
+    def _seqs_after(self, after: int, limit: Optional[int]) -> List[int]:
+        seqs = []
+        order = self._order
+        for i in range(bisect_right(order, after), len(order)):
+            s = order[i]
+            if s in self._by_seq:
+                seqs.append(s)
+                if limit is not None and len(seqs) >= limit:
+                    break
+        return seqs
+
+    def _seq_add(self, key_value: Any):
+        s = self._next_seq
+        self._next_seq += 1
+        self._seq[key_value] = s
+        self._by_seq[s] = key_value
+        self._order.append(s)
+
+    def _seq_remove(self, key_value: Any):
+        del self._by_seq[self._seq.pop(key_value)]
+        self._removed += 1
+        # bersihkan seq yang sudah dihapus jika jumlahnya lebih dari separuh
+        if self._removed > 64 and self._removed > len(self._by_seq):
+            self._order = [s for s in self._order if s in self._by_seq]
+            self._removed = 0
+
+    # index baris-baris (dalam rows) yang key-nya sudah ada di tabel atau muncul dua kali di rows
+    @_locked
+    def conflicts(self, rows: List[Dict[str, Any]]) -> List[int]:
+        seen = set()
+        bad = []
+        for i, row in enumerate(rows):
+            key_value = row[self.key]
+            if key_value in self._rows or key_value in seen:
+                bad.append(i)
+            else:
+                seen.add(key_value)
+        return bad
+
+    # operasi batch: key dicek sekaligus di awal sehingga tidak ada data yang berubah
+    # jika ada yang bentrok, dan index prefix cukup diurutkan ulang sekali per batch
+    @_locked
+    def insert_many(self, rows: List[Dict[str, Any]]) -> int:
+        bad = self.conflicts(rows)
+        if bad:
+            raise DuplicateKeyError(rows[bad[0]][self.key])
+        for row in rows:
+            key_value = row[self.key]
+            self._rows[key_value] = row
+            self._seq_add(key_value)
+        self._apply_index_batch([], [(row[self.key], row) for row in rows])
+        self.version += 1
+        if self._listeners:
+            self._notify([(None, row) for row in rows])
+        return len(rows)
+
+    @_locked
+    def upsert_many(self, rows: List[Dict[str, Any]]) -> int:
+        removed = []
+        changes = []
+        for row in rows:
+            key_value = row[self.key]
+            old = self._rows.get(key_value)
+            if old is not None:
+                removed.append((key_value, old))
+            else:
+                self._seq_add(key_value)
+            self._rows[key_value] = row
+            changes.append((old, row))
+        # baris dengan key sama di dalam batch: yang terakhir yang dipakai
+        latest = {row[self.key]: row for row in rows}
+        self._apply_index_batch(removed, list(latest.items()))
+        self.version += 1
+        self._notify(changes)
+        return len(rows)
+
+    @_locked
+    def delete_many(self, keys: Iterable[Any]) -> int:
+        removed = []
+        for key_value in keys:
+            old = self._rows.pop(key_value, None)
+            if old is not None:
+                self._seq_remove(key_value)
+                removed.append((key_value, old))
+        if removed:
+            self._apply_index_batch(removed, [])
+            self.version += 1
+            if self._listeners:
+                self._notify([(old, None) for _, old in removed])
+        return len(removed)
+
+    # mengubah sebagian kolom banyak data sekaligus: updates = {key: {kolom: nilai baru}}.
+    # Key data tidak boleh diubah; hanya index kolom yang nilainya benar-benar berubah
+    # yang diperbarui (index terurut kolom lain tidak diurutkan ulang).
+    @_locked
+    def update_many(self, updates: Dict[Any, Dict[str, Any]]) -> int:
+        indexed = set(self._indexes) | set(self._prefix_indexes) | set(self._range_indexes)
+        changes = []
+        moved: Dict[str, List[Tuple[Any, Dict[str, Any], Dict[str, Any]]]] = {}
+        for key_value, fields in updates.items():
+            old = self._rows.get(key_value)
+            if old is None:
+                continue
+            row = {**old, **fields}
+            row[self.key] = key_value
+            self._rows[key_value] = row
+            changes.append((old, row))
+            for field in indexed:
+                if field in fields and old.get(field) != row.get(field):
+                    moved.setdefault(field, []).append((key_value, old, row))
+        for field, rows in moved.items():
+            self._reindex_field(field, rows)
+        if changes:
+            self.version += 1
+            self._notify(changes)
+        return len(changes)
+
+    def _reindex_field(self, field: str, rows: List[Tuple[Any, Dict[str, Any], Dict[str, Any]]]):
+        index = self._indexes.get(field)
+        if index is not None:
+            for key_value, old, row in rows:
+                keys = index.get(old.get(field))
+                if keys is not None:
+                    keys.pop(key_value, None)
+                    if not keys:
+                        del index[old.get(field)]
+                self._bucket_add(field, index, row.get(field), key_value)
+        for sorted_field, entries, sort_value in self._sorted:
+            if sorted_field != field:
+                continue
+            entries.update({(sort_value(old), key_value) for key_value, old, _ in rows},
+                           [(sort_value(row), key_value) for key_value, _, row in rows])
+
+    # listener(changes, version) dipanggil setelah setiap operasi tulis (masih di dalam lock),
+    # changes berisi pasangan (data lama, data baru); None untuk data yang ditambah / dihapus
+    def subscribe(self, listener: Callable[[List[Change], int], None]):
+        self._listeners.append(listener)
+
+    def _notify(self, changes: List[Change]):
+        for listener in self._listeners:
+            listener(changes, self.version)
+
+    def _apply_index_batch(self, removed: List[Tuple[Any, Dict[str, Any]]], added: List[Tuple[Any, Dict[str, Any]]]):
+        self._sorted_per_row = False
+        try:
+            for key_value, row in removed:
+                self._index_remove(key_value, row)
+            for key_value, row in added:
+                self._index_add(key_value, row)
+        finally:
+            self._sorted_per_row = True
+        for _, entries, sort_value in self._sorted:
+            entries.update({(sort_value(row), key_value) for key_value, row in removed},
+                           [(sort_value(row), key_value) for key_value, row in added])
+
+    # index terurut (prefix dan range): (kolom, daftar (nilai urut, key), fungsi nilai urut sebuah data)
+    def _sorted_indexes(self) -> List[Tuple[str, _SortedEntries, Callable[[Dict[str, Any]], Any]]]:
+        indexes = []
+        for field, entries in self._prefix_indexes.items():
+            indexes.append((field, entries, lambda row, field=field: str(row.get(field, '')).lower()))
+        for field, entries in self._range_indexes.items():
+            convert = self.range_keys[field]
+            indexes.append((field, entries, lambda row, field=field, convert=convert: convert(row.get(field))))
+        return indexes
+
+    # mencari data dengan filter kolom yang sama persis (filters), awalan teks
+    # (prefix = (kolom, teks)) dan/atau rentang nilai kolom range_indexes
+    # (ranges = {kolom: (low, high)}, inklusif). Index dengan kandidat paling sedikit dipakai
+    # sebagai titik awal, sehingga biaya query sebanding dengan jumlah hasil.
+    @_locked
+    def query(self, filters: Dict[str, Any], prefix: Optional[Tuple[str, str]] = None,
+              ranges: Optional[Dict[str, Tuple[Any, Any]]] = None) -> List[Dict[str, Any]]:
+        filters = {field: value for field, value in filters.items() if value is not None}
+        if prefix is not None and not prefix[1]:
+            prefix = None
+        ranges = {field: bounds for field, bounds in (ranges or {}).items() if bounds != (None, None)}
+        candidates = None
+        for field, (low, high) in ranges.items():
+            range_keys = self._range_scan(field, low, high)
+            if candidates is None or len(range_keys) < len(candidates):
+                candidates = range_keys
+        for field, value in filters.items():
+            if field not in self._indexes:
+                continue
+            keys = self._indexes[field].get(value, {})
+            if candidates is None or len(keys) < len(candidates):
+                candidates = keys
+        if prefix is not None and prefix[0] in self._prefix_indexes:
+            prefix_keys = self._prefix_range(*prefix)
+            if candidates is None or len(prefix_keys) < len(candidates):
+                candidates = prefix_keys
+        if candidates is None:
+            candidates = self._rows
+        keys = []
+        for key_value in candidates:
+            row = self._rows[key_value]
+            if all(row.get(field) == value for field, value in filters.items()) and \
+                    (prefix is None or str(row.get(prefix[0], '')).lower().startswith(prefix[1].lower())) and \
+                    all(self._in_range(row, field, low, high) for field, (low, high) in ranges.items()):
+                keys.append(key_value)
+        # hasil diurutkan sesuai urutan tabel (seq), sama seperti tanpa filter
+        if candidates is not self._rows:
+            keys.sort(key=self._seq.__getitem__)
+        return [self._rows[key_value] for key_value in keys]
+
+    # key dengan nilai urut low <= nilai <= high (batas None berarti tidak dibatasi)
+    def _range_scan(self, field: str, low: Any, high: Any) -> List[Any]:
+        entries = self._range_indexes[field]
+        keys = []
+        for value, key_value in (iter(entries) if low is None else entries.irange((low,))):
+            if high is not None and value > high:
+                break
+            keys.append(key_value)
+        return keys
+
+    def _in_range(self, row: Dict[str, Any], field: str, low: Any, high: Any) -> bool:
+        value = self.range_keys[field](row.get(field))
+        return (low is None or value >= low) and (high is None or value <= high)
+
+    def _prefix_range(self, field: str, text: str) -> List[Any]:
+        entries = self._prefix_indexes[field]
+        text = text.lower()
+        keys = []
+        for value, key_value in entries.irange((text,)):
+            if not value.startswith(text):
+                break
+            keys.append(key_value)
+        return keys
+
+    # key ditaruh di belakang isi index (value); isi index tetap urut seq selama key yang masuk
+    # adalah data baru (seq terbesar)
+    def _bucket_add(self, field: str, index: Dict[Any, Dict[Any, None]], value: Any, key_value: Any):
+        keys = index.get(value)
+        if keys is None:
+            index[value] = {key_value: None}
+            return
+        if self._seq[key_value] < self._seq[next(reversed(keys))]:
+            self._unordered.add((field, value))
+        keys[key_value] = None
+
+    def _index_add(self, key_value: Any, row: Dict[str, Any]):
+        for field, index in self._indexes.items():
+            self._bucket_add(field, index, row.get(field), key_value)
+        if self._sorted_per_row:
+            for _, entries, sort_value in self._sorted:
+                entries.add((sort_value(row), key_value))
+
+    def _index_remove(self, key_value: Any, row: Dict[str, Any]):
+        for field, index in self._indexes.items():
+            keys = index.get(row.get(field))
+            if keys is not None:
+                keys.pop(key_value, None)
+                if not keys:
+                    del index[row.get(field)]
+        if self._sorted_per_row:
+            for _, entries, sort_value in self._sorted:
+                entries.discard((sort_value(row), key_value))
+
+    # data diganti: dengan key yang sama hanya index kolom yang nilainya berubah yang
+    # diperbarui, jadi posisi key di index (urutan first()) tidak berubah tanpa alasan
+    def _index_replace(self, old_key: Any, old: Dict[str, Any], key_value: Any, row: Dict[str, Any]):
+        if old_key != key_value:
+            self._index_remove(old_key, old)
+            self._index_add(key_value, row)
+            return
+        for field, index in self._indexes.items():
+            before, after = old.get(field), row.get(field)
+            if before != after:
+                keys = index[before]
+                del keys[key_value]
+                if not keys:
+                    del index[before]
+                self._bucket_add(field, index, after, key_value)
+        for _, entries, sort_value in self._sorted:
+            before, after = sort_value(old), sort_value(row)
+            if before != after:
+                entries.discard((before, key_value))
+                entries.add((after, key_value))
+
+    @_locked
+    def to_list(self):
+        return list(self._rows.values())
@@ -0,0 +1,236 @@
+import asyncio
+import hashlib
+import os
+import random
+import time
+from collections import Counter
+from contextlib import asynccontextmanager
+from datetime import datetime, timezone
+from typing import Any, Dict, List, Optional, Tuple
+
+from fastapi import HTTPException
+
+from cache import fetch_cached
+from metrics import loop_monitor, partner_wait
+from serialization import dumps
+from upstream import UPSTREAMS, fetch_conditional
+from upstream import lifespan as client_lifespan
+
+
+# Salinan lokal (mirror) data satu partner. rows adalah list dari partner apa adanya
+# (termasuk urutan dan data dengan key ganda), index: nilai key -> data pertama dengan
+# key tersebut (sama seperti mencari dengan loop). Jika isi data tidak berubah saat sync,
+# objek list yang sama tetap dipakai sehingga hasil turunan (mis. HashJoin) tetap valid.
+class Mirror:
+    def __init__(self, name: str, key: Optional[str], interval: float):
+        self.name = name
+        self.key = key
+        self.interval = interval
+        self.rows: Optional[List[Dict[str, Any]]] = None
+        self.index: Dict[Any, Dict[str, Any]] = {}
+        self.version = 0
+        self.etag: Optional[str] = None
+        self.last_modified: Optional[str] = None
+        self.body_hash: Optional[str] = None
+        self.last_attempt: Optional[float] = None
+        self.last_success: Optional[float] = None
+        self.last_change: Optional[float] = None
+        self.next_sync: Optional[float] = None
+        self.last_result: Optional[str] = None
+        self.last_error: Optional[str] = None
+        self.last_diff = {'added': 0, 'removed': 0, 'changed': 0}
+        self.stats = {'sync': 0, 'updated': 0, 'unchanged': 0, 'not_modified': 0, 'error': 0}
+
+    @property
+    def ready(self) -> bool:
+        return self.rows is not None
+
+    def get(self, key_value: Any) -> Optional[Dict[str, Any]]:
+        return self.index.get(key_value)
+
+    # selisih data lama dan baru: per key jika key diketahui, jika tidak per isi data
+    def diff(self, rows: List[Dict[str, Any]]) -> Dict[str, int]:
+        old = self.rows or []
+        if self.key is not None:
+            before = {row.get(self.key): row for row in old}
+            after = {row.get(self.key): row for row in rows}
+            added = sum(1 for key_value in after if key_value not in before)
+            removed = sum(1 for key_value in before if key_value not in after)
+            changed = sum(1 for key_value, row in after.items()
+                          if key_value in before and before[key_value] != row)
+            return {'added': added, 'removed': removed, 'changed': changed}
+        before = Counter(dumps(row) for row in old)
+        after = Counter(dumps(row) for row in rows)
+        return {'added': sum((after - before).values()), 'removed': sum((before - after).values()), 'changed': 0}
+
+    def apply(self, rows: List[Dict[str, Any]]) -> Dict[str, int]:
+        diff = self.diff(rows)
+        if self.rows is None or any(diff.values()):
+            index = {}
+            if self.key is not None:
+                for row in rows:
+                    index.setdefault(row.get(self.key), row)
+            self.rows = rows
+            self.index = index
+            self.version += 1
+            self.last_change = time.time()
+        return diff
+
+    def status(self) -> Dict[str, Any]:
+        now = time.time()
+
+        def iso(timestamp):
+            return None if timestamp is None else datetime.fromtimestamp(timestamp, timezone.utc).isoformat()
+        return {
+            'interval': self.interval,
+            'ready': self.ready,
+            'rows': len(self.rows) if self.rows is not None else None,
+            'version': self.version,
+            'last_attempt': iso(self.last_attempt),
+            'last_success': iso(self.last_success),
+            'last_change': iso(self.last_change),
+            # umur data mirror: detik sejak sync terakhir yang berhasil
+            'lag': round(now - self.last_success, 3) if self.last_success is not None else None,
+            'next_sync_in': round(max(0.0, self.next_sync - now), 3) if self.next_sync is not None else None,
+            'last_result': self.last_result,
+            'last_error': self.last_error,
+            'last_diff': self.last_diff,
+            'etag': self.etag,
+            'last_modified': self.last_modified,
+            **self.stats,
+        }
+
+
+# Menarik data setiap partner secara berkala di background (dimulai dari lifespan FastAPI):
+# - interval per partner (Upstream.sync_interval / UPSTREAM_<NAMA>_SYNC_INTERVAL)
+# - conditional GET: If-None-Match / If-Modified-Since jika partner mengirim ETag /
+#   Last-Modified; tanpa itu body yang sama persis (hash) dianggap tidak berubah
+# - jumlah sync yang berjalan bersamaan dibatasi max_concurrency
+# - jika sync gagal, data mirror sebelumnya tetap dipakai
+# - sync pertama ditunda start_delay detik supaya startup dan request pertama tidak
+#   berebut CPU dengan import httpx + parse data partner
+class SyncScheduler:
+    def __init__(self, mirrors: Dict[str, Mirror], max_concurrency: int = 2, start_delay: float = 0.0):
+        self.mirrors = mirrors
+        self.max_concurrency = max_concurrency
+        self.start_delay = start_delay
+        self._semaphore: Optional[asyncio.Semaphore] = None
+        self._tasks: List[asyncio.Task] = []
+
+    @property
+    def running(self) -> bool:
+        return bool(self._tasks)
+
+    def start(self):
+        if self._tasks:
+            return
+        self._semaphore = asyncio.Semaphore(self.max_concurrency)
+        self._tasks = [asyncio.ensure_future(self._loop(mirror)) for mirror in self.mirrors.values()]
+
+    async def stop(self):
+        tasks, self._tasks = self._tasks, []
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+
+    async def _loop(self, mirror: Mirror):
+        if self.start_delay > 0:
+            mirror.next_sync = time.time() + self.start_delay
+            await asyncio.sleep(self.start_delay)
+        while True:
+            await self.sync(mirror)
+            # jitter kecil supaya partner dengan interval sama tidak selalu ditarik bersamaan
+            delay = mirror.interval * random.uniform(0.9, 1.1)
+            mirror.next_sync = time.time() + delay
+            await asyncio.sleep(delay)
+
+    async def sync(self, mirror: Mirror):
+        async with self._semaphore or asyncio.Semaphore(1):
+            mirror.last_attempt = time.time()
+            mirror.stats['sync'] += 1
+            try:
+                result = await fetch_conditional(mirror.name, mirror.etag, mirror.last_modified)
+            except HTTPException as e:
+                mirror.stats['error'] += 1
+                mirror.last_result = 'error'
+                mirror.last_error = f'{e.status_code}: {e.detail}'
+                return
+            mirror.last_success = time.time()
+            mirror.last_error = None
+            if result is None:
+                mirror.stats['not_modified'] += 1
+                mirror.last_result = 'not_modified'
+                return
+            body, rows, etag, last_modified = result
+            mirror.etag, mirror.last_modified = etag, last_modified
+            body_hash = hashlib.sha1(body).hexdigest()
+            if mirror.ready and body_hash == mirror.body_hash:
+                mirror.stats['unchanged'] += 1
+                mirror.last_result = 'unchanged'
+                return
+            mirror.body_hash = body_hash
+            mirror.last_diff = mirror.apply(rows)
+            changed = any(mirror.last_diff.values())
+            mirror.stats['updated' if changed else 'unchanged'] += 1
+            mirror.last_result = 'updated' if changed else 'unchanged'
+
+    def status(self) -> Dict[str, Any]:
+        return {'running': self.running, 'max_concurrency': self.max_concurrency,
+                'sources': {name: mirror.status() for name, mirror in self.mirrors.items()}}
+
+
+# key data setiap partner untuk index mirror (None: tidak ada key yang pasti)
+MIRROR_KEYS = {'wisata': 'id_wisata', 'asuransi': 'nik', 'bank': 'nik', 'hotel': 'nik', 'rental': None, 'guide': 'id_guider'}
+
+mirrors: Dict[str, Mirror] = {name: Mirror(name, MIRROR_KEYS.get(name), upstream.sync_interval)
+                              for name, upstream in UPSTREAMS.items()}
+scheduler = SyncScheduler(mirrors, max_concurrency=int(os.environ.get('PARTNER_SYNC_CONCURRENCY', 2)),
+                          start_delay=float(os.environ.get('PARTNER_SYNC_DELAY', 1.0)))
+
+
+# Data partner untuk handler: dari mirror lokal jika sudah tersinkron, jika belum (atau
+# scheduler dimatikan dengan PARTNER_SYNC=0) diambil langsung lewat cache seperti biasa.
+# Waktu menunggu cache / partner dicatat di metric partner_fetch_seconds (metrics.py).
+async def partner_rows(name: str) -> List[Dict[str, Any]]:
+    mirror = mirrors[name]
+    if mirror.ready:
+        return mirror.rows
+    with partner_wait(name):
+        return await fetch_cached(name)
+
+
+# Seperti partner_rows, ditambah tag isi data (hash body dari partner, sama di semua worker)
+# untuk ETag; tag None jika data belum dari mirror
+async def partner_rows_tagged(name: str) -> Tuple[List[Dict[str, Any]], Optional[str]]:
+    mirror = mirrors[name]
+    if mirror.ready:
+        return mirror.rows, mirror.body_hash
+    with partner_wait(name):
+        return await fetch_cached(name), None
+
+
+# Satu data partner berdasarkan key mirror (data pertama dengan key tersebut)
+async def partner_row(name: str, key_value: Any) -> Optional[Dict[str, Any]]:
+    mirror = mirrors[name]
+    if mirror.ready:
+        return mirror.get(key_value)
+    with partner_wait(name):
+        rows = await fetch_cached(name)
+    for row in rows:
+        if row.get(mirror.key) == key_value:
+            return row
+    return None
+
+
+# lifespan FastAPI: HTTP client bersama + scheduler sync partner + monitor lag event loop
+@asynccontextmanager
+async def lifespan(app):
+    async with client_lifespan(app):
+        if os.environ.get('PARTNER_SYNC', '1') != '0':
+            scheduler.start()
+        loop_monitor.start()
+        try:
+            yield
+        finally:
+            await loop_monitor.stop()
+            await scheduler.stop()
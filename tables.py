@@ -0,0 +1,106 @@
+from changefeed import change_log
+from models import Penduduk, Pendudukasuransi, Pendudukbank, Pendudukhotel, Pendudukrental
+from penalty import parse_date
+from storage import open_projection, open_store
+
+
+# Tabel data milik API ini. Dibuat saat startup (murah), dipakai oleh router di routes_*.py
+# yang baru dimuat saat pertama kali dipakai (lihat lazy_routes.py).
+
+# Data dummy untuk tabel pajak_objek_wisata
+data_pajak = open_store('pajak', 'id_pajak', [
+    {'id_pajak': 'PJ001', 'status_kepemilikan': 'Swasta', 'jenis_pajak': 'Pajak Pertahanan Nilai (PPN)', 'tarif_pajak': 0.11, 'besar_pajak': 50000000},
+    {'id_pajak': 'PJ002', 'status_kepemilikan': 'Swasta', 'jenis_pajak': 'Pajak Pertahanan Nilai (PPN)', 'tarif_pajak': 0.11, 'besar_pajak': 100000000},
+    {'id_pajak': 'PJ003', 'status_kepemilikan': 'Pemerintah', 'jenis_pajak': 'Pajak Pertahanan Nilai (PPN)', 'tarif_pajak': 0, 'besar_pajak': 0},
+    {'id_pajak': 'PJ004', 'status_kepemilikan': 'Pemerintah', 'jenis_pajak': 'Pajak Pertahanan Nilai (PPN)', 'tarif_pajak': 0.11, 'besar_pajak': 75000000},
+    {'id_pajak': 'PJ005', 'status_kepemilikan': 'Campuran', 'jenis_pajak': 'Pajak Pertahanan Nilai (PPN)', 'tarif_pajak': 0.11, 'besar_pajak': 65000000}
+])
+
+# Data Dummy untuk tabel penduduk
+# index untuk filter wilayah (provinsi -> kota -> kecamatan -> desa) dan pencarian nama
+PENDUDUK_INDEXES = ('provinsi', 'kota', 'kecamatan', 'desa')
+
+# disimpan per kolom, kolom wilayah di-dictionary-encode (nilainya banyak yang sama)
+data_penduduk = open_store('penduduk', 'nik', indexes=PENDUDUK_INDEXES, prefix_indexes=('nama',),
+                           columns=tuple(Penduduk.model_fields), categorical=PENDUDUK_INDEXES, seed_rows=[
+    {'nik':101, 'nama':'Ale', 'provinsi': 'Jawa Barat', 'kota': 'Bandung', 'kecamatan': 'Dayeuhkolot', 'desa': 'Bojongsoang'},
+    {'nik':102, 'nama':'Leo', 'provinsi': 'Bali', 'kota': 'Gianyar', 'kecamatan': 'Gianyar', 'desa': 'Siangan'},
+    {'nik':103, 'nama':'Lea', 'provinsi': 'Jawa Tengah', 'kota': 'Yogyakarta', 'kecamatan': 'Gedongtengen', 'desa': 'Sosromeduran'},
+    {'nik':104, 'nama':'Satoru', 'provinsi': 'Jawa Timur', 'kota': 'Surabaya', 'kecamatan': 'Tenggilis Mejoyo', 'desa': 'Kendangsari'},
+    {'nik':105, 'nama':'Suguru', 'provinsi': 'DKI Jakarta', 'kota': 'Jakarta Selatan', 'kecamatan': 'Kebayoran Baru', 'desa': 'Senayan'},
+
+    {'nik':106, 'nama':'Ammar', 'provinsi': 'Banten', 'kota': 'Tangeran Selatan', 'kecamatan': 'Serpong', 'desa': 'Rawa Buntu'},
+    {'nik':107, 'nama':'Alif', 'provinsi': 'Sumatera Barat', 'kota': 'Padang', 'kecamatan': 'Kuranji', 'desa': 'Ampang'},
+    {'nik':108, 'nama':'Malvin', 'provinsi': 'Jawa Barat', 'kota': 'Bogor', 'kecamatan': 'Bogor Selatan', 'desa': 'Cikaret'},
+    {'nik':109, 'nama':'Agung', 'provinsi': 'Jawa Timur', 'kota': 'Jember', 'kecamatan': 'Pakusari', 'desa': 'Kertosari'},
+    {'nik':110, 'nama':'Fadlan', 'provinsi': 'Banten', 'kota': 'Serang', 'kecamatan': 'Taktakan', 'desa': 'Kalang Anyar'},
+
+    {'nik':111, 'nama':'Chadkowi', 'provinsi': 'Kota Bandung', 'kota': 'Bandung', 'kecamatan': 'Buah Batu', 'desa': 'Margasari'},
+    {'nik':112, 'nama':'Prabroro', 'provinsi': 'DKI Jakarta', 'kota': 'Jakarta Timur', 'kecamatan': 'Jatinegara', 'desa': 'Cipinang'},
+    {'nik':113, 'nama':'Anisa', 'provinsi': 'DIY', 'kota': 'Sleman', 'kecamatan': 'Sleman', 'desa': 'Triharjo'},
+    {'nik':114, 'nama':'Janggar', 'provinsi': 'Bali', 'kota': 'Badung', 'kecamatan': 'Kuta', 'desa': 'Seminyak'},
+    {'nik':115, 'nama':'Mahfud DM', 'provinsi': 'Jawa Timur', 'kota': 'Surabaya', 'kecamatan': 'Gayungan', 'desa': 'Gayungan'},
+   
+    {'nik':116, 'nama':'Ali', 'provinsi': 'Banten', 'kota': 'Tangerang Selatan', 'kecamatan': 'Ciputat Timur', 'desa': 'Bintaro Sektor 3A'},
+    {'nik':117, 'nama':'Sandra', 'provinsi': 'Jawa Barat', 'kota': 'Bandung', 'kecamatan': 'Sumur Bandung', 'desa': 'Karanganyar'},
+    {'nik':118, 'nama':'Joseph', 'provinsi': 'Jawa Tengah', 'kota': 'Magelang', 'kecamatan': 'Magelang Utara', 'desa': 'Wates'},
+    {'nik':119, 'nama':'Lisa', 'provinsi': 'DI Yogyakarta', 'kota': 'Yogyakarta', 'kecamatan': 'Kota Gede', 'desa': 'Purbayan'},
+    {'nik':120, 'nama':'Bagus', 'provinsi': 'DKI Jakarta', 'kota': 'Jakarta Barat', 'kecamatan': 'Taman Sari', 'desa': 'Maphar'},
+])
+
+# tabel kelompok lain berisi sebagian kolom data_penduduk (proyeksi): data yang sama dengan
+# data penduduk tidak disalin, perubahan data penduduk ikut terlihat di tabel-tabel ini
+data_Pendudukrental = open_projection('pendudukrental', data_penduduk, Pendudukrental.model_fields, [
+    {'nik':101, 'nama':'Ale', 'kota': 'Bandung'},
+    {'nik':102, 'nama':'Leo', 'kota': 'Gianyar'},
+    {'nik':103, 'nama':'Lea',  'kota': 'Yogyakarta'},
+    {'nik':104, 'nama':'Satoru', 'kota': 'Surabaya'},
+    {'nik':105, 'nama':'Suguru','kota': 'Jakarta Selatan',},
+])
+
+data_Pendudukhotel = open_projection('pendudukhotel', data_penduduk, Pendudukhotel.model_fields, [
+    {'nik':101, 'nama':'Ale', 'kota': 'Bandung'},
+    {'nik':102, 'nama':'Leo', 'kota': 'Gianyar'},
+    {'nik':103, 'nama':'Lea',  'kota': 'Yogyakarta'},
+    {'nik':104, 'nama':'Satoru', 'kota': 'Surabaya'},
+    {'nik':105, 'nama':'Suguru','kota': 'Jakarta Selatan',},
+])
+
+data_Pendudukasuransi = open_projection('pendudukasuransi', data_penduduk, Pendudukasuransi.model_fields,
+                                        indexes=PENDUDUK_INDEXES, prefix_indexes=('nama',), seed_rows=[
+    {'nik':116, 'nama':'Ali', 'provinsi': 'Banten', 'kota': 'Tangerang Selatan', 'kecamatan': 'Ciputat Timur', 'desa': 'Bintaro Sektor 3A'},
+    {'nik':117, 'nama':'Sandra', 'provinsi': 'Jawa Barat', 'kota': 'Bandung', 'kecamatan': 'Sumur Bandung', 'desa': 'Karanganyar'},
+    {'nik':118, 'nama':'Joseph', 'provinsi': 'Jawa Tengah', 'kota': 'Magelang', 'kecamatan': 'Magelang Utara', 'desa': 'Wates'},
+    {'nik':119, 'nama':'Lisa', 'provinsi': 'DI Yogyakarta', 'kota': 'Yogyakarta', 'kecamatan': 'Kota Gede', 'desa': 'Purbayan'},
+    {'nik':120, 'nama':'Bagus', 'provinsi': 'DKI Jakarta', 'kota': 'Jakarta Barat', 'kecamatan': 'Taman Sari', 'desa': 'Maphar'},
+])
+
+data_Pendudukbank = open_projection('pendudukbank', data_penduduk, Pendudukbank.model_fields, [
+    {'nik':106, 'nama':'Ammar'},
+    {'nik':107, 'nama':'Alif'},
+    {'nik':108, 'nama':'Malvin'},
+    {'nik':109, 'nama':'Agung'},
+    {'nik':110, 'nama':'Fadlan'},
+
+])
+
+# Data dummy untuk tabel pajak_objek_wisata
+# index hash untuk filter status_setoran / id_pajak dan index terurut (tanggal sebagai ordinal)
+# untuk query rentang tanggal_jatuh_tempo / tanggal_setoran
+SETORAN_INDEXES = ('status_setoran', 'id_pajak')
+SETORAN_RANGE_INDEXES = {'tanggal_jatuh_tempo': parse_date, 'tanggal_setoran': parse_date}
+
+data_setoran = open_store('setoran', 'id_setoran', indexes=SETORAN_INDEXES, range_indexes=SETORAN_RANGE_INDEXES, seed_rows=[
+    {'id_setoran': 1, 'id_pajak': 'PJ001', 'tanggal_jatuh_tempo': '30-11-2023', 'tanggal_setoran': '30-11-2023', 'status_setoran': 'tepat waktu', 'denda': 0, 'besar_pajak_setelah_denda': 0},
+    {'id_setoran': 2, 'id_pajak': 'PJ002', 'tanggal_jatuh_tempo': '30-11-2023', 'tanggal_setoran': '30-11-2023', 'status_setoran': 'terlambat', 'denda': 0.02, 'besar_pajak_setelah_denda': 100000000},
+    {'id_setoran': 3, 'id_pajak': 'PJ003', 'tanggal_jatuh_tempo': '30-11-2023', 'tanggal_setoran': '30-11-2023', 'status_setoran': 'tepat waktu', 'denda': 0, 'besar_pajak_setelah_denda': 0},
+    {'id_setoran': 4, 'id_pajak': 'PJ004', 'tanggal_jatuh_tempo': '30-11-2023', 'tanggal_setoran': '30-11-2023', 'status_setoran': 'terlambat', 'denda': 0.02, 'besar_pajak_setelah_denda': 75000000},
+    {'id_setoran': 5, 'id_pajak': 'PJ005', 'tanggal_jatuh_tempo': '30-11-2023', 'tanggal_setoran': '30-11-2023', 'status_setoran': 'tepat waktu', 'denda': 0, 'besar_pajak_setelah_denda': 0}
+])
+
+# semua perubahan tabel di atas dicatat di change feed (changefeed.py, endpoint /changes),
+# supaya kelompok lain cukup menerima perubahan alih-alih membaca ulang seluruh tabel
+for _name, _store in [('pajak', data_pajak), ('penduduk', data_penduduk), ('pendudukrental', data_Pendudukrental),
+                      ('pendudukhotel', data_Pendudukhotel), ('pendudukasuransi', data_Pendudukasuransi),
+                      ('pendudukbank', data_Pendudukbank), ('setoran', data_setoran)]:
+    change_log.track(_name, _store)
@@ -0,0 +1,42 @@
+# Pengaturan bersama semua test. Modul aplikasi ada di root repo (bukan package), jadi root
+# repo ditambahkan ke sys.path di sini sekali untuk semua file test.
+# Fixture backend / open_store dipakai test yang hasilnya harus sama pada backend memory
+# (store.KeyedStore) dan SQLite (sqlite_store.SqliteStore).
+# Jalankan dari root repo: python -m pytest -q tests
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import pytest  # noqa: E402
+
+from sqlite_store import SqliteDatabase, SqliteStore  # noqa: E402
+from store import KeyedStore  # noqa: E402
+
+
+@pytest.fixture(params=['memory', 'sqlite'])
+def backend(request) -> str:
+    return request.param
+
+
+# path database SQLite test ini (satu file per test, dibuka ulang untuk mensimulasikan worker lain)
+@pytest.fixture
+def db_path(tmp_path) -> str:
+    return str(tmp_path / 'test.db')
+
+
+# open_store(name, key, rows, **options) membuka tabel pada backend test ini; semua tabel
+# SQLite satu test memakai database yang sama. options sama seperti KeyedStore
+# (indexes, prefix_indexes, range_indexes).
+@pytest.fixture
+def open_store(backend, db_path):
+    databases = []
+
+    def open_store(name, key, rows=(), **options):
+        if backend == 'memory':
+            return KeyedStore(key, rows, **options)
+        if not databases:
+            databases.append(SqliteDatabase(db_path))
+        return SqliteStore(databases[0], name, key, rows, **options)
+
+    return open_store
@@ -0,0 +1,127 @@
+# Admission control (admission.AdmissionMiddleware) langsung lewat ASGI: rate limit per
+# client habis -> 429, antrean penuh / waktu tunggu habis -> 503, keduanya dengan
+# Retry-After; request yang mengantre mendapat slot setelah request aktif selesai.
+# Jam rate limiter diganti supaya hasilnya tidak bergantung kecepatan mesin.
+# Jalankan dari root repo: python -m pytest -q tests
+import asyncio
+import time
+from types import SimpleNamespace
+
+import pytest
+
+import admission
+from admission import AdmissionMiddleware, AdmissionPool
+
+
+class Clock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    clock = Clock()
+    monkeypatch.setattr(admission, 'time', SimpleNamespace(monotonic=clock, perf_counter=time.perf_counter))
+    return clock
+
+
+# aplikasi ASGI yang menahan request sampai gate dibuka
+class App:
+    def __init__(self):
+        self.gate = asyncio.Event()
+        self.started = 0
+
+    async def __call__(self, scope, receive, send):
+        self.started += 1
+        if scope['path'].startswith('/lambat'):
+            await self.gate.wait()
+        await send({'type': 'http.response.start', 'status': 200, 'headers': []})
+        await send({'type': 'http.response.body', 'body': b'ok'})
+
+
+async def request(middleware, path='/pajak', client='10.0.0.1', headers=()):
+    messages = []
+
+    async def receive():
+        return {'type': 'http.request'}
+
+    async def send(message):
+        messages.append(message)
+
+    scope = {'type': 'http', 'path': path, 'client': (client, 1234), 'headers': list(headers)}
+    await middleware(scope, receive, send)
+    start = messages[0]
+    return start['status'], dict(start['headers']).get(b'retry-after')
+
+
+def test_rate_limit_per_client(clock):
+    pool = AdmissionPool('tes_rate', rate=1, burst=2)
+    middleware = AdmissionMiddleware(App(), {'local': pool}, exempt=('/metrics',))
+
+    async def run():
+        statuses = [await request(middleware) for _ in range(3)]
+        statuses.append(await request(middleware, client='10.0.0.2'))
+        statuses.append(await request(middleware, '/metrics'))
+        clock.now += 1
+        statuses.append(await request(middleware))
+        statuses.append(await request(middleware))
+        return statuses
+
+    assert asyncio.run(run()) == [(200, None), (200, None), (429, b'1'), (200, None), (200, None),
+                                  (200, None), (429, b'1')]
+    assert pool.rejected['rate_limited'] == 2 and pool.stats['diterima'] == 4
+
+
+def test_forwarded_client_only_when_trusted(clock):
+    pool = AdmissionPool('tes_forwarded', rate=1, burst=1)
+    forwarded = [(b'x-forwarded-for', b'203.0.113.9, 10.0.0.1')]
+    trusted = AdmissionMiddleware(App(), {'local': pool}, trust_forwarded=True)
+
+    async def run():
+        return [await request(trusted, headers=forwarded), await request(trusted),
+                await request(trusted, headers=forwarded)]
+
+    assert [status for status, _ in asyncio.run(run())] == [200, 200, 429]
+
+
+def test_queue_full_is_503(clock):
+    app = App()
+    pool = AdmissionPool('tes_queue', concurrency=1, queue=1, queue_timeout=5)
+    middleware = AdmissionMiddleware(app, {'local': pool, 'upstream': AdmissionPool('tes_lain')},
+                                     routes=[('upstream', ('/lokal',))])
+
+    async def run():
+        active = asyncio.ensure_future(request(middleware, '/lambat'))
+        await asyncio.sleep(0)
+        queued = asyncio.ensure_future(request(middleware, '/lambat/2'))
+        await asyncio.sleep(0)
+        assert pool.limiter.active == 1 and pool.limiter.queued == 1
+        rejected = await request(middleware, '/lambat/3')
+        # pool lain tidak ikut penuh
+        other = await request(middleware, '/lokal')
+        app.gate.set()
+        return [await active, await queued, rejected, other]
+
+    assert asyncio.run(run()) == [(200, None), (200, None), (503, b'5'), (200, None)]
+    assert pool.rejected['queue_full'] == 1 and pool.stats['diterima'] == 2
+    assert pool.limiter.active == 0 and pool.limiter.queued == 0
+
+
+def test_queue_timeout_is_503(clock):
+    app = App()
+    pool = AdmissionPool('tes_timeout', concurrency=1, queue=4, queue_timeout=0.05)
+    middleware = AdmissionMiddleware(app, {'local': pool})
+
+    async def run():
+        active = asyncio.ensure_future(request(middleware, '/lambat'))
+        await asyncio.sleep(0)
+        timed_out = await request(middleware, '/lambat/2')
+        app.gate.set()
+        return [await active, timed_out]
+
+    assert asyncio.run(run()) == [(200, None), (503, b'1')]
+    assert pool.rejected['queue_timeout'] == 1 and app.started == 1
+    assert pool.limiter.active == 0
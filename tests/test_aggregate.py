@@ -0,0 +1,132 @@
+# Ringkasan berjalan (aggregate.RunningAggregate) harus selalu sama dengan perhitungan ulang
+# seluruh tabel, untuk backend memory dan SQLite, termasuk saat nilai min / max dihapus,
+# batch besar dan perubahan dari worker lain (versi tabel melompat).
+# Jalankan dari root repo: python -m pytest -q tests
+import math
+import random
+
+import pytest
+
+from aggregate import RunningAggregate
+from sqlite_store import SqliteDatabase, SqliteStore
+
+GROUP_BY = ('status_kepemilikan', 'jenis_pajak')
+FIELDS = ('besar_pajak', 'tarif_pajak')
+
+
+def pajak(rng, key):
+    return {'id_pajak': key, 'status_kepemilikan': rng.choice(['Swasta', 'Pemerintah', 'Campuran']),
+            'jenis_pajak': rng.choice(['PPN', 'PBJT']), 'tarif_pajak': rng.choice([0, 0.1, 0.11, 0.25]),
+            'besar_pajak': rng.randrange(0, 10 ** 6, 1000)}
+
+
+# perhitungan ulang dari nol, sebagai pembanding
+def full_summary(rows):
+    def stats(group):
+        result = {'count': len(group)}
+        for field in FIELDS:
+            values = [row[field] for row in group]
+            total = math.fsum(values) if any(isinstance(v, float) for v in values) else sum(values)
+            result[field] = {'sum': total, 'min': min(values, default=None), 'max': max(values, default=None)}
+        return result
+
+    summary = {'total': stats(rows)}
+    for field in GROUP_BY:
+        groups = {}
+        for row in rows:
+            groups.setdefault(str(row[field]), []).append(row)
+        summary[f'per_{field}'] = {value: stats(group) for value, group in groups.items()}
+    return summary
+
+
+@pytest.fixture
+def store(open_store):
+    return open_store('pajak', 'id_pajak')
+
+
+def test_random_operations_match_full_recomputation(store):
+    rng = random.Random(12)
+    keys = [f'K{i}' for i in range(60)]
+    store.insert_many([pajak(rng, key) for key in keys[:30]])
+    aggregate = RunningAggregate(store, GROUP_BY, FIELDS)
+    for i in range(400):
+        existing = [row['id_pajak'] for row in store]
+        op = rng.choice(['upsert', 'replace', 'delete', 'upsert_many', 'delete_many'])
+        if op == 'upsert':
+            store.upsert(pajak(rng, rng.choice(keys)))
+        elif op == 'replace' and existing:
+            # kadang key ikut diganti ke key yang belum dipakai
+            key = rng.choice(existing)
+            unused = [k for k in keys if k not in existing]
+            store.replace(key, pajak(rng, rng.choice(unused) if unused and rng.random() < 0.2 else key))
+        elif op == 'delete' and existing:
+            store.delete(rng.choice(existing))
+        elif op == 'upsert_many':
+            store.upsert_many([pajak(rng, rng.choice(keys)) for _ in range(rng.randrange(1, 8))])
+        elif op == 'delete_many' and existing:
+            store.delete_many(rng.sample(existing, min(len(existing), rng.randrange(1, 5))))
+        assert aggregate.snapshot() == full_summary(store.to_list()), f'berbeda setelah operasi ke-{i} ({op})'
+
+
+def test_removing_min_and_max_does_not_rescan(store):
+    store.insert_many([{'id_pajak': f'K{i}', 'status_kepemilikan': 'Swasta', 'jenis_pajak': 'PPN',
+                        'tarif_pajak': i / 100, 'besar_pajak': i} for i in range(1, 101)])
+    aggregate = RunningAggregate(store, GROUP_BY, FIELDS)
+    stats = aggregate._total.fields['besar_pajak']
+    # min / max harus dicari dari heap, bukan dari semua nilai
+    stats.counts = _NoScan(stats.counts)
+    for low, high in zip(range(1, 50), range(100, 51, -1)):
+        store.delete(f'K{low}')
+        store.delete(f'K{high}')
+        assert aggregate.snapshot()['total']['besar_pajak'] == {
+            'sum': sum(range(low + 1, high)), 'min': low + 1, 'max': high - 1}
+
+
+class _NoScan(dict):
+    def __iter__(self):
+        raise AssertionError('semua nilai dipindai')
+
+
+def test_large_batch_is_applied_incrementally(store):
+    rng = random.Random(3)
+    store.insert_many([pajak(rng, f'K{i}') for i in range(50)])
+    aggregate = RunningAggregate(store, GROUP_BY, FIELDS)
+    aggregate._rebuild = _fail_rebuild
+    store.upsert_many([pajak(rng, f'K{i}') for i in range(200)])
+    store.delete_many([f'K{i}' for i in range(0, 200, 2)])
+    assert aggregate.snapshot() == full_summary(store.to_list())
+
+
+def _fail_rebuild():
+    raise AssertionError('ringkasan dihitung ulang dari seluruh tabel')
+
+
+def test_sqlite_changes_from_other_worker_are_read_from_log(db_path):
+    path = db_path
+    rng = random.Random(5)
+    store = SqliteStore(SqliteDatabase(path), 'pajak', 'id_pajak')
+    store.insert_many([pajak(rng, f'K{i}') for i in range(50)])
+    aggregate = RunningAggregate(store, GROUP_BY, FIELDS)
+    aggregate._rebuild = _fail_rebuild
+    # worker lain: koneksi dan objek store sendiri, listener worker ini tidak dipanggil
+    other = SqliteStore(SqliteDatabase(path), 'pajak', 'id_pajak')
+    other.upsert_many([pajak(rng, f'K{i}') for i in range(30, 80)])
+    other.delete('K1')
+    assert aggregate.snapshot() == full_summary(store.to_list())
+    # tulisan worker ini setelah versi melompat juga ikut membaca perubahan worker lain
+    other.delete('K2')
+    store.delete('K3')
+    assert aggregate.snapshot() == full_summary(store.to_list())
+
+
+def test_sqlite_rebuilds_when_log_was_trimmed(db_path):
+    path = db_path
+    rng = random.Random(6)
+    store = SqliteStore(SqliteDatabase(path, change_retention=20), 'pajak', 'id_pajak')
+    store.insert_many([pajak(rng, f'K{i}') for i in range(10)])
+    aggregate = RunningAggregate(store, GROUP_BY, FIELDS)
+    other = SqliteStore(SqliteDatabase(path, change_retention=20), 'pajak', 'id_pajak')
+    for i in range(40):
+        other.upsert(pajak(rng, f'K{i % 15}'))
+    assert store.changes_since(aggregate._version) is None
+    assert aggregate.snapshot() == full_summary(store.to_list())
@@ -0,0 +1,117 @@
+# Batch insert / upsert / delete (bulk.apply_batch) di backend memory dan SQLite: atomic
+# menolak seluruh batch (400 data tidak valid, 409 key bentrok), non-atomic menyimpan baris
+# yang valid dan melaporkan sisanya per index, dan key yang ditambahkan request lain di
+# antara pengecekan dan insert dicek ulang.
+# Jalankan dari root repo: python -m pytest -q tests
+import json
+
+import pytest
+from fastapi import HTTPException
+from pydantic import BaseModel
+
+import bulk
+from bulk import apply_batch
+
+
+class Warga(BaseModel):
+    nik: int
+    nama: str
+
+
+@pytest.fixture
+def store(open_store):
+    return open_store('penduduk', 'nik', [{'nik': 1, 'nama': 'Ale'}])
+
+
+def body(*rows) -> bytes:
+    return json.dumps(list(rows)).encode()
+
+
+def niks(store):
+    return [row['nik'] for row in store.to_list()]
+
+
+def test_atomic_invalid_rejects_everything(store):
+    with pytest.raises(HTTPException) as error:
+        apply_batch(store, Warga, body({'nik': 2, 'nama': 'Leo'}, {'nik': 'x', 'nama': 'Lea'}), 'insert', True)
+    assert error.value.status_code == 400
+    assert [e['index'] for e in error.value.detail['errors']] == [1]
+    assert niks(store) == [1]
+
+
+def test_non_atomic_keeps_valid_rows(store):
+    rows = [{'nik': 2, 'nama': 'Leo'}, {'nik': 'x'}, {'nik': 1, 'nama': 'Ale lagi'}, {'nik': 3, 'nama': 'Lea'}]
+    result = apply_batch(store, Warga, body(*rows), 'insert', False)
+    assert result['diproses'] == 2 and result['ditolak'] == 2
+    assert [e['index'] for e in result['errors']] == [1, 2]
+    assert result['errors'][1]['detail'] == ['nik sudah ada.']
+    assert niks(store) == [1, 2, 3]
+    # NDJSON dengan baris yang bukan JSON
+    result = apply_batch(store, Warga, [b'{"nik": 4, "nama": "Ana"}', b'{rusak'], 'insert', False)
+    assert (result['diproses'], [e['index'] for e in result['errors']]) == (1, [1])
+    assert niks(store) == [1, 2, 3, 4]
+
+
+def test_atomic_duplicate_key_is_409(store):
+    with pytest.raises(HTTPException) as error:
+        apply_batch(store, Warga, body({'nik': 2, 'nama': 'Leo'}, {'nik': 1, 'nama': 'Ale'}), 'insert', True)
+    assert error.value.status_code == 409
+    assert error.value.detail['errors'] == [{'index': 1, 'detail': ['nik sudah ada.']}]
+    assert niks(store) == [1]
+
+
+def test_upsert_and_delete(store):
+    result = apply_batch(store, Warga, body({'nik': 1, 'nama': 'Alex'}, {'nik': 2, 'nama': 'Leo'}), 'upsert', True)
+    assert result['diproses'] == 2
+    assert store.get(1)['nama'] == 'Alex'
+    assert apply_batch(store, Warga, body(1, 5), 'delete', True)['diproses'] == 1
+    # delete dengan data lengkap, baris tidak valid dilaporkan
+    result = apply_batch(store, Warga, body({'nik': 2, 'nama': 'Leo'}, {'nama': 'tanpa nik'}), 'delete', False)
+    assert (result['diproses'], result['ditolak']) == (1, 1)
+    assert niks(store) == []
+
+
+# request lain menambah key 101, 102, ... tepat sebelum insert batch ini (setelah key
+# batch dicek), pada sebanyak races percobaan insert pertama
+def race_before_insert(store, monkeypatch, races=1):
+    insert_many = store.insert_many
+    attempts = []
+
+    def racing_insert_many(rows):
+        attempts.append(len(rows))
+        if len(attempts) <= races:
+            store.insert({'nik': 100 + len(attempts), 'nama': 'request lain'})
+        return insert_many(rows)
+
+    monkeypatch.setattr(store, 'insert_many', racing_insert_many)
+    return attempts
+
+
+def test_insert_retries_after_concurrent_insert(store, monkeypatch):
+    attempts = race_before_insert(store, monkeypatch)
+    result = apply_batch(store, Warga, body({'nik': 2, 'nama': 'Leo'}, {'nik': 101, 'nama': 'Lea'}), 'insert', False)
+    # percobaan kedua tanpa baris yang bentrok
+    assert attempts == [2, 1]
+    assert result['diproses'] == 1 and result['errors'] == [{'index': 1, 'detail': ['nik sudah ada.']}]
+    assert niks(store) == [1, 101, 2]
+    assert store.get(101)['nama'] == 'request lain'
+
+
+def test_atomic_conflict_found_on_retry_is_409(store, monkeypatch):
+    attempts = race_before_insert(store, monkeypatch)
+    with pytest.raises(HTTPException) as error:
+        apply_batch(store, Warga, body({'nik': 2, 'nama': 'Leo'}, {'nik': 101, 'nama': 'Lea'}), 'insert', True)
+    assert error.value.status_code == 409
+    assert attempts == [2]
+    assert niks(store) == [1, 101]
+
+
+def test_insert_gives_up_after_retries(store, monkeypatch):
+    attempts = race_before_insert(store, monkeypatch, races=bulk.INSERT_RETRIES + 1)
+    # setiap percobaan bentrok dengan key yang baru saja ditambahkan request lain
+    rows = [{'nik': 101 + i, 'nama': f'batch {i}'} for i in range(bulk.INSERT_RETRIES + 1)]
+    with pytest.raises(HTTPException) as error:
+        apply_batch(store, Warga, body(*rows), 'insert', False)
+    assert error.value.status_code == 409
+    assert len(attempts) == bulk.INSERT_RETRIES + 1
+    assert niks(store) == [1] + [101 + i for i in range(bulk.INSERT_RETRIES + 1)]
@@ -0,0 +1,73 @@
+# Pagination cursor (pagination.list_rows / store.page): halaman berikutnya tidak mengulang
+# atau melewatkan data walau ada insert / delete di antara dua halaman, di backend memory
+# dan SQLite; ?limit= di luar 1..MAX_LIMIT dan cursor rusak ditolak.
+# Jalankan dari root repo: python -m pytest -q tests
+import pytest
+from fastapi import Depends, FastAPI
+from fastapi.testclient import TestClient
+
+from pagination import MAX_LIMIT, Pagination, list_rows
+
+
+@pytest.fixture
+def store(open_store):
+    return open_store('penduduk', 'nik', [{'nik': i, 'nama': f'warga {i}'} for i in range(10)])
+
+
+@pytest.fixture
+def client(store):
+    app = FastAPI()
+
+    @app.get('/penduduk')
+    def get_penduduk(page: Pagination = Depends()):
+        return list_rows(store, page)
+
+    return TestClient(app)
+
+
+def read_page(client, cursor=None, limit=3):
+    params = {'limit': limit}
+    if cursor is not None:
+        params['cursor'] = cursor
+    response = client.get('/penduduk', params=params)
+    assert response.status_code == 200
+    return [row['nik'] for row in response.json()], response.headers.get('X-Next-Cursor')
+
+
+def test_cursor_survives_writes_between_pages(client, store):
+    seen, cursor = read_page(client)
+    assert seen == [0, 1, 2]
+    # data yang sudah dibaca dihapus, data halaman berikutnya dihapus, data baru ditambah
+    store.delete(1)
+    store.delete(2)
+    store.delete(4)
+    store.insert({'nik': 100, 'nama': 'warga baru'})
+    nik, cursor = read_page(client, cursor)
+    assert nik == [3, 5, 6]
+    seen += nik
+    # data yang sudah dibaca diubah: tidak muncul lagi di halaman berikutnya
+    store.replace(0, {'nik': 0, 'nama': 'warga nol'})
+    store.insert({'nik': 101, 'nama': 'warga baru'})
+    while cursor is not None:
+        nik, cursor = read_page(client, cursor)
+        seen += nik
+    assert seen == [0, 1, 2, 3, 5, 6, 7, 8, 9, 100, 101]
+
+
+def test_last_page_has_no_cursor(client, store):
+    nik, cursor = read_page(client, limit=10)
+    assert nik == list(range(10)) and cursor is None
+    nik, cursor = read_page(client, limit=9)
+    assert cursor is not None
+    # cursor data terakhir yang sudah dihapus tetap berlaku
+    store.delete(8)
+    assert read_page(client, cursor, limit=9) == ([9], None)
+
+
+def test_limit_bounds(client):
+    for limit in (0, -1, MAX_LIMIT + 1):
+        assert client.get('/penduduk', params={'limit': limit}).status_code == 422
+    assert read_page(client, limit=MAX_LIMIT) == (list(range(10)), None)
+    nik, cursor = read_page(client, limit=1)
+    assert nik == [0] and read_page(client, cursor, limit=1)[0] == [1]
+    assert client.get('/penduduk', params={'limit': 3, 'cursor': '!!rusak'}).status_code == 400
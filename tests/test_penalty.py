@@ -0,0 +1,75 @@
+# Hitung ulang denda (penalty.PenaltyEngine): status_setoran ikut diperbarui pada pass yang
+# sama, index status dan ringkasan per status tetap sesuai isi tabel, dan hasil fallback
+# Python sama persis dengan NumPy.
+# Jalankan dari root repo: python -m pytest -q tests
+from collections import Counter
+
+import pytest
+
+import penalty
+from aggregate import RunningAggregate
+from penalty import PenaltyEngine, parse_date
+from store import KeyedStore
+from tables import SETORAN_INDEXES, SETORAN_RANGE_INDEXES
+
+AS_OF = parse_date('31-12-2023')
+
+
+def setoran_rows():
+    rows = []
+    for i in range(300):
+        status = ['tepat waktu', 'terlambat', 'belum dibayar'][i % 3]
+        rows.append({'id_setoran': i, 'id_pajak': f'PJ{i % 5}', 'tanggal_jatuh_tempo': '30-11-2023',
+                     'tanggal_setoran': f'{1 + i % 28:02d}-12-2023' if i % 2 else f'{1 + i % 28:02d}-11-2023',
+                     'status_setoran': status, 'denda': 0, 'besar_pajak_setelah_denda': 0})
+    return rows
+
+
+@pytest.fixture(params=['numpy', 'python'])
+def engine(request, monkeypatch):
+    if request.param == 'python':
+        monkeypatch.setattr(penalty, '_numpy', lambda: None)
+    pajak = KeyedStore('id_pajak', [{'id_pajak': f'PJ{i}', 'besar_pajak': 1000000 * (i + 1)} for i in range(5)])
+    setoran = KeyedStore('id_setoran', setoran_rows(), indexes=SETORAN_INDEXES, range_indexes=SETORAN_RANGE_INDEXES)
+    return PenaltyEngine(setoran, pajak)
+
+
+def test_status_follows_overdue_days(engine):
+    engine.recalculate(0.02, AS_OF)
+    for row in engine.setoran:
+        if row['status_setoran'] == 'belum dibayar':
+            continue
+        late = parse_date(row['tanggal_setoran']) > parse_date(row['tanggal_jatuh_tempo'])
+        assert row['status_setoran'] == ('terlambat' if late else 'tepat waktu'), row
+        assert (row['denda'] > 0) == late, row
+    # status lain tidak diubah
+    assert sum(row['status_setoran'] == 'belum dibayar' for row in engine.setoran) == 100
+
+
+def test_status_index_and_summary_stay_consistent(engine):
+    summary = RunningAggregate(engine.setoran, ('status_setoran',), ('denda', 'besar_pajak_setelah_denda'))
+    engine.recalculate(0.02, AS_OF)
+    engine.recalculate(0.05, AS_OF)
+    rows = engine.setoran.to_list()
+    counts = Counter(row['status_setoran'] for row in rows)
+    for status, count in counts.items():
+        assert len(engine.setoran.query({'status_setoran': status})) == count
+        assert summary.snapshot()['per_status_setoran'][status]['count'] == count
+    assert summary.snapshot()['total']['besar_pajak_setelah_denda']['sum'] == \
+        sum(row['besar_pajak_setelah_denda'] for row in rows)
+    # tanpa perubahan apa pun tidak ada yang ditulis ulang
+    assert engine.recalculate(0.05, AS_OF)['diubah'] == 0
+
+
+def test_python_fallback_matches_numpy(monkeypatch):
+    if penalty._numpy() is None:
+        pytest.skip('numpy tidak terpasang')
+    results = []
+    for use_numpy in (True, False):
+        if not use_numpy:
+            monkeypatch.setattr(penalty, '_numpy', lambda: None)
+        pajak = KeyedStore('id_pajak', [{'id_pajak': f'PJ{i}', 'besar_pajak': 1000000 * (i + 1)} for i in range(5)])
+        setoran = KeyedStore('id_setoran', setoran_rows())
+        PenaltyEngine(setoran, pajak).recalculate(0.03, AS_OF)
+        results.append(setoran.to_list())
+    assert results[0] == results[1]
@@ -0,0 +1,112 @@
+# Tabel proyeksi (storage.open_projection) harus berperilaku sama di backend memory
+# (columnar.ProjectionStore) dan SQLite (sqlite_store.SqliteProjectionStore): mengikuti
+# perubahan data induk, tetap ada saat induk dihapus, dan data yang ditulis berbeda dari
+# induk tidak ikut berubah. Untuk SQLite juga saat induk diubah oleh worker lain.
+# Jalankan dari root repo: python -m pytest -q tests
+import pytest
+
+from columnar import CompactStore, ProjectionStore
+from serialization import encode_rows, encode_table
+from sqlite_store import SqliteDatabase, SqliteProjectionStore, SqliteStore
+
+COLUMNS = ('nik', 'nama', 'provinsi', 'kota')
+FIELDS = ('nik', 'nama', 'kota')
+
+
+def penduduk(nik, nama, kota='Bandung'):
+    return {'nik': nik, 'nama': nama, 'provinsi': 'Jawa Barat', 'kota': kota}
+
+
+SEED = [penduduk(101, 'Ale'), penduduk(102, 'Leo'), penduduk(103, 'Lea')]
+# 101 dan 102 sama dengan induknya, 103 ditulis berbeda
+PROJECTION_SEED = [{'nik': 101, 'nama': 'Ale', 'kota': 'Bandung'}, {'nik': 102, 'nama': 'Leo', 'kota': 'Bandung'},
+                   {'nik': 103, 'nama': 'Lea', 'kota': 'Bogor'}]
+
+
+def open_memory(db_path):
+    base = CompactStore('nik', COLUMNS, rows=SEED, indexes=('kota',), prefix_indexes=('nama',))
+    return base, ProjectionStore(base, FIELDS, PROJECTION_SEED, indexes=('kota',), prefix_indexes=('nama',))
+
+
+def open_sqlite(db_path, db=None):
+    db = db or SqliteDatabase(db_path)
+    base = SqliteStore(db, 'penduduk', 'nik', SEED, indexes=('kota',), prefix_indexes=('nama',))
+    return base, SqliteProjectionStore(db, 'pendudukrental', base, FIELDS, PROJECTION_SEED,
+                                       indexes=('kota',), prefix_indexes=('nama',))
+
+
+@pytest.fixture
+def tables(backend, db_path):
+    return (open_memory if backend == 'memory' else open_sqlite)(db_path)
+
+
+def test_follows_base_updates(tables):
+    base, projection = tables
+    version = projection.version
+    base.replace(101, penduduk(101, 'Álex', 'Garut'))
+    base.replace(103, penduduk(103, 'Lea', 'Depok'))
+    assert projection.get(101) == {'nik': 101, 'nama': 'Álex', 'kota': 'Garut'}
+    assert projection.get(103) == {'nik': 103, 'nama': 'Lea', 'kota': 'Bogor'}
+    assert projection.version > version
+    # index projection ikut diperbarui
+    assert [row['nik'] for row in projection.query({'kota': 'Garut'})] == [101]
+    assert [row['nik'] for row in projection.query({}, prefix=('nama', 'áL'))] == [101]
+    assert projection.query({'kota': 'Bandung'}) == [{'nik': 102, 'nama': 'Leo', 'kota': 'Bandung'}]
+
+
+def test_unprojected_field_change_is_invisible(tables):
+    base, projection = tables
+    version = projection.version
+    base.replace(101, {**penduduk(101, 'Ale'), 'provinsi': 'Banten'})
+    assert projection.version == version
+    assert projection.get(101) == {'nik': 101, 'nama': 'Ale', 'kota': 'Bandung'}
+
+
+def test_delete_or_rekey_base_keeps_projection(tables):
+    base, projection = tables
+    base.delete(101)
+    base.replace(102, penduduk(202, 'Leo'))
+    assert projection.get(101) == {'nik': 101, 'nama': 'Ale', 'kota': 'Bandung'}
+    assert projection.get(102) == {'nik': 102, 'nama': 'Leo', 'kota': 'Bandung'}
+    assert projection.get(202) is None
+    base.replace(202, penduduk(202, 'Leon'))
+    assert projection.get(102)['nama'] == 'Leo'
+
+
+def test_own_write_stops_following(tables):
+    base, projection = tables
+    projection.replace(101, {'nik': 101, 'nama': 'Ale K', 'kota': 'Bandung'})
+    base.replace(101, penduduk(101, 'Ale', 'Cimahi'))
+    assert projection.get(101) == {'nik': 101, 'nama': 'Ale K', 'kota': 'Bandung'}
+
+
+def test_sqlite_follows_writes_from_other_worker(db_path):
+    base, projection = open_sqlite(db_path)
+    version = projection.version
+    # worker lain: koneksi dan objek store sendiri
+    other_base, _ = open_sqlite(db_path, SqliteDatabase(db_path))
+    other_base.update_many({101: {'kota': 'Garut'}, 102: {'nama': 'Leon'}})
+    assert projection.get(101)['kota'] == 'Garut'
+    assert projection.get(102)['nama'] == 'Leon'
+    # perubahan proyeksi tercatat di log perubahan bersama
+    changes, current = projection.changes_since(version)
+    assert current == projection.version == version + 2
+    assert sorted((old['nik'], new) for old, new in changes) == [
+        (101, {'nik': 101, 'nama': 'Ale', 'kota': 'Garut'}), (102, {'nik': 102, 'nama': 'Leon', 'kota': 'Bandung'})]
+
+
+# cache encode per nomor tulis (serialization.encode_table) tidak boleh memberi isi lama
+def test_encode_table_matches_rows_after_writes(db_path):
+    base, projection = open_memory(db_path)
+    for store in (base, projection):
+        assert encode_table(store) == encode_rows(store, store.to_list())
+    base.replace(101, penduduk(101, 'Álex', 'Garut'))
+    base.replace(102, penduduk(202, 'Leo'))
+    base.delete(103)
+    base.insert(penduduk(104, 'Ana'))
+    projection.replace(101, {'nik': 101, 'nama': 'Ale K', 'kota': 'Bandung'})
+    projection.insert({'nik': 104, 'nama': 'Ana', 'kota': 'Bandung'})
+    for store in (base, projection):
+        assert encode_table(store) == encode_rows(store, store.to_list())
+    base.replace(104, penduduk(104, 'Ana', 'Depok'))
+    assert encode_table(projection) == encode_rows(projection, projection.to_list())
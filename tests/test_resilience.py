@@ -0,0 +1,190 @@
+# Kebijakan pemanggilan partner (resilience.ResiliencePolicy) dengan transport palsu: jumlah
+# retry dibatasi, circuit breaker open -> half_open -> closed / open lagi, dan hedged request.
+# Waktu breaker dan jitter retry diganti supaya hasilnya tidak bergantung jam.
+# Jalankan dari root repo: python -m pytest -q tests
+import asyncio
+from types import SimpleNamespace
+
+import httpx
+import pytest
+from fastapi import HTTPException
+
+import resilience
+import upstream
+from resilience import CircuitOpenError, ResiliencePolicy, UpstreamError
+
+
+class Clock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    clock = Clock()
+    # hanya jam breaker yang diganti (event loop tetap memakai jam asli), retry tanpa jeda
+    monkeypatch.setattr(resilience, 'time', SimpleNamespace(monotonic=clock))
+    monkeypatch.setattr(resilience, 'random', SimpleNamespace(uniform=lambda low, high: 0.0))
+    return clock
+
+
+# transport palsu: setiap percobaan mengambil hasil berikutnya (status error atau data)
+class FakeTransport:
+    def __init__(self, *results):
+        self.results = list(results)
+        self.calls = 0
+
+    async def __call__(self, timeout: float):
+        self.calls += 1
+        result = self.results.pop(0) if len(self.results) > 1 else self.results[0]
+        if isinstance(result, int):
+            raise UpstreamError(result)
+        return result
+
+
+def call(policy, transport):
+    return asyncio.run(policy.call(transport))
+
+
+def test_retries_until_success(clock):
+    policy = ResiliencePolicy(budget=5, retries=2)
+    transport = FakeTransport(502, 504, 'data')
+    assert call(policy, transport) == 'data'
+    assert transport.calls == 3
+    assert policy.stats['retry'] == 2 and policy.breaker.state == 'closed' and policy.breaker.failures == 0
+
+
+def test_retry_limit(clock):
+    policy = ResiliencePolicy(budget=5, retries=2)
+    transport = FakeTransport(503)
+    with pytest.raises(UpstreamError):
+        call(policy, transport)
+    assert transport.calls == 3
+    assert policy.stats['failure'] == 1
+
+
+def test_client_error_is_not_retried(clock):
+    policy = ResiliencePolicy(budget=5, retries=2, failure_threshold=1)
+    transport = FakeTransport(404)
+    with pytest.raises(UpstreamError) as error:
+        call(policy, transport)
+    assert error.value.status_code == 404 and transport.calls == 1
+    # partner hidup: breaker tidak dibuka
+    assert policy.breaker.state == 'closed'
+
+
+def test_breaker_opens_then_half_open_probe(clock):
+    policy = ResiliencePolicy(budget=5, retries=0, failure_threshold=3, reset_timeout=30)
+    failing = FakeTransport(502)
+    for _ in range(3):
+        with pytest.raises(UpstreamError):
+            call(policy, failing)
+    assert policy.breaker.state == 'open' and policy.breaker.opened == 1
+    # selama terbuka request tidak dikirim
+    clock.now += 10
+    with pytest.raises(CircuitOpenError) as error:
+        call(policy, failing)
+    assert error.value.retry_after == pytest.approx(20)
+    assert failing.calls == 3 and policy.stats['rejected'] == 1
+    # setelah reset_timeout: satu percobaan (half_open); gagal -> open lagi
+    clock.now += 20
+    with pytest.raises(UpstreamError):
+        call(policy, failing)
+    assert failing.calls == 4 and policy.breaker.state == 'open' and policy.breaker.opened == 2
+    # percobaan berikutnya berhasil -> closed
+    clock.now += 30
+    assert call(policy, FakeTransport('data')) == 'data'
+    assert policy.breaker.state == 'closed' and policy.breaker.failures == 0
+
+
+def test_half_open_allows_one_probe_at_a_time(clock):
+    breaker = resilience.CircuitBreaker(failure_threshold=1, reset_timeout=30)
+    breaker.record_failure()
+    clock.now += 30
+    assert breaker.allow() and breaker.state == 'half_open'
+    assert not breaker.allow()
+    # percobaan dibatalkan: percobaan berikutnya boleh dikirim
+    breaker.release()
+    assert breaker.allow()
+
+
+def test_retry_stops_when_breaker_opens(clock):
+    policy = ResiliencePolicy(budget=5, retries=5, failure_threshold=2)
+    transport = FakeTransport(502)
+    with pytest.raises(UpstreamError):
+        call(policy, transport)
+    assert transport.calls == 2 and policy.breaker.state == 'open'
+
+
+def hedged_policy():
+    policy = ResiliencePolicy(budget=5, retries=0, hedge_percentile=0.95, hedge_min_samples=5)
+    for _ in range(5):
+        policy.latency.add(0.01)
+    return policy
+
+
+def test_hedge_wins_when_first_attempt_hangs(clock):
+    policy = hedged_policy()
+    started = []
+
+    async def attempt(timeout):
+        started.append(timeout)
+        if len(started) == 1:
+            await asyncio.sleep(60)
+        return f'percobaan {len(started)}'
+
+    assert call(policy, attempt) == 'percobaan 2'
+    assert len(started) == 2 and policy.stats['hedged'] == 1 and policy.stats['hedge_won'] == 1
+
+
+def test_hedge_not_sent_for_fast_attempt(clock):
+    policy = hedged_policy()
+    transport = FakeTransport('data')
+    assert call(policy, transport) == 'data'
+    assert transport.calls == 1 and policy.stats['hedged'] == 0
+
+
+def test_hedge_failure_waits_for_first_attempt(clock):
+    policy = hedged_policy()
+
+    started = []
+
+    async def attempt(timeout):
+        started.append(timeout)
+        if len(started) == 1:
+            await asyncio.sleep(0.05)
+            return 'pertama'
+        raise UpstreamError(502)
+
+    assert call(policy, attempt) == 'pertama'
+    assert policy.stats['hedged'] == 1 and policy.stats['hedge_won'] == 0
+
+
+# lewat httpx dengan MockTransport: error jaringan menjadi 502, breaker terbuka menjadi
+# 503 dengan Retry-After
+def test_upstream_call_maps_errors(clock, monkeypatch):
+    partner = upstream.Upstream('tes', 'http://partner.test/data', "Gagal mengambil data.",
+                                timeout=5, retries=0, failure_threshold=2)
+    requests = []
+
+    def handler(request):
+        requests.append(request)
+        raise httpx.ConnectError('partner mati', request=request)
+
+    async def run():
+        monkeypatch.setattr(upstream, '_client', httpx.AsyncClient(transport=httpx.MockTransport(handler)))
+        statuses, retry_after = [], None
+        for _ in range(3):
+            try:
+                await upstream._call(partner)
+            except HTTPException as e:
+                statuses.append(e.status_code)
+                retry_after = (e.headers or {}).get('Retry-After')
+        await upstream.close_client()
+        return statuses, retry_after
+
+    assert asyncio.run(run()) == ([502, 502, 503], '30')
+    assert len(requests) == 2
@@ -0,0 +1,56 @@
+# Autocomplete nama (search.NameIndex): hasil sama dengan memeriksa semua nama satu per satu,
+# dengan dan tanpa NumPy, termasuk saat banyak nama memuat semua trigram query tetapi
+# katanya tidak cocok.
+# Jalankan dari root repo: python -m pytest -q tests
+import random
+
+import pytest
+
+import search
+from search import NameIndex, normalize
+
+WORDS = ['budi', 'ani', 'anita', 'andi', 'dani', 'sari', 'santoso', 'siti', 'bud']
+
+
+@pytest.fixture(params=['numpy', 'python'])
+def engine(request, monkeypatch):
+    if request.param == 'numpy':
+        if search._numpy() is None:
+            pytest.skip('numpy tidak terpasang')
+    else:
+        monkeypatch.setattr(search, '_numpy', lambda: None)
+    return request.param
+
+
+# pembanding: memeriksa semua nama
+def expected(names, text, limit):
+    tokens = normalize(text).split()
+    complete, last = tokens[:-1], tokens[-1]
+    found = []
+    for key, name in names.items():
+        words = normalize(name).split()
+        if all(word in words for word in complete) and any(word.startswith(last) for word in words):
+            found.append((not normalize(name).startswith(' '.join(tokens)), len(name), name, key))
+    found.sort()
+    return [name for _, _, name, _ in found[:limit]]
+
+
+def test_matches_full_scan(engine):
+    rng = random.Random(5)
+    names = {i: ' '.join(rng.choice(WORDS) for _ in range(rng.randrange(1, 4))) for i in range(500)}
+    index = NameIndex()
+    for key, name in names.items():
+        index.add(key, name)
+    for key in rng.sample(sorted(names), 50):
+        index.remove(key)
+        del names[key]
+    for text in ['bu', 'budi a', 'budi ani', 'ani bu', 'sa', 'siti santoso', 'dani b', 'x']:
+        assert [name for _, name in index.autocomplete(text, 20)] == expected(names, text, 20), text
+
+
+def test_exact_match_behind_many_trigram_matches(engine):
+    index = NameIndex()
+    for i in range(3000):
+        index.add(i, 'budi andi dani')
+    index.add('x', 'budi anita')
+    assert index.autocomplete('budi ani') == [('x', 'budi anita')]
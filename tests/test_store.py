@@ -0,0 +1,64 @@
+# store.first(): satu data dengan nilai kolom tertentu langsung dari index, sama untuk
+# backend memory dan SQLite, termasuk setelah nilai kolom yang diindeks diubah. Query
+# prefix / range tetap benar setelah banyak insert, delete dan perubahan satu per satu.
+# Jalankan dari root repo: python -m pytest -q tests
+import random
+
+import pytest
+
+
+@pytest.fixture
+def store(open_store):
+    return open_store('setoran', 'id_setoran', indexes=('status_setoran',))
+
+
+def test_first_reads_index(store):
+    store.insert_many([{'id_setoran': i, 'status_setoran': 'terlambat' if i % 2 else 'tepat waktu'} for i in range(10)])
+    assert store.first('status_setoran', 'terlambat')['id_setoran'] == 1
+    assert store.first('status_setoran', 'belum dibayar') is None
+    store.update_many({1: {'status_setoran': 'tepat waktu'}, 4: {'status_setoran': 'belum dibayar'}})
+    assert store.first('status_setoran', 'terlambat')['id_setoran'] == 3
+    assert store.first('status_setoran', 'belum dibayar')['id_setoran'] == 4
+    store.delete_many([3, 5, 7, 9])
+    assert store.first('status_setoran', 'terlambat') is None
+    # kolom tanpa index tetap bisa dicari
+    assert store.first('id_setoran', 8)['status_setoran'] == 'tepat waktu'
+
+
+def test_first_keeps_table_order_after_rewrites(store):
+    store.insert_many([{'id_setoran': i, 'status_setoran': 'terlambat'} for i in range(3)])
+    # menulis ulang data yang sama tidak memindahkan posisinya
+    store.replace(0, {'id_setoran': 0, 'status_setoran': 'terlambat'})
+    store.upsert({'id_setoran': 1, 'status_setoran': 'terlambat', 'denda': 0.02})
+    store.upsert_many([{'id_setoran': 0, 'status_setoran': 'terlambat'}])
+    assert store.first('status_setoran', 'terlambat')['id_setoran'] == 0
+    # pindah status lalu kembali: tetap urutan tabel (seq), bukan urutan masuk index
+    store.replace(0, {'id_setoran': 0, 'status_setoran': 'tepat waktu'})
+    assert store.first('status_setoran', 'terlambat')['id_setoran'] == 1
+    store.update_many({0: {'status_setoran': 'terlambat'}})
+    assert store.first('status_setoran', 'terlambat')['id_setoran'] == 0
+    store.replace(0, {'id_setoran': 0, 'status_setoran': 'tepat waktu'})
+    store.replace(0, {'id_setoran': 0, 'status_setoran': 'terlambat'})
+    assert store.first('status_setoran', 'terlambat')['id_setoran'] == 0
+    assert [row['id_setoran'] for row in store.query({'status_setoran': 'terlambat'})] == [0, 1, 2]
+
+
+def test_prefix_and_range_after_single_writes(open_store):
+    rng = random.Random(3)
+    store = open_store('penduduk', 'nik', [{'nik': i, 'nama': f'warga {i % 97}'} for i in range(3000)],
+                       prefix_indexes=('nama',), range_indexes={'nik': int})
+    rows = {row['nik']: row for row in store.to_list()}
+    for nik in rng.sample(sorted(rows), 800):
+        store.delete(nik)
+        del rows[nik]
+    for i in range(3000, 4500):
+        rows[i] = store.insert({'nik': i, 'nama': f'warga {rng.randrange(97)}'})
+    for nik in rng.sample(sorted(rows), 500):
+        rows[nik] = {'nik': nik, 'nama': f'penduduk {nik % 13}'}
+        store.replace(nik, rows[nik])
+    for text in ('warga 1', 'penduduk', 'warga 96', 'x'):
+        expected = sorted(nik for nik, row in rows.items() if row['nama'].startswith(text))
+        assert sorted(row['nik'] for row in store.query({}, prefix=('nama', text))) == expected
+    for low, high in ((None, 10), (1000, 1200), (2990, 3010), (4400, None)):
+        expected = sorted(nik for nik in rows if (low is None or nik >= low) and (high is None or nik <= high))
+        assert [row['nik'] for row in store.query({}, ranges={'nik': (low, high)})] == expected
@@ -0,0 +1,110 @@
+# Sync data partner ke mirror lokal (sync.SyncScheduler / sync.Mirror) dengan partner palsu
+# (httpx.MockTransport): selisih data diterapkan ke mirror dan index-nya, ETag dikirim
+# ulang sebagai If-None-Match dan jawaban 304 tidak mengubah apa pun, body yang sama tanpa
+# ETag dikenali dari hash-nya, dan sync yang gagal tetap memakai data lama.
+# Jalankan dari root repo: python -m pytest -q tests
+import asyncio
+import json
+
+import httpx
+import pytest
+
+import upstream
+from sync import Mirror, SyncScheduler
+
+
+class FakePartner:
+    def __init__(self, rows, etag=None):
+        self.rows = rows
+        self.etag = etag
+        self.status = 200
+        self.requests = []
+
+    def __call__(self, request: httpx.Request) -> httpx.Response:
+        self.requests.append(request)
+        if self.status != 200:
+            return httpx.Response(self.status)
+        if self.etag is not None and request.headers.get('If-None-Match') == self.etag:
+            return httpx.Response(304, headers={'ETag': self.etag})
+        headers = {'ETag': self.etag} if self.etag is not None else {}
+        return httpx.Response(200, content=json.dumps(self.rows).encode(), headers=headers)
+
+
+@pytest.fixture
+def partner(monkeypatch):
+    partner = FakePartner([{'id_guider': 1, 'nama': 'Ale'}, {'id_guider': 2, 'nama': 'Leo'}], etag='"v1"')
+    monkeypatch.setitem(upstream.UPSTREAMS, 'tes', upstream.Upstream('tes', 'http://partner.test/guide',
+                                                                     "Gagal mengambil data.", retries=0))
+    monkeypatch.setattr(upstream, '_client', None)
+    return partner
+
+
+def run_syncs(partner, mirror, steps):
+    async def run():
+        upstream._client = httpx.AsyncClient(transport=httpx.MockTransport(partner))
+        scheduler = SyncScheduler({'tes': mirror})
+        try:
+            for step in steps:
+                step()
+                await scheduler.sync(mirror)
+        finally:
+            await upstream.close_client()
+
+    asyncio.run(run())
+
+
+def test_diff_applied_and_304_keeps_mirror(partner):
+    mirror = Mirror('tes', 'id_guider', 60)
+    results = []
+
+    def not_modified():
+        results.append((mirror.last_result, mirror.version, mirror.rows))
+
+    def changed():
+        results.append((mirror.last_result, mirror.version, mirror.rows))
+        partner.rows = [{'id_guider': 1, 'nama': 'Álex'}, {'id_guider': 3, 'nama': 'Lea'}]
+        partner.etag = '"v2"'
+
+    run_syncs(partner, mirror, [lambda: None, not_modified, changed])
+    assert results[0][:2] == ('updated', 1)
+    # 304: data dan objek list mirror tetap sama
+    assert results[1][0] == 'not_modified' and results[1][1] == 1 and results[1][2] is results[0][2]
+    assert [request.headers.get('If-None-Match') for request in partner.requests] == [None, '"v1"', '"v1"']
+    assert mirror.last_result == 'updated' and mirror.version == 2
+    assert mirror.last_diff == {'added': 1, 'removed': 1, 'changed': 1}
+    assert mirror.get(1)['nama'] == 'Álex' and mirror.get(2) is None and mirror.get(3)['nama'] == 'Lea'
+    assert mirror.etag == '"v2"'
+    assert (mirror.stats['updated'], mirror.stats['not_modified']) == (2, 1)
+
+
+def test_same_body_without_etag_is_unchanged(partner):
+    partner.etag = None
+    mirror = Mirror('tes', 'id_guider', 60)
+    versions = []
+    run_syncs(partner, mirror, [lambda: None, lambda: versions.append(mirror.rows)])
+    assert mirror.last_result == 'unchanged' and mirror.version == 1
+    assert mirror.rows is versions[0]
+    assert 'If-None-Match' not in partner.requests[1].headers
+
+
+def test_failed_sync_keeps_old_rows(partner):
+    mirror = Mirror('tes', 'id_guider', 60)
+
+    def fail():
+        partner.status = 503
+
+    run_syncs(partner, mirror, [lambda: None, fail])
+    assert mirror.last_result == 'error' and mirror.last_error.startswith('503')
+    assert mirror.ready and mirror.version == 1 and mirror.get(2)['nama'] == 'Leo'
+    assert mirror.stats['error'] == 1
+
+
+def test_diff_without_key_counts_rows():
+    mirror = Mirror('rental', None, 60)
+    mirror.apply([{'nama': 'Ale'}, {'nama': 'Ale'}, {'nama': 'Leo'}])
+    assert mirror.apply([{'nama': 'Ale'}, {'nama': 'Lea'}]) == {'added': 1, 'removed': 2, 'changed': 0}
+    assert mirror.version == 2
+    # urutan berbeda tetapi isi sama: tidak dianggap berubah
+    rows = mirror.rows
+    assert mirror.apply([{'nama': 'Lea'}, {'nama': 'Ale'}]) == {'added': 0, 'removed': 0, 'changed': 0}
+    assert mirror.rows is rows and mirror.version == 2
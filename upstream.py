@@ -0,0 +1,179 @@
+import asyncio
+import importlib.util
+import math
+import os
+import time
+from contextlib import asynccontextmanager
+from typing import TYPE_CHECKING, Any, Dict, Optional, Tuple
+
+from fastapi import HTTPException
+
+from metrics import UPSTREAM_SECONDS
+from resilience import CircuitOpenError, ResiliencePolicy, UpstreamError
+
+# httpx diimpor saat client dibuat (lifespan), bukan saat modul ini diimpor
+if TYPE_CHECKING:
+    import httpx
+
+
+# HTTP/2 hanya dipakai jika paket h2 terpasang
+HTTP2_AVAILABLE = importlib.util.find_spec('h2') is not None
+
+
+# Konfigurasi satu API kelompok lain (partner). URL bisa diganti lewat
+# environment variable UPSTREAM_<NAMA>_URL, misalnya untuk server stub lokal.
+# ttl / stale_ttl (detik, UPSTREAM_<NAMA>_TTL / UPSTREAM_<NAMA>_STALE_TTL) dipakai oleh cache di cache.py.
+# retries / hedge_percentile (UPSTREAM_<NAMA>_RETRIES / UPSTREAM_<NAMA>_HEDGE, mis. 0.95)
+# dan circuit breaker diatur lewat ResiliencePolicy (resilience.py).
+class Upstream:
+    def __init__(self, name: str, url: str, error_detail: str,
+                 timeout: float = 10.0, max_connections: int = 10,
+                 ttl: float = 60.0, stale_ttl: float = 600.0,
+                 retries: int = 2, hedge_percentile: Optional[float] = None,
+                 failure_threshold: int = 5, reset_timeout: float = 30.0, sync_interval: float = 60.0):
+        self.name = name
+        self.url = os.environ.get(f'UPSTREAM_{name.upper()}_URL', url)
+        self.error_detail = error_detail
+        self.timeout = timeout
+        self.max_connections = max_connections
+        self.ttl = float(os.environ.get(f'UPSTREAM_{name.upper()}_TTL', ttl))
+        self.stale_ttl = float(os.environ.get(f'UPSTREAM_{name.upper()}_STALE_TTL', stale_ttl))
+        # jeda (detik) antar sync background data partner ke mirror lokal (sync.py)
+        self.sync_interval = float(os.environ.get(f'UPSTREAM_{name.upper()}_SYNC_INTERVAL', sync_interval))
+        # membatasi jumlah request bersamaan ke satu partner
+        self.semaphore = asyncio.Semaphore(max_connections)
+        # UPSTREAM_<NAMA>_HEDGE kosong / 0 mematikan hedging
+        hedge = os.environ.get(f'UPSTREAM_{name.upper()}_HEDGE', hedge_percentile)
+        self.policy = ResiliencePolicy(
+            budget=timeout,
+            retries=int(os.environ.get(f'UPSTREAM_{name.upper()}_RETRIES', retries)),
+            failure_threshold=failure_threshold,
+            reset_timeout=reset_timeout,
+            hedge_percentile=float(hedge) or None if hedge else None,
+        )
+
+
+UPSTREAMS: Dict[str, Upstream] = {
+    'wisata': Upstream('wisata', "https://pajakobjekwisata.onrender.com/wisata",
+                       "Gagal mengambil data Objek Wisata", timeout=30.0, ttl=300.0, hedge_percentile=0.95,
+                       sync_interval=300.0),
+    'asuransi': Upstream('asuransi', "https://eai-fastapi.onrender.com/penduduk",
+                         "Gagal mengambil Penduduk.", timeout=30.0),
+    'bank': Upstream('bank', "https://jumantaradev.my.id/", "Gagal mengambil Penduduk."),
+    'hotel': Upstream('hotel', "https://hotelbaru.onrender.com", "Gagal mengambil Penduduk.", timeout=30.0),
+    'rental': Upstream('rental', "https://rental-mobil-api.onrender.com/pelanggan",
+                       "Gagal mengambil Penduduk.", timeout=30.0),
+    'guide': Upstream('guide', "https://tour-guide-ks4n.onrender.com/tourguide",
+                      "Gagal mengambil Tour Guide.", timeout=30.0),
+}
+
+_client: Optional['httpx.AsyncClient'] = None
+
+
+# Satu AsyncClient untuk semua partner supaya koneksi (TCP/TLS) dipakai ulang.
+# Dibuat oleh lifespan saat startup; tanpa lifespan (mis. script) dibuat saat pertama dipakai.
+def get_client() -> 'httpx.AsyncClient':
+    global _client
+    if _client is None or _client.is_closed:
+        import httpx
+
+        _client = httpx.AsyncClient(
+            http2=HTTP2_AVAILABLE,
+            limits=httpx.Limits(
+                max_connections=sum(upstream.max_connections for upstream in UPSTREAMS.values()),
+                max_keepalive_connections=len(UPSTREAMS) * 4,
+                keepalive_expiry=60.0,
+            ),
+        )
+    return _client
+
+
+async def close_client():
+    global _client
+    if _client is not None:
+        await _client.aclose()
+        _client = None
+
+
+async def _open_client():
+    await asyncio.to_thread(importlib.import_module, 'httpx')
+    get_client()
+
+
+# lifespan FastAPI: client dibuat saat startup dan ditutup saat shutdown. Import httpx
+# (~160 ms) dijalankan di thread, jadi server sudah melayani request lokal selama client
+# disiapkan; request partner yang datang lebih dulu menunggu import yang sama selesai.
+@asynccontextmanager
+async def lifespan(app):
+    opening = asyncio.create_task(_open_client())
+    try:
+        yield
+    finally:
+        opening.cancel()
+        await close_client()
+
+
+# Satu percobaan request ke partner, error jaringan / timeout sebagai UpstreamError 502 / 504.
+# Dengan etag / last_modified dikirim sebagai conditional GET (If-None-Match / If-Modified-Since).
+# None jika partner menjawab 304 (tidak berubah), selain itu (body, data JSON, ETag, Last-Modified).
+async def _request(upstream: Upstream, timeout: float, etag: Optional[str] = None,
+                   last_modified: Optional[str] = None) -> Optional[Tuple[bytes, Any, Optional[str], Optional[str]]]:
+    headers = {}
+    if etag:
+        headers['If-None-Match'] = etag
+    if last_modified:
+        headers['If-Modified-Since'] = last_modified
+    import httpx
+
+    async with upstream.semaphore:
+        # waktu request (tanpa antre semaphore) dicatat per partner + status di metrics.py
+        started = time.perf_counter()
+        try:
+            response = await get_client().get(upstream.url, headers=headers,
+                                              timeout=httpx.Timeout(timeout, connect=min(timeout, 5.0)))
+        except httpx.TimeoutException:
+            UPSTREAM_SECONDS.observe(time.perf_counter() - started, (upstream.name, 'timeout'))
+            raise UpstreamError(504)
+        except httpx.HTTPError:
+            UPSTREAM_SECONDS.observe(time.perf_counter() - started, (upstream.name, 'error'))
+            raise UpstreamError(502)
+    UPSTREAM_SECONDS.observe(time.perf_counter() - started, (upstream.name, str(response.status_code)))
+    if response.status_code == 304 and headers:
+        return None
+    if response.status_code != 200:
+        raise UpstreamError(response.status_code)
+    try:
+        data = response.json()
+    except ValueError:
+        raise UpstreamError(502)
+    return response.content, data, response.headers.get('ETag'), response.headers.get('Last-Modified')
+
+
+# Menjalankan request lewat ResiliencePolicy partner (retry, hedging, circuit breaker).
+# Error diteruskan sebagai HTTPException dengan status yang sama (502 / 504 untuk jaringan),
+# 503 + Retry-After jika circuit breaker partner sedang terbuka.
+async def _call(upstream: Upstream, etag: Optional[str] = None, last_modified: Optional[str] = None):
+    try:
+        return await upstream.policy.call(lambda timeout: _request(upstream, timeout, etag, last_modified))
+    except CircuitOpenError as e:
+        raise HTTPException(status_code=503, detail=upstream.error_detail,
+                            headers={'Retry-After': str(max(1, math.ceil(e.retry_after)))})
+    except UpstreamError as e:
+        raise HTTPException(status_code=e.status_code, detail=upstream.error_detail)
+
+
+# Mengambil data JSON dari partner
+async def fetch_json(name: str) -> Any:
+    return (await _call(UPSTREAMS[name]))[1]
+
+
+# Seperti fetch_json, tapi memakai ETag / Last-Modified dari pengambilan sebelumnya
+# (dipakai sync.py). None jika data partner tidak berubah, selain itu
+# (body, data JSON, ETag, Last-Modified).
+async def fetch_conditional(name: str, etag: Optional[str] = None, last_modified: Optional[str] = None):
+    return await _call(UPSTREAMS[name], etag, last_modified)
+
+
+# status circuit breaker, latency dan jumlah retry / hedge setiap partner
+def upstream_status() -> Dict[str, Any]:
+    return {name: {'url': upstream.url, **upstream.policy.snapshot()} for name, upstream in UPSTREAMS.items()}